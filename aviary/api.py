@@ -38,6 +38,7 @@ from aviary.interface.methods_for_level1 import run_level_1
 from aviary.interface.methods_for_level1 import run_aviary
 from aviary.interface.methods_for_level2 import AviaryProblem
 from aviary.interface.utils.check_phase_info import check_phase_info
+from aviary.interface.utils.warm_start import WarmStartLibrary
 from aviary.utils.engine_deck_conversion import EngineDeckConverter
 from aviary.utils.fortran_to_aviary import create_aviary_deck
 from aviary.utils.functions import set_aviary_initial_values, get_path
@@ -1,15 +1,9 @@
 import argparse
+import importlib
 import os
 import sys
 
 import aviary
-from aviary.interface.methods_for_level1 import _exec_level1, _setup_level1_parser
-from aviary.utils.fortran_to_aviary import _exec_F2A, _setup_F2A_parser
-from aviary.utils.engine_deck_conversion import _exec_EDC, _setup_EDC_parser, EDC_description
-from aviary.utils.aero_table_conversion import _exec_ATC, _setup_ATC_parser
-from aviary.visualization.dashboard import _dashboard_setup_parser, _dashboard_cmd
-from aviary.interface.graphical_input import _exec_flight_profile, _setup_flight_profile_parser
-from aviary.interface.download_models import _exec_hangar, _setup_hangar_parser
 
 
 def _load_and_exec(script_name, user_args):
@@ -41,23 +35,55 @@ def _load_and_exec(script_name, user_args):
     exec(code, globals_dict)  # nosec: private, internal use only
 
 
+# The module that implements each command is only imported when that command is run,
+# so that the heavy dependencies of the other commands (the full Aviary and OpenMDAO
+# stack, tkinter, bokeh, ...) do not slow down every call.
+# {command: (module, parser setup function, executor function, help[,
+#            name of the full description in the module])}
 _command_map = {
-    'fortran_to_aviary': (_setup_F2A_parser, _exec_F2A,
+    'fortran_to_aviary': ('aviary.utils.fortran_to_aviary', '_setup_F2A_parser', '_exec_F2A',
                           "Converts legacy Fortran input decks to Aviary csv based decks"),
-    'run_mission': (_setup_level1_parser, _exec_level1,
-                    "Runs Aviary using a provided input deck"),
-    'draw_mission': (_setup_flight_profile_parser, _exec_flight_profile,
+    'run_mission': ('aviary.interface.methods_for_level1', '_setup_level1_parser',
+                    '_exec_level1', "Runs Aviary using a provided input deck"),
+    'run_batch': ('aviary.interface.methods_for_level1', '_setup_batch_parser', '_exec_batch',
+                  "Runs several Aviary cases in parallel and collects their results"),
+    'draw_mission': ('aviary.interface.graphical_input', '_setup_flight_profile_parser',
+                     '_exec_flight_profile',
                      "Allows users to draw a mission profile for use in Aviary."),
-    'dashboard': (_dashboard_setup_parser, _dashboard_cmd,
-                  "Run the Dashboard tool"),
-    'hangar': (_setup_hangar_parser, _exec_hangar,
+    'dashboard': ('aviary.visualization.dashboard', '_dashboard_setup_parser',
+                  '_dashboard_cmd', "Run the Dashboard tool"),
+    'hangar': ('aviary.interface.download_models', '_setup_hangar_parser', '_exec_hangar',
                "Allows users that pip installed Aviary to download models from the Aviary hangar"),
-    'convert_engine': (_setup_EDC_parser, _exec_EDC, EDC_description),
-    'convert_aero_table': (_setup_ATC_parser, _exec_ATC,
+    'convert_engine': ('aviary.utils.engine_deck_conversion', '_setup_EDC_parser', '_exec_EDC',
+                       'Converts FLOPS- or GASP-formatted engine decks into Aviary csv format.',
+                       'EDC_description'),
+    'convert_aero_table': ('aviary.utils.aero_table_conversion', '_setup_ATC_parser', '_exec_ATC',
                            'Converts FLOPS- or GASP-formatted aero data files into Aviary csv format.'),
 }
 
 
+def _load_command(command):
+    """
+    Import the module of the given command.
+
+    Parameters
+    ----------
+    command : str
+        The name of the command.
+
+    Returns
+    -------
+    (function, function, str or None)
+        The parser setup function, the executor function and the full description, if
+        the module has one, of the command.
+    """
+    module_name, setup_name, exec_name, _, *description_name = _command_map[command]
+    module = importlib.import_module(module_name)
+    description = getattr(module, description_name[0]) if description_name else None
+
+    return getattr(module, setup_name), getattr(module, exec_name), description
+
+
 def aviary_cmd():
     """
     Run an 'aviary' sub-command or list help info for 'aviary' command or sub-commands.
@@ -83,14 +109,20 @@ def aviary_cmd():
     # Adding the --version argument
     parser.add_argument('--version', action='store_true', help='show version and exit')
 
-    subs = parser.add_subparsers(title='Tools', metavar='', dest="subparser_name")
-    for p, (parser_setup_func, executor, help_str) in sorted(_command_map.items()):
-        subp = subs.add_parser(p, help=help_str)
-        parser_setup_func(subp)
-        subp.set_defaults(executor=executor)
-
     args = [a for a in sys.argv[1:] if not a.startswith('-')]
     # '--version', '--dependency_versions')]
+
+    subs = parser.add_subparsers(title='Tools', metavar='', dest="subparser_name")
+    for p, (_, _, _, help_str, *_) in sorted(_command_map.items()):
+        # only the selected command needs its arguments and full description
+        if args and args[0] == p:
+            parser_setup_func, executor, description = _load_command(p)
+            subp = subs.add_parser(p, help=help_str, description=description)
+            parser_setup_func(subp)
+            subp.set_defaults(executor=executor)
+        else:
+            subs.add_parser(p, help=help_str)
+
     cmdargs = [a for a in sys.argv[1:] if a not in ('-h',)]
 
     if len(args) == 1 and len(user_args) == 0:
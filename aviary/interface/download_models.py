@@ -1,12 +1,13 @@
 import os
 from pathlib import Path
 import argparse
-import pkg_resources
+import importlib.resources
 import shutil
 
 
 def aviary_resource(resource_name: str) -> str:
-    return pkg_resources.resource_filename("aviary", resource_name)
+    # importlib.resources is used instead of pkg_resources, which is slow to import
+    return str(importlib.resources.files("aviary") / resource_name)
 
 
 def get_model(file_name: str, verbose=False) -> Path:
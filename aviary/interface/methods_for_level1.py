@@ -1,19 +1,32 @@
 """
 This file contains functions needed to run Aviary using the Level 1 interface.
 """
+import contextlib
+import csv
+import importlib.util
+import json
+import multiprocessing
+import multiprocessing.connection
 import os
+import time
 from pathlib import Path
 
+import numpy as np
 import openmdao.api as om
+from openmdao.core.problem import _clear_problem_names
 from aviary.variable_info.enums import AnalysisScheme, Verbosity
+from aviary.variable_info.variables import Aircraft, Mission
 from aviary.interface.methods_for_level2 import AviaryProblem
+from aviary.interface.utils.warm_start import WarmStartLibrary, _check_analysis_scheme
+from aviary.utils.functions import get_path
 
 
 def run_aviary(aircraft_filename, phase_info, optimizer=None,
                analysis_scheme=AnalysisScheme.COLLOCATION, objective_type=None,
                record_filename='dymos_solution.db', restart_filename=None, max_iter=50,
                run_driver=True, make_plots=True, phase_info_parameterization=None,
-               optimization_history_filename=None, verbosity=Verbosity.BRIEF):
+               optimization_history_filename=None, verbosity=Verbosity.BRIEF,
+               input_overrides=None, warm_start_library=None, outdir=None):
     """
     Run the Aviary optimization problem for a specified aircraft configuration and mission.
 
@@ -47,6 +60,16 @@ def run_aviary(aircraft_filename, phase_info, optimizer=None,
     phase_info_parameterization : function, optional
         Additional information to parameterize the phase_info object based on
         desired cruise altitude and Mach.
+    input_overrides : dict, optional
+        Values of the form {name: (val, units)} that replace the ones loaded from
+        aircraft_filename before the inputs are preprocessed.
+    warm_start_library : WarmStartLibrary or str, optional
+        Library, or the directory of one, whose nearest stored solutions replace the
+        default initial guesses. If the driver converges, the solution is added to it.
+        Only available for the collocation analysis scheme.
+    outdir : str, optional
+        Directory that the recorded solution and optimization history, the reports and
+        the coloring files are written to, instead of the current working directory.
 
     Returns
     -------
@@ -60,13 +83,28 @@ def run_aviary(aircraft_filename, phase_info, optimizer=None,
     Users can modify or add methods to alter the Aviary problem's behavior.
     """
 
+    if warm_start_library is not None:
+        _check_analysis_scheme(analysis_scheme)
+
     # Build problem
     prob = AviaryProblem(analysis_scheme, name=Path(aircraft_filename).stem)
 
+    if outdir is not None:
+        os.makedirs(outdir, exist_ok=True)
+        prob.options['coloring_dir'] = os.path.join(outdir, 'coloring_files')
+        record_filename = os.path.join(outdir, record_filename)
+        if optimization_history_filename is not None:
+            optimization_history_filename = os.path.join(
+                outdir, optimization_history_filename)
+
     # Load aircraft and options data from user
     # Allow for user overrides here
     prob.load_inputs(aircraft_filename, phase_info, verbosity=verbosity)
 
+    if input_overrides is not None:
+        for name, (val, units) in input_overrides.items():
+            prob.aviary_inputs.set_val(name, val, units=units)
+
     # Preprocess inputs
     prob.check_and_preprocess_inputs()
 
@@ -87,12 +125,29 @@ def run_aviary(aircraft_filename, phase_info, optimizer=None,
     # Detail which variables the optimizer can control
     prob.add_objective(objective_type=objective_type)
 
-    prob.setup()
+    if outdir is not None:
+        # reports, including the optimizer output and dymos plots, are written when the
+        # problem is set up and run
+        reports_dir = om.get_reports_dir()
+        om.set_reports_dir(os.path.join(outdir, 'reports'))
+
+    try:
+        prob.setup()
 
-    prob.set_initial_guesses()
+        if warm_start_library is not None and not isinstance(warm_start_library,
+                                                             WarmStartLibrary):
+            warm_start_library = WarmStartLibrary(warm_start_library)
 
-    prob.failed = prob.run_aviary_problem(
-        record_filename, restart_filename=restart_filename, run_driver=run_driver, make_plots=make_plots, optimization_history_filename=optimization_history_filename)
+        prob.set_initial_guesses(warm_start_library=warm_start_library)
+
+        prob.failed = prob.run_aviary_problem(
+            record_filename, restart_filename=restart_filename, run_driver=run_driver, make_plots=make_plots, optimization_history_filename=optimization_history_filename)
+    finally:
+        if outdir is not None:
+            om.set_reports_dir(reports_dir)
+
+    if warm_start_library is not None and run_driver and not prob.failed:
+        warm_start_library.add(prob)
 
     return prob
 
@@ -194,3 +249,275 @@ def _exec_level1(args, user_args):
         max_iter=args.max_iter,
         analysis_scheme=analysis_scheme,
     )
+
+
+# values collected by run_aviary_batch when no outputs are given
+_default_batch_outputs = [
+    (Mission.Design.GROSS_MASS, 'lbm'),
+    (Mission.Summary.FUEL_BURNED, 'lbm'),
+    (Aircraft.Design.OPERATING_MASS, 'lbm'),
+    (Mission.Design.RANGE, 'NM'),
+]
+
+
+def run_aviary_batch(cases, outdir='batch_output', max_workers=None, timeout=None,
+                     outputs=None, results_filename='batch_results.csv', **kwargs):
+    """
+    Run several Aviary problems in parallel processes and collect their results in a
+    single table.
+
+    Every case runs in a separate process and writes its outputs to its own
+    sub-directory of outdir, with its printed output in run.log. Where processes are
+    forked, the cases share everything already imported in the calling process, so
+    they do not pay the import cost again.
+
+    Parameters
+    ----------
+    cases : list
+        The cases to run. Each case is either the filename of an aircraft input deck
+        or a dict with the key 'aircraft_filename' and optionally 'name',
+        'phase_info' (a dict, or the filename of a python file that defines
+        phase_info) and 'input_overrides' (see run_aviary).
+    outdir : str, optional
+        Directory that holds the case directories and the results table, defaults to
+        'batch_output'.
+    max_workers : int, optional
+        Maximum number of cases that run at the same time, defaults to the number of
+        CPUs.
+    timeout : float, optional
+        Time in seconds after which a case is terminated. By default the cases are not
+        timed out.
+    outputs : list, optional
+        Names, or (name, units) tuples, of the values collected from every case.
+        Defaults to the gross mass, fuel burned, operating mass and range.
+    results_filename : str, optional
+        Name of the csv file in outdir that the results table is written to,
+        defaults to 'batch_results.csv'. If None, no file is written.
+    **kwargs
+        Passed to run_aviary for every case, for example optimizer or max_iter.
+
+    Returns
+    -------
+    list of dict
+        One row per case, in the order of cases. Each row holds the case name, the
+        status ('success', 'failed', 'error' or 'timeout'), the run time in seconds,
+        an error message and the collected outputs.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count()
+    if outputs is None:
+        outputs = _default_batch_outputs
+    outputs = [(output, None) if isinstance(output, str) else tuple(output)
+               for output in outputs]
+    outdir = os.path.abspath(outdir)
+
+    batch_cases = []
+    case_names = set()
+    for case in cases:
+        if not isinstance(case, dict):
+            case = {'aircraft_filename': case}
+        case = case.copy()
+        case.setdefault('name', Path(case['aircraft_filename']).stem)
+        # keep the case directories apart
+        name = case['name']
+        idx = 1
+        while case['name'] in case_names:
+            case['name'] = f'{name}_{idx}'
+            idx += 1
+        case_names.add(case['name'])
+        case['outdir'] = os.path.join(outdir, case['name'])
+        batch_cases.append(case)
+
+    context = multiprocessing.get_context()
+    rows = [None] * len(batch_cases)
+    pending = list(enumerate(batch_cases))
+    running = {}
+
+    while pending or running:
+        while pending and len(running) < max_workers:
+            case_idx, case = pending.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_run_batch_case, args=(case, outputs, kwargs, sender))
+            process.start()
+            sender.close()
+            running[case_idx] = (process, receiver, time.perf_counter())
+
+        multiprocessing.connection.wait(
+            [receiver for _, receiver, _ in running.values()], timeout=0.1)
+
+        for case_idx, (process, receiver, start_time) in list(running.items()):
+            row = None
+            run_time = time.perf_counter() - start_time
+            try:
+                if receiver.poll():
+                    row = receiver.recv()
+            except EOFError:
+                pass
+
+            if row is None:
+                if not process.is_alive():
+                    row = _batch_row(batch_cases[case_idx], outputs, 'error', run_time,
+                                     f'process exited with code {process.exitcode}')
+                elif timeout is not None and run_time > timeout:
+                    process.terminate()
+                    row = _batch_row(batch_cases[case_idx], outputs, 'timeout', run_time,
+                                     f'timed out after {timeout} s')
+                else:
+                    continue
+
+            process.join()
+            receiver.close()
+            del running[case_idx]
+            rows[case_idx] = row
+
+    if results_filename is not None:
+        os.makedirs(outdir, exist_ok=True)
+        with open(os.path.join(outdir, results_filename), 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=list(rows[0]) if rows else [])
+            writer.writeheader()
+            writer.writerows(rows)
+
+    return rows
+
+
+def _batch_row(case, outputs, status, run_time, message=''):
+    row = {'case': case['name'], 'status': status, 'run_time': run_time,
+           'message': message}
+    for name, units in outputs:
+        row[name if units is None else f'{name} ({units})'] = None
+    return row
+
+
+def _run_batch_case(case, outputs, run_kwargs, connection):
+    start_time = time.perf_counter()
+    row = _batch_row(case, outputs, 'error', 0.)
+
+    try:
+        # forked processes inherit the problem names used in the calling process
+        _clear_problem_names()
+
+        aircraft_filename = str(get_path(case['aircraft_filename']))
+        phase_info = case.get('phase_info')
+        if isinstance(phase_info, str):
+            phase_info = _load_phase_info(get_path(phase_info))
+
+        os.makedirs(case['outdir'], exist_ok=True)
+
+        with open(os.path.join(case['outdir'], 'run.log'), 'w') as log, \
+                contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            prob = run_aviary(aircraft_filename, phase_info,
+                              input_overrides=case.get('input_overrides'),
+                              outdir=case['outdir'], **run_kwargs)
+
+        row['status'] = 'failed' if prob.failed else 'success'
+        missing = []
+        for name, units in outputs:
+            try:
+                val = np.atleast_1d(prob.get_val(name, units=units))
+            except KeyError:
+                missing.append(name)
+                continue
+            row[name if units is None else f'{name} ({units})'] = \
+                val[0] if val.size == 1 else val.tolist()
+        if missing:
+            row['message'] = 'outputs not found: ' + ', '.join(missing)
+
+    except Exception as err:
+        row['status'] = 'error'
+        row['message'] = f'{type(err).__name__}: {err}'
+
+    row['run_time'] = time.perf_counter() - start_time
+    connection.send(row)
+    connection.close()
+
+
+def _load_phase_info(filename):
+    spec = importlib.util.spec_from_file_location('batch_phase_info', filename)
+    phase_info_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(phase_info_module)
+    return phase_info_module.phase_info
+
+
+def _setup_batch_parser(parser):
+    def_outdir = os.path.join(os.getcwd(), "batch_output")
+    parser.add_argument(
+        'input_decks', metavar='indeck', type=str, nargs='*',
+        help='Names of vehicle input deck files, each one is run as a separate case'
+    )
+    parser.add_argument(
+        "--cases",
+        type=str,
+        default=None,
+        help="Path to a json file with a list of cases, each a dict with the keys "
+             "'aircraft_filename' and optionally 'name', 'phase_info' and "
+             "'input_overrides' ({name: [val, units]})"
+    )
+    parser.add_argument(
+        "-o", "--outdir", default=def_outdir,
+        help="Directory to write the case outputs and the results table to"
+    )
+    parser.add_argument(
+        "--optimizer",
+        type=str,
+        default='SNOPT',
+        help="Name of optimizer",
+        choices=("SNOPT", "IPOPT", "SLSQP", "None")
+    )
+    parser.add_argument(
+        "--phase_info",
+        type=str,
+        default=None,
+        help="Path to phase info file used by the cases that do not give their own"
+    )
+    parser.add_argument(
+        "--max_iter",
+        type=int,
+        default=50,
+        help="maximum number of iterations")
+    parser.add_argument(
+        "--shooting",
+        action="store_true",
+        help="Use shooting instead of collocation",
+    )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=None,
+        help="Maximum number of cases run at the same time, defaults to the number of "
+             "CPUs")
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Time in seconds after which a case is terminated")
+
+
+def _exec_batch(args, user_args):
+    cases = list(args.input_decks)
+    if args.cases is not None:
+        with open(args.cases) as f:
+            cases.extend(json.load(f))
+
+    for idx, case in enumerate(cases):
+        if not isinstance(case, dict):
+            case = {'aircraft_filename': case}
+        if args.phase_info is not None:
+            case.setdefault('phase_info', args.phase_info)
+        cases[idx] = case
+
+    kwargs = {
+        'max_iter': args.max_iter,
+        'optimizer': None if args.optimizer == 'None' else args.optimizer,
+    }
+    if args.shooting:
+        kwargs['analysis_scheme'] = AnalysisScheme.SHOOTING
+        kwargs['run_driver'] = False
+
+    rows = run_aviary_batch(cases, outdir=args.outdir, max_workers=args.max_workers,
+                            timeout=args.timeout, **kwargs)
+
+    for row in rows:
+        print(f"{row['case']}: {row['status']} ({row['run_time']:.1f} s) "
+              f"{row['message']}")
+    print('Results written to', os.path.join(args.outdir, 'batch_results.csv'))
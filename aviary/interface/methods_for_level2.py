@@ -41,6 +41,7 @@ from aviary.utils.functions import create_opts2vals, add_opts2vals, promote_airc
 from aviary.utils.process_input_decks import create_vehicle, update_GASP_options, initial_guessing
 from aviary.utils.preprocessors import preprocess_crewpayload
 from aviary.interface.utils.check_phase_info import check_phase_info
+from aviary.interface.utils.warm_start import WarmStartLibrary, _check_analysis_scheme
 from aviary.utils.aviary_values import AviaryValues
 
 from aviary.variable_info.functions import setup_trajectory_params, override_aviary_vars
@@ -1949,7 +1950,7 @@ class AviaryProblem(om.Problem):
             warnings.simplefilter("ignore", om.PromotionWarning)
             super().setup(**kwargs)
 
-    def set_initial_guesses(self):
+    def set_initial_guesses(self, warm_start_library=None, num_neighbors=2):
         """
         Call `set_val` on the trajectory for states and controls to seed
         the problem with reasonable initial guesses. This is especially
@@ -1963,7 +1964,17 @@ class AviaryProblem(om.Problem):
         and continue to the next phase after that. For other phases, we set the initial
         guesses for states and controls according to the information available
         in the 'initial_guesses' attribute of the phase.
+
+        If a warm_start_library (a WarmStartLibrary, or the directory of one) is given,
+        these guesses are then replaced by a blend of the num_neighbors stored solutions
+        nearest to this problem, for all phases and variables that they contain. The
+        solutions used are kept in `self.warm_start_neighbors`.
         """
+        self.warm_start_neighbors = []
+
+        if warm_start_library is not None:
+            _check_analysis_scheme(self.analysis_scheme)
+
         # Grab the trajectory object from the model
         if self.analysis_scheme is AnalysisScheme.SHOOTING:
             if self.problem_type is ProblemType.SIZING:
@@ -2020,6 +2031,21 @@ class AviaryProblem(om.Problem):
             # Set initial guesses for states and controls for each phase
             self._add_guesses(phase_name, phase, guesses)
 
+        if warm_start_library is not None:
+            if not isinstance(warm_start_library, WarmStartLibrary):
+                warm_start_library = WarmStartLibrary(warm_start_library)
+
+            self.warm_start_neighbors = warm_start_library.set_initial_guesses(
+                self, num_neighbors=num_neighbors)
+
+            if self.aviary_inputs.get_val('verbosity').value >= 1:
+                if self.warm_start_neighbors:
+                    print('Warm starting from',
+                          ', '.join(f'{filename.name} (weight {weight:.2f})'
+                                    for filename, _, weight in self.warm_start_neighbors))
+                else:
+                    print('The warm start library is empty, using the default guesses')
+
     def _process_guess_var(self, val, key, phase):
         """
         Process the guess variable, which can either be a float or an array of floats.
@@ -3,9 +3,10 @@ import pandas as pd
 import numpy as np
 
 from openmdao.utils.mpi import MPI
-from openmdao.utils.reports_system import register_report
+from openmdao.utils.reports_system import register_report, register_report_hook
 
 from aviary.interface.utils.markdown_utils import write_markdown_variable_table
+from aviary.interface.utils.subsystem_profiler import get_subsystem_profiler
 from aviary.utils.named_values import NamedValues
 from aviary.utils.functions import wrapped_convert_units
 
@@ -46,6 +47,67 @@ def register_custom_reports():
                     method='run_driver',
                     pre_or_post='post')
 
+    # The subsystem profile is not a default report because instrumenting every
+    # component slows the model down. Request it with reports=['subsystem_profile'] or
+    # OPENMDAO_REPORTS=subsystem_profile.
+    description = 'Generates wall time and call count profiles of each subsystem and ' \
+                  'phase of the Aviary problem'
+    register_report_hook('subsystem_profile', 'final_setup', 'AviaryProblem',
+                         post=_install_subsystem_profiler, description=description)
+
+    for method in ('run_driver', 'run_model'):
+        register_report_hook('subsystem_profile', method, 'AviaryProblem',
+                             pre=_start_subsystem_profile, post=subsystem_profile,
+                             description=description, method=method)
+
+
+def _install_subsystem_profiler(prob, **kwargs):
+    from aviary.interface.methods_for_level2 import AviaryProblem
+    if not isinstance(prob, AviaryProblem):
+        return
+
+    get_subsystem_profiler(prob).install()
+
+
+def _start_subsystem_profile(prob, method, **kwargs):
+    from aviary.interface.methods_for_level2 import AviaryProblem
+    if not isinstance(prob, AviaryProblem):
+        return
+
+    get_subsystem_profiler(prob).start(method)
+
+
+def subsystem_profile(prob, method='run_driver', **kwargs):
+    """
+    Writes the wall time and call counts recorded for each system in the AviaryProblem,
+    grouped by subsystem and by phase. A readable summary is written to
+    "subsystem_profile.md" and the full profile to "subsystem_profile.json" in the
+    reports folder.
+
+    Parameters
+    ----------
+    prob : AviaryProblem
+        The AviaryProblem used to generate this report
+    method : str
+        The name of the problem method that has just finished running
+    """
+    from aviary.interface.methods_for_level2 import AviaryProblem
+    if not isinstance(prob, AviaryProblem):
+        return
+
+    profiler = get_subsystem_profiler(prob)
+    profiler.stop(method)
+
+    if MPI and MPI.COMM_WORLD.rank != 0:
+        return
+
+    reports_folder = Path(prob.get_reports_dir())
+    reports_folder.mkdir(parents=True, exist_ok=True)
+
+    profile = profiler.get_profile()
+    profiler.write_json(reports_folder / 'subsystem_profile.json', profile)
+    profiler.write_markdown(reports_folder / 'subsystem_profile.md', profile)
+
 
 def subsystem_report(prob, **kwargs):
     """
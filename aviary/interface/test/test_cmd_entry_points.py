@@ -1,10 +1,27 @@
+import os
 import subprocess
+import sys
+import time
 import unittest
 from pathlib import Path
 
 import pkg_resources
 from openmdao.utils.testing_utils import require_pyoptsparse, use_tempdirs
 
+import aviary
+
+
+def run_python(code):
+    """
+    Run python code in a new interpreter, so that nothing is imported beforehand.
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [str(Path(aviary.__file__).parents[1]), env.get('PYTHONPATH', '')])
+
+    return subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                          capture_output=True, text=True).stdout
+
 
 @use_tempdirs
 class CommandEntryPointsTestCases(unittest.TestCase):
@@ -67,5 +84,56 @@ class CommandEntryPointsTestCases(unittest.TestCase):
         self.run_and_test_cmd(cmd2)
 
 
+class LazyCommandTestCases(unittest.TestCase):
+    # modules that only the commands that use them should import
+    heavy_modules = ('openmdao', 'dymos', 'tkinter', 'bokeh',
+                     'aviary.interface.methods_for_level1')
+
+    def run_cmd(self, *args):
+        return run_python(
+            'import sys\n'
+            'from aviary.interface.cmd_entry_points import aviary_cmd\n'
+            f'sys.argv = {["aviary", *args]}\n'
+            'try:\n'
+            '    aviary_cmd()\n'
+            'except SystemExit:\n'
+            '    pass\n'
+            f'print([name for name in {self.heavy_modules} if name in sys.modules])\n')
+
+    def test_help(self):
+        output = self.run_cmd('-h')
+
+        for command in ('convert_engine', 'dashboard', 'draw_mission', 'run_mission'):
+            self.assertIn(command, output)
+
+        self.assertTrue(output.endswith('[]\n'), output)
+
+    def test_command_help(self):
+        output = self.run_cmd('hangar', '-h')
+
+        self.assertIn('--outdir', output)
+        self.assertTrue(output.endswith('[]\n'), output)
+
+    def test_command_description(self):
+        output = self.run_cmd('convert_engine', '-h')
+
+        self.assertIn('Data points whose T4 exceeds T4max are removed.',
+                      ' '.join(output.split()))
+
+    def bench_test_startup_time(self):
+        commands = ['aviary -h', 'aviary hangar -h', 'aviary convert_engine -h',
+                    'aviary run_mission -h']
+
+        print('\ncommand                   | time (s)')
+        for command in commands:
+            start = time.perf_counter()
+            self.run_cmd(*command.split()[1:])
+            print(f'{command:25} | {time.perf_counter() - start:.2f}')
+
+        start = time.perf_counter()
+        run_python('import aviary.api')
+        print(f'{"import aviary.api":25} | {time.perf_counter() - start:.2f}')
+
+
 if __name__ == "__main__":
     unittest.main()
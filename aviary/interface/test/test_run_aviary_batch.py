@@ -0,0 +1,76 @@
+from copy import deepcopy
+import csv
+import os
+import unittest
+
+from openmdao.core.problem import _clear_problem_names
+from openmdao.utils.testing_utils import use_tempdirs
+
+from aviary.interface.default_phase_info.height_energy import phase_info
+from aviary.interface.methods_for_level1 import run_aviary, run_aviary_batch
+from aviary.variable_info.enums import Verbosity
+from aviary.variable_info.variables import Aircraft
+
+
+@use_tempdirs
+class RunAviaryBatchTest(unittest.TestCase):
+    def setUp(self):
+        _clear_problem_names()
+
+    def tearDown(self):
+        _clear_problem_names()
+
+    def test_batch(self):
+        aircraft_filename = 'models/test_aircraft/aircraft_for_bench_FwFm.csv'
+        # a problem of the same name in the calling process does not clash with the
+        # cases
+        run_aviary(aircraft_filename, deepcopy(phase_info), optimizer='SLSQP',
+                   run_driver=False, make_plots=False, verbosity=Verbosity.QUIET)
+
+        cases = [
+            aircraft_filename,
+            {
+                'name': 'large_wing',
+                'aircraft_filename': aircraft_filename,
+                'input_overrides': {Aircraft.Wing.AREA: (1400., 'ft**2')},
+            },
+            'missing_aircraft.csv',
+        ]
+        rows = run_aviary_batch(
+            cases, outdir='batch', optimizer='SLSQP', run_driver=False,
+            make_plots=False)
+
+        self.assertEqual([row['case'] for row in rows],
+                         ['aircraft_for_bench_FwFm', 'large_wing', 'missing_aircraft'])
+        self.assertEqual([row['status'] for row in rows],
+                         ['success', 'success', 'error'])
+        self.assertIn('FileNotFoundError', rows[2]['message'])
+
+        mass_name = 'aircraft:design:operating_mass (lbm)'
+        self.assertGreater(rows[1][mass_name], rows[0][mass_name])
+
+        for case in ['aircraft_for_bench_FwFm', 'large_wing']:
+            self.assertTrue(os.path.isfile(os.path.join('batch', case, 'run.log')))
+
+        with open(os.path.join('batch', 'batch_results.csv'), newline='') as csvfile:
+            table = list(csv.DictReader(csvfile))
+        self.assertEqual(len(table), 3)
+        self.assertEqual(float(table[1][mass_name]), rows[1][mass_name])
+
+    def test_timeout(self):
+        # loading this phase_info never finishes
+        with open('blocking_phase_info.py', 'w') as f:
+            f.write('import threading\nthreading.Event().wait()\n')
+
+        rows = run_aviary_batch(
+            [{'aircraft_filename': 'models/test_aircraft/aircraft_for_bench_FwFm.csv',
+              'phase_info': os.path.abspath('blocking_phase_info.py')}],
+            outdir='batch', timeout=1., optimizer='SLSQP', run_driver=False,
+            make_plots=False, results_filename=None)
+
+        self.assertEqual(rows[0]['status'], 'timeout')
+        self.assertFalse(os.path.exists(os.path.join('batch', 'batch_results.csv')))
+
+
+if __name__ == '__main__':
+    unittest.main()
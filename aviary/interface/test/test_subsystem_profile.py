@@ -0,0 +1,86 @@
+from copy import deepcopy
+from pathlib import Path
+import json
+import unittest
+
+import openmdao.api as om
+from openmdao.utils import reports_system
+from openmdao.utils.testing_utils import set_env_vars, use_tempdirs
+
+from aviary.interface.default_phase_info.height_energy import phase_info
+from aviary.interface.methods_for_level1 import run_aviary
+from aviary.interface.reports import register_custom_reports
+from aviary.interface.utils.subsystem_profiler import get_subsystem_profiler
+
+
+@use_tempdirs
+class SubsystemProfileTest(unittest.TestCase):
+    def setUp(self):
+        om.clear_reports()
+
+        # the Aviary reports are registered through an entry point when it is installed
+        reports_system._load_report_plugins()
+        if 'subsystem_profile' not in reports_system._reports_registry:
+            register_custom_reports()
+
+    @set_env_vars(TESTFLO_RUNNING='0', OPENMDAO_REPORTS='subsystem_profile')
+    def test_subsystem_profile(self):
+        local_phase_info = deepcopy(phase_info)
+        prob = run_aviary('models/test_aircraft/aircraft_for_bench_FwFm.csv',
+                          local_phase_info, optimizer='SLSQP', max_iter=0)
+
+        reports_dir = Path(prob.get_reports_dir())
+        self.assertTrue((reports_dir / 'subsystem_profile.md').is_file())
+
+        with open(reports_dir / 'subsystem_profile.json') as f:
+            profile = json.load(f)
+
+        problem = profile['problem']
+        num_solves = problem['solve_nonlinear']['calls']
+        self.assertGreater(num_solves, 0)
+        self.assertGreater(problem['run_driver'], problem['solve_nonlinear']['time'])
+        self.assertIn('driver_overhead', problem)
+
+        for name in ('propulsion', 'aerodynamics', 'mission'):
+            self.assertGreater(profile['subsystems'][name]['time'], 0.)
+
+        for name in ('pre_mission', 'climb', 'cruise', 'descent'):
+            self.assertIn(name, profile['phases'])
+
+        systems = profile['systems']
+        engine_name = \
+            'traj.phases.climb.rhs_all.core_propulsion.engine_deck.interpolation'
+
+        engine = systems[engine_name]
+        self.assertEqual(engine['subsystem'], 'propulsion')
+        self.assertEqual(engine['phase'], 'climb')
+        self.assertGreaterEqual(engine['methods']['compute']['calls'], num_solves)
+
+        skin_friction = systems[
+            'traj.phases.cruise.rhs_all.core_aerodynamics.SkinFrictionCoef']
+        self.assertEqual(skin_friction['subsystem'], 'aerodynamics')
+        methods = skin_friction['methods']
+        self.assertGreaterEqual(methods['solve_nonlinear']['calls'], num_solves)
+        self.assertGreater(methods['apply_nonlinear']['calls'], num_solves)
+
+        profiler = get_subsystem_profiler(prob)
+
+        # the instrumented methods keep recording after a reset, and installing again
+        # does not time anything twice
+        calls = []
+        for install in (False, True):
+            if install:
+                profiler.install()
+            profiler.reset()
+            prob.run_model()
+
+            profile = profiler.get_profile()
+            self.assertEqual(profile['problem']['solve_nonlinear']['calls'], 1)
+            calls.append(profile['systems'][engine_name]['methods']['compute']['calls'])
+
+        self.assertGreater(calls[0], 0)
+        self.assertEqual(calls[1], calls[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+from copy import deepcopy
+import io
+import unittest
+
+from openmdao.core.problem import _clear_problem_names
+from openmdao.utils.assert_utils import assert_near_equal
+from openmdao.utils.testing_utils import use_tempdirs
+
+from aviary.interface.default_phase_info.height_energy import phase_info
+from aviary.interface.methods_for_level1 import run_aviary
+from aviary.interface.methods_for_level2 import AviaryProblem
+from aviary.interface.utils.warm_start import WarmStartLibrary
+from aviary.variable_info.enums import AnalysisScheme, Verbosity
+from aviary.variable_info.variables import Mission
+
+
+def _run(design_range, **kwargs):
+    _clear_problem_names()
+
+    return run_aviary('models/test_aircraft/aircraft_for_bench_FwFm.csv',
+                      deepcopy(phase_info), optimizer='SLSQP', make_plots=False,
+                      verbosity=Verbosity.QUIET,
+                      input_overrides={Mission.Design.RANGE: (design_range, 'NM')},
+                      **kwargs)
+
+
+@use_tempdirs
+class WarmStartLibraryTest(unittest.TestCase):
+    def tearDown(self):
+        # forked processes, e.g. of run_aviary_batch, inherit the problem names
+        _clear_problem_names()
+
+    def test_warm_start(self):
+        library = WarmStartLibrary('library')
+
+        prob = _run(3500., run_driver=False, warm_start_library=library)
+        # nothing is stored without a driver run, and the library was empty
+        self.assertEqual(prob.warm_start_neighbors, [])
+        self.assertEqual(library.get_neighbors([3500., 175400., 169.]), [])
+
+        # a trajectory that differs from the default guesses
+        prob.set_val('traj.cruise.states:mass',
+                     0.95 * prob.get_val('traj.cruise.states:mass'))
+        prob.set_val('traj.cruise.t_duration', 20000., units='s')
+        prob.run_model()
+        library.add(prob, evaluations=30)
+
+        warm_prob = _run(3000., run_driver=False, warm_start_library='library')
+
+        self.assertEqual(len(warm_prob.warm_start_neighbors), 1)
+
+        for name in ('cruise.states:mass', 'cruise.t_duration', 'descent.t_initial',
+                     'climb.states:distance'):
+            assert_near_equal(warm_prob.get_val(f'traj.{name}'),
+                              prob.get_val(f'traj.{name}'), 1e-12)
+
+        # the initial time of climb is fixed
+        assert_near_equal(warm_prob.get_val('traj.climb.t_initial'), 0.)
+
+    def test_neighbors(self):
+        library = WarmStartLibrary('library', keys=[(Mission.Design.RANGE, 'NM')])
+
+        prob = _run(3000., run_driver=False)
+        library.add(prob, evaluations=20)
+        prob.aviary_inputs.set_val(Mission.Design.RANGE, 3600., units='NM')
+        library.add(prob, evaluations=30)
+        prob.aviary_inputs.set_val(Mission.Design.RANGE, 2000., units='NM')
+        prob.warm_start_neighbors = library.get_neighbors([2000.])
+        library.add(prob, evaluations=10)
+
+        neighbors = library.get_neighbors([3200.], num_neighbors=2)
+        # distances are relative to the spread of ranges, 1600 NM
+        assert_near_equal([distance for _, distance, _ in neighbors],
+                          [200. / 1600., 400. / 1600.], 1e-12)
+        assert_near_equal([weight for _, _, weight in neighbors], [2. / 3., 1. / 3.],
+                          1e-12)
+
+        exact = library.get_neighbors([3600.], num_neighbors=3)
+        self.assertEqual(len(exact), 1)
+        self.assertEqual(exact[0][2], 1.)
+
+        stream = io.StringIO()
+        report = library.evaluation_report(out_stream=stream)
+        self.assertEqual(report['cold'], {'cases': 2, 'mean_evaluations': 25.})
+        self.assertEqual(report['warm'], {'cases': 1, 'mean_evaluations': 10.})
+        assert_near_equal(report['savings'], 0.6, 1e-12)
+        self.assertIn('driver evaluations saved by warm starting: 60.0%',
+                      stream.getvalue())
+
+    def test_shooting(self):
+        library = WarmStartLibrary('library')
+        prob = AviaryProblem(AnalysisScheme.SHOOTING)
+
+        # shooting trajectories are neither stored nor seeded
+        for func in (library.add, library.set_initial_guesses,
+                     lambda prob: prob.set_initial_guesses(warm_start_library=library)):
+            with self.assertRaises(ValueError):
+                func(prob)
+
+        with self.assertRaises(ValueError):
+            run_aviary('models/test_aircraft/aircraft_for_bench_GwGm.csv', {},
+                       analysis_scheme=AnalysisScheme.SHOOTING,
+                       warm_start_library=library)
+
+        self.assertEqual(list(library.directory.glob('*.npz')), [])
+
+    def bench_test_evaluation_savings(self):
+        library = WarmStartLibrary('library')
+
+        _run(3500., max_iter=100, warm_start_library=library)
+        cold_prob = _run(3300., max_iter=100)
+        warm_prob = _run(3300., max_iter=100, warm_start_library=library)
+
+        print(f'cold start: {cold_prob.driver.iter_count} driver evaluations, '
+              f'warm start: {warm_prob.driver.iter_count} driver evaluations')
+        library.evaluation_report()
+
+        assert_near_equal(warm_prob.get_val(Mission.Design.GROSS_MASS),
+                          cold_prob.get_val(Mission.Design.GROSS_MASS), 1e-6)
+        self.assertLess(warm_prob.driver.iter_count, cold_prob.driver.iter_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
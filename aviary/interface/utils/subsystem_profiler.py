@@ -0,0 +1,304 @@
+import functools
+import json
+from collections import defaultdict
+from time import perf_counter
+
+from openmdao.core.explicitcomponent import ExplicitComponent
+from openmdao.core.implicitcomponent import ImplicitComponent
+from openmdao.solvers.nonlinear.nonlinear_runonce import NonlinearRunOnce
+from openmdao.utils.class_util import overrides_method
+
+# methods timed on every component; solve_nonlinear is also timed on any system that
+# iterates its own nonlinear solver
+_component_methods = {
+    ExplicitComponent: ('compute', 'compute_partials'),
+    ImplicitComponent: ('apply_nonlinear', 'linearize', 'solve_nonlinear'),
+}
+
+# methods that are timed directly inside the components, so they can be summed
+# without counting anything twice
+_leaf_methods = ('compute', 'compute_partials', 'apply_nonlinear', 'linearize')
+
+
+class SubsystemProfiler(object):
+    """
+    Record wall time and call counts of the systems in an AviaryProblem.
+
+    Components are instrumented in place, so the profiler adds a small overhead to
+    every call and should only be installed when a profile is wanted. Times are grouped
+    by the Aviary subsystem builder that added each system and by mission phase.
+    """
+
+    def __init__(self, prob):
+        self.prob = prob
+        # {pathname: {method: [calls, time]}}
+        self.records = defaultdict(lambda: defaultdict(lambda: [0, 0.]))
+        self.classes = {}
+        self.run_times = defaultdict(float)
+        self._start_times = {}
+
+    def reset(self):
+        """
+        Discard all recorded times.
+        """
+        # the instrumented methods keep their own records, so they are cleared in place
+        for methods in self.records.values():
+            for record in methods.values():
+                record[:] = [0, 0.]
+
+        self.run_times.clear()
+        self._start_times.clear()
+
+    def install(self):
+        """
+        Wrap the methods of every system in the model. Systems that are already
+        instrumented are skipped, so this may be called after every setup.
+        """
+        prob = self.prob
+        model = prob.model
+
+        for system in model.system_iter(recurse=True):
+            if getattr(system, '_aviary_profiled', False):
+                continue
+
+            pathname = system.pathname
+            self.classes[pathname] = type(system).__name__
+
+            for base, methods in _component_methods.items():
+                if isinstance(system, base):
+                    for method in methods:
+                        if overrides_method(method, system, base):
+                            self._wrap(system, method, pathname, method)
+
+            solver = system.nonlinear_solver
+
+            if solver is not None and not isinstance(solver, NonlinearRunOnce):
+                self._wrap(system, '_solve_nonlinear', pathname, 'solve_nonlinear')
+
+            system._aviary_profiled = True
+
+        if not getattr(model, '_aviary_profiled', False):
+            self._wrap(model, '_solve_nonlinear', '', 'solve_nonlinear')
+            model._aviary_profiled = True
+
+        driver = prob.driver
+
+        if not getattr(driver, '_aviary_profiled', False):
+            self._wrap(driver, '_compute_totals', '', 'derivatives')
+            driver._aviary_profiled = True
+
+    def _wrap(self, obj, attr, pathname, method_name):
+        method = getattr(obj, attr)
+        record = self.records[pathname][method_name]
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                record[0] += 1
+                record[1] += perf_counter() - start
+
+        setattr(obj, attr, timed)
+
+    def start(self, name):
+        """
+        Start timing a problem level call such as run_driver.
+        """
+        self._start_times[name] = perf_counter()
+
+    def stop(self, name):
+        """
+        Stop timing a problem level call started with start().
+        """
+        start = self._start_times.pop(name, None)
+
+        if start is not None:
+            self.run_times[name] += perf_counter() - start
+
+    def _get_builders(self):
+        """
+        Return {builder name: subsystem label} for the subsystem builders in the problem.
+        """
+        prob = self.prob
+        builders = {}
+
+        for key, builder in getattr(prob, 'core_subsystems', {}).items():
+            builders[builder.name] = key
+
+        external = []
+        pre_mission_info = getattr(prob, 'pre_mission_info', None) or {}
+        external.extend(pre_mission_info.get('external_subsystems', []))
+
+        for info in (getattr(prob, 'phase_info', None) or {}).values():
+            external.extend(info.get('external_subsystems', []))
+
+        for builder in external:
+            builders.setdefault(builder.name, f'external:{builder.name}')
+
+        return builders
+
+    @staticmethod
+    def _get_phase(pathname):
+        parts = pathname.split('.')
+
+        if 'phases' in parts[:-1]:
+            return parts[parts.index('phases') + 1]
+
+        if parts[0] in ('pre_mission', 'post_mission'):
+            return parts[0]
+
+        return 'other'
+
+    def get_profile(self):
+        """
+        Return the recorded times as a dictionary that can be written as JSON.
+
+        Returns
+        -------
+        dict
+            'systems' holds the calls and time of each instrumented method of each
+            system. 'subsystems' and 'phases' sum the component level methods, which
+            do not include the time spent in their solvers, by subsystem and by phase.
+            'problem' holds the total time in run_driver and run_model, the time
+            spent running the model and computing derivatives from the driver, and the
+            remainder attributed to the driver itself.
+        """
+        builders = self._get_builders()
+
+        systems = {}
+        subsystems = defaultdict(lambda: defaultdict(lambda: [0, 0.]))
+        phases = defaultdict(lambda: defaultdict(float))
+
+        for pathname, methods in self.records.items():
+            if not pathname:
+                continue
+
+            parts = pathname.split('.')
+            subsystem = next((builders[part] for part in parts if part in builders),
+                             'mission' if parts[0] == 'traj' else 'other')
+            phase = self._get_phase(pathname)
+
+            systems[pathname] = {
+                'class': self.classes.get(pathname),
+                'subsystem': subsystem,
+                'phase': phase,
+                'methods': {method: {'calls': calls, 'time': time}
+                            for method, (calls, time) in methods.items()},
+            }
+
+            for method, (calls, time) in methods.items():
+                if method in _leaf_methods:
+                    record = subsystems[subsystem][method]
+                    record[0] += calls
+                    record[1] += time
+                    phases[phase][subsystem] += time
+
+        problem = {name: time for name, time in self.run_times.items()}
+        model = self.records.get('', {})
+
+        model_time = 0.
+        for method in ('solve_nonlinear', 'derivatives'):
+            calls, time = model.get(method, (0, 0.))
+            problem[method] = {'calls': calls, 'time': time}
+            model_time += time
+
+        if 'run_driver' in problem:
+            problem['driver_overhead'] = max(problem['run_driver'] - model_time, 0.)
+
+        return {
+            'problem': problem,
+            'subsystems': {
+                name: {
+                    'time': sum(time for _, time in methods.values()),
+                    'methods': {method: {'calls': calls, 'time': time}
+                                for method, (calls, time) in methods.items()}}
+                for name, methods in subsystems.items()},
+            'phases': {phase: dict(times) for phase, times in phases.items()},
+            'systems': systems,
+        }
+
+    def write_json(self, filename, profile=None):
+        """
+        Write the profile to a JSON file.
+        """
+        if profile is None:
+            profile = self.get_profile()
+
+        with open(filename, 'w') as f:
+            json.dump(profile, f, indent=2)
+
+    def write_markdown(self, filename, profile=None, num_systems=20):
+        """
+        Write a readable summary of the profile, including the num_systems systems
+        with the largest total time.
+        """
+        if profile is None:
+            profile = self.get_profile()
+
+        problem = profile['problem']
+        subsystems = profile['subsystems']
+        phases = profile['phases']
+
+        with open(filename, 'w') as f:
+            f.write('# SUBSYSTEM PROFILE\n\n')
+            f.write('| Step | Calls | Time (s) |\n| :- | -: | -: |\n')
+
+            for name in ('run_driver', 'run_model'):
+                if name in problem:
+                    f.write(f'| {name} | | {problem[name]:.4f} |\n')
+
+            for name in ('solve_nonlinear', 'derivatives'):
+                f.write(f'| model {name} | {problem[name]["calls"]} | '
+                        f'{problem[name]["time"]:.4f} |\n')
+
+            if 'driver_overhead' in problem:
+                f.write(f'| driver overhead | | {problem["driver_overhead"]:.4f} |\n')
+                f.write('\nDriver overhead includes the time spent in the optimizer and '
+                        'computing any total coloring.\n')
+
+            f.write('\n# SUBSYSTEMS\n\n')
+            f.write('Component level compute, compute_partials, apply_nonlinear and '
+                    'linearize calls.\n\n')
+            f.write('| Subsystem | Method | Calls | Time (s) |\n| :- | :- | -: | -: |\n')
+
+            for name, data in sorted(subsystems.items(), key=lambda item: -item[1]['time']):
+                for method, record in data['methods'].items():
+                    f.write(f'| {name} | {method} | {record["calls"]} | '
+                            f'{record["time"]:.4f} |\n')
+
+            f.write('\n# PHASES\n\n')
+            names = sorted(subsystems, key=lambda name: -subsystems[name]['time'])
+            f.write('| Phase | ' + ' | '.join(names) + ' |\n')
+            f.write('| :- |' + ' -: |' * len(names) + '\n')
+
+            for phase, times in phases.items():
+                f.write(f'| {phase} | ' +
+                        ' | '.join(f'{times.get(name, 0.):.4f}' for name in names) + ' |\n')
+
+            f.write('\n# SLOWEST SYSTEMS\n\n')
+            f.write('Solver times include the systems being solved.\n\n')
+            f.write('| System | Class | Method | Calls | Time (s) |\n'
+                    '| :- | :- | :- | -: | -: |\n')
+
+            rows = [(pathname, data['class'], method, record)
+                    for pathname, data in profile['systems'].items()
+                    for method, record in data['methods'].items()]
+            rows.sort(key=lambda row: -row[3]['time'])
+
+            for pathname, class_name, method, record in rows[:num_systems]:
+                f.write(f'| {pathname} | {class_name} | {method} | {record["calls"]} | '
+                        f'{record["time"]:.4f} |\n')
+
+
+def get_subsystem_profiler(prob):
+    """
+    Return the SubsystemProfiler attached to prob, creating it if needed.
+    """
+    profiler = getattr(prob, '_subsystem_profiler', None)
+
+    if profiler is None:
+        profiler = prob._subsystem_profiler = SubsystemProfiler(prob)
+
+    return profiler
@@ -0,0 +1,346 @@
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import dymos as dm
+import numpy as np
+
+from aviary.variable_info.enums import AnalysisScheme
+from aviary.variable_info.variables import Aircraft, Mission
+
+# design inputs that identify a stored solution by default
+_default_keys = (
+    (Mission.Design.RANGE, 'NM'),
+    (Mission.Design.GROSS_MASS, 'lbm'),
+    (Aircraft.CrewPayload.NUM_PASSENGERS, 'unitless'),
+)
+
+
+def _check_analysis_scheme(analysis_scheme):
+    # shooting trajectories have no dymos phases to store or seed
+    if analysis_scheme is not AnalysisScheme.COLLOCATION:
+        raise ValueError('A warm start library can only be used with the collocation '
+                         'analysis scheme')
+
+
+# the variables of a phase that are stored, as (path prefix, options attribute)
+_phase_variables = (
+    ('states', 'state_options'),
+    ('controls', 'control_options'),
+    ('polynomial_controls', 'polynomial_control_options'),
+)
+
+
+class WarmStartLibrary(object):
+    """
+    A directory of converged trajectories used as initial guesses for similar problems.
+
+    Every solution added to the library is written to its own .npz file, holding the
+    values of the key design inputs of the problem, the time span of each phase, and
+    the timeseries of its optimized states and controls against the normalized time of
+    the phase. Since every file has a unique name, several processes can add to the
+    same library at once, for example the cases of run_aviary_batch.
+
+    A new problem is seeded with an inverse distance weighted blend of the stored
+    solutions that are nearest to it in the key inputs, interpolated onto its own
+    transcription grid. Key inputs are compared relative to their spread in the
+    library, so that e.g. range and gross mass count equally.
+
+    Only problems that use the collocation analysis scheme can be stored or seeded.
+
+    Parameters
+    ----------
+    directory : str or Path
+        Directory that holds the solutions, created if needed.
+    keys : list of (str, str), optional
+        Names and units of the aviary inputs that identify a solution. Defaults to the
+        design range, design gross mass and number of passengers.
+    """
+
+    def __init__(self, directory, keys=None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        if keys is None:
+            keys = _default_keys
+        self.keys = [tuple(key) for key in keys]
+
+    def get_key_values(self, prob):
+        """
+        Return the values of the key inputs of an AviaryProblem.
+        """
+        values = []
+
+        for name, units in self.keys:
+            if name in prob.aviary_inputs:
+                val = prob.aviary_inputs.get_val(name, units=units)
+            else:
+                val = prob.meta_data[name]['default_value']
+
+            values.append(float(np.ravel(val)[0]))
+
+        return np.array(values)
+
+    def _get_records(self):
+        """
+        Return the filename, key values, driver evaluations and whether it was warm
+        started of every stored solution that has all the key inputs of the library.
+        """
+        key_names = [name for name, _ in self.keys]
+        records = []
+
+        for filename in sorted(self.directory.glob('*.npz')):
+            with np.load(filename) as data:
+                stored_names = list(data['key_names'])
+                if not all(name in stored_names for name in key_names):
+                    continue
+
+                key_values = data['key_values'][
+                    [stored_names.index(name) for name in key_names]]
+                records.append((filename, key_values, int(data['evaluations']),
+                                bool(data['warm_started'])))
+
+        return records
+
+    def add(self, prob, evaluations=None):
+        """
+        Store the current trajectory of an AviaryProblem that uses collocation.
+
+        Parameters
+        ----------
+        prob : AviaryProblem
+            The problem, after it was run.
+        evaluations : int, optional
+            Number of driver evaluations the problem took to converge, used by
+            evaluation_report. Defaults to the iteration count of the driver, which
+            counts the model evaluations of the optimizer, not its major iterations.
+
+        Returns
+        -------
+        Path
+            The file the solution was written to.
+        """
+        _check_analysis_scheme(prob.analysis_scheme)
+
+        if evaluations is None:
+            evaluations = getattr(prob.driver, 'iter_count', -1)
+
+        data = {
+            'key_names': np.array([name for name, _ in self.keys]),
+            'key_values': self.get_key_values(prob),
+            'evaluations': np.array(evaluations),
+            'warm_started': np.array(bool(getattr(prob, 'warm_start_neighbors', None))),
+        }
+
+        for phase_name, phase in prob.model.traj._phases.items():
+            if isinstance(phase, dm.AnalyticPhase):
+                continue
+
+            path = f'traj.{phase_name}'
+            time_name = phase.time_options['name']
+            time_units = phase.time_options['units']
+
+            t_initial = prob.get_val(f'{path}.t_initial', units=time_units)
+            t_duration = prob.get_val(f'{path}.t_duration', units=time_units)
+            time = prob.get_val(f'{path}.timeseries.{time_name}', units=time_units)
+
+            # segments share their end nodes, which are only kept once
+            tau, idx = np.unique(2.0 * (time.ravel() - t_initial) / t_duration - 1.0,
+                                 return_index=True)
+
+            data[f'{phase_name}.t_initial'] = t_initial
+            data[f'{phase_name}.t_duration'] = t_duration
+            data[f'{phase_name}.tau'] = tau
+
+            for prefix, options_name in _phase_variables:
+                for name, options in getattr(phase, options_name).items():
+                    if not options['opt']:
+                        continue
+
+                    data[f'{phase_name}.{prefix}:{name}'] = prob.get_val(
+                        f'{path}.timeseries.{name}', units=options['units'])[idx]
+
+        filename = self.directory / f'{uuid.uuid4().hex}.npz'
+        np.savez(filename, **data)
+
+        return filename
+
+    def get_neighbors(self, key_values, num_neighbors=2):
+        """
+        Return the stored solutions nearest to the given key input values.
+
+        Parameters
+        ----------
+        key_values : array_like
+            Values of the key inputs, in the units of self.keys.
+        num_neighbors : int, optional
+            Maximum number of solutions returned, defaults to 2.
+
+        Returns
+        -------
+        list of (Path, float, float)
+            Filename, normalized distance and interpolation weight of each solution,
+            nearest first. The weights sum to one.
+        """
+        records = self._get_records()
+        if not records:
+            return []
+
+        key_values = np.asarray(key_values, dtype=float)
+        stored_values = np.array([record[1] for record in records])
+
+        # compare the keys relative to their spread in the library, or to their
+        # magnitude if all solutions have the same value
+        scale = np.ptp(np.vstack((stored_values, key_values)), axis=0)
+        scale = np.where(scale > 0.0, scale, np.maximum(np.abs(key_values), 1.0))
+        distances = np.sqrt(np.sum(((stored_values - key_values) / scale)**2, axis=1))
+
+        order = np.argsort(distances, kind='stable')[:num_neighbors]
+        distances = distances[order]
+
+        if distances[0] == 0.0:
+            # an exact match is used as is
+            order = order[:1]
+            distances = distances[:1]
+            weights = np.ones(1)
+        else:
+            weights = 1.0 / distances
+            weights /= np.sum(weights)
+
+        return [(records[idx][0], distance, weight)
+                for idx, distance, weight in zip(order, distances, weights)]
+
+    def set_initial_guesses(self, prob, num_neighbors=2):
+        """
+        Set the time spans, states and controls of the phases of an AviaryProblem from
+        the nearest stored solutions.
+
+        Values that the optimizer cannot change, i.e. fixed initial or final times and
+        states, and controls that are not optimized, are left as they are. Phases and
+        variables that are not in a stored solution keep their current guesses.
+
+        Parameters
+        ----------
+        prob : AviaryProblem
+            The problem, after setup and set_initial_guesses.
+        num_neighbors : int, optional
+            Maximum number of solutions blended together, defaults to 2.
+
+        Returns
+        -------
+        list of (Path, float, float)
+            The solutions used, see get_neighbors.
+        """
+        _check_analysis_scheme(prob.analysis_scheme)
+
+        neighbors = self.get_neighbors(self.get_key_values(prob), num_neighbors)
+        if not neighbors:
+            return neighbors
+
+        solutions = [(np.load(filename), weight) for filename, _, weight in neighbors]
+
+        try:
+            for phase_name, phase in prob.model.traj._phases.items():
+                if isinstance(phase, dm.AnalyticPhase):
+                    continue
+
+                self._set_phase_guesses(prob, phase_name, phase, solutions)
+        finally:
+            for data, _ in solutions:
+                data.close()
+
+        return neighbors
+
+    def _set_phase_guesses(self, prob, phase_name, phase, solutions):
+        path = f'traj.{phase_name}'
+        time_options = phase.time_options
+        solutions = [(data, weight) for data, weight in solutions
+                     if f'{phase_name}.tau' in data]
+        if not solutions:
+            return
+
+        # the solutions that have this phase are weighted among themselves
+        total_weight = sum(weight for _, weight in solutions)
+
+        def blend(name, interp_name=None):
+            value = 0.0
+            for data, weight in solutions:
+                ys = data[f'{phase_name}.{name}']
+                if interp_name is not None:
+                    ys = phase.interp(interp_name, ys=ys, xs=data[f'{phase_name}.tau'])
+                value = value + weight / total_weight * ys
+            return value
+
+        for name, fixed in (('t_initial', time_options['fix_initial']),
+                            ('t_duration', time_options['fix_duration'])):
+            if not fixed:
+                prob.set_val(f'{path}.{name}', blend(name), units=time_options['units'])
+
+        for prefix, options_name in _phase_variables:
+            for name, options in getattr(phase, options_name).items():
+                key = f'{prefix}:{name}'
+                if not options['opt'] or not all(
+                        f'{phase_name}.{key}' in data for data, _ in solutions):
+                    continue
+
+                val = blend(key, name)
+
+                if prefix == 'states':
+                    # guesses that were set as a single value are broadcast to all nodes
+                    current = np.broadcast_to(
+                        prob.get_val(f'{path}.{key}', units=options['units']), val.shape)
+                    # keep the fixed ends of the state
+                    if options['fix_initial']:
+                        val[0] = current[0]
+                    if options['fix_final']:
+                        val[-1] = current[-1]
+
+                prob.set_val(f'{path}.{key}', val, units=options['units'])
+
+    def evaluation_report(self, out_stream=sys.stdout):
+        """
+        Compare the driver evaluations of the stored solutions that were warm started
+        with the ones that were not.
+
+        Parameters
+        ----------
+        out_stream : file-like, optional
+            Where the report is written, defaults to stdout. If None, nothing is
+            written.
+
+        Returns
+        -------
+        dict
+            Number of solutions and mean driver evaluations of the 'cold' and 'warm'
+            started solutions, and the fraction of driver evaluations saved by warm
+            starting, which is None if either group is empty.
+        """
+        records = self._get_records()
+        report = {}
+
+        for name, warm_started in (('cold', False), ('warm', True)):
+            evaluations = [record[2] for record in records
+                           if record[3] is warm_started and record[2] >= 0]
+            report[name] = {
+                'cases': len(evaluations),
+                'mean_evaluations': float(np.mean(evaluations)) if evaluations else None,
+            }
+
+        cold = report['cold']['mean_evaluations']
+        warm = report['warm']['mean_evaluations']
+        report['savings'] = 1.0 - warm / cold if cold and warm is not None else None
+
+        if out_stream is not None:
+            out_stream.write(f'Warm start library {os.fspath(self.directory)}\n')
+            for name in ('cold', 'warm'):
+                data = report[name]
+                mean = data['mean_evaluations']
+                mean = 'n/a' if mean is None else f'{mean:.1f}'
+                out_stream.write(f'  {name} started: {data["cases"]} cases, '
+                                 f'{mean} driver evaluations on average\n')
+            if report['savings'] is not None:
+                out_stream.write(f'  driver evaluations saved by warm starting: '
+                                 f'{100.0 * report["savings"]:.1f}%\n')
+
+        return report
@@ -328,6 +328,7 @@ class FlightPhaseBase(PhaseBuilderBase):
             'meta_data': self.meta_data,
             'subsystem_options': self.subsystem_options,
             'throttle_enforcement': self.user_options.get_val('throttle_enforcement'),
+            **self._atmosphere_ode_init_kwargs(),
         }
 
 
@@ -400,6 +401,8 @@ FlightPhaseBase._add_meta_data('solve_for_distance', val=False)
 
 FlightPhaseBase._add_meta_data('constraints', val={})
 
+FlightPhaseBase._add_atmosphere_meta_data()
+
 FlightPhaseBase._add_initial_guess_meta_data(
     InitialGuessState('altitude'),
     desc='initial guess for vertical distances')
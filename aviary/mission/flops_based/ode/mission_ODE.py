@@ -1,8 +1,8 @@
 import numpy as np
 import openmdao.api as om
-from dymos.models.atmosphere import USatm1976Comp
 
 from aviary.mission.flops_based.ode.mission_EOM import MissionEOM
+from aviary.mission.ode.atmosphere import build_atmosphere
 from aviary.mission.gasp_based.ode.time_integration_base_classes import add_SGM_required_inputs, add_SGM_required_outputs
 from aviary.utils.aviary_values import AviaryValues
 from aviary.utils.functions import promote_aircraft_and_mission_vars
@@ -52,6 +52,14 @@ class MissionODE(om.Group):
             types=AnalysisScheme,
             desc="The analysis method that will be used to close the trajectory; for example collocation or time integration",
         )
+        self.options.declare(
+            'atmosphere_model', default='USatm1976', values=['USatm1976', 'tabular'],
+            desc='atmosphere component used by the ODE: dymos USatm1976Comp or the '
+            'shared-table TabularAtmosphereComp')
+        self.options.declare(
+            'delta_T', default=0.0, types=(int, float),
+            desc='temperature offset from the standard day in degR; requires the '
+            'tabular atmosphere model')
 
     def setup(self):
         options = self.options
@@ -78,7 +86,9 @@ class MissionODE(om.Group):
             promotes_outputs=['*'])
         self.add_subsystem(
             name='atmosphere',
-            subsys=USatm1976Comp(num_nodes=nn),
+            subsys=build_atmosphere(
+                nn, atmosphere_model=options['atmosphere_model'],
+                delta_T=options['delta_T']),
             promotes_inputs=[('h', Dynamic.Mission.ALTITUDE)],
             promotes_outputs=[
                 ('sos', Dynamic.Mission.SPEED_OF_SOUND), ('rho', Dynamic.Mission.DENSITY),
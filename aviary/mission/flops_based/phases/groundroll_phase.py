@@ -145,6 +145,7 @@ class GroundrollPhase(PhaseBuilderBase):
             'meta_data': self.meta_data,
             'subsystem_options': self.subsystem_options,
             'set_input_defaults': False,
+            **self._atmosphere_ode_init_kwargs(),
         }
 
 
@@ -180,6 +181,8 @@ GroundrollPhase._add_meta_data('rotation', val=False)
 GroundrollPhase._add_meta_data('clean', val=False)
 GroundrollPhase._add_meta_data('constraints', val={})
 
+GroundrollPhase._add_atmosphere_meta_data()
+
 GroundrollPhase._add_initial_guess_meta_data(
     InitialGuessIntegrationVariable(key='velocity'),
     desc='initial guess for initial velocity and final specified as a tuple')
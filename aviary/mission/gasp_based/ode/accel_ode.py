@@ -1,5 +1,4 @@
 import numpy as np
-from dymos.models.atmosphere.atmos_1976 import USatm1976Comp
 
 from aviary.mission.gasp_based.ode.accel_eom import AccelerationRates
 from aviary.mission.gasp_based.ode.base_ode import BaseODE
@@ -30,7 +29,7 @@ class AccelODE(BaseODE):
 
         self.add_subsystem(
             "USatm",
-            USatm1976Comp(
+            self.build_atmosphere(
                 num_nodes=nn),
             promotes_inputs=[
                 ("h",
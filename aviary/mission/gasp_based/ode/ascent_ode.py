@@ -1,5 +1,4 @@
 import numpy as np
-from dymos.models.atmosphere.atmos_1976 import USatm1976Comp
 
 from aviary.variable_info.enums import AlphaModes, AnalysisScheme
 from aviary.variable_info.variables import Aircraft, Mission, Dynamic
@@ -40,7 +39,7 @@ class AscentODE(BaseODE):
 
         self.add_subsystem(
             "USatm",
-            USatm1976Comp(
+            self.build_atmosphere(
                 num_nodes=nn),
             promotes_inputs=[
                 ("h",
@@ -9,6 +9,11 @@ from aviary.variable_info.enums import AnalysisScheme, AlphaModes, SpeedType
 from aviary.variable_info.variables import Aircraft, Mission, Dynamic
 from aviary.mission.ode.specific_energy_rate import SpecificEnergyRate
 from aviary.mission.ode.altitude_rate import AltitudeRate
+from aviary.mission.ode.atmosphere import build_atmosphere
+from aviary.mission.ode.node_decoupled_newton import NodeBlockSolver, \
+    NodeDecoupledNewton
+from aviary.subsystems.propulsion.engine_deck import EngineDeck
+from aviary.subsystems.propulsion.propulsion_builder import PropulsionBuilderBase
 
 
 class BaseODE(om.Group):
@@ -37,6 +42,25 @@ class BaseODE(om.Group):
             desc='dictionary of parameters to be passed to the subsystem builders'
         )
 
+        self.options.declare(
+            'atmosphere_model', default='USatm1976', values=['USatm1976', 'tabular'],
+            desc='atmosphere component used by the ODE: dymos USatm1976Comp or the '
+            'shared-table TabularAtmosphereComp'
+        )
+
+        self.options.declare(
+            'delta_T', default=0.0, types=(int, float),
+            desc='temperature offset from the standard day in degR; requires the '
+            'tabular atmosphere model'
+        )
+
+        self.options.declare(
+            'balance_solver', default='newton', values=['newton', 'node_decoupled'],
+            desc='solver used for the alpha, throttle and speed balances: a Newton '
+            'solver over all nodes, or NodeDecoupledNewton, which converges and bounds '
+            'each node separately'
+        )
+
     def AddAlphaControl(
         self,
         alpha_group=None,
@@ -157,13 +181,9 @@ class BaseODE(om.Group):
                                       )
 
             if add_default_solver and alpha_mode not in (AlphaModes.ROTATION,):
-                alpha_group.nonlinear_solver = om.NewtonSolver()
-                alpha_group.nonlinear_solver.options["solve_subsystems"] = True
-                alpha_group.nonlinear_solver.options["iprint"] = print_level
-                alpha_group.nonlinear_solver.options["atol"] = atol
-                alpha_group.nonlinear_solver.options["rtol"] = rtol
-                alpha_group.nonlinear_solver.linesearch = om.BoundsEnforceLS()
-                alpha_group.linear_solver = om.DirectSolver(assemble_jac=True)
+                self.add_balance_solver(
+                    alpha_group, num_nodes=nn, atol=atol, rtol=rtol,
+                    print_level=print_level)
 
     def AddThrottleControl(
         self,
@@ -173,43 +193,70 @@ class BaseODE(om.Group):
         rtol=1e-12,
         add_default_solver=True,
         print_level=0,
+        required_thrust_name='required_thrust',
+        subsystem_names=None,
     ):
         '''
         This is used when throttle in an ODE needs to be controlled directly.
+
+        If the engine has an inverse thrust table (see
+        Aircraft.Engine.PRECOMPUTE_INVERSE_THRUST), the throttle is computed directly
+        from the required thrust and prop_group needs no solver. Otherwise a balance
+        is added that converges throttle to match the required thrust.
+
+        subsystem_names lists the subsystems already added to prop_group, in order, so
+        that the throttle lookup can be placed before the engines.
+
+        Returns True if the balance was added.
         '''
 
         nn = num_nodes
 
-        thrust_bal = om.BalanceComp(
-            name=Dynamic.Mission.THROTTLE,
-            val=np.ones(nn),
-            upper=1.0,
-            lower=0.0,
-            units='unitless',
-            lhs_name=Dynamic.Mission.THRUST_TOTAL,
-            rhs_name="required_thrust",
-            eq_units="lbf",
-        )
-        prop_group.add_subsystem("thrust_balance",
-                                 thrust_bal,
-                                 promotes_inputs=[
-                                     Dynamic.Mission.THRUST_TOTAL, 'required_thrust'],
-                                 promotes_outputs=[Dynamic.Mission.THROTTLE],
-                                 )
-
-        if add_default_solver:
-            prop_group.linear_solver = om.DirectSolver()
-            prop_group.linear_solver.options["iprint"] = print_level
-
-            prop_group.nonlinear_solver = om.NewtonSolver()
-            prop_group.nonlinear_solver.options["err_on_non_converge"] = False
-            prop_group.nonlinear_solver.options["solve_subsystems"] = True
-            prop_group.nonlinear_solver.options["maxiter"] = 20
-            prop_group.nonlinear_solver.options["iprint"] = print_level
-            prop_group.nonlinear_solver.options["atol"] = atol
-            prop_group.nonlinear_solver.options["rtol"] = rtol
-            prop_group.nonlinear_solver.linesearch = om.BoundsEnforceLS()
-            prop_group.linear_solver = om.DirectSolver(assemble_jac=True)
+        throttle_lookup = self._build_throttle_lookup(nn)
+
+        if throttle_lookup is not None:
+            prop_group.add_subsystem(
+                "throttle_lookup",
+                throttle_lookup,
+                promotes_inputs=[Dynamic.Mission.MACH, Dynamic.Mission.ALTITUDE,
+                                 Aircraft.Engine.SCALE_FACTOR,
+                                 ('required_thrust', required_thrust_name)],
+                promotes_outputs=[Dynamic.Mission.THROTTLE],
+            )
+
+            # the engines run after throttle is known, and everything else in
+            # prop_group (such as the required thrust) runs before
+            if subsystem_names is None:
+                subsystem_names = []
+            prop_names = [subsystem.name for subsystem in self.options['core_subsystems']
+                          if isinstance(subsystem, PropulsionBuilderBase)]
+            prop_group.set_order(
+                [name for name in subsystem_names if name not in prop_names] +
+                ['throttle_lookup'] +
+                [name for name in subsystem_names if name in prop_names])
+
+        else:
+            thrust_bal = om.BalanceComp(
+                name=Dynamic.Mission.THROTTLE,
+                val=np.ones(nn),
+                upper=1.0,
+                lower=0.0,
+                units='unitless',
+                lhs_name=Dynamic.Mission.THRUST_TOTAL,
+                rhs_name=required_thrust_name,
+                eq_units="lbf",
+            )
+            prop_group.add_subsystem("thrust_balance",
+                                     thrust_bal,
+                                     promotes_inputs=[
+                                         Dynamic.Mission.THRUST_TOTAL, required_thrust_name],
+                                     promotes_outputs=[Dynamic.Mission.THROTTLE],
+                                     )
+
+            if add_default_solver:
+                self.add_balance_solver(
+                    prop_group, num_nodes=nn, atol=atol, rtol=rtol,
+                    print_level=print_level, maxiter=20, err_on_non_converge=False)
 
         if prop_group is not self:
             self.add_subsystem(
@@ -218,6 +265,57 @@ class BaseODE(om.Group):
                 promotes=['*']
             )
 
+        return throttle_lookup is None
+
+    def add_balance_solver(
+        self,
+        group,
+        num_nodes=1,
+        atol=1e-7,
+        rtol=1e-7,
+        print_level=0,
+        **newton_options,
+    ):
+        '''
+        Add the solvers that converge the BalanceComps in group, as selected by the
+        balance_solver option. Extra keyword arguments are passed on as options of the
+        nonlinear solver.
+        '''
+        if self.options['balance_solver'] == 'node_decoupled':
+            group.nonlinear_solver = NodeDecoupledNewton(
+                num_nodes=num_nodes, solve_subsystems=True, iprint=print_level,
+                atol=atol, rtol=rtol, **newton_options)
+            group.linear_solver = NodeBlockSolver(num_nodes=num_nodes)
+
+        else:
+            group.nonlinear_solver = om.NewtonSolver(
+                solve_subsystems=True, iprint=print_level, atol=atol, rtol=rtol,
+                **newton_options)
+            group.nonlinear_solver.linesearch = om.BoundsEnforceLS()
+            group.linear_solver = om.DirectSolver(assemble_jac=True)
+
+    def _build_throttle_lookup(self, num_nodes):
+        '''
+        Return the ThrottleLookup of the engine, or None if there is more than one engine
+        model or the engine does not have an inverse thrust table.
+        '''
+        engine_models = self.options['aviary_options'].get_item(
+            'engine_models', ([], None))[0]
+
+        if len(engine_models) != 1 or not isinstance(engine_models[0], EngineDeck):
+            return None
+
+        return engine_models[0].build_throttle_lookup(num_nodes)
+
+    def build_atmosphere(self, num_nodes, **kwargs):
+        '''
+        Return the atmosphere component selected by the atmosphere_model and delta_T
+        options.
+        '''
+        return build_atmosphere(
+            num_nodes, atmosphere_model=self.options['atmosphere_model'],
+            delta_T=self.options['delta_T'], **kwargs)
+
     def add_flight_conditions(self, nn, input_speed_type=SpeedType.TAS):
         if input_speed_type is SpeedType.TAS:
             promotes_inputs = [("TAS", Dynamic.Mission.VELOCITY)]
@@ -0,0 +1,410 @@
+import numpy as np
+from scipy.integrate import RK45
+from simupy.block_diagram import DEFAULT_EVENT_FIND_OPTIONS, DEFAULT_INTEGRATOR_OPTIONS
+
+from aviary.mission.gasp_based.ode.explicit_fast_path import build_explicit_fast_path
+from aviary.mission.gasp_based.ode.time_integration_base_classes import SimuPyProblem
+
+
+class BatchedPhaseResult():
+    """
+    Result of integrating one phase for a batch of trajectories.
+
+    Attributes
+    ----------
+    t : list of ndarray
+        Times of the accepted steps of each trajectory, ending at its final time.
+    x : list of ndarray
+        States at these times, shape (num_times, dim_state) for each trajectory.
+    t_final : ndarray
+        Final time of each trajectory, shape (num_trajectories,).
+    x_final : ndarray
+        Final states of each trajectory, shape (num_trajectories, dim_state).
+    event_reached : ndarray of bool
+        Whether each trajectory ended at an event, rather than at the maximum
+        allowable time, the maximum number of steps, or a NaN state rate.
+    final_values : dict
+        Values of the model variables requested with final_outputs at the final time
+        and states of each trajectory, shape (num_trajectories,), keyed by name.
+    """
+
+    def __init__(self, t, x, t_final, x_final, event_reached, final_values=None):
+        self.t = t
+        self.x = x
+        self.t_final = t_final
+        self.x_final = x_final
+        self.event_reached = event_reached
+        self.final_values = final_values or {}
+
+
+class _BatchedPhase():
+    """
+    A vectorized copy of the ODE of a phase, with one node for each trajectory.
+    """
+
+    def __init__(self, problem: SimuPyProblem, num_trajectories, trajectory_values):
+        for method in ('state_equation_function', 'event_equation_function',
+                       'update_equation_function'):
+            if getattr(type(problem), method) is not getattr(SimuPyProblem, method):
+                raise NotImplementedError(
+                    f'{type(problem).__name__} overrides {method}, so its trajectories '
+                    'cannot be integrated in a batch')
+
+        self.problem = problem
+        self.num_trajectories = num_trajectories
+        self.prob = prob = problem._get_vectorized_problem(num_trajectories)
+        self.fast_path = build_explicit_fast_path(prob)
+
+        for name, values in trajectory_values.items():
+            try:
+                shape = prob.get_val(name).shape
+            except KeyError:
+                # like shared parameters, values only go to the phases that use them
+                continue
+
+            if not shape or shape[0] != num_trajectories:
+                raise ValueError(
+                    f'{name} is not vectorized over the nodes of '
+                    f'{type(problem.ode).__name__}, so it cannot differ between '
+                    'trajectories.')
+
+            prob.set_val(name, np.broadcast_to(
+                np.reshape(values, (num_trajectories,) + (1,) * (len(shape) - 1)),
+                shape))
+
+    def _get(self, name, units):
+        """
+        Return the value of a variable for each trajectory, which is its first entry for
+        each node, or its value for all of them if it is not node-wise.
+        """
+        val = self.prob.get_val(name, units=units)
+        if val.size == 1:
+            return np.full(self.num_trajectories, val.item())
+
+        return val.reshape(self.num_trajectories, -1)[:, 0]
+
+    def evaluate(self, t, x):
+        """
+        Run the model at time t and states x of each trajectory and return the state
+        rates, shape (num_trajectories, dim_state).
+        """
+        problem = self.problem
+        prob = self.prob
+
+        if not problem.time_independent:
+            prob.set_val(problem.t_name, t)
+        for idx, (state_name, state_data) in enumerate(problem.states.items()):
+            prob.set_val(state_name, x[:, idx], units=state_data['units'])
+
+        if self.fast_path is None:
+            prob.run_model()
+        else:
+            self.fast_path.run()
+
+        return np.column_stack([
+            self._get(state_data['rate'], state_data['rate_units'])
+            for state_data in problem.states.values()])
+
+    def events(self):
+        """
+        Return the value of each trigger of the phase at the point the model was last
+        run at, shape (num_trajectories, num_triggers).
+        """
+        problem = self.problem
+        values = []
+
+        for trigger in problem.triggers:
+            trigger_value = trigger.value
+            if isinstance(trigger_value, str):
+                if hasattr(problem, trigger_value):
+                    trigger_value = getattr(problem, trigger_value)
+                else:
+                    trigger_value = self._get(trigger_value, trigger.units)
+
+            values.append(self._get(trigger.state, trigger.units) - trigger_value)
+
+        return np.column_stack(values).reshape(self.num_trajectories, -1)
+
+
+def _rms(values):
+    return np.sqrt(np.mean(values**2, axis=-1))
+
+
+def simulate_phase_batch(
+    problem: SimuPyProblem,
+    t0,
+    x0,
+    trajectory_values=None,
+    integrator_options=None,
+    event_find_options=None,
+    max_steps=10_000,
+    final_outputs=None,
+):
+    """
+    Integrate a phase for a batch of trajectories, with all of their state rates
+    computed by a single copy of the ODE that has one node per trajectory.
+
+    The states are integrated with the same Dormand-Prince 5(4) method and tolerances
+    that SimuPyProblem.simulate uses, but every trajectory takes its own steps. A
+    trajectory stops at the first point at which any trigger of the phase changes sign,
+    which is located on the dense output of the step it happens in.
+
+    Parameters
+    ----------
+    problem : SimuPyProblem
+        The phase. Parameters shared by all trajectories are the values currently set in
+        problem.prob. Phases that override state_equation_function,
+        event_equation_function or update_equation_function are not supported.
+    t0 : float or ndarray
+        Initial time of each trajectory.
+    x0 : ndarray
+        Initial states of each trajectory, shape (num_trajectories, dim_state).
+    trajectory_values : dict
+        Values of model inputs that differ between the trajectories, shape
+        (num_trajectories,), keyed by promoted name. The inputs must be vectorized over
+        the nodes of the ODE.
+    integrator_options : dict
+        rtol, atol and max_step of the integration, see DEFAULT_INTEGRATOR_OPTIONS.
+    event_find_options : dict
+        xtol and maxiter of the event location, see DEFAULT_EVENT_FIND_OPTIONS.
+    max_steps : int
+        Maximum number of steps of each trajectory.
+    final_outputs : dict
+        Units of model variables, keyed by promoted name, whose values at the end of
+        each trajectory are returned in BatchedPhaseResult.final_values.
+
+    Returns
+    -------
+    BatchedPhaseResult
+        The result of the phase.
+    """
+    x = np.array(x0, dtype=float, ndmin=2)
+    num_trajectories, dim_state = x.shape
+    t = np.array(np.broadcast_to(t0, num_trajectories), dtype=float)
+
+    options = {**DEFAULT_INTEGRATOR_OPTIONS, **(integrator_options or {})}
+    rtol = options['rtol']
+    atol = options['atol']
+    t_max = problem.max_allowable_time
+    max_step = options['max_step'] if options['max_step'] > 0.0 else np.inf
+    find_options = {**DEFAULT_EVENT_FIND_OPTIONS, **(event_find_options or {})}
+
+    phase = _BatchedPhase(problem, num_trajectories, trajectory_values or {})
+
+    A, B, C, E, P = RK45.A, RK45.B, RK45.C, RK45.E, RK45.P
+    error_exponent = -1.0 / (RK45.error_estimator_order + 1)
+
+    f = phase.evaluate(t, x)
+    events = phase.events()
+    active = np.all(np.isfinite(f), axis=1)
+
+    # initial step size, as in scipy.integrate.solve_ivp
+    scale = atol + np.abs(x) * rtol
+    d0 = _rms(x / scale)
+    d1 = _rms(f / scale)
+    h0 = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / np.where(d1 > 0., d1, 1.))
+    f1 = phase.evaluate(t + h0, x + h0[:, np.newaxis] * f)
+    d2 = _rms((f1 - f) / scale) / h0
+    d12 = np.maximum(d1, d2)
+    h1 = np.where(d12 <= 1e-15, np.maximum(1e-6, h0 * 1e-3),
+                  (0.01 / np.where(d12 > 0., d12, 1.)) ** (-error_exponent))
+    h = np.minimum(np.minimum(100 * h0, h1), max_step)
+
+    t_history = [[t[i]] for i in range(num_trajectories)]
+    x_history = [[x[i].copy()] for i in range(num_trajectories)]
+    event_reached = np.zeros(num_trajectories, dtype=bool)
+    num_steps = 0
+
+    K = np.empty((num_trajectories, RK45.n_stages + 1, dim_state))
+
+    while np.any(active) and num_steps < max_steps:
+        num_steps += 1
+        h = np.where(active, np.minimum(h, t_max - t), 0.0)
+
+        K[:, 0] = f
+        for stage, (a, c) in enumerate(zip(A[1:], C[1:]), start=1):
+            dx = np.einsum('nsd,s->nd', K[:, :stage], a[:stage]) * h[:, np.newaxis]
+            K[:, stage] = phase.evaluate(t + c * h, x + dx)
+
+        x_new = x + h[:, np.newaxis] * np.einsum('nsd,s->nd', K[:, :-1], B)
+        t_new = t + h
+        f_new = phase.evaluate(t_new, x_new)
+        # the model is now at the end of every step, where the events are checked
+        events_new = phase.events()
+        K[:, -1] = f_new
+
+        scale = atol + np.maximum(np.abs(x), np.abs(x_new)) * rtol
+        error = _rms(h[:, np.newaxis] * np.einsum('nsd,s->nd', K, E) / scale)
+        finite = np.all(np.isfinite(f_new), axis=1) & np.all(np.isfinite(x_new), axis=1)
+        accepted = active & finite & (error <= 1.0)
+
+        # step size control of scipy's RK45
+        with np.errstate(divide='ignore'):
+            factor = np.where(
+                error == 0.0, 10.0,
+                np.clip(0.9 * error ** error_exponent, 0.2, 10.0))
+        factor = np.where(accepted, factor, np.minimum(factor, 1.0))
+        factor = np.where(finite, factor, 0.5)
+        h_next = np.minimum(h * factor, max_step)
+
+        crossed = accepted[:, np.newaxis] & (np.sign(events_new) != np.sign(events))
+        ending = np.any(crossed, axis=1)
+
+        if np.any(ending):
+            theta = _find_events(phase, t, x, h, K, P, events, events_new, crossed,
+                                 find_options)
+            q = np.einsum('nsd,sp->ndp', K, P)
+            powers = theta[:, np.newaxis] ** np.arange(1, P.shape[1] + 1)
+            x_event = x + h[:, np.newaxis] * np.einsum('ndp,np->nd', q, powers)
+            t_new = np.where(ending, t + theta * h, t_new)
+            x_new = np.where(ending[:, np.newaxis], x_event, x_new)
+            event_reached |= ending
+
+        for i in np.nonzero(accepted)[0]:
+            t_history[i].append(t_new[i])
+            x_history[i].append(x_new[i].copy())
+
+        t = np.where(accepted, t_new, t)
+        x = np.where(accepted[:, np.newaxis], x_new, x)
+        f = np.where(accepted[:, np.newaxis], f_new, f)
+        events = np.where(accepted[:, np.newaxis], events_new, events)
+        h = h_next
+
+        # trajectories end at an event, at the maximum time, or when they fail
+        active &= ~ending & (t < t_max) & (h > 0.0)
+
+    final_values = {}
+    if final_outputs:
+        # the trajectories ended in different steps, so the model is run once more at
+        # all of their final points
+        phase.evaluate(t, x)
+        final_values = {name: phase._get(name, units)
+                        for name, units in final_outputs.items()}
+
+    return BatchedPhaseResult(
+        [np.array(ts) for ts in t_history],
+        [np.array(xs) for xs in x_history],
+        t, x, event_reached, final_values)
+
+
+def _find_events(phase, t, x, h, K, P, events, events_new, crossed, find_options):
+    """
+    Return the fraction of the last step at which the first trigger that changed sign
+    in it crosses zero, for the trajectories in which one did.
+
+    The root of each trajectory is found with the Illinois variant of regula falsi,
+    evaluating the events of all trajectories at once on the dense output of their step.
+    """
+    num_trajectories = t.size
+    ending = np.any(crossed, axis=1)
+    rows = np.arange(num_trajectories)
+
+    # the trigger whose linear estimate of the crossing is earliest
+    with np.errstate(divide='ignore', invalid='ignore'):
+        estimate = np.where(crossed, events / (events - events_new), np.inf)
+    channel = np.argmin(estimate, axis=1)
+
+    a = np.zeros(num_trajectories)
+    b = np.ones(num_trajectories)
+    fa = events[rows, channel]
+    fb = events_new[rows, channel]
+    side = np.zeros(num_trajectories, dtype=int)
+
+    q = np.einsum('nsd,sp->ndp', K, P)
+    exponents = np.arange(1, P.shape[1] + 1)
+    theta = np.ones(num_trajectories)
+    # bracket tolerance as a fraction of each step
+    xtol = find_options['xtol'] / np.where(h > 0., h, 1.0)
+    searching = ending & (np.abs(b - a) > xtol) & (fb != 0.0)
+
+    for _ in range(find_options['maxiter']):
+        if not np.any(searching):
+            break
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            new_theta = np.where(fb != fa, b - fb * (b - a) / (fb - fa), 0.5 * (a + b))
+        new_theta = np.where(np.isfinite(new_theta), np.clip(new_theta, a, b),
+                             0.5 * (a + b))
+        theta = np.where(searching, new_theta, theta)
+
+        x_theta = x + h[:, np.newaxis] * np.einsum(
+            'ndp,np->nd', q, theta[:, np.newaxis] ** exponents)
+        phase.evaluate(t + theta * h, np.where(searching[:, np.newaxis], x_theta, x))
+        value = phase.events()[rows, channel]
+
+        same_as_b = np.sign(value) == np.sign(fb)
+        # move the end on the same side of the root, and halve the value at the
+        # other end if the same end moved last time
+        new_b = searching & same_as_b
+        new_a = searching & ~same_as_b
+        fa = np.where(new_b & (side == 1), 0.5 * fa, fa)
+        fb = np.where(new_a & (side == -1), 0.5 * fb, fb)
+        b = np.where(new_b, theta, b)
+        fb = np.where(new_b, value, fb)
+        a = np.where(new_a, theta, a)
+        fa = np.where(new_a, value, fa)
+        side = np.where(new_b, 1, np.where(new_a, -1, side))
+
+        searching &= (np.abs(b - a) > xtol) & (value != 0.0)
+
+    # the end of the final bracket that is past the crossing, like the point simupy
+    # stops at
+    return np.where(ending, b, 1.0)
+
+
+def simulate_batch(problems, initial_states, trajectory_values=None, t0=0.0,
+                   **integrator_kwargs):
+    """
+    Integrate a sequence of phases for a batch of trajectories, see
+    simulate_phase_batch.
+
+    Each trajectory moves on to the next phase at its own final time and state of the
+    previous one. As in SGMTrajBase.compute_traj_loop, the initial states of the next
+    phase are the values of its states in the model of the previous phase, at the end
+    of that phase.
+
+    Parameters
+    ----------
+    problems : list of SimuPyProblem
+        The phases, in order.
+    initial_states : dict
+        Initial values of the states of the first phase, shape (num_trajectories,),
+        keyed by state name, in the units of the states of the first phase. States that
+        are not given start at 0.
+    trajectory_values : dict
+        Values of model inputs that differ between the trajectories, see
+        simulate_phase_batch.
+    t0 : float or ndarray
+        Initial time of each trajectory.
+    **integrator_kwargs
+        Passed on to simulate_phase_batch.
+
+    Returns
+    -------
+    list of BatchedPhaseResult
+        The result of each phase.
+    """
+    num_trajectories = len(next(iter(initial_states.values())))
+    first = problems[0]
+    x = np.column_stack([
+        np.broadcast_to(initial_states.get(state_name, 0.0), num_trajectories)
+        for state_name in first.state_names]).astype(float)
+    t = np.broadcast_to(t0, num_trajectories).astype(float)
+
+    results = []
+    for idx, problem in enumerate(problems):
+        # states of the next phase at the end of this one
+        next_states = problems[idx + 1].states if idx + 1 < len(problems) else {}
+        result = simulate_phase_batch(
+            problem, t, x, trajectory_values=trajectory_values,
+            final_outputs={state_name: state_data['units']
+                           for state_name, state_data in next_states.items()},
+            **integrator_kwargs)
+        results.append(result)
+
+        if next_states:
+            x = np.column_stack([result.final_values[state_name]
+                                 for state_name in next_states])
+            t = result.t_final
+
+    return results
@@ -1,6 +1,5 @@
 import numpy as np
 import openmdao.api as om
-from dymos.models.atmosphere.atmos_1976 import USatm1976Comp
 
 from aviary.mission.gasp_based.flight_conditions import FlightConditions
 from aviary.mission.gasp_based.ode.base_ode import BaseODE
@@ -25,7 +24,7 @@ class BreguetCruiseODESolution(BaseODE):
 
         self.add_subsystem(
             "USatm",
-            USatm1976Comp(
+            self.build_atmosphere(
                 num_nodes=nn),
             promotes_inputs=[
                 ("h",
@@ -64,6 +63,7 @@ class BreguetCruiseODESolution(BaseODE):
         )
 
         prop_group = om.Group()
+        prop_subsystems = []
 
         kwargs = {'num_nodes': nn, 'aviary_inputs': aviary_options,
                   'method': 'cruise', 'output_alpha': True}
@@ -71,6 +71,7 @@ class BreguetCruiseODESolution(BaseODE):
             system = subsystem.build_mission(**kwargs)
             if system is not None:
                 if isinstance(subsystem, PropulsionBuilderBase):
+                    prop_subsystems.append(subsystem.name)
                     prop_group.add_subsystem(subsystem.name,
                                              system,
                                              promotes_inputs=subsystem.mission_inputs(
@@ -83,42 +84,14 @@ class BreguetCruiseODESolution(BaseODE):
                                            **kwargs),
                                        promotes_outputs=subsystem.mission_outputs(**kwargs))
 
-        bal = om.BalanceComp(
-            name=Dynamic.Mission.THROTTLE,
-            val=np.ones(nn),
-            upper=1.0,
-            lower=0.0,
-            units="unitless",
-            lhs_name=Dynamic.Mission.THRUST_TOTAL,
-            rhs_name=Dynamic.Mission.DRAG,
-            eq_units="lbf",
-        )
-
-        prop_group.add_subsystem(
-            "thrust_balance",
-            subsys=bal,
-            promotes_inputs=['*'],
-            promotes_outputs=['*'])
+        thrust_balance = self.AddThrottleControl(
+            prop_group=prop_group, num_nodes=nn, add_default_solver=False,
+            required_thrust_name=Dynamic.Mission.DRAG, subsystem_names=prop_subsystems)
 
-        prop_group.linear_solver = om.DirectSolver()
-
-        prop_group.nonlinear_solver = om.NewtonSolver(
-            solve_subsystems=True,
-            maxiter=20,
-            rtol=1e-12,
-            atol=1e-12,
-            err_on_non_converge=False,
-        )
-        prop_group.nonlinear_solver.linesearch = om.BoundsEnforceLS()
-
-        prop_group.nonlinear_solver.options["iprint"] = 2
-        prop_group.linear_solver.options["iprint"] = 2
-
-        self.add_subsystem(
-            'prop_group',
-            subsys=prop_group,
-            promotes_inputs=['*'],
-            promotes_outputs=['*'])
+        if thrust_balance:
+            self.add_balance_solver(
+                prop_group, num_nodes=nn, atol=1e-12, rtol=1e-12, print_level=2,
+                maxiter=20, err_on_non_converge=False)
 
         #
         # collect initial/final outputs
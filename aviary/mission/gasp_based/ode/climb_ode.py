@@ -1,6 +1,5 @@
 import numpy as np
 import openmdao.api as om
-from dymos.models.atmosphere.atmos_1976 import USatm1976Comp
 
 from aviary.mission.gasp_based.flight_conditions import FlightConditions
 from aviary.mission.gasp_based.ode.base_ode import BaseODE
@@ -56,7 +55,7 @@ class ClimbODE(BaseODE):
 
         self.add_subsystem(
             "USatm",
-            USatm1976Comp(
+            self.build_atmosphere(
                 num_nodes=nn),
             promotes_inputs=[
                 ("h",
@@ -84,13 +83,7 @@ class ClimbODE(BaseODE):
                 "mach_balance_group", subsys=om.Group(), promotes=["*"]
             )
 
-            mach_balance_group.nonlinear_solver = om.NewtonSolver()
-            mach_balance_group.nonlinear_solver.options["solve_subsystems"] = True
-            mach_balance_group.nonlinear_solver.options["iprint"] = 0
-            mach_balance_group.nonlinear_solver.options["atol"] = 1e-7
-            mach_balance_group.nonlinear_solver.options["rtol"] = 1e-7
-            mach_balance_group.nonlinear_solver.linesearch = om.BoundsEnforceLS()
-            mach_balance_group.linear_solver = om.DirectSolver(assemble_jac=True)
+            self.add_balance_solver(mach_balance_group, num_nodes=nn)
             mach_balance_group.add_subsystem(
                 "speeds",
                 SpeedConstraints(
@@ -168,14 +161,7 @@ class ClimbODE(BaseODE):
                                            **kwargs),
                                        promotes_outputs=subsystem.mission_outputs(**kwargs))
 
-        # maybe replace this with the solver in AddAlphaControl?
-        lift_balance_group.nonlinear_solver = om.NewtonSolver()
-        lift_balance_group.nonlinear_solver.options["solve_subsystems"] = True
-        lift_balance_group.nonlinear_solver.options["iprint"] = 0
-        lift_balance_group.nonlinear_solver.options["atol"] = 1e-7
-        lift_balance_group.nonlinear_solver.options["rtol"] = 1e-7
-        lift_balance_group.nonlinear_solver.linesearch = om.BoundsEnforceLS()
-        lift_balance_group.linear_solver = om.DirectSolver(assemble_jac=True)
+        self.add_balance_solver(lift_balance_group, num_nodes=nn)
 
         lift_balance_group.add_subsystem(
             "climb_eom",
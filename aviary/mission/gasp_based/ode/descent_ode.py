@@ -1,6 +1,5 @@
 import numpy as np
 import openmdao.api as om
-from dymos.models.atmosphere.atmos_1976 import USatm1976Comp
 
 from aviary.variable_info.enums import AnalysisScheme, AlphaModes, SpeedType
 from aviary.variable_info.variables import Mission, Dynamic
@@ -64,7 +63,7 @@ class DescentODE(BaseODE):
 
         self.add_subsystem(
             "USatm",
-            USatm1976Comp(
+            self.build_atmosphere(
                 num_nodes=nn),
             promotes_inputs=[
                 ("h",
@@ -94,13 +93,7 @@ class DescentODE(BaseODE):
                     "mach_balance_group", subsys=om.Group(), promotes=["*"]
                 )
 
-                mach_balance_group.nonlinear_solver = om.NewtonSolver()
-                mach_balance_group.nonlinear_solver.options["solve_subsystems"] = True
-                mach_balance_group.nonlinear_solver.options["iprint"] = 0
-                mach_balance_group.nonlinear_solver.options["atol"] = 1e-7
-                mach_balance_group.nonlinear_solver.options["rtol"] = 1e-7
-                mach_balance_group.nonlinear_solver.linesearch = om.BoundsEnforceLS()
-                mach_balance_group.linear_solver = om.DirectSolver(assemble_jac=True)
+                self.add_balance_solver(mach_balance_group, num_nodes=nn)
 
                 speed_bal = om.BalanceComp(
                     name=Dynamic.Mission.MACH,
@@ -157,14 +150,7 @@ class DescentODE(BaseODE):
             promotes_outputs=[Dynamic.Mission.DYNAMIC_PRESSURE,] + speed_outputs,
         )
 
-        # maybe replace this with the solver in AddAlphaControl?
-        lift_balance_group.nonlinear_solver = om.NewtonSolver()
-        lift_balance_group.nonlinear_solver.options["solve_subsystems"] = True
-        lift_balance_group.nonlinear_solver.options["iprint"] = 0
-        lift_balance_group.nonlinear_solver.options["atol"] = 1e-7
-        lift_balance_group.nonlinear_solver.options["rtol"] = 1e-7
-        lift_balance_group.nonlinear_solver.linesearch = om.BoundsEnforceLS()
-        lift_balance_group.linear_solver = om.DirectSolver(assemble_jac=True)
+        self.add_balance_solver(lift_balance_group, num_nodes=nn)
 
         lift_balance_group.add_subsystem(
             "descent_eom",
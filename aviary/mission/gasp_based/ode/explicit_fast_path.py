@@ -0,0 +1,234 @@
+import numpy as np
+import openmdao.api as om
+from openmdao.utils.units import unit_conversion
+
+
+def _get_offsets(vector):
+    """
+    Return the start of every variable of a vector in its flat array, keyed by the
+    absolute variable name.
+    """
+    offsets = {}
+    start = 0
+    for abs_name, val in vector._abs_item_iter():
+        offsets[abs_name] = start
+        start += val.size
+
+    return offsets
+
+
+def _get_conversion(from_units, to_units):
+    """
+    Return the (factor, offset) that converts a value from from_units to to_units as
+    (value + offset) * factor, or None if no conversion is needed.
+    """
+    if from_units is None or to_units is None or from_units == to_units:
+        return None
+
+    factor, offset = unit_conversion(from_units, to_units)
+
+    if factor == 1.0 and offset == 0.0:
+        return None
+
+    return factor, offset
+
+
+def get_unsupported_reason(model):
+    """
+    Return why the fast path cannot evaluate a model, or None if it can.
+    """
+    if model.comm.size > 1:
+        return 'it runs under MPI'
+
+    if model._has_output_scaling or model._has_resid_scaling:
+        return 'it has scaled outputs or residuals'
+
+    for system in model.system_iter(include_self=True, recurse=True):
+        if isinstance(system, om.Group):
+            solver = system.nonlinear_solver
+            if solver is not None and not isinstance(solver, om.NonlinearRunOnce):
+                return f"{system.pathname or 'the model'} has a {solver.SOLVER} solver"
+
+        elif not isinstance(system, om.ExplicitComponent):
+            return f'{system.pathname} is not an ExplicitComponent'
+
+        elif system._discrete_inputs or system._discrete_outputs:
+            return f'{system.pathname} has discrete variables'
+
+    return None
+
+
+class _VariableAccessor():
+    """
+    Reads and writes the values of a list of variables directly in the output vector of
+    the model, in the given units.
+    """
+
+    def __init__(self, outputs, indices, to_source, from_source):
+        self._outputs = outputs
+        self._indices = indices
+        self._to_source = to_source
+
+        # the first entry of each variable, and the conversion of all of them at once
+        self._first_indices = np.array([idx[0] for idx in indices], dtype=int)
+        self._factors = np.array(
+            [1.0 if conversion is None else conversion[0] for conversion in from_source])
+        self._offsets = np.array(
+            [0.0 if conversion is None else conversion[1] for conversion in from_source])
+        self._convert = any(conversion is not None for conversion in from_source)
+
+    def get(self):
+        """
+        Return the first entry of each variable.
+        """
+        values = self._outputs.asarray()[self._first_indices]
+
+        if self._convert:
+            values = (values + self._offsets) * self._factors
+
+        return values
+
+    def set(self, values):
+        """
+        Set every entry of each variable to the corresponding value.
+        """
+        array = self._outputs.asarray()
+
+        for idx, conversion, val in zip(self._indices, self._to_source, values):
+            if conversion is not None:
+                factor, offset = conversion
+                val = (val + offset) * factor
+            array[idx] = val
+
+
+class ExplicitFastPath():
+    """
+    Evaluates a model made only of explicit components without going through
+    Problem.run_model.
+
+    The data transfers of every component are flattened into a single gather, with the
+    unit conversions, from the output vector of the model into its input vector. Each
+    component is then computed in execution order directly on its views of these
+    vectors, skipping the solvers, recording, and hooks of run_model. Values set or read
+    through the problem stay consistent with the fast path, since both use the same
+    vectors.
+
+    Use build_explicit_fast_path to create one, which returns None for models with
+    solvers or implicit components.
+    """
+
+    def __init__(self, prob):
+        model = prob.model
+        self._model = model
+
+        out_offsets = _get_offsets(model._outputs)
+        in_offsets = _get_offsets(model._inputs)
+        abs2meta_in = model._var_abs2meta['input']
+        abs2meta_out = model._var_abs2meta['output']
+        conns = model._conn_global_abs_in2out
+
+        self._out_offsets = out_offsets
+        self._components = []
+
+        for comp in model.system_iter(recurse=True, typ=om.ExplicitComponent):
+            if isinstance(comp, om.IndepVarComp):
+                continue
+
+            src_idx = []
+            factors = []
+            offsets = []
+            in_start = in_stop = None
+
+            for abs_in, val in comp._inputs._abs_item_iter():
+                if in_start is None:
+                    in_start = in_offsets[abs_in]
+                in_stop = in_offsets[abs_in] + val.size
+
+                meta = abs2meta_in[abs_in]
+                abs_out = conns[abs_in]
+                out_meta = abs2meta_out[abs_out]
+
+                if meta['src_indices'] is None:
+                    idx = np.arange(out_meta['size'])
+                else:
+                    idx = meta['src_indices'].flat()
+                src_idx.append(out_offsets[abs_out] + idx)
+
+                conversion = _get_conversion(out_meta['units'], meta['units'])
+                factor, offset = (1.0, 0.0) if conversion is None else conversion
+                factors.append(np.full(val.size, factor))
+                offsets.append(np.full(val.size, offset))
+
+            if in_start is None:
+                transfer = None
+            else:
+                factors = np.concatenate(factors)
+                offsets = np.concatenate(offsets)
+                if np.all(factors == 1.0) and np.all(offsets == 0.0):
+                    factors = offsets = None
+                transfer = (slice(in_start, in_stop), np.concatenate(src_idx), factors,
+                            offsets)
+
+            self._components.append((comp, transfer))
+
+    def get_accessor(self, names, units):
+        """
+        Return an accessor for the values of the given promoted variables.
+
+        Inputs are accessed through the output they are connected to, as in
+        Problem.set_val and get_val. Units of None mean the variables are accessed in
+        the units they are stored in.
+        """
+        model = self._model
+        prom2abs_in = model._var_allprocs_prom2abs_list['input']
+        abs2meta_in = model._var_abs2meta['input']
+        abs2meta_out = model._var_abs2meta['output']
+
+        indices = []
+        to_source = []
+        from_source = []
+
+        for name, unit in zip(names, units):
+            src = model.get_source(name)
+            src_meta = abs2meta_out[src]
+            idx = np.arange(src_meta['size'])
+
+            if name in prom2abs_in:
+                src_indices = abs2meta_in[prom2abs_in[name][0]]['src_indices']
+                if src_indices is not None:
+                    idx = src_indices.flat()
+
+            indices.append(self._out_offsets[src] + idx)
+            to_source.append(_get_conversion(unit, src_meta['units']))
+            from_source.append(_get_conversion(src_meta['units'], unit))
+
+        return _VariableAccessor(model._outputs, indices, to_source, from_source)
+
+    def run(self):
+        """
+        Compute every component of the model once, in execution order.
+        """
+        model = self._model
+        inputs = model._inputs.asarray()
+        outputs = model._outputs.asarray()
+
+        for comp, transfer in self._components:
+            if transfer is not None:
+                in_slice, src_idx, factors, offsets = transfer
+                if factors is None:
+                    inputs[in_slice] = outputs[src_idx]
+                else:
+                    inputs[in_slice] = (outputs[src_idx] + offsets) * factors
+
+            comp.compute(comp._inputs, comp._outputs)
+
+
+def build_explicit_fast_path(prob):
+    """
+    Return an ExplicitFastPath for the model of a problem after final_setup, or None if
+    the model has components or solvers that it cannot evaluate.
+    """
+    if get_unsupported_reason(prob.model) is not None:
+        return None
+
+    return ExplicitFastPath(prob)
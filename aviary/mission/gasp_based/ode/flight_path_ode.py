@@ -1,6 +1,5 @@
 import numpy as np
 import openmdao.api as om
-from dymos.models.atmosphere.atmos_1976 import USatm1976Comp
 from aviary.subsystems.mass.mass_to_weight import MassToWeight
 
 from aviary.variable_info.enums import AlphaModes, AnalysisScheme, SpeedType
@@ -96,7 +95,7 @@ class FlightPathODE(BaseODE):
 
         self.add_subsystem(
             "USatm",
-            USatm1976Comp(num_nodes=nn),
+            self.build_atmosphere(num_nodes=nn),
             promotes_inputs=[("h", Dynamic.Mission.ALTITUDE)],
             promotes_outputs=["rho", ("sos", Dynamic.Mission.SPEED_OF_SOUND),
                               ("temp", Dynamic.Mission.TEMPERATURE), ("pres", Dynamic.Mission.STATIC_PRESSURE), "viscosity", "drhos_dh"],
@@ -145,10 +144,12 @@ class FlightPathODE(BaseODE):
             self.AddAlphaControl(alpha_mode=alpha_mode, target_load_factor=1,
                                  atol=1e-6, rtol=1e-12, num_nodes=nn, print_level=print_level)
 
+        prop_subsystems = []
         for subsystem in core_subsystems:
             system = subsystem.build_mission(**kwargs)
             if system is not None:
                 if isinstance(subsystem, PropulsionBuilderBase):
+                    prop_subsystems.append(subsystem.name)
                     prop_group.add_subsystem(subsystem.name,
                                              system,
                                              promotes_inputs=subsystem.mission_inputs(
@@ -184,9 +185,11 @@ class FlightPathODE(BaseODE):
                 ],
                 promotes_outputs=['required_thrust']
             )
+            prop_subsystems.append('calc_thrust')
 
             self.AddThrottleControl(prop_group=prop_group,
-                                    atol=1e-8, print_level=print_level)
+                                    atol=1e-8, print_level=print_level,
+                                    subsystem_names=prop_subsystems)
 
         self.add_subsystem(
             "flight_path_eom",
@@ -0,0 +1,193 @@
+import time
+import unittest
+import warnings
+
+import numpy as np
+import openmdao.api as om
+from openmdao.utils.assert_utils import assert_near_equal
+from openmdao.utils.units import convert_units
+
+from aviary.mission.gasp_based.ode.batched_time_integration import \
+    simulate_batch, simulate_phase_batch
+from aviary.mission.gasp_based.ode.test.test_time_integration_base_classes import \
+    build_descent_problem
+from aviary.mission.gasp_based.ode.time_integration_base_classes import SimuPyProblem
+
+
+class DecayODE(om.ExplicitComponent):
+    """
+    x_rate = -k * x, with a rate constant that can differ between the nodes.
+    """
+
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int)
+
+    def setup(self):
+        nn = self.options['num_nodes']
+        self.add_input('t_curr', val=np.zeros(nn), units='s')
+        self.add_input('x', val=np.ones(nn), units='m')
+        self.add_input('k', val=np.ones(nn), units='1/s')
+        self.add_input('c', val=1., units='unitless')
+        self.add_output('x_rate', val=np.zeros(nn), units='m/s')
+        self.add_output('y', val=np.zeros(nn), units='m')
+
+    def compute(self, inputs, outputs):
+        outputs['x_rate'] = -inputs['k'] * inputs['x']
+        outputs['y'] = inputs['c'] * inputs['x']
+
+
+def _build_decay_problem(trigger_value):
+    problem = SimuPyProblem(
+        DecayODE(),
+        states={'x': {'units': 'm', 'rate': 'x_rate', 'rate_units': 'm/s'}},
+        parameters={'k': '1/s', 'c': 'unitless'},
+        outputs={'y': 'm'},
+    )
+    problem.add_trigger('x', trigger_value, units='m')
+
+    return problem
+
+
+class SimulatePhaseBatchTest(unittest.TestCase):
+    def test_decay(self):
+        problem = _build_decay_problem(0.5)
+        x0 = np.array([1.0, 2.0, 4.0])
+        k = np.array([1.0, 0.5, 2.0])
+
+        problem.set_val('c', 3.0)
+        result = simulate_phase_batch(
+            problem, 1.0, x0[:, np.newaxis], trajectory_values={'k': k},
+            final_outputs={'y': 'cm'})
+
+        # x = x0 * exp(-k * (t - 1)) reaches 0.5 at
+        t_event = 1.0 + np.log(2.0 * x0) / k
+        # the event time is as accurate as the integration
+        assert_near_equal(result.t_final, t_event, 1e-5)
+        assert_near_equal(result.x_final[:, 0], np.full(3, 0.5), 1e-10)
+        self.assertTrue(np.all(result.event_reached))
+        assert_near_equal(result.final_values['y'], 300.0 * result.x_final[:, 0], 1e-12)
+
+        for t, x, x_start, k_traj in zip(result.t, result.x, x0, k):
+            self.assertEqual(t[0], 1.0)
+            assert_near_equal(x[:, 0], x_start * np.exp(-k_traj * (t - 1.0)), 1e-6)
+
+    def test_max_allowable_time(self):
+        problem = _build_decay_problem(0.5)
+        problem.max_allowable_time = 1.0
+
+        # the second trajectory does not decay to 0.5 within a second
+        result = simulate_phase_batch(
+            problem, 0.0, np.array([[1.0], [4.0]]), trajectory_values={'k': [1., 1.]})
+
+        assert_near_equal(result.t_final, [np.log(2.0), 1.0], 1e-5)
+        assert_near_equal(result.x_final[1], 4.0 * np.exp(-1.0), 1e-6)
+        np.testing.assert_array_equal(result.event_reached, [True, False])
+
+    def test_trajectory_values(self):
+        problem = _build_decay_problem(0.5)
+
+        # c is not node-wise, so it is shared by all trajectories
+        with self.assertRaises(ValueError):
+            simulate_phase_batch(problem, 0.0, np.ones((2, 1)),
+                                 trajectory_values={'c': [1., 2.]})
+
+    def test_event_override(self):
+        class CustomEventProblem(SimuPyProblem):
+            def event_equation_function(self, t, x):
+                return x - 0.5
+
+        problem = CustomEventProblem(
+            DecayODE(),
+            states={'x': {'units': 'm', 'rate': 'x_rate', 'rate_units': 'm/s'}},
+            parameters={'k': '1/s', 'c': 'unitless'},
+            outputs={'y': 'm'},
+        )
+
+        with self.assertRaises(NotImplementedError):
+            simulate_phase_batch(problem, 0.0, np.ones((2, 1)))
+
+    def test_phases(self):
+        first = _build_decay_problem(0.5)
+        second = _build_decay_problem(0.25)
+        first.set_val('k', 2.0)
+
+        results = simulate_batch([first, second], {'x': np.array([1.0, 2.0])})
+
+        # the second phase starts at the time and state the first one ended at
+        t_switch = np.log(2.0 * np.array([1.0, 2.0])) / 2.0
+        assert_near_equal(results[0].t_final, t_switch, 1e-5)
+        assert_near_equal(results[1].t_final, t_switch + np.log(2.0), 1e-5)
+        assert_near_equal(results[1].x_final[:, 0], np.full(2, 0.25), 1e-10)
+
+
+class BatchedDescentTest(unittest.TestCase):
+    def setUp(self):
+        self.masses = np.array([145e3, 165e3])
+        self.altitudes = np.array([33e3, 37e3])
+
+    def _build_sequential(self, mass, altitude, phase_names=None):
+        prob, _, _ = build_descent_problem(phase_names=phase_names)
+        prob.set_val('traj.altitude_initial', val=altitude, units='ft')
+        prob.set_val('traj.mass_initial', val=mass, units='lbm')
+
+        return prob
+
+    def _run_sequential(self, prob):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            prob.run_model()
+
+    def _simulate_batch(self, traj):
+        mass_units = traj.ODEs[0].states['mass']['units']
+        results = traj.simulate_batch({
+            'mass': convert_units(self.masses, 'lbm', mass_units),
+            'altitude': self.altitudes,
+        })
+
+        return (convert_units(results[-1].x_final[:, 0], mass_units, 'lbm'),
+                convert_units(results[-1].x_final[:, 1], 'ft', 'NM'))
+
+    def test_descent(self):
+        # the Mach descent is enough to compare both paths, the benchmark flies all of
+        # the descent
+        prob = self._build_sequential(self.masses[-1], self.altitudes[-1],
+                                      phase_names=['descent1'])
+        self._run_sequential(prob)
+        mass, distance = self._simulate_batch(prob.model.traj)
+
+        # simupy locates the events on a spline of the accepted steps, which is less
+        # accurate than the dense output of the steps
+        assert_near_equal(mass[-1], prob.get_val('traj.mass_final', units='lbm'), 1e-6)
+        assert_near_equal(distance[-1], prob.get_val('traj.distance_final', units='NM'),
+                          1e-3)
+
+        # heavier aircraft that start higher burn more fuel and fly further
+        self.assertTrue(np.all(np.diff(self.masses - mass) > 0.0))
+        self.assertTrue(np.all(np.diff(distance) > 0.0))
+
+    def bench_test_descent(self):
+        self.masses = np.linspace(145e3, 165e3, 8)
+        self.altitudes = np.linspace(33e3, 37e3, 8)
+
+        # only the integrations are timed, the problems of both paths are built first
+        probs = [self._build_sequential(mass, altitude)
+                 for mass, altitude in zip(self.masses, self.altitudes)]
+
+        start = time.perf_counter()
+        for prob in probs:
+            self._run_sequential(prob)
+        elapsed = time.perf_counter() - start
+        print(f'sequential: {elapsed:.2f} s')
+
+        # the first batch builds the vectorized copies of the ODEs
+        traj = probs[-1].model.traj
+        self._simulate_batch(traj)
+
+        start = time.perf_counter()
+        self._simulate_batch(traj)
+        elapsed = time.perf_counter() - start
+        print(f'batched: {elapsed:.2f} s')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import time
+import unittest
+
+import numpy as np
+import openmdao.api as om
+from openmdao.utils.assert_utils import assert_check_totals, assert_near_equal
+
+from aviary.interface.default_phase_info.two_dof import default_mission_subsystems
+from aviary.mission.gasp_based.ode.breguet_cruise_ode import BreguetCruiseODESolution
+from aviary.subsystems.propulsion.engine_deck import EngineDeck
+from aviary.utils.functions import get_path
+from aviary.utils.preprocessors import preprocess_propulsion
+from aviary.variable_info.options import get_option_defaults
+from aviary.variable_info.variables import Aircraft, Dynamic
+
+
+def _build_problem(num_nodes, precompute_inverse_thrust):
+    aviary_options = get_option_defaults(engine=False)
+    engine_options = aviary_options.deepcopy()
+    engine_options.set_val(Aircraft.Engine.DATA_FILE,
+                           get_path('models/engines/turbofan_23k_1.deck'))
+    engine_options.set_val(Aircraft.Engine.PRECOMPUTE_INVERSE_THRUST,
+                           precompute_inverse_thrust)
+    preprocess_propulsion(aviary_options, [EngineDeck(options=engine_options)])
+
+    prob = om.Problem()
+    prob.model = BreguetCruiseODESolution(
+        num_nodes=num_nodes, aviary_options=aviary_options,
+        core_subsystems=default_mission_subsystems)
+    prob.model.set_input_defaults(Dynamic.Mission.MACH, 0.8 * np.ones(num_nodes))
+    prob.setup(check=False, force_alloc_complex=True)
+
+    prob.set_val(Dynamic.Mission.ALTITUDE, np.linspace(35000, 37500, num_nodes),
+                 units='ft')
+    prob.set_val('mass', np.linspace(170000, 140000, num_nodes), units='lbm')
+
+    return prob
+
+
+class BreguetCruiseThrottleLookupTest(unittest.TestCase):
+    def test_throttle_lookup(self):
+        num_nodes = 5
+        names = (Dynamic.Mission.THROTTLE, Dynamic.Mission.THRUST_TOTAL,
+                 Dynamic.Mission.FUEL_FLOW_RATE_NEGATIVE_TOTAL, Dynamic.Mission.DISTANCE)
+        results = {}
+
+        for precompute_inverse_thrust in (False, True):
+            prob = _build_problem(num_nodes, precompute_inverse_thrust)
+            prob.run_model()
+
+            results[precompute_inverse_thrust] = {
+                name: prob.get_val(name).copy() for name in names}
+
+        # the lookup needs no solver
+        self.assertFalse(hasattr(prob.model.prop_group, 'thrust_balance'))
+        self.assertTrue(hasattr(prob.model.prop_group, 'throttle_lookup'))
+        self.assertIsInstance(prob.model.prop_group.nonlinear_solver,
+                              om.NonlinearRunOnce)
+
+        assert_near_equal(results[True][Dynamic.Mission.THRUST_TOTAL],
+                          prob.get_val(Dynamic.Mission.DRAG), 1e-10)
+
+        for name in names:
+            assert_near_equal(results[True][name], results[False][name], 1e-9)
+
+        data = prob.check_totals(
+            of=[Dynamic.Mission.THROTTLE, Dynamic.Mission.FUEL_FLOW_RATE_NEGATIVE_TOTAL],
+            wrt=['mass', Dynamic.Mission.ALTITUDE], method='cs', out_stream=None)
+        assert_check_totals(data, atol=1e-8, rtol=1e-8)
+
+    def bench_test_throttle_lookup(self):
+        print('\nnodes | inverse thrust table | run_model (ms)')
+
+        for num_nodes in (1, 20, 100):
+            for precompute_inverse_thrust in (False, True):
+                prob = _build_problem(num_nodes, precompute_inverse_thrust)
+                prob.final_setup()
+                guess = prob.model._outputs.asarray().copy()
+
+                times = []
+                for _ in range(5):
+                    prob.model._outputs.set_val(guess)
+                    start = time.perf_counter()
+                    prob.run_model()
+                    times.append(time.perf_counter() - start)
+
+                print(f'{num_nodes:5} | {str(precompute_inverse_thrust):20} | '
+                      f'{1e3 * min(times):.1f}')
+
+
+if __name__ == '__main__':
+    unittest.main()
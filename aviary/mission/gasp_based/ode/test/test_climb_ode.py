@@ -3,7 +3,7 @@ import os
 
 import numpy as np
 import openmdao.api as om
-from openmdao.utils.assert_utils import assert_check_partials
+from openmdao.utils.assert_utils import assert_check_partials, assert_near_equal
 
 from aviary.mission.gasp_based.ode.climb_ode import ClimbODE
 from aviary.utils.test_utils.IO_test_util import check_prob_outputs
@@ -93,6 +93,48 @@ class ClimbODETestCase(unittest.TestCase):
         }
         check_prob_outputs(self.prob, testvals, 1e-1)  # TODO tighten
 
+    def test_tabular_atmosphere(self):
+        """The tabular atmosphere reproduces the standard day and supports a hot day."""
+        results = {}
+        for atmosphere_model, delta_T in [('USatm1976', 0.), ('tabular', 0.),
+                                          ('tabular', 27.)]:
+            prob = om.Problem()
+            prob.model = ClimbODE(
+                num_nodes=2,
+                EAS_target=270,
+                mach_cruise=0.8,
+                aviary_options=get_option_defaults(),
+                core_subsystems=default_mission_subsystems,
+                atmosphere_model=atmosphere_model,
+                delta_T=delta_T,
+            )
+            prob.setup(check=False)
+            prob.set_val(Dynamic.Mission.THROTTLE, np.array([0.956, 0.956]),
+                         units='unitless')
+            prob.set_val(Dynamic.Mission.ALTITUDE, np.array([11000, 37000]), units="ft")
+            prob.set_val(Dynamic.Mission.MASS, np.array([174149, 171592]), units="lbm")
+            prob.set_val("EAS", np.array([270, 270]), units="kn")
+            prob.run_model()
+
+            results[atmosphere_model, delta_T] = {
+                name: prob.get_val(name) for name in
+                [Dynamic.Mission.ALTITUDE_RATE, Dynamic.Mission.DISTANCE_RATE,
+                 Dynamic.Mission.TEMPERATURE, Dynamic.Mission.MACH,
+                 Dynamic.Mission.VELOCITY]}
+
+        standard = results['USatm1976', 0.]
+        for name, val in results['tabular', 0.].items():
+            assert_near_equal(val, standard[name], 1e-10)
+
+        hot_day = results['tabular', 27.]
+        assert_near_equal(hot_day[Dynamic.Mission.TEMPERATURE],
+                          standard[Dynamic.Mission.TEMPERATURE] + 27., 1e-12)
+        # at the same pressure and EAS, warmer air gives a higher TAS but the same Mach
+        assert_near_equal(hot_day[Dynamic.Mission.MACH],
+                          standard[Dynamic.Mission.MACH], 1e-10)
+        self.assertTrue(np.all(hot_day[Dynamic.Mission.VELOCITY] >
+                               standard[Dynamic.Mission.VELOCITY]))
+
 
 if __name__ == "__main__":
     unittest.main()
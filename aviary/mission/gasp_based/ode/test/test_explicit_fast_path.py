@@ -0,0 +1,238 @@
+import time
+import unittest
+import warnings
+
+import numpy as np
+import openmdao.api as om
+from openmdao.utils.assert_utils import assert_near_equal
+
+from aviary.interface.default_phase_info.two_dof import default_mission_subsystems
+from aviary.mission.gasp_based.ode.explicit_fast_path import build_explicit_fast_path
+from aviary.mission.gasp_based.ode.time_integration_base_classes import SimuPyProblem
+from aviary.mission.gasp_based.phases.time_integration_phases import SGMAccel, \
+    SGMGroundroll, SGMRotation
+from aviary.mission.gasp_based.phases.time_integration_traj import FlexibleTraj
+from aviary.subsystems.propulsion.engine_deck import EngineDeck
+from aviary.utils.preprocessors import preprocess_propulsion
+from aviary.utils.process_input_decks import create_vehicle
+from aviary.variable_info.enums import Verbosity
+from aviary.variable_info.variables import Aircraft, Dynamic
+
+
+def _build_explicit_model():
+    """
+    A model with unit conversions, src_indices and a nested group.
+    """
+    prob = om.Problem()
+    model = prob.model
+
+    model.add_subsystem(
+        'spread', om.ExecComp('y = x * arange(3)', x={'units': 'ft'},
+                              y={'shape': 3, 'units': 'm'}),
+        promotes=['*'])
+
+    sub = model.add_subsystem('sub', om.Group(), promotes=['*'])
+    sub.add_subsystem(
+        'pick', om.ExecComp('z = 2.0 * w', w={'units': 'cm'}, z={'units': 'degC'}),
+        promotes_outputs=['z'])
+    sub.add_subsystem(
+        'temp', om.ExecComp('t = z + 1.0', z={'units': 'degF'}, t={'units': 'degF'}),
+        promotes=['*'])
+    model.connect('y', 'pick.w', src_indices=[2])
+
+    prob.setup()
+    prob.final_setup()
+
+    return prob
+
+
+def _get_expected_outputs(x):
+    """
+    Return y (m), pick.w (m) and t (degC) of the explicit model for x in m.
+    """
+    y = x / 0.3048 * np.arange(3)
+    # z = 2 * w in degC, and t is 1 degF more
+    return y, y[2], 2.0 * 100.0 * y[2] + 5.0 / 9.0
+
+
+def _get_aviary_inputs():
+    aviary_inputs, _ = create_vehicle(
+        'models/large_single_aisle_1/large_single_aisle_1_GwGm.csv')
+    aviary_inputs.set_val('verbosity', Verbosity.QUIET)
+    aviary_inputs.set_val(Aircraft.Engine.SCALED_SLS_THRUST, val=28690, units="lbf")
+    aviary_inputs.set_val(Dynamic.Mission.THROTTLE, val=0, units="unitless")
+    preprocess_propulsion(aviary_inputs, [EngineDeck(options=aviary_inputs)])
+
+    return aviary_inputs
+
+
+class ExplicitFastPathTest(unittest.TestCase):
+    def test_run(self):
+        prob = _build_explicit_model()
+        prob.set_val('x', 3.0, units='m')
+        prob.run_model()
+        expected_outputs = prob.model._outputs.asarray().copy()
+        expected_inputs = prob.model._inputs.asarray().copy()
+
+        fast_path = build_explicit_fast_path(prob)
+        prob.model._outputs.set_val(0.0)
+        prob.set_val('x', 3.0, units='m')
+        prob.model._inputs.set_val(0.0)
+        fast_path.run()
+
+        assert_near_equal(prob.model._outputs.asarray(), expected_outputs, 1e-14)
+        assert_near_equal(prob.model._inputs.asarray(), expected_inputs, 1e-14)
+        y, w, t = _get_expected_outputs(3.0)
+        assert_near_equal(prob.get_val('y', units='m'), y, 1e-14)
+        assert_near_equal(prob.get_val('t', units='degC'), t, 1e-14)
+
+    def test_accessor(self):
+        prob = _build_explicit_model()
+        fast_path = build_explicit_fast_path(prob)
+
+        inputs = fast_path.get_accessor(['x'], ['m'])
+        inputs.set([3.0])
+        assert_near_equal(prob.get_val('x', units='m'), 3.0, 1e-14)
+
+        fast_path.run()
+        assert_near_equal(inputs.get(), [3.0], 1e-14)
+
+        outputs = fast_path.get_accessor(['y', 'pick.w', 't'], ['m', 'm', 'degC'])
+        y, w, t = _get_expected_outputs(3.0)
+        assert_near_equal(outputs.get(), [y[0], w, t], 1e-14)
+
+    def test_unsupported(self):
+        prob = om.Problem()
+        prob.model.add_subsystem('y', om.ExecComp('y = x**2'), promotes=['*'])
+        balance = prob.model.add_subsystem('balance', om.BalanceComp(), promotes=['*'])
+        balance.add_balance('x', lhs_name='y', rhs_name='a')
+        prob.model.nonlinear_solver = om.NewtonSolver(solve_subsystems=False)
+        prob.model.linear_solver = om.DirectSolver()
+        prob.setup()
+        prob.final_setup()
+
+        self.assertIsNone(build_explicit_fast_path(prob))
+
+
+class DecayODE(om.ExplicitComponent):
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int)
+
+    def setup(self):
+        nn = self.options['num_nodes']
+        self.add_input('t_curr', val=np.zeros(nn), units='s')
+        self.add_input('x', val=np.ones(nn), units='m')
+        self.add_input('k', val=1., units='1/s')
+        self.add_input('u', val=np.zeros(nn), units='m/s')
+        self.add_output('x_rate', val=np.zeros(nn), units='m/s')
+        self.add_output('y', val=np.zeros(nn), units='m')
+        self.num_computes = 0
+
+    def compute(self, inputs, outputs):
+        self.num_computes += 1
+        outputs['x_rate'] = -inputs['k'] * inputs['x']**2 + 0.1 * inputs['t_curr'] + \
+            inputs['u']
+        outputs['y'] = 2. * inputs['x']
+
+
+class SimuPyFastPathTest(unittest.TestCase):
+    def test_simupy_problem(self):
+        results = {}
+
+        for fast_path in (False, True):
+            ode = DecayODE()
+            problem = SimuPyProblem(
+                ode,
+                states={'x': {'units': 'ft', 'rate': 'x_rate', 'rate_units': 'ft/s'}},
+                parameters={'k': '1/s'},
+                outputs={'y': 'ft', 'x': 'm'},
+                controls={'u': 'ft/s'},
+                eval_cache_size=0,
+                fast_path=fast_path,
+            )
+            problem.output_nan = False
+            self.assertEqual(problem._fast_path is not None, fast_path)
+
+            problem.set_val('k', 0.5)
+            results[fast_path] = [
+                problem.state_equation_function(2.0, np.array([10.0]), np.array([1.0])),
+                problem.output_equation_function(3.0, np.array([5.0])),
+                problem.time, problem.state, problem.control,
+                problem.get_val('x_rate', units='ft/s'),
+            ]
+            self.assertEqual(ode.num_computes, 2)
+
+        for fast, slow in zip(results[True], results[False]):
+            assert_near_equal(fast, slow, 1e-14)
+
+        assert_near_equal(results[True][1], [10.0, 5.0 * 0.3048], 1e-14)
+
+    def test_sgm_accel(self):
+        ode_args = dict(aviary_options=_get_aviary_inputs(),
+                        core_subsystems=default_mission_subsystems)
+        x = np.array([170000., 5., 500., 400.])
+        results = {}
+
+        for fast_path in (False, True):
+            problem = SGMAccel(ode_args=ode_args, simupy_args=dict(fast_path=fast_path))
+            self.assertEqual(problem._fast_path is not None, fast_path)
+            problem.output_nan = False
+
+            results[fast_path] = [problem.state_equation_function(0., x),
+                                  problem.output_equation_function(0., x)]
+
+        for fast, slow in zip(results[True], results[False]):
+            assert_near_equal(fast, slow, 1e-14)
+
+    def bench_test_two_dof_takeoff(self):
+        aviary_inputs = _get_aviary_inputs()
+        ode_args = dict(aviary_options=aviary_inputs,
+                        core_subsystems=default_mission_subsystems)
+        results = {}
+
+        for fast_path in (False, True):
+            simupy_args = dict(verbosity=Verbosity.QUIET, fast_path=fast_path)
+            phases = {
+                'groundroll': {
+                    'ode': SGMGroundroll(ode_args=ode_args, simupy_args=simupy_args),
+                    'vals_to_set': {
+                        'attr:VR_value': {'val': 'SGMGroundroll_velocity_trigger',
+                                          'units': 'kn'}},
+                },
+                'rotation': {
+                    'ode': SGMRotation(ode_args=ode_args, simupy_args=simupy_args),
+                    'vals_to_set': {},
+                },
+            }
+            traj = FlexibleTraj(
+                Phases=phases,
+                traj_final_state_output=[Dynamic.Mission.MASS, Dynamic.Mission.DISTANCE],
+                traj_initial_state_input=[Dynamic.Mission.MASS,
+                                          Dynamic.Mission.DISTANCE,
+                                          Dynamic.Mission.ALTITUDE],
+                traj_event_trigger_input=[
+                    (phases['groundroll']['ode'], Dynamic.Mission.VELOCITY, 0)],
+            )
+            prob = om.Problem()
+            prob.model.add_subsystem('traj', traj)
+            prob.setup()
+            prob.set_val('traj.altitude_initial', val=0., units='ft')
+            prob.set_val('traj.mass_initial', val=174000., units='lbm')
+            prob.set_val('traj.distance_initial', val=0., units='NM')
+            prob.set_val('traj.SGMGroundroll_velocity_trigger', val=143.1, units='kn')
+
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                start = time.perf_counter()
+                prob.run_model()
+                elapsed = time.perf_counter() - start
+
+            print(f'fast_path={fast_path}: {elapsed:.2f} s')
+            results[fast_path] = (prob.get_val('traj.distance_final'),
+                                  prob.get_val('traj.mass_final'))
+
+        assert_near_equal(results[True], results[False], 0.)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,507 @@
+import time
+import tracemalloc
+import unittest
+import warnings
+
+import numpy as np
+import openmdao.api as om
+from openmdao.utils.assert_utils import assert_near_equal
+
+from aviary.interface.default_phase_info.two_dof import default_mission_subsystems
+from aviary.interface.default_phase_info.two_dof_fiti import \
+    create_2dof_based_ascent_phases, create_2dof_based_descent_phases
+from aviary.mission.gasp_based.ode.time_integration_base_classes import SimuPyProblem
+from aviary.mission.gasp_based.phases.time_integration_traj import FlexibleTraj
+from aviary.subsystems.propulsion.engine_deck import EngineDeck
+from aviary.utils.preprocessors import preprocess_propulsion
+from aviary.utils.process_input_decks import create_vehicle
+from aviary.variable_info.enums import Verbosity
+from aviary.variable_info.variables import Aircraft, Dynamic
+
+
+def _get_ode_args():
+    aviary_inputs, _ = create_vehicle(
+        'models/large_single_aisle_1/large_single_aisle_1_GwGm.csv')
+    aviary_inputs.set_val('verbosity', Verbosity.QUIET)
+    aviary_inputs.set_val(Aircraft.Engine.SCALED_SLS_THRUST, val=28690, units="lbf")
+    aviary_inputs.set_val(Dynamic.Mission.THROTTLE, val=0, units="unitless")
+    ode_args = dict(aviary_options=aviary_inputs,
+                    core_subsystems=default_mission_subsystems)
+    preprocess_propulsion(aviary_inputs, [EngineDeck(options=aviary_inputs)])
+
+    return ode_args
+
+
+def build_descent_problem(eval_cache_size=256, phase_names=None, **traj_kwargs):
+    phases = create_2dof_based_descent_phases(_get_ode_args(), cruise_mach=.8)
+    if phase_names is not None:
+        phases = {name: phases[name] for name in phase_names}
+
+    for phase_info in phases.values():
+        phase_info['ode'].eval_cache_size = eval_cache_size
+
+    traj = FlexibleTraj(
+        Phases=phases,
+        traj_final_state_output=[
+            Dynamic.Mission.MASS,
+            Dynamic.Mission.DISTANCE,
+        ],
+        traj_initial_state_input=[
+            Dynamic.Mission.MASS,
+            Dynamic.Mission.DISTANCE,
+            Dynamic.Mission.ALTITUDE,
+        ],
+        **traj_kwargs,
+    )
+    prob = om.Problem()
+    prob.model.add_subsystem('traj', traj)
+    prob.setup()
+    prob.set_val("traj.altitude_initial", val=35e3, units="ft")
+    prob.set_val("traj.mass_initial", val=154e3, units="lbm")
+    prob.set_val("traj.distance_initial", val=0, units="NM")
+
+    num_runs = [0]
+    for phase_info in phases.values():
+        ode_prob = phase_info['ode'].prob
+        run_model = ode_prob.run_model
+
+        def counted_run_model(run_model=run_model):
+            num_runs[0] += 1
+            run_model()
+
+        ode_prob.run_model = counted_run_model
+
+    return prob, phases, num_runs
+
+
+class DecayODE(om.ExplicitComponent):
+    def initialize(self):
+        self.options.declare('num_nodes', default=1, types=int)
+
+    def setup(self):
+        nn = self.options['num_nodes']
+        self.add_input('t_curr', val=np.zeros(nn), units='s')
+        self.add_input('x', val=np.ones(nn), units='m')
+        self.add_input('k', val=1., units='1/s')
+        self.add_output('x_rate', val=np.zeros(nn), units='m/s')
+        self.add_output('y', val=np.zeros(nn), units='m')
+        self.declare_partials('*', '*', method='cs')
+        self.num_computes = 0
+
+    def compute(self, inputs, outputs):
+        self.num_computes += 1
+        outputs['x_rate'] = -inputs['k'] * inputs['x']**2 + 0.1 * inputs['t_curr']
+        outputs['y'] = 2. * inputs['x']
+
+
+class SimuPyProblemCacheTest(unittest.TestCase):
+    def build(self, eval_cache_size=256):
+        ode = DecayODE()
+        problem = SimuPyProblem(
+            ode,
+            states={'x': {'units': 'm', 'rate': 'x_rate', 'rate_units': 'm/s'}},
+            parameters={'k': '1/s'},
+            outputs={'y': 'm'},
+            eval_cache_size=eval_cache_size,
+        )
+        problem.output_nan = False
+        return ode, problem
+
+    def test_repeated_point(self):
+        ode, problem = self.build()
+
+        rate = problem.state_equation_function(0.5, np.array([2.]))
+        output = problem.output_equation_function(0.5, np.array([2.]))
+        problem.event_equation_function(0.5, np.array([2.]))
+
+        assert_near_equal(rate, [-3.95])
+        assert_near_equal(output, [4.])
+        self.assertEqual(ode.num_computes, 1)
+        self.assertEqual(problem.cache_hits, 2)
+        self.assertEqual(problem.cache_misses, 1)
+
+    def test_lru(self):
+        ode, problem = self.build(eval_cache_size=2)
+
+        for x in [1., 2., 1.]:
+            problem.state_equation_function(0., np.array([x]))
+        self.assertEqual(problem.cache_misses, 2)
+
+        # the model has to be re-run before it can be read at a cached point
+        assert_near_equal(problem.get_val('x_rate'), -1.)
+        self.assertEqual(problem.cache_misses, 3)
+
+        # x=2 was evicted by x=3
+        for x in [3., 2.]:
+            problem.state_equation_function(0., np.array([x]))
+        self.assertEqual(problem.cache_misses, 5)
+        self.assertEqual(len(problem._eval_cache), 2)
+
+    def test_set_val(self):
+        ode, problem = self.build()
+
+        problem.state_equation_function(0., np.array([2.]))
+        problem.set_val('k', 1.)
+        problem.state_equation_function(0., np.array([2.]))
+        self.assertEqual(problem.cache_misses, 1)
+
+        problem.set_val('k', 3.)
+        rate = problem.state_equation_function(0., np.array([2.]))
+        assert_near_equal(rate, [-12.])
+        self.assertEqual(problem.cache_misses, 2)
+
+    def test_no_cache(self):
+        ode, problem = self.build(eval_cache_size=0)
+
+        problem.state_equation_function(0.5, np.array([2.]))
+        output = problem.output_equation_function(0.5, np.array([2.]))
+
+        assert_near_equal(output, [4.])
+        self.assertEqual(ode.num_computes, 2)
+        self.assertEqual(len(problem._eval_cache), 0)
+
+
+class VectorizedJacobianTest(unittest.TestCase):
+    def test_state_rate_partials(self):
+        problem = SimuPyProblem(
+            DecayODE(),
+            states={'x': {'units': 'm', 'rate': 'x_rate', 'rate_units': 'm/s'}},
+            parameters={'k': '1/s'},
+            outputs={'y': 'm'},
+        )
+        problem.output_nan = False
+        problem.set_val('k', 0.5)
+
+        ts = np.linspace(0., 10., 11)
+        xs = np.linspace(1., 3., 11)[:, np.newaxis]
+
+        # chunks of 4, 4 and 3 points, the last one padded to 4 nodes
+        df_dx, df_dparam = problem.compute_state_rate_partials(
+            ts, xs, ['k', 't_curr'], chunk_size=4)
+
+        for idx, (t, x) in enumerate(zip(ts, xs)):
+            problem.state_equation_function(t, x)
+            assert_near_equal(
+                df_dx[idx], problem.compute_totals(
+                    ['x_rate'], ['x'], return_format='array'), 1e-12)
+            assert_near_equal(
+                df_dparam[idx], problem.compute_totals(
+                    ['x_rate'], ['k', 't_curr'], return_format='array'), 1e-12)
+
+        assert_near_equal(df_dx[:, 0, 0], -xs[:, 0], 1e-12)
+        self.assertEqual(sorted(problem._vectorized_probs), [4])
+
+    def test_no_num_nodes(self):
+        ode = om.ExecComp('x_rate = -x', x={'units': 'm'}, x_rate={'units': 'm/s'})
+        problem = SimuPyProblem(
+            ode,
+            states={'x': {'units': 'm', 'rate': 'x_rate', 'rate_units': 'm/s'}},
+            parameters={},
+            outputs={'x_rate': 'm/s'},
+            time_independent=True,
+        )
+
+        with self.assertRaises(NotImplementedError):
+            problem.compute_state_rate_partials([0.], [[1.]])
+
+
+class CheckpointedResultTest(unittest.TestCase):
+    def test_dense(self):
+        problem = SimuPyProblem(
+            DecayODE(),
+            states={'x': {'units': 'm', 'rate': 'x_rate', 'rate_units': 'm/s'}},
+            parameters={'k': '1/s'},
+            outputs={'y': 'm'},
+        )
+        problem.add_trigger('x', 10.)
+        problem.set_val('k', 0.5)
+        problem.initial_condition = np.array([2.])
+        sim_result = problem.simulate((0., 20.))
+
+        checkpointed = problem.checkpoint(sim_result, 3)
+        assert_near_equal(checkpointed.x[:-1], sim_result.x[:-1:3], 0.)
+        assert_near_equal(checkpointed.x[-1], sim_result.x[-1], 0.)
+        assert_near_equal(checkpointed.y[-1], sim_result.y[-1], 0.)
+
+        dense = checkpointed.dense(problem)
+        assert_near_equal(dense.t, sim_result.t, 0.)
+        assert_near_equal(dense.x, sim_result.x, 1e-5)
+        assert_near_equal(dense.x[::3], sim_result.x[::3], 0.)
+        self.assertTrue(np.isnan(dense.y[1, 0]))
+
+
+class ReuseUnchangedPhasesTest(unittest.TestCase):
+    def build(self, reuse_unchanged_phases):
+        phases = {}
+        for phase_name, x_final in [('decay1', 1.), ('decay2', .5)]:
+            ode = om.ExecComp(
+                ['x_rate = -k * x**2 + 0.1 * t_curr', 'z_rate = x + 0. * z'],
+                x={'units': 'm'}, z={'units': 'm*s'}, k={'units': '1/s'},
+                t_curr={'units': 's'}, x_rate={'units': 'm/s'}, z_rate={'units': 'm'})
+            problem = SimuPyProblem(
+                ode,
+                states={
+                    'x': {'units': 'm', 'rate': 'x_rate', 'rate_units': 'm/s'},
+                    'z': {'units': 'm*s', 'rate': 'z_rate', 'rate_units': 'm'},
+                },
+                parameters={'k': '1/s'},
+                outputs={'x_rate': 'm/s'},
+            )
+            problem.add_trigger('x', x_final)
+            phases[phase_name] = {
+                'ode': problem,
+                'vals_to_set': {'k': {'val': 1., 'units': '1/s'}},
+            }
+
+        traj = FlexibleTraj(
+            Phases=phases,
+            traj_final_state_output=['x', 'z'],
+            traj_initial_state_input=['x', 'z'],
+            reuse_unchanged_phases=reuse_unchanged_phases,
+        )
+        prob = om.Problem()
+        prob.model.add_subsystem('traj', traj)
+        prob.setup()
+        prob.set_val('traj.x_initial', 2.)
+        return prob, phases, traj
+
+    def test_reuse(self):
+        prob, phases, traj = self.build(reuse_unchanged_phases=True)
+        prob.run_model()
+        self.assertEqual(traj.num_reused_phases, 0)
+
+        prob.run_model()
+        self.assertEqual(traj.num_reused_phases, 2)
+
+        # only the second phase depends on this value
+        phases['decay2']['vals_to_set']['k']['val'] = 2.
+        prob.run_model()
+        self.assertEqual(traj.num_reused_phases, 3)
+
+        expected_prob, expected_phases, _ = self.build(reuse_unchanged_phases=False)
+        expected_phases['decay2']['vals_to_set']['k']['val'] = 2.
+        expected_prob.run_model()
+        assert_near_equal(
+            prob.get_val('traj.z_final'), expected_prob.get_val('traj.z_final'), 0.)
+
+        # a new initial state invalidates all phases
+        prob.set_val('traj.x_initial', 3.)
+        prob.run_model()
+        self.assertEqual(traj.num_reused_phases, 3)
+
+    def test_two_dof_takeoff_and_climb(self):
+        phases = create_2dof_based_ascent_phases(_get_ode_args())
+        phases = {phase_name: phases[phase_name] for phase_name in
+                  ['groundroll', 'rotation', 'ascent', 'accel', 'climb1']}
+        traj = FlexibleTraj(
+            Phases=phases,
+            traj_final_state_output=[Dynamic.Mission.MASS, Dynamic.Mission.DISTANCE],
+            traj_initial_state_input=[Dynamic.Mission.MASS,
+                                      Dynamic.Mission.DISTANCE,
+                                      Dynamic.Mission.ALTITUDE],
+            traj_event_trigger_input=[
+                (phases['groundroll']['ode'], Dynamic.Mission.VELOCITY, 0)],
+            reuse_unchanged_phases=True,
+        )
+        prob = om.Problem()
+        prob.model.add_subsystem('traj', traj)
+        prob.setup()
+        prob.set_val('traj.altitude_initial', val=0., units='ft')
+        prob.set_val('traj.mass_initial', val=174000., units='lbm')
+        prob.set_val('traj.distance_initial', val=0., units='NM')
+        prob.set_val('traj.SGMGroundroll_velocity_trigger', val=143.1, units='kn')
+        prob.set_val('traj.' + Aircraft.Design.MAX_FUSELAGE_PITCH_ANGLE, 15.,
+                     units='deg')
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            prob.run_model()
+            distance = prob.get_val('traj.distance_final', units='NM')
+
+            # the ascent sets alpha and the flap and gear retraction times while it is
+            # integrated, and FlexibleTraj sets the retraction times and the start of
+            # the rotation again on every compute
+            prob.run_model()
+            self.assertEqual(traj.num_reused_phases, 5)
+
+            # only the climb depends on this value
+            phases['climb1']['vals_to_set']['EAS']['val'] = 240.
+            prob.run_model()
+            self.assertEqual(traj.num_reused_phases, 9)
+            self.assertLess(prob.get_val('traj.distance_final', units='NM'), distance)
+
+            phases['climb1']['vals_to_set']['EAS']['val'] = 250.
+            prob.run_model()
+            self.assertEqual(traj.num_reused_phases, 13)
+
+        # the Newton solvers of the climb ODE start from where the previous integration
+        # left them
+        assert_near_equal(prob.get_val('traj.distance_final', units='NM'), distance,
+                          1e-6)
+
+
+class AdjointExecutorTest(unittest.TestCase):
+    def test_executors(self):
+        of = ['traj.mass_final', 'traj.distance_final']
+        wrt = ['traj.mass_initial', 'traj.altitude_initial',
+               'traj.' + Aircraft.Wing.AREA]
+        prob, _, _ = build_descent_problem()
+        traj = prob.model.traj
+
+        totals = {}
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            prob.run_model()
+            # the ODE solvers of the first linearization start from the state of the
+            # forward integration, later ones from where the previous one ended
+            prob.compute_totals(of, wrt)
+
+            # the executor is only used in compute_partials
+            for adjoint_executor in [None, 'thread', 'process']:
+                traj.options['adjoint_executor'] = adjoint_executor
+                totals[adjoint_executor] = prob.compute_totals(
+                    of, wrt, return_format='array')
+
+        # each co-state sweep is deterministic, so the results must be identical
+        np.testing.assert_array_equal(totals['thread'], totals[None])
+        np.testing.assert_array_equal(totals['process'], totals[None])
+
+
+class FlexibleTrajBenchmark(unittest.TestCase):
+    def bench_test_two_dof_descent(self):
+        results = {}
+        for eval_cache_size in [0, 256]:
+            prob, phases, num_runs = build_descent_problem(eval_cache_size)
+
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                start = time.perf_counter()
+                prob.run_model()
+                elapsed = time.perf_counter() - start
+
+            hits = sum(phase_info['ode'].cache_hits for phase_info in phases.values())
+            print(f'eval_cache_size={eval_cache_size}: {elapsed:.2f} s, '
+                  f'{num_runs[0]} ODE evaluations, {hits} cache hits')
+            results[eval_cache_size] = (
+                num_runs[0],
+                prob.get_val('traj.distance_final', units='NM'),
+                prob.get_val('traj.mass_final', units='lbm'),
+            )
+
+        uncached, cached = results[0], results[256]
+        self.assertLess(cached[0], uncached[0] / 2)
+        # the ODE converges alpha with a Newton solver, so repeated evaluations of the
+        # same point differ at the solver tolerance
+        assert_near_equal(cached[1], uncached[1], 1e-6)
+        assert_near_equal(cached[2], uncached[2], 1e-6)
+
+    def bench_test_vectorized_jacobians(self):
+        of = ['traj.mass_final', 'traj.distance_final']
+        wrt = ['traj.mass_initial', 'traj.altitude_initial',
+               'traj.' + Aircraft.Wing.AREA]
+        totals = {}
+        for vectorized in [False, True]:
+            prob, phases, _ = build_descent_problem(vectorized_jacobians=vectorized)
+
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                prob.run_model()
+
+                # the first call also builds the vectorized ODEs
+                prob.compute_totals(of, wrt)
+                start = time.perf_counter()
+                totals[vectorized] = prob.compute_totals(of, wrt, return_format='array')
+                elapsed = time.perf_counter() - start
+
+            print(f'vectorized_jacobians={vectorized}: {elapsed:.2f} s')
+
+        assert_near_equal(totals[True], totals[False], 1e-7)
+
+    def bench_test_adjoint_executor(self):
+        of = ['traj.mass_final', 'traj.distance_final']
+        wrt = ['traj.mass_initial', 'traj.altitude_initial',
+               'traj.' + Aircraft.Wing.AREA]
+        totals = {}
+        for adjoint_executor in [None, 'thread', 'process']:
+            prob, phases, _ = build_descent_problem(adjoint_executor=adjoint_executor)
+
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                prob.run_model()
+
+                start = time.perf_counter()
+                totals[adjoint_executor] = prob.compute_totals(
+                    of, wrt, return_format='array')
+                elapsed = time.perf_counter() - start
+
+            print(f'adjoint_executor={adjoint_executor}: {elapsed:.2f} s')
+
+        # each co-state sweep is deterministic, so the results must be identical
+        np.testing.assert_array_equal(totals['thread'], totals[None])
+        np.testing.assert_array_equal(totals['process'], totals[None])
+
+    def bench_test_checkpointing(self):
+        of = ['traj.mass_final', 'traj.distance_final']
+        wrt = ['traj.mass_initial', 'traj.altitude_initial',
+               'traj.' + Aircraft.Wing.AREA]
+        totals = {}
+        retained_memory = {}
+        peak_memory = {}
+        for checkpoint_interval in [None, 4, 16]:
+            prob, phases, _ = build_descent_problem(
+                checkpoint_interval=checkpoint_interval)
+
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                prob.run_model()
+
+                start = time.perf_counter()
+                totals[checkpoint_interval] = prob.compute_totals(
+                    of, wrt, return_format='array')
+                elapsed = time.perf_counter() - start
+
+                # tracing slows the evaluations down, so the memory is measured in a
+                # separate pass: what the forward integration keeps for the derivatives,
+                # and the peak until they are computed
+                tracemalloc.start()
+                prob.run_model()
+                retained_memory[checkpoint_interval] = tracemalloc.get_traced_memory()[0]
+                prob.compute_totals(of, wrt, return_format='array')
+                peak_memory[checkpoint_interval] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+            print(f'checkpoint_interval={checkpoint_interval}: {elapsed:.2f} s, '
+                  f'{retained_memory[checkpoint_interval]} bytes retained, '
+                  f'{peak_memory[checkpoint_interval]} bytes peak')
+
+        for checkpoint_interval in [4, 16]:
+            self.assertLess(retained_memory[checkpoint_interval], retained_memory[None])
+            # the re-integrated states match the forward ones to the integrator tolerance
+            assert_near_equal(totals[checkpoint_interval], totals[None], 1e-5)
+
+    def bench_test_reuse_unchanged_phases(self):
+        # sweep a value that only affects the last phase
+        eas_values = [250., 240., 230., 220.]
+        results = {}
+        for reuse in [False, True]:
+            prob, phases, _ = build_descent_problem(reuse_unchanged_phases=reuse)
+
+            distances = []
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                start = time.perf_counter()
+                for eas in eas_values:
+                    phases['descent3']['vals_to_set']['EAS']['val'] = eas
+                    prob.run_model()
+                    distances.append(prob.get_val('traj.distance_final', units='NM'))
+                elapsed = time.perf_counter() - start
+
+            print(f'reuse_unchanged_phases={reuse}: {elapsed:.2f} s, '
+                  f'{prob.model.traj.num_reused_phases} phases reused')
+            results[reuse] = np.array(distances)
+
+        assert_near_equal(results[True], results[False], 0.)
+
+
+if __name__ == '__main__':
+    unittest.main()
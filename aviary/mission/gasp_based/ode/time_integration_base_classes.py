@@ -1,10 +1,15 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
 import numpy as np
 import openmdao.api as om
 from openmdao.utils import units
-from scipy import interpolate
+from scipy import integrate, interpolate
 from simupy.block_diagram import DEFAULT_INTEGRATOR_OPTIONS, SimulationMixin
 from simupy.systems import DynamicalSystem
 
+from aviary.mission.gasp_based.ode.explicit_fast_path import \
+    build_explicit_fast_path, get_unsupported_reason
 from aviary.mission.gasp_based.ode.params import ParamPort
 from aviary.variable_info.enums import Verbosity
 from aviary.variable_info.variable_meta_data import _MetaData
@@ -69,7 +74,8 @@ class SimuPyProblem(SimulationMixin):
         verbosity=Verbosity.QUIET,
         max_allowable_time=1_000_000,
         adjoint_int_opts=DEFAULT_INTEGRATOR_OPTIONS.copy(),
-
+        eval_cache_size=256,
+        fast_path=True,
     ):
         """
         states: a dictionary of the form {state_name:{'units':unit, 'rate':state_rate_name, 'rate_units':state_rate_units}}
@@ -82,8 +88,30 @@ class SimuPyProblem(SimulationMixin):
         include_state_outputs : automatically add the state to the input
         works well for auto-parsed naming, does not check for duplication before adding
         states, parameters, outputs, and controls can also be input as a list of keys for the dictionary
+        eval_cache_size: maximum number of (time, state, control) points whose state rates
+        and outputs are kept, so that repeated calls at the same point do not run the
+        model again. Set to 0 to run the model on every call.
+        fast_path: if True and the ODE is made only of explicit components without
+        solvers, the model is evaluated with an ExplicitFastPath, and time, states,
+        controls, state rates and outputs are read and written directly in its vectors,
+        instead of going through Problem.run_model, set_val and get_val.
         """
 
+        # evaluation cache, see _cached_evaluation
+        self.eval_cache_size = eval_cache_size
+        self._eval_cache = OrderedDict()
+        # changes whenever an input of the model is set to a new value
+        self._inputs_version = 0
+        # values given through set_val and set_attr, see parameter_version
+        self._parameters = {}
+        self._num_cache_clears = 0
+        # key of the point the model outputs were last computed at
+        self._model_key = None
+        # key of a cached point whose inputs are loaded but have not been run
+        self._stale_key = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
         default_om_list_args = dict(prom_name=True, val=False,
                                     out_stream=None, units=True)
 
@@ -94,21 +122,12 @@ class SimuPyProblem(SimulationMixin):
         self.adjoint_int_opts['name'] = "dop853"
 
         self.dt = 0.0
-        prob = om.Problem()
-        if aviary_options:
-            from aviary.interface.methods_for_level2 import AviaryGroup
-            prob.model = AviaryGroup(
-                aviary_options=aviary_options, aviary_metadata=meta_data)
-        prob.model.add_subsystem(
-            "ODE_group",
-            ode,
-            promotes=["*"],
-        )
+        self.aviary_options = aviary_options
+        self.meta_data = meta_data
         self.ode = ode
-
-        self.prob = prob
-        prob.setup(check=False, force_alloc_complex=True)
-        prob.final_setup()
+        self.prob = prob = self._setup_problem(ode)
+        # copies of the ODE with num_nodes > 1, keyed by num_nodes
+        self._vectorized_probs = {}
 
         if triggers is None:
             triggers = []
@@ -230,6 +249,13 @@ class SimuPyProblem(SimulationMixin):
         # TODO: add defensive checks to make sure dimensions match in both setup and
         # calls
 
+        self._fast_path = None
+        if fast_path:
+            self._setup_fast_path()
+        if fast_path and self._fast_path is None and verbosity.value >= 2:
+            print(f'{type(self).__name__}: not using the fast path because '
+                  f'{get_unsupported_reason(prob.model)}')
+
         if verbosity.value >= 2:
             if problem_name:
                 problem_name = '_'+problem_name
@@ -239,18 +265,65 @@ class SimuPyProblem(SimulationMixin):
                 prob.model.list_inputs(out_stream=outfile,)
             print(states)
 
+    def _setup_problem(self, ode):
+        prob = om.Problem()
+        if self.aviary_options:
+            from aviary.interface.methods_for_level2 import AviaryGroup
+            prob.model = AviaryGroup(
+                aviary_options=self.aviary_options, aviary_metadata=self.meta_data)
+        prob.model.add_subsystem(
+            "ODE_group",
+            ode,
+            promotes=["*"],
+        )
+        prob.setup(check=False, force_alloc_complex=True)
+        prob.final_setup()
+        return prob
+
+    def _setup_fast_path(self):
+        self._fast_path = fast_path = build_explicit_fast_path(self.prob)
+        if fast_path is None:
+            return
+
+        if not self.time_independent:
+            self._fast_time = fast_path.get_accessor([self.t_name], [None])
+        self._fast_state = fast_path.get_accessor(
+            self.state_names,
+            [state_data['units'] for state_data in self.states.values()])
+        self._fast_control = fast_path.get_accessor(
+            list(self.controls), list(self.controls.values()))
+        self._fast_state_rate = fast_path.get_accessor(
+            [state_data['rate'] for state_data in self.states.values()],
+            [state_data['rate_units'] for state_data in self.states.values()])
+        self._fast_output = fast_path.get_accessor(
+            list(self.outputs), list(self.outputs.values()))
+
+    def _run_model(self):
+        if self._fast_path is None:
+            self.prob.run_model()
+        else:
+            self._fast_path.run()
+
     @property
     def time(self):
+        if self._fast_path is not None and not self.time_independent:
+            return self._fast_time.get()[0]
         return self.prob.get_val(self.t_name)[0]
 
     @time.setter
     def time(self, value):
         if self.time_independent or self.time == value:
             return
-        self.prob.set_val(self.t_name, value)
+        if self._fast_path is not None:
+            self._fast_time.set([value])
+        else:
+            self.prob.set_val(self.t_name, value)
+        self._inputs_changed()
 
     @property
     def state(self):
+        if self._fast_path is not None:
+            return self._fast_state.get()
         return np.array(
             [
                 self.prob.get_val(state_name, units=state_data['units'])[0]
@@ -262,11 +335,16 @@ class SimuPyProblem(SimulationMixin):
     def state(self, value):
         if np.all(self.state == value):
             return
+        if self._fast_path is not None:
+            self._fast_state.set(value)
+            self._inputs_changed()
+            return
         for state_name, elem_val in zip(
             self.states.keys(), value
         ):
             self.prob.set_val(state_name, elem_val,
                               units=self.states[state_name]['units'])
+        self._inputs_changed()
 
     def compute_along_traj(self, ts, xs):
         self.prob.set_val(self.t_name, ts)
@@ -274,10 +352,13 @@ class SimuPyProblem(SimulationMixin):
             self.prob.set_val(state_name, elem_val,
                               units=self.states[state_name]['units'])
 
+        self._inputs_changed()
         self.prob.run_model()
 
     @property
     def control(self):
+        if self._fast_path is not None:
+            return self._fast_control.get()
         return np.array(
             [
                 self.prob.get_val(control_name, units=unit)[0]
@@ -291,10 +372,15 @@ class SimuPyProblem(SimulationMixin):
             value = np.array([])
         if (self.control.size == value.size) and np.all(self.control == value):
             return
+        if self._fast_path is not None:
+            self._fast_control.set(value)
+            self._inputs_changed()
+            return
         for control_name, elem_val in zip(
             self.controls, value
         ):
             self.prob.set_val(control_name, elem_val, units=self.controls[control_name])
+            self._inputs_changed()
 
     @property
     def parameter(self):
@@ -310,12 +396,14 @@ class SimuPyProblem(SimulationMixin):
         if np.all(self.parameter == value):
             return
         for parameter_name, elem_val in zip(
-            self.paramaters, value
+            self.parameters, value
         ):
-            self.prob.set_val(parameter_name, elem_val)
+            self.set_val(parameter_name, elem_val)
 
     @property
     def state_rate(self):
+        if self._fast_path is not None:
+            return self._fast_state_rate.get()
         return np.array(
             [
                 self.prob.get_val(state_data['rate'], units=state_data['rate_units'])[0]
@@ -325,6 +413,8 @@ class SimuPyProblem(SimulationMixin):
 
     @property
     def output(self):
+        if self._fast_path is not None:
+            return self._fast_output.get()
         return np.array(
             [
                 self.prob.get_val(output_name, units=unit)[0]
@@ -341,32 +431,239 @@ class SimuPyProblem(SimulationMixin):
             ]
         )
 
+    def _eval_key(self, t, x, u=None):
+        if self.time_independent:
+            t = None
+        else:
+            t = float(np.real(t))
+        x = np.asarray(x, dtype=float).tobytes()
+        # only the leading entries of u are used, one for each control
+        u = b'' if u is None else np.asarray(u, dtype=float)[:self.dim_input].tobytes()
+        return (t, x, u, self._inputs_version)
+
+    def _inputs_changed(self):
+        # the model outputs no longer correspond to its inputs
+        self._model_key = None
+        self._stale_key = None
+
+    def _cached_evaluation(self, t, x, u=None):
+        """
+        Load the point (t, x, u) into the model and return its cache entry, a dict of
+        the quantities already derived at that point. The model is only run if the
+        point is not cached; a cached point that is not the one the model was last run
+        at is marked stale and only re-run if something reads the model (see _sync).
+        """
+        key = self._eval_key(t, x, u)
+        if key == self._model_key:
+            self.cache_hits += 1
+            entry = self._eval_cache.get(key, {})
+        else:
+            self.time = t
+            self.state = x
+            self.control = u
+            if key in self._eval_cache:
+                self.cache_hits += 1
+                entry = self._eval_cache[key]
+                self._stale_key = key
+            else:
+                self._run_model()
+                self.cache_misses += 1
+                self._model_key = key
+                entry = {}
+
+        if self.eval_cache_size > 0:
+            self._eval_cache[key] = entry
+            self._eval_cache.move_to_end(key)
+            if len(self._eval_cache) > self.eval_cache_size:
+                self._eval_cache.popitem(last=False)
+        else:
+            self._model_key = None
+
+        return entry
+
+    def _sync(self):
+        # run the model at a stale cached point before its values are read
+        if self._stale_key is not None:
+            self._run_model()
+            self.cache_misses += 1
+            self._model_key = self._stale_key
+            self._stale_key = None
+
     @property
+    def parameter_version(self):
+        """
+        Key of the values the parameters and attributes of the problem were given
+        through set_val and set_attr. It is the same whenever they have the same
+        values, so setting a value and setting it back does not change it. Values that
+        the equations of the problem set during an integration (see
+        _set_equation_val) are not part of it.
+        """
+        return (self._num_cache_clears,) + tuple(sorted(self._parameters.items()))
+
+    def clear_eval_cache(self):
+        """
+        Discard all cached evaluations. Only needed if inputs of the model were changed
+        through self.prob directly instead of through set_val.
+        """
+        self._eval_cache.clear()
+        self._inputs_version += 1
+        self._num_cache_clears += 1
+        self._inputs_changed()
+
     def compute(self):
-        # TODO: create cache -- t, x (optionally u) as hash
-        # I guess just set_val for every input and output?
-        # for compute_totals, force run_model. anywhere else that needs forced
-        # run_model?
-        return self.prob.run_model
+        self.prob.run_model()
+        if self._stale_key is not None:
+            self._model_key = self._stale_key
+            self._stale_key = None
+
+    def _get_vectorized_problem(self, num_nodes):
+        """
+        Return a problem containing a copy of the ODE with num_nodes nodes, with all
+        independent variables other than time and the states set to the values they
+        currently have in self.prob.
+        """
+        if num_nodes not in self._vectorized_probs:
+            if 'num_nodes' not in self.ode.options:
+                raise NotImplementedError(
+                    f'{type(self.ode).__name__} does not have a num_nodes option')
+            ode = type(self.ode)()
+            for name in self.ode.options:
+                if name in ode.options:
+                    ode.options[name] = self.ode.options[name]
+            ode.options['num_nodes'] = num_nodes
+            self._vectorized_probs[num_nodes] = self._setup_problem(ode)
+
+        vec_prob = self._vectorized_probs[num_nodes]
+        skip = self.state_names if self.time_independent else [self.t_name] + \
+            self.state_names
+        list_args = dict(is_indep_var=True, prom_name=True, val=True, units=True,
+                         out_stream=None)
+        values = {}
+        for abs_name, data in self.prob.model.list_inputs(**list_args):
+            prom_name = data['prom_name']
+            if prom_name in skip or prom_name in values:
+                continue
+            # inputs connected to an IndepVarComp are set through its outputs below
+            if self.prob.model.get_source(prom_name).startswith('_auto_ivc.'):
+                values[prom_name] = data
+        for abs_name, data in self.prob.model.list_outputs(**list_args):
+            if not abs_name.startswith('_auto_ivc.'):
+                values[data['prom_name']] = data
+
+        for name, data in values.items():
+            val = data['val']
+            shape = vec_prob.get_val(name, units=data['units']).shape
+            if shape != val.shape:
+                # node-wise variables are stored with a leading num_nodes axis
+                val = np.broadcast_to(val, shape)
+            vec_prob.set_val(name, val, units=data['units'])
+
+        return vec_prob
+
+    def compute_state_rate_partials(self, ts, xs, param_names=(), chunk_size=64):
+        """
+        Compute the derivatives of the state rates with respect to the states and
+        parameters at each point of a trajectory, evaluating up to chunk_size points in a
+        single vectorized copy of the ODE.
+
+        Since the nodes of the ODE are independent, each column of the per-point
+        Jacobians is found for all nodes at once with a single forward linear solve.
+
+        Parameters
+        ----------
+        ts : ndarray
+            Times of the points, shape (n,).
+        xs : ndarray
+            States at each point, shape (n, dim_state).
+        param_names : list of str
+            Parameters to differentiate with respect to.
+        chunk_size : int
+            Maximum number of nodes in the vectorized ODE. Shorter chunks are padded to
+            the next power of two so that only a few vectorized problems are ever built.
+
+        Returns
+        -------
+        df_dx : ndarray
+            d(state_rate)/d(state), shape (n, dim_state, dim_state).
+        df_dparam : ndarray
+            d(state_rate)/d(parameter), shape (n, dim_state, len(param_names)).
+        """
+        ts = np.asarray(ts, dtype=float)
+        xs = np.asarray(xs, dtype=float).reshape(ts.size, self.dim_state)
+        param_names = list(param_names)
+        rate_names = [state_data['rate'] for state_data in self.states.values()]
+        wrt_names = self.state_names + param_names
+
+        num_points = ts.size
+        df_dwrt = np.empty((num_points, self.dim_state, len(wrt_names)))
+
+        for start in range(0, num_points, chunk_size):
+            stop = min(start + chunk_size, num_points)
+            num_nodes = min(chunk_size, 1 << (stop - start - 1).bit_length())
+            # pad by repeating the last point
+            pad_idx = np.minimum(np.arange(start, start + num_nodes), stop - 1)
+
+            prob = self._get_vectorized_problem(num_nodes)
+            if not self.time_independent:
+                prob.set_val(self.t_name, ts[pad_idx])
+            for state_name, state_vals in zip(self.state_names, xs[pad_idx].T):
+                prob.set_val(state_name, state_vals,
+                             units=self.states[state_name]['units'])
+            prob.run_model()
+            prob.model.run_linearize()
+
+            sources = [prob.model.get_source(name) for name in wrt_names]
+            sizes = [prob.get_val(source).size for source in sources]
+            for wrt_idx, source in enumerate(sources):
+                seed = {src: np.zeros(size) for src, size in zip(sources, sizes)}
+                seed[source][:] = 1.
+                jvp = prob.compute_jacvec_product(rate_names, sources, 'fwd', seed)
+                for rate_idx, rate_name in enumerate(rate_names):
+                    df_dwrt[start:stop, rate_idx, wrt_idx] = \
+                        jvp[rate_name].ravel()[:stop - start]
+
+        return df_dwrt[..., :self.dim_state], df_dwrt[..., self.dim_state:]
 
     @property
     def compute_totals(self):
+        self._sync()
         return self.prob.compute_totals
 
     def state_equation_function(self, t, x, u=None):
-        self.time = t
-        self.state = x
-        self.control = u
-        self.compute()
-        return self.state_rate
+        entry = self._cached_evaluation(t, x, u)
+        if 'state_rate' not in entry:
+            self._sync()
+            entry['state_rate'] = self.state_rate
+        return entry['state_rate'].copy()
 
     def output_equation_function(self, t, x):
         if self.output_nan:
             return np.ones(self.dim_output) * np.nan
-        self.time = t
-        self.state = x
-        self.compute()
-        return self.output
+        entry = self._cached_evaluation(t, x)
+        if 'output' not in entry:
+            self._sync()
+            entry['output'] = self.output
+        return entry['output'].copy()
+
+    def integrate_segment(self, ts, x0):
+        """
+        Integrate the states from x0 at ts[0] without any events and return them at
+        ts, used to recompute the trajectory between the checkpoints of a
+        CheckpointedResult.
+        """
+        integrator_options = DEFAULT_INTEGRATOR_OPTIONS.copy()
+        integrator = integrate.ode(lambda t, x: self.state_equation_function(t, x))
+        integrator.set_integrator(integrator_options.pop('name'), **integrator_options)
+        integrator.set_initial_value(x0, ts[0])
+
+        xs = np.empty((len(ts), self.dim_state))
+        xs[0] = x0
+        for idx, t in enumerate(ts[1:], 1):
+            xs[idx] = integrator.integrate(t)
+        return xs
+
+    def checkpoint(self, sim_result, checkpoint_interval):
+        return CheckpointedResult(sim_result, checkpoint_interval)
 
     def prepare_to_integrate(self, t0, x0):
         self.output_nan = False
@@ -399,8 +696,10 @@ class SimuPyProblem(SimulationMixin):
         self.num_events = 0
 
     def event_equation_function(self, t, x):
-        self.output_equation_function(t, x)
-        self.compute()
+        # trigger values may depend on attributes that are not part of the cache key,
+        # so only the model evaluation is reused
+        self._cached_evaluation(t, x)
+        self._sync()
         event_values = [self.evaluate_trigger(trigger) for trigger in self.triggers]
         # print(event_values)
         return np.array(event_values)
@@ -418,11 +717,253 @@ class SimuPyProblem(SimulationMixin):
 
     @property
     def get_val(self):
+        self._sync()
         return self.prob.get_val
 
+    def set_val(self, name, val=None, units=None, indices=None):
+        self._set_equation_val(name, val, units=units, indices=indices)
+        self._parameters[name] = self.prob.get_val(name).tobytes()
+
+    def _set_equation_val(self, name, val=None, units=None, indices=None):
+        """
+        Set an input of the model without changing the parameter_version. Used for
+        values that the equations of the problem compute during an integration, like
+        alpha or the time of an event, which would otherwise make the problem look
+        changed after every integration.
+        """
+        try:
+            previous = np.copy(self.prob.get_val(name))
+        except KeyError:
+            previous = None
+        self.prob.set_val(name, val, units=units, indices=indices)
+        # compare the stored values, converting them back to units is not exact
+        if previous is not None and np.array_equal(previous, self.prob.get_val(name)):
+            return
+        # cached evaluations used the old value
+        self._inputs_version += 1
+        self._inputs_changed()
+
+    def set_attr(self, name, val):
+        # attributes can be used as trigger values, so they are part of the
+        # parameter_version
+        self._parameters['attr:' + name] = np.asarray(val).tobytes()
+        if np.array_equal(getattr(self, name, None), val):
+            return
+        setattr(self, name, np.copy(val))
+        self._inputs_version += 1
+
+
+class CheckpointedResult():
+    """
+    Sparse replacement for a simupy SimulationResult. All saved times are kept, but the
+    states, outputs and events only at every checkpoint_interval-th saved point and at
+    the last one, so t is longer than x, y and e. dense() re-integrates the states
+    between the checkpoints at the saved times.
+    """
+
+    def __init__(self, sim_result, checkpoint_interval):
+        num_points = sim_result.t.shape[0]
+        self.checkpoint_idx = np.unique(np.r_[
+            np.arange(0, num_points, checkpoint_interval), num_points - 1])
+        self.t = sim_result.t.copy()
+        self.x = sim_result.x[self.checkpoint_idx]
+        self.y = sim_result.y[self.checkpoint_idx]
+        self.e = sim_result.e[self.checkpoint_idx]
+
     @property
-    def set_val(self):
-        return self.prob.set_val
+    def nbytes(self):
+        return self.t.nbytes + self.x.nbytes + self.y.nbytes + self.e.nbytes
+
+    def dense(self, problem):
+        """
+        Return a result with the states at all saved times, re-integrated between the
+        checkpoints by problem. Outputs and events are only available at the
+        checkpoints (NaN elsewhere).
+        """
+        num_points = self.t.shape[0]
+        dense_result = CheckpointedResult.__new__(CheckpointedResult)
+        dense_result.checkpoint_idx = np.arange(num_points)
+        dense_result.t = self.t
+        dense_result.x = np.empty((num_points, self.x.shape[1]))
+        dense_result.y = np.full((num_points, self.y.shape[1]), np.nan)
+        dense_result.e = np.full((num_points, self.e.shape[1]), np.nan)
+
+        for k, (start, end) in enumerate(
+                zip(self.checkpoint_idx[:-1], self.checkpoint_idx[1:])):
+            if end - start > 1:
+                dense_result.x[start:end] = problem.integrate_segment(
+                    self.t[start:end], self.x[k])
+
+        dense_result.x[self.checkpoint_idx] = self.x
+        dense_result.y[self.checkpoint_idx] = self.y
+        dense_result.e[self.checkpoint_idx] = self.e
+        return dense_result
+
+
+class _ConstantInterpolant():
+    # stands in for a spline when a phase has too few points to interpolate
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self, t):
+        return self.value
+
+
+def _costate_sweep(output, costate, param_deriv, phases, adjoint_int_opts, verbosity):
+    """
+    Integrate the co-state of one trajectory output backwards through all phases.
+
+    This only uses the pre-computed adjoint data in phases (one dict per phase, last
+    phase first, see SGMTrajBase.compute_partials) so that the sweeps for different
+    outputs are independent and can be run in separate threads or processes.
+
+    Returns the co-state simulation results for each phase and a dict of the partials
+    of output, keyed by input name.
+    """
+    costate_reses = []
+    partials = {}
+    lamda_dot_plus = np.zeros_like(costate)
+
+    if verbosity.value >= 2:
+        print("\nstarting partial for %s" % output, costate)
+
+    dg_dt = 0.
+
+    for phase in phases:
+        df_dx = phase['df_dx']
+        df_dparam = phase['df_dparam']
+        dg_dx = phase['dg_dx']
+        f_minus = phase['f_minus']
+        f_plus = phase['f_plus']
+        state_update = phase['state_update']
+        dh_dx = phase['dh_dx']
+        dh_dparam = phase['dh_dparam']
+        t0, tf = phase['t0'], phase['tf']
+
+        # assumes only 1 of time, state, or output dependence
+        # assume no discontinuous state update, would need an API for that in
+        # compute as well --
+        # but assume some form of event has happened
+
+        # already checked that event_channel_names was well-defined in the
+        # pre-compute, so will just assign the co-state just once
+        for channel_name, event_trigger_name in phase['active_channels']:
+            state_disc = phase['x_final'] - state_update
+            state_disc[np.where(np.isinf(state_update))] = 0.
+
+            if channel_name != phase['t_name']:
+                lamda_dot = df_dx(phase['t_final']) @ costate
+                # lamda_dot_plus = lamda_dot
+                if verbosity is Verbosity.DEBUG:
+                    if np.any(state_disc):
+                        print("update is non-zero!", phase['name'], phase['state_names'],
+                              state_disc, costate, lamda_dot)
+                        print(
+                            "inner product becomes...",
+                            state_disc[None,
+                                       :] @ dh_dx @ lamda_dot_plus[:, None],
+                            state_disc[None,
+                                       :] @ dh_dx.T @ lamda_dot_plus[:, None]
+                        )
+                    print("dh_dx for", phase['name'], phase['state_names'], "\n",  dh_dx)
+                    print("costate", costate)
+                costate_update_terms = [
+                    dh_dx.T @ costate[:, None],
+                    # costate[:, None],
+                    # TODO: should this be f_plus? probably not
+                    (dg_dx.T @ (f_plus - f_minus)
+                     [None, :] @ costate[:, None]) / (dg_dx@f_minus),
+                    # don't believe in lamda_dot terms anymore
+                    # -(dg_dx.T @ state_disc[None, :] @ dh_dx.T @ lamda_dot_plus[:, None]) / (dg_dx@f_minus),
+
+                ]
+
+                # TODO: is this wrong?
+                costate[:] = np.sum(costate_update_terms, axis=0).squeeze()
+
+            if event_trigger_name is not None:
+                if verbosity.value >= 2:
+                    print("setting event trigger data", event_trigger_name)
+                partials[event_trigger_name] = (
+                    + costate[None, :] @ (f_minus - f_plus) /
+                    (dg_dt + dg_dx@f_minus)
+                    # +(lamda_dot_plus[None, :] @ dh_dx @ state_disc[None, :])/(dg_dt + dg_dx@f_minus)
+                )
+
+            # how to account for terminal event? through costate IC.
+            # TODO: Is this wrong?
+            param_deriv += (costate[None, :] @ dh_dparam).squeeze()
+
+        # build co-state systems
+
+        def co_state_rate(t, costate, *args):
+            return df_dx(t) @ costate
+
+        if verbosity.value >= 2:
+            print('dim_state:', phase['dim_state'], "ic:", costate)
+
+        costate_sys = DynamicalSystem(state_equation_function=co_state_rate,
+                                      dim_state=phase['dim_state'])
+        costate_sys.initial_condition = costate
+
+        # simulate co-state system
+        co_res = costate_sys.simulate(
+            (t0, tf), integrator_options=adjoint_int_opts)
+        costate_reses.append(co_res)
+
+        if df_dparam is not None:
+            df_dparam_val = df_dparam(co_res.t)
+            param_deriv_integrand_data = np.matmul(
+                co_res.x[:, None, :],
+                df_dparam_val
+            ).squeeze()
+            try:
+                param_deriv_integrand = interpolate.make_interp_spline(
+                    co_res.t,
+                    np.atleast_1d(param_deriv_integrand_data),
+                    # k=df_dparam.k
+                    k=min(3, co_res.t.shape[0]-1)
+                )
+            except ValueError as e:
+                print(
+                    "HIT VALUE ERROR!",
+                    output,
+                    phase['name'],
+                    co_res.t.shape,
+                    co_res.x.shape,
+                    df_dparam_val.shape,
+                    getattr(df_dparam, 'k', None),
+                    "final_results:\n\n",
+                    t0, tf,
+                    co_res.t,
+                    co_res.x,
+                )
+                raise e
+            param_deriv_integrand_antideriv = param_deriv_integrand.antiderivative()
+
+            # TODO: is the sign wrong here?
+            param_deriv -= (
+                param_deriv_integrand_antideriv(t0)
+                - param_deriv_integrand_antideriv(tf)
+            )
+
+        # consume initial condition
+        next_state_names = phase['next_state_names']
+        if next_state_names is None:
+            break
+        costate = np.zeros(len(next_state_names))
+        lamda_dot_plus = np.zeros_like(costate)
+        lamda_dot_plus_rate = co_state_rate(co_res.t[-1], co_res.x[-1])
+
+        # TODO: do co-states need unit changes? probably not...
+        for state_name in phase['state_names']:
+            costate[next_state_names.index(
+                state_name)] = co_res.x[-1, phase['state_names'].index(state_name)]
+            lamda_dot_plus[
+                next_state_names.index(state_name)
+            ] = lamda_dot_plus_rate[phase['state_names'].index(state_name)]
+
+    return costate_reses, param_deriv, partials
 
 
 class SGMTrajBase(om.ExplicitComponent):
@@ -431,8 +972,41 @@ class SGMTrajBase(om.ExplicitComponent):
         # TODO: param_dict
         self.options.declare("param_dict",
                              default=ParamPort.param_data)
+        self.options.declare(
+            "vectorized_jacobians", default=False, types=bool,
+            desc="If True, compute_partials evaluates the state rate Jacobians at all "
+                 "saved points of a phase with vectorized copies of its ODE instead of "
+                 "one point at a time")
+        self.options.declare(
+            "jacobian_chunk_size", default=64, types=int,
+            desc="Maximum number of nodes in the vectorized ODEs used when "
+                 "vectorized_jacobians is True")
+        self.options.declare(
+            "adjoint_executor", default=None, values=[None, 'thread', 'process'],
+            desc="If set, the co-state integrations for the different trajectory "
+                 "outputs in compute_partials are run in a pool of this kind")
+        self.options.declare(
+            "adjoint_max_workers", default=None, types=int, allow_none=True,
+            desc="Maximum number of workers used when adjoint_executor is set")
+        self.options.declare(
+            "checkpoint_interval", default=None, types=int, allow_none=True, lower=1,
+            desc="If set, the states, outputs and events of each phase are only kept "
+                 "at every checkpoint_interval-th saved point after the forward "
+                 "integration and compute_partials re-integrates the states between "
+                 "these checkpoints. Larger values keep less in memory between "
+                 "evaluations, but the re-integration makes compute_partials several "
+                 "times slower and raises its peak memory, so the full trajectories "
+                 "are kept by default")
+        self.options.declare(
+            "reuse_unchanged_phases", default=False, types=bool,
+            desc="If True, leading phases whose parameters (see "
+                 "SimuPyProblem.parameter_version) and initial conditions did not "
+                 "change since the previous compute reuse their previous results "
+                 "instead of being integrated again")
         self.verbosity = verbosity
         self.max_allowable_time = 1_000_000
+        self._previous_phases = []
+        self.num_reused_phases = 0
         self.adjoint_int_opts = DEFAULT_INTEGRATOR_OPTIONS.copy()
         self.adjoint_int_opts['nsteps'] = 5000
         self.adjoint_int_opts['name'] = "dop853"
@@ -603,11 +1177,43 @@ class SGMTrajBase(om.ExplicitComponent):
                         )
                     pass
 
+    def simulate_batch(self, initial_states, trajectory_values=None, **kwargs):
+        """
+        Integrate the phases of the trajectory for a batch of initial states, with the
+        state rates of all trajectories of a phase computed by a single vectorized copy
+        of its ODE (see batched_time_integration.simulate_batch).
+
+        Parameters other than trajectory_values are the values currently set in the
+        ODEs, e.g. by the last call to compute. Unlike compute_traj_loop, every
+        trajectory goes through all phases in order.
+
+        Parameters
+        ----------
+        initial_states : dict
+            Initial values of the states of the first phase, shape (num_trajectories,),
+            keyed by state name.
+        trajectory_values : dict
+            Values of node-wise model inputs that differ between the trajectories.
+        **kwargs
+            Passed on to batched_time_integration.simulate_batch.
+
+        Returns
+        -------
+        list of BatchedPhaseResult
+            The result of each phase.
+        """
+        from aviary.mission.gasp_based.ode.batched_time_integration import \
+            simulate_batch
+
+        return simulate_batch(self.ODEs, initial_states,
+                              trajectory_values=trajectory_values, **kwargs)
+
     def compute_traj_loop(self, first_problem, inputs, outputs, t0=0., state0=None):
         if self.verbosity.value >= 2:
             print("initializing compute_traj_loop")
         sim_results = []
         sim_problems = [first_problem]
+        checkpoint_interval = self.options["checkpoint_interval"]
         t = t0
         if state0 is not None:
             state = state0
@@ -619,16 +1225,49 @@ class SGMTrajBase(om.ExplicitComponent):
                 for state_name in first_problem.state_names
             ]).squeeze()
 
+        # phases of the previous call that can be reused, see reuse_unchanged_phases
+        if self.options["reuse_unchanged_phases"]:
+            previous_phases = self._previous_phases
+        else:
+            previous_phases = []
+        phase_records = []
+
         while True:
             current_problem = sim_problems[-1]
-            current_problem.initial_condition = state
+            phase_idx = len(sim_results)
+            phase_key = (
+                current_problem.parameter_version,
+                t,
+                np.asarray(state, dtype=float).tobytes(),
+            )
 
-            sim_result = current_problem.simulate(
-                (t, self.max_allowable_time),
+            reused = (
+                phase_idx < len(previous_phases)
+                and previous_phases[phase_idx][0] is current_problem
+                and previous_phases[phase_idx][1] == phase_key
             )
-            if sim_result.t.shape[0] == 2:
-                print("\n"*3, "IMMEDIATE PHASE TERMINATION", current_problem, "\n"*2)
+            if reused:
+                sim_result = previous_phases[phase_idx][2]
+                self.num_reused_phases += 1
+                if self.verbosity.value >= 2:
+                    print("reusing the previous result of", current_problem)
+            else:
+                # all later phases start from the result of this one
+                previous_phases = []
+                current_problem.initial_condition = state
+
+                sim_result = current_problem.simulate(
+                    (t, self.max_allowable_time),
+                )
+                if sim_result.t.shape[0] == 2:
+                    print("\n"*3, "IMMEDIATE PHASE TERMINATION", current_problem,
+                          "\n"*2)
+                if checkpoint_interval is not None:
+                    sim_result = current_problem.checkpoint(
+                        sim_result, checkpoint_interval)
+
             sim_results.append(sim_result)
+            phase_records.append((current_problem, phase_key, sim_result, state))
 
             t = sim_result.t[-1]
             x = sim_result.x[-1, :]
@@ -662,20 +1301,31 @@ class SGMTrajBase(om.ExplicitComponent):
                 if self.verbosity.value >= 2:
                     print(" was on problem:", current_problem,
                           "\n got back:", next_problem)
-            # compute the output at the final condition to make sure all outputs are current
-            current_problem.output_equation_function(t, x)
-            state = np.array(
-                [
-                    current_problem.prob.get_val(state_name, units=state_data['units'])
-                    for state_name, state_data in next_problem.states.items()
-                ]
-            ).squeeze()
+            if (
+                reused
+                and phase_idx + 1 < len(previous_phases)
+                and previous_phases[phase_idx + 1][0] is next_problem
+            ):
+                # the initial state of the next phase only depends on the reused
+                # result, so it is the same as in the previous call
+                state = previous_phases[phase_idx + 1][3]
+            else:
+                # compute the output at the final condition to make sure all outputs
+                # are current
+                current_problem.output_equation_function(t, x)
+                state = np.array(
+                    [
+                        current_problem.get_val(state_name, units=state_data['units'])
+                        for state_name, state_data in next_problem.states.items()
+                    ]
+                ).squeeze()
             sim_problems.append(next_problem)
 
         if self.verbosity.value >= 2:
             print("ended loop")
 
         # wrap main loop
+        self._previous_phases = phase_records
         self.sim_results = sim_results
         self.sim_problems = sim_problems
 
@@ -768,6 +1418,9 @@ class SGMTrajBase(om.ExplicitComponent):
             self.sim_results[::-1],
             self.sim_problems[::-1],
         ):
+            if isinstance(res, CheckpointedResult):
+                res = res.dense(prob)
+
             # build time-varying co-state matrix
             df_dx_data = np.empty(res.x.shape + (res.x.shape[-1],))
 
@@ -812,10 +1465,31 @@ class SGMTrajBase(om.ExplicitComponent):
                                  "time in the future?? but currently no time-based "
                                  "events are used")
 
+            vectorized = False
+            if self.options["vectorized_jacobians"]:
+                try:
+                    df_dx, df_dparam = prob.compute_state_rate_partials(
+                        res.t[::-1],
+                        res.x[::-1, :],
+                        list(param_dict.keys()),
+                        chunk_size=self.options["jacobian_chunk_size"],
+                    )
+                except NotImplementedError:
+                    pass
+                else:
+                    vectorized = True
+                    df_dx_data[...] = df_dx.transpose(0, 2, 1)
+                    if param_dict:
+                        df_dparam_data[...] = df_dparam
+
             for idx, (t, x) in enumerate(zip(res.t[::-1], res.x[::-1, :])):
+                jump = (idx == last_res_idx) and (prob is not self.sim_problems[0])
+                if vectorized and not jump:
+                    continue
+
                 state_rate = prob.state_equation_function(t, x)
 
-                if (idx == last_res_idx) and (prob is not self.sim_problems[0]):
+                if jump:
                     next_prob = self.sim_problems[self.sim_problems.index(prob)-1]
 
                     f_plus = np.zeros(next_prob.dim_state)
@@ -885,6 +1559,9 @@ class SGMTrajBase(om.ExplicitComponent):
                     dh_dxs.append(dh_dx)
                     dh_dparams.append(dh_dparam)
 
+                if vectorized:
+                    continue
+
                 state_rate_names = [val['rate'] for _, val in prob.states.items()]
                 df_dx_data[idx, :, :] = prob.compute_totals(state_rate_names,
                                                             prob.state_names,
@@ -901,9 +1578,7 @@ class SGMTrajBase(om.ExplicitComponent):
 
             # TODO: why is this failing?
             if skip_interp:
-                mean_df_dx = np.mean(df_dx_data, axis=0)
-
-                df_dxs.append(lambda t: mean_df_dx)
+                df_dxs.append(_ConstantInterpolant(np.mean(df_dx_data, axis=0)))
             else:
                 try:
                     df_dxs.append(interpolate.make_interp_spline(
@@ -920,8 +1595,8 @@ class SGMTrajBase(om.ExplicitComponent):
 
             if param_dict:
                 if skip_interp:
-                    mean_df_dparam = np.mean(df_dparam_data, axis=0)
-                    df_dparams.append(lambda t: mean_df_dparam)
+                    df_dparams.append(_ConstantInterpolant(
+                        np.mean(df_dparam_data, axis=0)))
                 else:
                     df_dparams.append(interpolate.make_interp_spline(
                         tf_total - res.t[::-1],
@@ -940,185 +1615,104 @@ class SGMTrajBase(om.ExplicitComponent):
             print("size check:", len(self.sim_problems), len(dg_dxs), len(f_minuses),
                   len(f_pluses), )
 
-        # main loop
-        for output, costate_ic, param_deriv in zip(self.all_traj_outputs, costate_ics,
-                                                   param_derivs):
-
-            output_name = self.all_traj_outputs[output]["name"]
-            next_prob = self.sim_problems[-1]
-            costate = costate_ic
-            lamda_dot_plus = np.zeros_like(costate)
-
-            # self.sim_results[-1].x[-1, next_prob.state_names.index(output)]
-            if self.verbosity.value >= 2:
-                print("\nstarting partial for %s" % output, costate)
-
-            dg_dt = 0.
-
-            for (
-                phase_idx,
-                res,
-                prob,
-                df_dx,
-                df_dparam,
-                dg_dx,
-                f_minus,
-                f_plus,
-                state_update,
-                dh_dx,
-                dh_dparam,
-            ) in zip(
-                range(len(self.sim_results), 0, -1),
-                self.sim_results[::-1],
-                self.sim_problems[::-1],
-                df_dxs,
-                df_dparams,
-                dg_dxs,
-                f_minuses,
-                f_pluses,
-                state_updates,
-                dh_dxs,
-                dh_dparams,
-            ):
-
-                t0, tf = tf_total - res.t[[-1, 0]]
-
-                # assumes only 1 of time, state, or output dependence
-                # assume no discontinuous state update, would need an API for that in
-                # compute as well --
-                # but assume some form of event has happened
-
-                # already checked that event_channel_names was well-defined in the
-                # pre-compute, so will just assign the co-state just once
-                for channel_idx, channel_name in enumerate(prob.event_channel_names):
-                    if np.argmin(np.abs(res.e[-1, :])) not in [channel_idx]:
-                        continue
-
-                    state_disc = res.x[-1] - state_update
-                    state_disc[np.where(np.isinf(state_update))] = 0.
-
-                    if channel_name != prob.t_name:
-                        lamda_dot = df_dx(res.t[-1]) @ costate
-                        # lamda_dot_plus = lamda_dot
-                        if self.verbosity is Verbosity.DEBUG:
-                            if np.any(state_disc):
-                                print("update is non-zero!", prob, prob.state_names,
-                                      state_disc, costate, lamda_dot)
-                                print(
-                                    "inner product becomes...",
-                                    state_disc[None,
-                                               :] @ dh_dx @ lamda_dot_plus[:, None],
-                                    state_disc[None,
-                                               :] @ dh_dx.T @ lamda_dot_plus[:, None]
-                                )
-                            print("dh_dx for", prob, prob.state_names, "\n",  dh_dx)
-                            print("costate", costate)
-                        costate_update_terms = [
-                            dh_dx.T @ costate[:, None],
-                            # costate[:, None],
-                            # TODO: should this be f_plus? probably not
-                            (dg_dx.T @ (f_plus - f_minus)
-                             [None, :] @ costate[:, None]) / (dg_dx@f_minus),
-                            # don't believe in lamda_dot terms anymore
-                            # -(dg_dx.T @ state_disc[None, :] @ dh_dx.T @ lamda_dot_plus[:, None]) / (dg_dx@f_minus),
-
-                        ]
-
-                        # TODO: is this wrong?
-                        costate[:] = np.sum(costate_update_terms, axis=0).squeeze()
-
-                    if (
-                        (event_key := (prob, channel_name, channel_idx))
-                        in self.traj_event_trigger_input
-                    ):
-                        event_trigger_name = self.traj_event_trigger_input[event_key]["name"]
-                        if self.verbosity.value >= 2:
-                            print("setting event trigger data", event_trigger_name)
-                        J[output_name, event_trigger_name] = (
-                            + costate[None, :] @ (f_minus - f_plus) /
-                            (dg_dt + dg_dx@f_minus)
-                            # +(lamda_dot_plus[None, :] @ dh_dx @ state_disc[None, :])/(dg_dt + dg_dx@f_minus)
-                        )
-
-                    # how to account for terminal event? through costate IC.
-                    # TODO: Is this wrong?
-                    param_deriv += (costate[None, :] @ dh_dparam).squeeze()
-
-                # build co-state systems
-
-                def co_state_rate(t, costate, *args):
-                    return df_dx(t) @ costate
-
-                if self.verbosity.value >= 2:
-                    print('dim_state:', prob.dim_state, "ic:", costate)
-
-                costate_sys = DynamicalSystem(state_equation_function=co_state_rate,
-                                              dim_state=prob.dim_state)
-                costate_sys.initial_condition = costate
-
-                # simulate co-state system
-                co_res = costate_sys.simulate(
-                    (t0, tf), integrator_options=self.adjoint_int_opts)
-                costate_reses[output].append(co_res)
-
-                if param_dict:
-                    df_dparam_val = df_dparam(co_res.t)
-                    param_deriv_integrand_data = np.matmul(
-                        co_res.x[:, None, :],
-                        df_dparam_val
-                    ).squeeze()
-                    try:
-                        param_deriv_integrand = interpolate.make_interp_spline(
-                            co_res.t,
-                            np.atleast_1d(param_deriv_integrand_data),
-                            # k=df_dparam.k
-                            k=min(3, co_res.t.shape[0]-1)
-                        )
-                    except ValueError as e:
-                        print(
-                            "HIT VALUE ERROR!",
-                            output,
-                            prob,
-                            co_res.t.shape,
-                            co_res.x.shape,
-                            df_dparam_val.shape,
-                            df_dparam.k,
-                            "final_results:\n\n",
-                            t0, tf,
-                            co_res.t,
-                            co_res.x,
-                        )
-                        raise e
-                    param_deriv_integrand_antideriv = param_deriv_integrand.antiderivative()
+        # collect the adjoint data of each phase, last phase first
+        adjoint_phases = []
+        for (
+            res,
+            prob,
+            df_dx,
+            df_dparam,
+            dg_dx,
+            f_minus,
+            f_plus,
+            state_update,
+            dh_dx,
+            dh_dparam,
+        ) in zip(
+            self.sim_results[::-1],
+            self.sim_problems[::-1],
+            df_dxs,
+            df_dparams,
+            dg_dxs,
+            f_minuses,
+            f_pluses,
+            state_updates,
+            dh_dxs,
+            dh_dparams,
+        ):
+            active_channels = []
+            for channel_idx, channel_name in enumerate(prob.event_channel_names):
+                if np.argmin(np.abs(res.e[-1, :])) not in [channel_idx]:
+                    continue
 
-                    # TODO: is the sign wrong here?
-                    param_deriv -= (
-                        param_deriv_integrand_antideriv(t0)
-                        - param_deriv_integrand_antideriv(tf)
-                    )
+                event_trigger_name = None
+                if (
+                    (event_key := (prob, channel_name, channel_idx))
+                    in self.traj_event_trigger_input
+                ):
+                    event_trigger_name = self.traj_event_trigger_input[event_key]["name"]
+                active_channels.append((channel_name, event_trigger_name))
+
+            if prob is not self.sim_problems[0]:
+                next_prob = self.sim_problems[self.sim_problems.index(prob)-1]
+                next_state_names = next_prob.state_names
+            else:
+                next_state_names = None
+
+            adjoint_phases.append(dict(
+                name=str(prob),
+                t0=tf_total - res.t[-1],
+                tf=tf_total - res.t[0],
+                t_final=res.t[-1],
+                x_final=res.x[-1],
+                t_name=prob.t_name,
+                state_names=prob.state_names,
+                dim_state=prob.dim_state,
+                next_state_names=next_state_names,
+                active_channels=active_channels,
+                df_dx=df_dx,
+                df_dparam=df_dparam,
+                dg_dx=dg_dx,
+                f_minus=f_minus,
+                f_plus=f_plus,
+                state_update=state_update,
+                dh_dx=dh_dx,
+                dh_dparam=dh_dparam,
+            ))
 
-                # consume initial condition
-                if prob is not self.sim_problems[0]:
-                    next_prob = self.sim_problems[self.sim_problems.index(prob)-1]
-                else:
-                    break
-                costate = np.zeros(next_prob.dim_state)
-                lamda_dot_plus = np.zeros_like(costate)
-                lamda_dot_plus_rate = co_state_rate(co_res.t[-1], co_res.x[-1])
-
-                # TODO: do co-states need unit changes? probably not...
-                for state_name in prob.state_names:
-                    costate[next_prob.state_names.index(
-                        state_name)] = co_res.x[-1, prob.state_names.index(state_name)]
-                    lamda_dot_plus[
-                        next_prob.state_names.index(state_name)
-                    ] = lamda_dot_plus_rate[prob.state_names.index(state_name)]
+        # main loop
+        # the co-state of each output is integrated independently
+        sweep_args = [
+            (output, costate_ic, param_deriv, adjoint_phases, self.adjoint_int_opts,
+             self.verbosity)
+            for output, costate_ic, param_deriv in zip(
+                self.all_traj_outputs, costate_ics, param_derivs)
+        ]
+        adjoint_executor = self.options["adjoint_executor"]
+        if adjoint_executor is None or len(sweep_args) < 2:
+            sweeps = [_costate_sweep(*args) for args in sweep_args]
+        else:
+            if adjoint_executor == 'thread':
+                executor = ThreadPoolExecutor
+            else:
+                executor = ProcessPoolExecutor
+            with executor(max_workers=self.options["adjoint_max_workers"]) as pool:
+                # map returns the results in the same order as the outputs
+                sweeps = list(pool.map(_costate_sweep, *zip(*sweep_args)))
+
+        first_prob = self.sim_problems[0]
+        for output, (output_costate_reses, param_deriv, partials) in zip(
+                self.all_traj_outputs, sweeps):
+            output_name = self.all_traj_outputs[output]["name"]
+            costate_reses[output] = output_costate_reses
 
+            for input_name, partial in partials.items():
+                J[output_name, input_name] = partial
             for state_to_deriv, metadata in self.traj_initial_state_input.items():
                 param_name = metadata["name"]
-                J[output_name, param_name] = costate_reses[output][-1].x[
+                J[output_name, param_name] = output_costate_reses[-1].x[
                     -1,
-                    prob.state_names.index(state_to_deriv)
+                    first_prob.state_names.index(state_to_deriv)
                 ]
             for param_deriv_val, param_deriv_name in zip(param_deriv, param_dict):
                 J[output_name, param_deriv_name] = param_deriv_val
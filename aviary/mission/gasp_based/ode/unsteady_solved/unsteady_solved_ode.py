@@ -1,6 +1,5 @@
 import numpy as np
 import openmdao.api as om
-from dymos.models.atmosphere.atmos_1976 import USatm1976Comp
 
 from aviary.constants import RHO_SEA_LEVEL_ENGLISH as rho_sl
 from aviary.mission.gasp_based.ode.base_ode import BaseODE
@@ -89,7 +88,7 @@ class UnsteadySolvedODE(BaseODE):
 
         self.add_subsystem(
             "USatm",
-            USatm1976Comp(
+            self.build_atmosphere(
                 num_nodes=nn, output_dsos_dh=True),
             promotes_inputs=[
                 ("h",
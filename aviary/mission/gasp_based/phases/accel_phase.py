@@ -73,6 +73,12 @@ class AccelPhase(PhaseBuilderBase):
 
         return phase
 
+    def _extra_ode_init_kwargs(self):
+        """
+        Return extra kwargs required for initializing the ODE.
+        """
+        return self._atmosphere_ode_init_kwargs()
+
 
 # Adding metadata for the AccelPhase
 AccelPhase._add_meta_data(
@@ -105,6 +111,7 @@ AccelPhase._add_meta_data('distance_defect_ref', val=None, units='NM')
 AccelPhase._add_meta_data('alt', val=500, units='ft')
 AccelPhase._add_meta_data('num_segments', val=None, units='unitless')
 AccelPhase._add_meta_data('order', val=None, units='unitless')
+AccelPhase._add_atmosphere_meta_data()
 
 AccelPhase._add_initial_guess_meta_data(
     InitialGuessIntegrationVariable(),
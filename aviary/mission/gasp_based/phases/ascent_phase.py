@@ -80,6 +80,12 @@ class AscentPhase(PhaseBuilderBase):
 
         return phase
 
+    def _extra_ode_init_kwargs(self):
+        """
+        Return extra kwargs required for initializing the ODE.
+        """
+        return self._atmosphere_ode_init_kwargs()
+
 
 # Adding metadata for the AscentPhase
 AscentPhase._add_meta_data(
@@ -127,6 +133,7 @@ AscentPhase._add_meta_data('alpha_constraint_upper', val=np.deg2rad(30), units='
 AscentPhase._add_meta_data('alpha_constraint_ref', val=np.deg2rad(5), units='rad')
 AscentPhase._add_meta_data('num_segments', val=None, units='unitless')
 AscentPhase._add_meta_data('order', val=None, units='unitless')
+AscentPhase._add_atmosphere_meta_data()
 
 # Adding initial guess metadata
 AscentPhase._add_initial_guess_meta_data(
@@ -112,6 +112,8 @@ class ClimbPhase(PhaseBuilderBase):
         return {
             'EAS_target': self.user_options.get_val('EAS_target', units='kn'),
             'mach_cruise': self.user_options.get_val('mach_cruise'),
+            'balance_solver': self.user_options.get_val('balance_solver'),
+            **self._atmosphere_ode_init_kwargs(),
         }
 
 
@@ -149,6 +151,8 @@ ClimbPhase._add_meta_data('distance_ref0', val=0, units='NM')
 ClimbPhase._add_meta_data('distance_defect_ref', val=None, units='NM')
 ClimbPhase._add_meta_data('num_segments', val=None, units='unitless')
 ClimbPhase._add_meta_data('order', val=None, units='unitless')
+ClimbPhase._add_atmosphere_meta_data()
+ClimbPhase._add_balance_solver_meta_data()
 
 ClimbPhase._add_initial_guess_meta_data(
     InitialGuessIntegrationVariable(),
@@ -76,6 +76,15 @@ class CruisePhase(PhaseBuilderBase):
 
         return phase
 
+    def _extra_ode_init_kwargs(self):
+        """
+        Return extra kwargs required for initializing the ODE.
+        """
+        return {
+            'balance_solver': self.user_options.get_val('balance_solver'),
+            **self._atmosphere_ode_init_kwargs(),
+        }
+
 
 # Adding metadata for the CruisePhase
 CruisePhase._add_meta_data('alt_cruise', val=0)
@@ -92,6 +101,8 @@ CruisePhase._add_meta_data('duration_bounds', val=(
     0., 3600.), units='s', desc='duration bounds')
 CruisePhase._add_meta_data('fix_duration', val=False)
 CruisePhase._add_meta_data('initial_bounds', val=(0., 100.), units='s')
+CruisePhase._add_atmosphere_meta_data()
+CruisePhase._add_balance_solver_meta_data()
 
 CruisePhase._add_initial_guess_meta_data(
     InitialGuessIntegrationVariable(),
@@ -60,6 +60,8 @@ class DescentPhase(PhaseBuilderBase):
             'input_speed_type': self.user_options.get_val('input_speed_type'),
             'mach_cruise': self.user_options.get_val('mach_cruise'),
             'EAS_limit': self.user_options.get_val('EAS_limit', 'kn'),
+            'balance_solver': self.user_options.get_val('balance_solver'),
+            **self._atmosphere_ode_init_kwargs(),
         }
 
 
@@ -98,6 +100,8 @@ DescentPhase._add_meta_data('distance_ref0', val=0, units='NM')
 DescentPhase._add_meta_data('distance_defect_ref', val=None, units='NM')
 DescentPhase._add_meta_data('num_segments', val=None, units='unitless')
 DescentPhase._add_meta_data('order', val=None, units='unitless')
+DescentPhase._add_atmosphere_meta_data()
+DescentPhase._add_balance_solver_meta_data()
 
 # Adding initial guess metadata
 DescentPhase._add_initial_guess_meta_data(
@@ -85,6 +85,12 @@ class GroundrollPhase(PhaseBuilderBase):
 
         return phase
 
+    def _extra_ode_init_kwargs(self):
+        """
+        Return extra kwargs required for initializing the ODE.
+        """
+        return self._atmosphere_ode_init_kwargs()
+
 
 # Adding metadata for the GroundrollPhase
 GroundrollPhase._add_meta_data(
@@ -113,6 +119,7 @@ GroundrollPhase._add_meta_data('t_init_gear', val=100, units='s')
 GroundrollPhase._add_meta_data('t_init_flaps', val=100, units='s')
 GroundrollPhase._add_meta_data('num_segments', val=None, units='unitless')
 GroundrollPhase._add_meta_data('order', val=None, units='unitless')
+GroundrollPhase._add_atmosphere_meta_data()
 
 # Adding initial guess metadata
 GroundrollPhase._add_initial_guess_meta_data(
@@ -92,6 +92,12 @@ class RotationPhase(PhaseBuilderBase):
 
         return phase
 
+    def _extra_ode_init_kwargs(self):
+        """
+        Return extra kwargs required for initializing the ODE.
+        """
+        return self._atmosphere_ode_init_kwargs()
+
 
 # Adding metadata for the RotationPhase
 RotationPhase._add_meta_data(
@@ -131,6 +137,7 @@ RotationPhase._add_meta_data('t_init_gear', val=100, units='s')
 RotationPhase._add_meta_data('t_init_flaps', val=100, units='s')
 RotationPhase._add_meta_data('num_segments', val=None, units='unitless')
 RotationPhase._add_meta_data('order', val=None, units='unitless')
+RotationPhase._add_atmosphere_meta_data()
 
 # Adding initial guess metadata
 RotationPhase._add_initial_guess_meta_data(
@@ -157,7 +157,7 @@ class SGMAscent(SimuPyProblem):
 
     def event_equation_function(self, t, x):
         alpha = self.get_alpha(t, x)
-        self.ode0.set_val("alpha", alpha)
+        self.ode0._set_equation_val("alpha", alpha)
         self.ode0.output_equation_function(t, x)
         alt = self.ode0.get_val(Dynamic.Mission.ALTITUDE).squeeze()
         return np.array(
@@ -175,11 +175,11 @@ class SGMAscent(SimuPyProblem):
         elif 1 in event_channels:
             if self.verbosity.value >= 2:
                 print("flaps!", t)
-            self.set_val("t_init_flaps", t)
+            self._set_equation_val("t_init_flaps", t)
         elif 2 in event_channels:
             if self.verbosity.value >= 2:
                 print("gear!", t)
-            self.set_val("t_init_gear", t)
+            self._set_equation_val("t_init_gear", t)
         else:
             return np.nan * np.ones(self.dim_state)
         return x
@@ -252,6 +252,10 @@ class SGMAscentCombined(SGMAscent):
         for ode in self.odes:
             ode.set_val(*args, **kwargs)
 
+    def _set_equation_val(self, *args, **kwargs):
+        for ode in self.odes:
+            ode._set_equation_val(*args, **kwargs)
+
     def compute_alpha(self, ode, t, x):
         return ode.output_equation_function(t, x)[list(ode.outputs.keys()).index("alpha")]
 
@@ -331,13 +335,30 @@ class SGMAscentCombined(SGMAscent):
             return np.ones(self.dim_output) * np.nan
         alpha = self.get_alpha(t, x)
         prob = self.get_prob(t, x)
-        prob.set_val("alpha", alpha)
+        prob._set_equation_val("alpha", alpha)
         return prob.state_equation_function(t, x)
 
     @property
     def compute_totals(self):
         return self.get_prob(self.time, self.state).compute_totals
 
+    def compute_state_rate_partials(self, ts, xs, param_names=(), chunk_size=64):
+        # the ODE that provides the state rates depends on which constraint limits
+        # alpha at each point, so there is no single ODE to vectorize
+        raise NotImplementedError(
+            'SGMAscentCombined does not support vectorized Jacobians')
+
+    @property
+    def parameter_version(self):
+        # set_val is forwarded to the ODEs of each alpha mode
+        return (super().parameter_version,) + tuple(
+            ode.parameter_version for ode in self.odes)
+
+    def checkpoint(self, sim_result, checkpoint_interval):
+        # the ODE that is active at a point depends on the integration history, so the
+        # trajectory can not be re-integrated from a checkpoint
+        return sim_result
+
     def output_equation_function(self, t, x):
         if np.any(np.isnan(x)) or self.output_nan:
             return np.ones(self.dim_output) * np.nan
@@ -349,7 +370,7 @@ class SGMAscentCombined(SGMAscent):
         # using solver may introduce slight variations depending on how it's walking or
         # not? and need to have a real compute before compute totals - or does that mean
         # use problem?
-        prob.set_val("alpha", alpha)
+        prob._set_equation_val("alpha", alpha)
         self.time = t
         self.state = x
         return prob.output_equation_function(t, x)
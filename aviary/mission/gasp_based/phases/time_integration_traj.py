@@ -61,7 +61,7 @@ class FlexibleTraj(TimeIntegrationTrajBase):
             if vals_to_set:
                 for name, data in vals_to_set.items():
                     if name.startswith('attr:'):
-                        setattr(phase, name.replace('attr:', ''), inputs[data['val']])
+                        phase.set_attr(name.replace('attr:', ''), inputs[data['val']])
                     elif name.startswith('rotation.'):
                         phase.rotation.set_val(name.replace(
                             'rotation.', ''), data['val'], units=data['units'])
@@ -90,7 +90,7 @@ class FlexibleTraj(TimeIntegrationTrajBase):
 
             if next_problem is not None:
                 if type(current_problem) is SGMGroundroll:
-                    next_problem.prob.set_val("start_rotation", t_start_rotation)
+                    next_problem.set_val("start_rotation", t_start_rotation)
                 elif type(current_problem) is SGMRotation:
                     next_problem.rotation.set_val("start_rotation", t_start_rotation)
 
@@ -0,0 +1,267 @@
+from functools import lru_cache
+
+import numpy as np
+import openmdao.api as om
+from dymos.models.atmosphere.atmos_1976 import USatm1976Comp, USatm1976Data
+
+# width of the uniform altitude bins used by the dense table (ft)
+_BIN_WIDTH = 1000.0
+
+# ratio of specific heats times the gas constant, matching USatm1976Comp
+_K = 1.4 * 1716.49
+
+# Sutherland's constant for air (degR)
+_SUTHERLAND = 198.72
+
+# order of the variables stacked in the dense table
+_T, _P, _RHO, _VISC, _DRHO, _DT = range(6)
+
+
+@lru_cache(maxsize=None)
+def _get_atmosphere_table():
+    """
+    Build the dense coefficient table shared by every TabularAtmosphereComp.
+
+    The 1976 standard atmosphere Akima splines provided by dymos have 1000 ft knots up
+    to 170,000 ft and 10,000 ft knots above that. Re-expanding every spline segment
+    onto uniform 1000 ft bins lets the bin be found arithmetically instead of with a
+    search, and stacking all of the interpolated quantities means a single gather
+    provides every coefficient needed at a node.
+
+    Returns
+    -------
+    h_left : ndarray
+        Left edge of each bin (ft). The first and last bins hold the linear
+        extrapolation segments used below and above the tabulated altitudes.
+    coeffs : ndarray
+        Cubic coefficients for each bin, shape (4, 6, num_bins).
+    """
+    alt = USatm1976Data.alt
+    akima = np.stack([
+        USatm1976Data.akima_T, USatm1976Data.akima_P, USatm1976Data.akima_rho,
+        USatm1976Data.akima_viscosity, USatm1976Data.akima_drho, USatm1976Data.akima_dT,
+    ], axis=1)
+
+    num_interior = int(round((alt[-1] - alt[0]) / _BIN_WIDTH))
+    interior_left = alt[0] + _BIN_WIDTH * np.arange(num_interior)
+
+    # akima[i] is the segment starting at alt[i - 1]; akima[0] and akima[-1] are the
+    # extrapolation segments
+    segment = np.searchsorted(alt, interior_left, side='right')
+    d = (interior_left - alt[segment - 1])[:, np.newaxis]
+    c = akima[segment]
+
+    # re-expand each cubic about the left edge of its new bin
+    interior = np.empty_like(c)
+    interior[..., 0] = c[..., 0] + d * (c[..., 1] + d * (c[..., 2] + d * c[..., 3]))
+    interior[..., 1] = c[..., 1] + d * (2.0 * c[..., 2] + 3.0 * d * c[..., 3])
+    interior[..., 2] = c[..., 2] + 3.0 * d * c[..., 3]
+    interior[..., 3] = c[..., 3]
+
+    h_left = np.hstack((alt[0], interior_left, alt[-1]))
+    coeffs = np.concatenate((akima[:1], interior, akima[-1:]))
+
+    # store as (4, 6, num_bins) so that gathering bins gives contiguous rows
+    coeffs = np.ascontiguousarray(coeffs.transpose(2, 1, 0))
+
+    h_left.flags.writeable = False
+    coeffs.flags.writeable = False
+
+    return h_left, coeffs
+
+
+class TabularAtmosphereComp(om.ExplicitComponent):
+    """
+    1976 standard atmosphere evaluated from a precomputed dense spline table.
+
+    This is a drop-in replacement for dymos' USatm1976Comp, with the same inputs,
+    outputs, and units. The interpolation table is built once and shared by every
+    instance. A constant temperature offset from the standard day may be applied
+    through the ``delta_T`` option; pressure is unchanged by the offset, and density,
+    speed of sound, and viscosity (using Sutherland's law) follow the offset
+    temperature.
+    """
+
+    def initialize(self):
+        self.options.declare(
+            'num_nodes', types=int,
+            desc='Number of nodes to be evaluated in the RHS')
+        self.options.declare(
+            'h_def', values=('geopotential', 'geodetic'), default='geopotential',
+            desc='The definition of altitude provided as input to the component. If '
+            '"geodetic", it will be converted to geopotential based on Equation 19 in '
+            'the original standard.')
+        self.options.declare(
+            'output_dsos_dh', types=bool, default=False,
+            desc='If true, the derivative of the speed of sound will be added as an '
+            'output')
+        self.options.declare(
+            'delta_T', types=(int, float), default=0.0,
+            desc='temperature offset from the standard day in degR; positive values '
+            'give a hot day and negative values give a cold day')
+
+    def setup(self):
+        nn = self.options['num_nodes']
+
+        self._geodetic = self.options['h_def'] == 'geodetic'
+        self._R0 = 6_356_766 / 0.3048  # Value of R0 from the original standard (m -> ft)
+
+        self.add_input('h', val=np.ones(nn), units='ft')
+
+        self.add_output('temp', val=np.ones(nn), units='degR')
+        self.add_output('pres', val=np.ones(nn), units='psi')
+        self.add_output('rho', val=np.ones(nn), units='slug/ft**3')
+        self.add_output('viscosity', val=np.ones(nn), units='lbf*s/ft**2')
+        self.add_output('drhos_dh', val=np.ones(nn), units='slug/ft**4')
+        self.add_output('sos', val=np.ones(nn), units='ft/s')
+
+        if self.options['output_dsos_dh']:
+            self.add_output('dsos_dh', val=np.ones(nn), units='1/s')
+
+    def setup_partials(self):
+        arange = np.arange(self.options['num_nodes'])
+
+        of = ['temp', 'pres', 'rho', 'viscosity', 'drhos_dh', 'sos']
+
+        if self.options['output_dsos_dh']:
+            of.append('dsos_dh')
+
+        self.declare_partials(of, 'h', rows=arange, cols=arange)
+
+    def _lookup(self, z, num_vars):
+        """
+        Return the cubic coefficients of the first ``num_vars`` tabulated quantities at
+        the given geopotential altitudes, with shape (4, num_vars, num_nodes), and the
+        offset of each altitude from the left edge of its bin.
+        """
+        h_left, coeffs = _get_atmosphere_table()
+
+        idx = np.floor((z.real - h_left[1]) * (1.0 / _BIN_WIDTH)).astype(int) + 1
+        np.clip(idx, 0, len(h_left) - 1, out=idx)
+
+        return coeffs[:, :num_vars].take(idx, axis=2), z - h_left[idx]
+
+    def _geopotential(self, h):
+        """
+        Return geopotential altitude and its derivative with respect to the input.
+        """
+        if self._geodetic:
+            R0 = self._R0
+            return h / (R0 + h) * R0, (R0 / (R0 + h)) ** 2
+
+        return h, 1.0
+
+    def compute(self, inputs, outputs):
+        delta_T = self.options['delta_T']
+        output_dsos_dh = self.options['output_dsos_dh']
+        z, _ = self._geopotential(inputs['h'])
+
+        c, dx = self._lookup(z, 6 if output_dsos_dh else 4)
+        val = c[0] + dx * (c[1] + dx * (c[2] + dx * c[3]))
+        deriv = c[1, :_VISC] + dx * (2.0 * c[2, :_VISC] + 3.0 * dx * c[3, :_VISC])
+
+        T = val[_T]
+        rho = val[_RHO]
+        drho_dh = deriv[_RHO]
+        visc = val[_VISC]
+
+        if delta_T:
+            T_std = T
+            T = T_std + delta_T
+            ratio = T_std / T
+
+            drho_dh = drho_dh * ratio + rho * deriv[_T] * delta_T / T**2
+            rho = rho * ratio
+            visc = visc * (T / T_std)**1.5 * (T_std + _SUTHERLAND) / (T + _SUTHERLAND)
+
+        outputs['temp'] = T
+        outputs['pres'] = val[_P]
+        outputs['rho'] = rho
+        outputs['viscosity'] = visc
+        outputs['drhos_dh'] = drho_dh
+        outputs['sos'] = np.sqrt(_K * T)
+
+        if output_dsos_dh:
+            outputs['dsos_dh'] = 0.5 * np.sqrt(_K / T) * val[_DT]
+
+    def compute_partials(self, inputs, partials):
+        delta_T = self.options['delta_T']
+        output_dsos_dh = self.options['output_dsos_dh']
+        z, dz_dh = self._geopotential(inputs['h'])
+
+        c, dx = self._lookup(z, 6 if output_dsos_dh else 5)
+        deriv = c[1] + dx * (2.0 * c[2] + 3.0 * dx * c[3])
+        T = c[0, _T] + dx * (c[1, _T] + dx * (c[2, _T] + dx * c[3, _T]))
+
+        dT_dh = deriv[_T]
+        drho_dh = deriv[_RHO]
+        d2rho_dh2 = deriv[_DRHO]
+        dvisc_dh = deriv[_VISC]
+
+        if delta_T:
+            rho = c[0, _RHO] + dx * (c[1, _RHO] + dx * (c[2, _RHO] + dx * c[3, _RHO]))
+            visc = c[0, _VISC] + dx * (c[1, _VISC]
+                                       + dx * (c[2, _VISC] + dx * c[3, _VISC]))
+            d2T_dh2 = 2.0 * c[2, _T] + 6.0 * dx * c[3, _T]
+
+            T_std = T
+            T = T_std + delta_T
+            ratio = T_std / T
+            dratio_dh = dT_dh * delta_T / T**2
+
+            d2rho_dh2 = (
+                d2rho_dh2 * ratio + 2.0 * drho_dh * dratio_dh
+                + rho * delta_T * (d2T_dh2 / T**2 - 2.0 * dT_dh**2 / T**3))
+            drho_dh = drho_dh * ratio + rho * dratio_dh
+
+            factor = (T / T_std)**1.5 * (T_std + _SUTHERLAND) / (T + _SUTHERLAND)
+            dlnfactor_dh = dT_dh * (
+                1.5 / T - 1.5 / T_std
+                + 1.0 / (T_std + _SUTHERLAND) - 1.0 / (T + _SUTHERLAND))
+            dvisc_dh = (dvisc_dh + visc * dlnfactor_dh) * factor
+
+        partials['temp', 'h'] = dT_dh * dz_dh
+        partials['pres', 'h'] = deriv[_P] * dz_dh
+        partials['rho', 'h'] = drho_dh * dz_dh
+        partials['viscosity', 'h'] = dvisc_dh * dz_dh
+        partials['drhos_dh', 'h'] = d2rho_dh2 * dz_dh**2
+        partials['sos', 'h'] = 0.5 * np.sqrt(_K / T) * dT_dh * dz_dh
+
+        if output_dsos_dh:
+            partials['dsos_dh', 'h'] = \
+                0.5 * np.sqrt(_K / T) * (deriv[_DT] - 0.5 * dT_dh**2 / T) * dz_dh**2
+
+
+def build_atmosphere(num_nodes, atmosphere_model='USatm1976', delta_T=0.0, **kwargs):
+    """
+    Return the atmosphere component requested by an ODE.
+
+    Parameters
+    ----------
+    num_nodes : int
+        Number of nodes to be evaluated.
+    atmosphere_model : str
+        'USatm1976' for dymos' USatm1976Comp, or 'tabular' for TabularAtmosphereComp.
+    delta_T : float
+        Temperature offset from the standard day in degR. Only supported by the
+        tabular model.
+    **kwargs
+        Additional options passed to the component.
+
+    Returns
+    -------
+    openmdao.api.ExplicitComponent
+    """
+    if atmosphere_model == 'tabular':
+        return TabularAtmosphereComp(num_nodes=num_nodes, delta_T=delta_T, **kwargs)
+
+    if atmosphere_model != 'USatm1976':
+        raise ValueError(
+            f'unsupported atmosphere_model: "{atmosphere_model}"; '
+            'use "USatm1976" or "tabular"')
+
+    if delta_T:
+        raise ValueError(
+            'a temperature offset (delta_T) requires atmosphere_model="tabular"')
+
+    return USatm1976Comp(num_nodes=num_nodes, **kwargs)
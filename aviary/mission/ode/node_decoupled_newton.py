@@ -0,0 +1,395 @@
+import numpy as np
+import openmdao.api as om
+from openmdao.solvers.linesearch.backtracking import LinesearchSolver
+from openmdao.solvers.solver import LinearSolver
+
+
+def _get_node_index(system, num_nodes):
+    """
+    Return the node of every entry in the output vector of a system.
+
+    Entries of outputs whose first dimension is num_nodes belong to the node given by
+    their first index. All other entries, such as the scalar geometry outputs computed
+    in the aero setup, are assigned to the extra node num_nodes.
+    """
+    _, outputs, _ = system.get_nonlinear_vectors()
+    node_index = []
+
+    for name in outputs.keys():
+        val = outputs[name]
+        shape = np.shape(val)
+
+        if shape and shape[0] == num_nodes:
+            node_index.append(np.repeat(np.arange(num_nodes), val.size // num_nodes))
+        else:
+            node_index.append(np.full(np.size(val), num_nodes))
+
+    return np.concatenate(node_index) if node_index else np.zeros(0, dtype=int)
+
+
+def _check_unscaled(solver, system):
+    """
+    Raise an error if any output of the system is scaled.
+
+    The solvers work on the vectors as they are, and the public run_* methods of
+    System that they call assume that the vectors are not scaled.
+    """
+    meta = system.get_io_metadata(
+        iotypes='output', metadata_keys=['ref', 'ref0', 'res_ref'])
+
+    for name, var_meta in meta.items():
+        # residuals are scaled by ref when res_ref is not given
+        res_ref = var_meta['res_ref']
+        if res_ref is None:
+            res_ref = var_meta['ref']
+
+        if np.any(var_meta['ref'] != 1.0) or np.any(var_meta['ref0'] != 0.0) or \
+                np.any(res_ref != 1.0):
+            raise ValueError(
+                f'{solver.msginfo}: output {name} is scaled, which is not supported.')
+
+
+class NodeBlockSolver(LinearSolver):
+    """
+    Linear solver for groups whose Jacobian is block diagonal over the nodes.
+
+    Each node has one small dense block, which is found from one Jacobian-vector
+    product per column of the block, seeded at every node at once. The blocks are then
+    inverted together with a single batched call, instead of factorizing one sparse
+    matrix over all of the nodes. Outputs that are not vectorized over the nodes may
+    feed the nodes, but may not depend on them.
+    """
+
+    SOLVER = 'LN: NodeBlock'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self._node_rows = None
+        self._global_rows = None
+        self._inv_blocks = None
+        self._inv_global = None
+        self._global_coupling = None
+
+    def _declare_options(self):
+        super()._declare_options()
+
+        self.options.declare(
+            'num_nodes', types=int, default=1,
+            desc='number of nodes that the outputs of the group are vectorized over')
+
+        self.supports['assembled_jac'] = False
+
+    def _setup_solvers(self, system, depth):
+        super()._setup_solvers(system, depth)
+
+        _check_unscaled(self, system)
+
+        num_nodes = self.options['num_nodes']
+        node_index = _get_node_index(system, num_nodes)
+
+        # entries sorted by node, with the entries that are not vectorized last
+        order = np.argsort(node_index, kind='stable')
+        num_node_entries = np.count_nonzero(node_index < num_nodes)
+        self._node_rows = order[:num_node_entries].reshape(num_nodes, -1)
+        self._global_rows = order[num_node_entries:]
+
+    def _jac_vec(self, seed):
+        """
+        Return the product of the Jacobian of the group with seed.
+        """
+        system = self._system()
+        _, d_outputs, d_residuals = system.get_linear_vectors()
+
+        d_outputs.set_val(seed)
+        system.run_apply_linear('fwd')
+
+        return d_residuals.asarray(copy=True)
+
+    def _linearize(self):
+        """
+        Find and invert the block of each node.
+        """
+        system = self._system()
+
+        # the products are not available under complex step, where the blocks found at
+        # the real solution are the exact Jacobian of the imaginary perturbation
+        if system.under_complex_step and self._inv_blocks is not None:
+            return
+
+        _, d_outputs, d_residuals = system.get_linear_vectors()
+        node_rows = self._node_rows
+        global_rows = self._global_rows
+        num_nodes, block_size = node_rows.shape
+        num_global = len(global_rows)
+
+        # the products below overwrite the linear vectors
+        d_outputs_save = d_outputs.asarray(copy=True)
+        d_residuals_save = d_residuals.asarray(copy=True)
+
+        dtype = d_outputs_save.dtype
+        blocks = np.empty((num_nodes, block_size, block_size), dtype=dtype)
+        global_block = np.empty((num_global, num_global), dtype=dtype)
+        global_coupling = np.empty((num_nodes, block_size, num_global), dtype=dtype)
+
+        try:
+            for j in range(block_size):
+                seed = np.zeros_like(d_outputs_save)
+                seed[node_rows[:, j]] = 1.0
+                column = self._jac_vec(seed)
+
+                if np.any(column[global_rows] != 0.0):
+                    raise RuntimeError(
+                        f'{self.msginfo}: outputs of {system.pathname} that are not '
+                        'vectorized depend on the nodes.')
+
+                blocks[:, :, j] = column[node_rows]
+
+            for j in range(num_global):
+                seed = np.zeros_like(d_outputs_save)
+                seed[global_rows[j]] = 1.0
+                column = self._jac_vec(seed)
+
+                global_block[:, j] = column[global_rows]
+                global_coupling[:, :, j] = column[node_rows]
+
+            # seeding every node at once cannot tell whether the nodes are coupled, so
+            # compare one more product against the blocks
+            seed = np.random.default_rng(0).uniform(0.5, 1.5, len(d_outputs_save))
+            column = self._jac_vec(seed)
+            expected = np.einsum('nij,nj->ni', blocks, seed[node_rows]) + \
+                global_coupling @ seed[global_rows]
+
+            if not np.allclose(column[node_rows], expected, rtol=1e-10, atol=1e-12):
+                raise RuntimeError(
+                    f'{self.msginfo}: the Jacobian of {system.pathname} couples the '
+                    'nodes, so it cannot be solved one node at a time.')
+
+        finally:
+            d_outputs.set_val(d_outputs_save)
+            d_residuals.set_val(d_residuals_save)
+
+        # a row is empty only when the products skipped its subsystem because it is
+        # not relevant to the current derivatives, and then its solution is not used
+        for block in (blocks, global_block[np.newaxis]):
+            node, row = np.nonzero(~block.any(axis=2))
+            block[node, row, row] = 1.0
+
+        try:
+            self._inv_blocks = np.linalg.inv(blocks)
+            self._inv_global = np.linalg.inv(global_block)
+
+        except np.linalg.LinAlgError:
+            raise RuntimeError(
+                f'{self.msginfo}: the Jacobian of {system.pathname} is singular.')
+
+        self._global_coupling = global_coupling
+
+    def _block_solve(self, rhs, transpose=False):
+        """
+        Solve the block lower triangular system, or its transpose.
+        """
+        node_rows = self._node_rows
+        global_rows = self._global_rows
+        solution = np.empty_like(rhs)
+
+        if transpose:
+            node_solution = np.einsum('nji,nj->ni', self._inv_blocks, rhs[node_rows])
+            solution[node_rows] = node_solution
+            solution[global_rows] = self._inv_global.T @ (
+                rhs[global_rows] -
+                np.einsum('nij,ni->j', self._global_coupling, node_solution))
+
+        else:
+            global_solution = self._inv_global @ rhs[global_rows]
+            solution[global_rows] = global_solution
+            node_rhs = rhs[node_rows] - self._global_coupling @ global_solution
+            solution[node_rows] = np.einsum('nij,nj->ni', self._inv_blocks, node_rhs)
+
+        return solution
+
+    def solve(self, mode, rel_systems=None):
+        """
+        Run the solver.
+
+        Parameters
+        ----------
+        mode : str
+            'fwd' or 'rev'.
+        rel_systems : set of str
+            Names of systems relevant to the current solve.  Deprecated.
+        """
+        _, d_outputs, d_residuals = self._system().get_linear_vectors()
+
+        if mode == 'fwd':
+            d_outputs.set_val(self._block_solve(d_residuals.asarray()))
+        else:
+            d_residuals.set_val(self._block_solve(d_outputs.asarray(), transpose=True))
+
+
+class NodeStepLS(LinesearchSolver):
+    """
+    Line search that takes the Newton step only at the nodes that have not converged.
+
+    Each entry is clipped to its bounds separately, without the extra residual
+    evaluations of BoundsEnforceLS. The nodes to hold fixed are set by the
+    NodeDecoupledNewton that owns this line search.
+    """
+
+    SOLVER = 'LS: NodeStep'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self.frozen = None
+        self._lower = None
+        self._upper = None
+
+    def _declare_options(self):
+        super()._declare_options()
+
+        for unused_option in ('atol', 'rtol', 'maxiter', 'err_on_non_converge',
+                              'restart_from_successful', 'bound_enforcement'):
+            self.options.undeclare(unused_option)
+
+    def _setup_solvers(self, system, depth):
+        super()._setup_solvers(system, depth)
+
+        _check_unscaled(self, system)
+
+        _, outputs, _ = system.get_nonlinear_vectors()
+        meta = system.get_io_metadata(iotypes='output', metadata_keys=['lower', 'upper'])
+        lower = []
+        upper = []
+
+        for name in outputs.keys():
+            size = np.size(outputs[name])
+            var_lower = meta[name]['lower']
+            var_upper = meta[name]['upper']
+
+            lower.append(np.broadcast_to(
+                -np.inf if var_lower is None else np.ravel(var_lower), size))
+            upper.append(np.broadcast_to(
+                np.inf if var_upper is None else np.ravel(var_upper), size))
+
+        self._lower = np.concatenate(lower) if lower else np.zeros(0)
+        self._upper = np.concatenate(upper) if upper else np.zeros(0)
+        self.frozen = None
+
+    def solve(self):
+        """
+        Add the Newton step to the outputs.
+        """
+        system = self._system()
+        _, outputs, _ = system.get_nonlinear_vectors()
+        _, d_outputs, _ = system.get_linear_vectors()
+
+        step = d_outputs.asarray(copy=True)
+
+        if self.frozen is not None:
+            step[self.frozen] = 0.0
+
+        outputs.set_val(np.clip(outputs.asarray() + step, self._lower, self._upper))
+
+
+class NodeDecoupledNewton(om.NewtonSolver):
+    """
+    Newton solver for groups whose residuals are independent at each node.
+
+    Each node is checked for convergence separately against atol and rtol, where rtol
+    is relative to the initial residual of that node, and nodes stop being updated once
+    they have converged. The step is taken by a NodeStepLS, which enforces the bounds
+    entry by entry. The Newton step comes from the linear solver of the group, which is
+    normally a NodeBlockSolver.
+
+    The norm reported each iteration is the largest ratio of a node's residual norm to
+    the tolerance it has to meet, scaled by atol, so that the solver stops exactly when
+    every node has converged.
+    """
+
+    SOLVER = 'NL: NodeNewton'
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        self.linesearch = NodeStepLS()
+
+        self._node_index = None
+        self._node_norm0 = None
+        self._converged = None
+
+    def _declare_options(self):
+        super()._declare_options()
+
+        self.options.declare(
+            'num_nodes', types=int, default=1,
+            desc='number of nodes that the outputs of the group are vectorized over')
+
+    def _setup_solvers(self, system, depth):
+        super()._setup_solvers(system, depth)
+
+        if self.options['atol'] <= 0.0 or self.options['rtol'] <= 0.0:
+            raise ValueError(f'{self.msginfo}: atol and rtol must be positive.')
+
+        if not isinstance(self.linesearch, NodeStepLS):
+            raise ValueError(f'{self.msginfo}: the line search must be a NodeStepLS.')
+
+        self._node_index = _get_node_index(system, self.options['num_nodes'])
+
+    def _iter_initialize(self):
+        """
+        Perform any necessary pre-processing operations.
+
+        Returns
+        -------
+        float
+            initial error.
+        float
+            error at the first iteration.
+        """
+        self._node_norm0 = None
+        self._converged = np.zeros(self.options['num_nodes'] + 1, dtype=bool)
+        self.linesearch.frozen = None
+
+        _, norm = super()._iter_initialize()
+
+        # the reported norm is atol times the largest error relative to its
+        # tolerance, which also meets rtol relative to this
+        return self.options['atol'] / self.options['rtol'], norm
+
+    def _iter_get_norm(self):
+        """
+        Return the scaled error of the node that is furthest from convergence.
+
+        Returns
+        -------
+        float
+            atol times the largest ratio of a node's residual norm to its tolerance.
+        """
+        system = self._system()
+        _, _, residuals = system.get_nonlinear_vectors()
+        num_nodes = self.options['num_nodes']
+        atol = self.options['atol']
+        rtol = self.options['rtol']
+
+        node_norms = np.sqrt(np.bincount(
+            self._node_index, weights=np.abs(residuals.asarray())**2,
+            minlength=num_nodes + 1))
+
+        if self._node_norm0 is None:
+            self._node_norm0 = np.where(node_norms == 0.0, 1.0, node_norms)
+
+        error = np.minimum(node_norms / atol, node_norms / self._node_norm0 / rtol)
+
+        # under complex step every node must follow the perturbation
+        if not system.under_complex_step:
+            self._converged[num_nodes] |= error[num_nodes] <= 1.0
+
+            # the nodes depend on the outputs that are not vectorized, so they can
+            # only be frozen once those have converged
+            if self._converged[num_nodes]:
+                self._converged[:num_nodes] |= error[:num_nodes] <= 1.0
+
+            self.linesearch.frozen = self._converged[self._node_index]
+
+        return atol * error.max()
@@ -0,0 +1,122 @@
+import time
+import unittest
+
+import numpy as np
+import openmdao.api as om
+from dymos.models.atmosphere.atmos_1976 import USatm1976Comp
+from openmdao.utils.assert_utils import assert_check_partials, assert_near_equal
+
+from aviary.mission.ode.atmosphere import TabularAtmosphereComp, build_atmosphere
+
+outputs = ['temp', 'pres', 'rho', 'viscosity', 'drhos_dh', 'sos', 'dsos_dh']
+
+
+def build_problem(comp, h):
+    prob = om.Problem()
+    prob.model.add_subsystem('atmos', comp, promotes=['*'])
+    prob.setup(force_alloc_complex=True)
+    prob.set_val('h', h, units='ft')
+    prob.run_model()
+
+    return prob
+
+
+class TabularAtmosphereTest(unittest.TestCase):
+    def setUp(self):
+        # cover the extrapolated regions, the 10,000 ft knots above 170,000 ft, and
+        # points exactly on the knots
+        self.h = np.hstack((np.linspace(-20000., 260000., 701),
+                            np.arange(-15000., 250001., 1000.)))
+
+    def test_match_USatm1976(self):
+        nn = len(self.h)
+
+        for h_def in ('geopotential', 'geodetic'):
+            with self.subTest(h_def=h_def):
+                expected = build_problem(
+                    USatm1976Comp(num_nodes=nn, h_def=h_def, output_dsos_dh=True),
+                    self.h)
+                prob = build_problem(
+                    TabularAtmosphereComp(num_nodes=nn, h_def=h_def,
+                                          output_dsos_dh=True),
+                    self.h)
+
+                expected_J = expected.compute_totals(outputs, 'h')
+                J = prob.compute_totals(outputs, 'h')
+
+                for name in outputs:
+                    assert_near_equal(prob.get_val(name), expected.get_val(name), 1e-13)
+                    assert_near_equal(J[name, 'h'], expected_J[name, 'h'], 1e-13)
+
+    def test_delta_T(self):
+        h = np.linspace(0., 50000., 11)
+        delta_T = 27.
+
+        standard = build_problem(TabularAtmosphereComp(num_nodes=11), h)
+        prob = build_problem(TabularAtmosphereComp(num_nodes=11, delta_T=delta_T), h)
+
+        T = standard.get_val('temp')
+        assert_near_equal(prob.get_val('temp'), T + delta_T, 1e-14)
+        assert_near_equal(prob.get_val('pres'), standard.get_val('pres'), 1e-14)
+        assert_near_equal(prob.get_val('rho'),
+                          standard.get_val('rho') * T / (T + delta_T), 1e-14)
+        assert_near_equal(prob.get_val('sos'),
+                          standard.get_val('sos') * np.sqrt((T + delta_T) / T), 1e-14)
+
+    def test_partials(self):
+        h = np.linspace(-20000., 260000., 141) + 100.
+        nn = len(h)
+        # drhos_dh and dsos_dh are differentiated through their own splines, as in
+        # USatm1976Comp, so they do not match complex step
+        spline_partials = [('drhos_dh', 'h'), ('dsos_dh', 'h')]
+
+        for h_def in ('geopotential', 'geodetic'):
+            for delta_T in (0., 30., -30.):
+                with self.subTest(h_def=h_def, delta_T=delta_T):
+                    prob = build_problem(
+                        TabularAtmosphereComp(num_nodes=nn, h_def=h_def,
+                                              output_dsos_dh=True, delta_T=delta_T), h)
+                    partial_data = prob.check_partials(out_stream=None, method='cs')
+                    data = partial_data['atmos']
+
+                    if h_def == 'geopotential':
+                        # the density gradient output must include the temperature
+                        # offset terms
+                        assert_near_equal(prob.get_val('drhos_dh'),
+                                          np.diag(data['rho', 'h']['J_fd']), 1e-12)
+
+                    for key in spline_partials:
+                        data.pop(key)
+
+                    assert_check_partials(partial_data, atol=1e-10, rtol=1e-12)
+
+    def test_build_atmosphere(self):
+        self.assertIsInstance(build_atmosphere(3), USatm1976Comp)
+        self.assertIsInstance(build_atmosphere(3, 'tabular', delta_T=10.),
+                              TabularAtmosphereComp)
+
+        with self.assertRaises(ValueError):
+            build_atmosphere(3, 'isa')
+
+        with self.assertRaises(ValueError):
+            build_atmosphere(3, delta_T=10.)
+
+    def bench_test_evaluation(self):
+        print('\nnum_nodes | USatm1976Comp (us) | TabularAtmosphereComp (us)')
+        for nn in (20, 200, 2000, 20000):
+            h = np.linspace(0., 45000., nn)
+            times = []
+            for comp_class in (USatm1976Comp, TabularAtmosphereComp):
+                prob = build_problem(comp_class(num_nodes=nn), h)
+                num_runs = 200
+                start = time.perf_counter()
+                for _ in range(num_runs):
+                    prob.model.run_apply_nonlinear()
+                    prob.model.run_linearize()
+                times.append((time.perf_counter() - start) / num_runs * 1e6)
+
+            print(f'{nn:9d} | {times[0]:18.1f} | {times[1]:26.1f}')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+import time
+import unittest
+
+import numpy as np
+import openmdao.api as om
+from openmdao.utils.assert_utils import assert_check_totals, assert_near_equal
+
+from aviary.interface.default_phase_info.two_dof import default_mission_subsystems
+from aviary.mission.gasp_based.ode.climb_ode import ClimbODE
+from aviary.mission.gasp_based.ode.descent_ode import DescentODE
+from aviary.mission.ode.node_decoupled_newton import NodeBlockSolver, \
+    NodeDecoupledNewton
+from aviary.variable_info.enums import SpeedType
+from aviary.variable_info.options import get_option_defaults
+from aviary.variable_info.variables import Dynamic
+
+
+def _build_balance_problem(num_nodes, coupled=False):
+    """
+    Solve k * x**2 = a at every node, where k = 2 * c is not vectorized.
+    """
+    prob = om.Problem()
+    model = prob.model
+
+    ivc = model.add_subsystem('ivc', om.IndepVarComp(), promotes=['*'])
+    ivc.add_output('a', np.linspace(1.0, 100.0, num_nodes))
+    ivc.add_output('c', 1.5)
+
+    group = model.add_subsystem('balance_group', om.Group(), promotes=['*'])
+    k_comp = group.add_subsystem('k_comp', om.ExecComp('k = 2.0 * c'), promotes=['*'])
+    k_comp.declare_partials('k', 'c', method='cs')
+
+    arange = np.arange(num_nodes)
+
+    if coupled:
+        y_comp = group.add_subsystem(
+            'y_comp', om.ExecComp(
+                'y = k * x**2 + 0.1 * sum(x)', y={'shape': num_nodes},
+                x={'shape': num_nodes}),
+            promotes=['*'])
+        y_comp.declare_partials('y', 'x', method='cs')
+    else:
+        y_comp = group.add_subsystem(
+            'y_comp', om.ExecComp(
+                'y = k * x**2', y={'shape': num_nodes}, x={'shape': num_nodes}),
+            promotes=['*'])
+        y_comp.declare_partials('y', 'x', rows=arange, cols=arange, method='cs')
+
+    y_comp.declare_partials('y', 'k', rows=arange, cols=np.zeros(num_nodes), method='cs')
+
+    balance = group.add_subsystem('balance', om.BalanceComp(), promotes=['*'])
+    balance.add_balance(
+        'x', val=np.ones(num_nodes), lower=0.5, lhs_name='y', rhs_name='a')
+
+    group.nonlinear_solver = NodeDecoupledNewton(
+        num_nodes=num_nodes, solve_subsystems=True, atol=1e-12, rtol=1e-12, maxiter=20,
+        iprint=-1)
+    group.linear_solver = NodeBlockSolver(num_nodes=num_nodes)
+
+    prob.setup(force_alloc_complex=True)
+
+    return prob
+
+
+class NodeDecoupledNewtonTest(unittest.TestCase):
+    def test_solve(self):
+        num_nodes = 7
+        prob = _build_balance_problem(num_nodes)
+        prob.run_model()
+
+        assert_near_equal(
+            prob.get_val('x'), np.sqrt(np.linspace(1.0, 100.0, num_nodes) / 3.0), 1e-12)
+        self.assertGreater(prob.model.balance_group.nonlinear_solver._iter_count, 1)
+
+        # a node that is already converged is not updated again
+        x = prob.get_val('x')
+        prob.set_val('a', 50.0 * np.ones(num_nodes))
+        prob.set_val('a', 3.0 * x[0]**2, indices=[0])
+        prob.run_model()
+
+        self.assertEqual(prob.get_val('x')[0], x[0])
+        assert_near_equal(
+            prob.get_val('x')[1:], np.full(num_nodes - 1, np.sqrt(50.0 / 3.0)), 1e-12)
+
+    def test_bounds(self):
+        num_nodes = 4
+        prob = _build_balance_problem(num_nodes)
+        # the solution of the first node is below the lower bound of x
+        prob.set_val('a', [0.01, 3.0, 12.0, 27.0])
+        prob.run_model()
+
+        assert_near_equal(prob.get_val('x'), [0.5, 1.0, 2.0, 3.0], 1e-12)
+
+    def test_totals(self):
+        prob = _build_balance_problem(5)
+        prob.run_model()
+
+        for mode in ('fwd', 'rev'):
+            prob.setup(force_alloc_complex=True, mode=mode)
+            prob.run_model()
+            data = prob.check_totals(
+                of=['x', 'y'], wrt=['a', 'c'], method='cs', out_stream=None)
+            assert_check_totals(data, atol=1e-10, rtol=1e-10)
+
+    def test_coupled_nodes(self):
+        prob = _build_balance_problem(3, coupled=True)
+
+        with self.assertRaises(RuntimeError) as cm:
+            prob.run_model()
+
+        self.assertIn('couples the nodes', str(cm.exception))
+
+
+def _build_ode_problem(ode, num_nodes, balance_solver):
+    prob = om.Problem()
+
+    if ode == 'climb':
+        prob.model = ClimbODE(
+            num_nodes=num_nodes, EAS_target=250, mach_cruise=0.8,
+            aviary_options=get_option_defaults(),
+            core_subsystems=default_mission_subsystems, balance_solver=balance_solver)
+        prob.setup(check=False, force_alloc_complex=True)
+        prob.set_val(Dynamic.Mission.THROTTLE, 0.956)
+        prob.set_val(
+            Dynamic.Mission.ALTITUDE, np.linspace(1000, 37000, num_nodes), units='ft')
+        prob.set_val(
+            Dynamic.Mission.MASS, np.linspace(174845, 171000, num_nodes), units='lbm')
+
+    else:
+        prob.model = DescentODE(
+            num_nodes=num_nodes, mach_cruise=0.8, EAS_limit=350,
+            input_speed_type=SpeedType.MACH, aviary_options=get_option_defaults(),
+            core_subsystems=default_mission_subsystems, balance_solver=balance_solver)
+        prob.setup(check=False, force_alloc_complex=True)
+        prob.set_val(Dynamic.Mission.THROTTLE, 0.0)
+        prob.set_val(
+            Dynamic.Mission.ALTITUDE, np.linspace(36500, 1000, num_nodes), units='ft')
+        prob.set_val(
+            Dynamic.Mission.MASS, np.linspace(147661, 146000, num_nodes), units='lbm')
+
+    prob.set_val('EAS', 250, units='kn')
+
+    return prob
+
+
+class ODEBalanceSolverTest(unittest.TestCase):
+    def test_climb_and_descent(self):
+        for ode in ('climb', 'descent'):
+            with self.subTest(ode=ode):
+                results = {}
+
+                for balance_solver in ('newton', 'node_decoupled'):
+                    prob = _build_ode_problem(ode, 10, balance_solver)
+                    prob.run_model()
+
+                    results[balance_solver] = {
+                        name: prob.get_val(name).copy()
+                        for name in ('alpha', Dynamic.Mission.MACH,
+                                     Dynamic.Mission.FLIGHT_PATH_ANGLE)}
+
+                for name, val in results['newton'].items():
+                    assert_near_equal(results['node_decoupled'][name], val, 1e-8)
+
+    def bench_test_balance_solver(self):
+        print('\node     | nodes | solver         | run_model (ms)')
+
+        for ode in ('climb', 'descent'):
+            for num_nodes in (20, 50, 200):
+                for balance_solver in ('newton', 'node_decoupled'):
+                    prob = _build_ode_problem(ode, num_nodes, balance_solver)
+                    prob.final_setup()
+                    _, outputs, _ = prob.model.get_nonlinear_vectors()
+                    guess = outputs.asarray(copy=True)
+
+                    times = []
+                    for _ in range(5):
+                        outputs.set_val(guess)
+                        start = time.perf_counter()
+                        prob.run_model()
+                        times.append(time.perf_counter() - start)
+
+                    print(f'{ode:8} | {num_nodes:5} | {balance_solver:14} | '
+                          f'{1e3 * min(times):.1f}')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -308,6 +308,15 @@ class PhaseBuilderBase(ABC):
         """
         return {}
 
+    def _atmosphere_ode_init_kwargs(self):
+        """
+        Return the ODE kwargs of the options added by _add_atmosphere_meta_data().
+        """
+        return {
+            'atmosphere_model': self.user_options.get_val('atmosphere_model'),
+            'delta_T': self.user_options.get_val('delta_T', units='degR'),
+        }
+
     def to_phase_info(self):
         '''
         Return the stored settings as phase info.
@@ -398,6 +407,33 @@ class PhaseBuilderBase(ABC):
 
         meta_data[name] = dict(val=val, units=units, desc=desc)
 
+    @classmethod
+    def _add_atmosphere_meta_data(cls):
+        '''
+        Update supported options with the atmosphere model of the ODE.
+
+        Builders that add these options pass them on to their ODE with
+        _atmosphere_ode_init_kwargs().
+        '''
+        cls._add_meta_data(
+            'atmosphere_model', val='USatm1976',
+            desc='atmosphere component used by the ODE: "USatm1976" or "tabular"')
+
+        cls._add_meta_data(
+            'delta_T', val=0., units='degR',
+            desc='temperature offset from the standard day; requires the tabular'
+            ' atmosphere model')
+
+    @classmethod
+    def _add_balance_solver_meta_data(cls):
+        '''
+        Update supported options with the solver of the balance groups in the ODE.
+        '''
+        cls._add_meta_data(
+            'balance_solver', val='newton',
+            desc='solver used by the balance groups of the ODE: "newton", or'
+            ' "node_decoupled" to converge each node separately')
+
     @classmethod
     def _add_initial_guess_meta_data(cls, initial_guess: InitialGuess, desc=None):
         '''
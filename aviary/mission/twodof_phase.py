@@ -113,6 +113,7 @@ class TwoDOFPhase(FlightPhaseBase):
             'clean': self.user_options.get_val('clean'),
             'ground_roll': self.user_options.get_val('ground_roll'),
             'throttle_enforcement': self.user_options.get_val('throttle_enforcement'),
+            **self._atmosphere_ode_init_kwargs(),
         }
 
 
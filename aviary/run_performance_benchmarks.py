@@ -0,0 +1,12 @@
+import argparse
+import sys
+
+from aviary.validation_cases.benchmark_performance import _exec_performance, \
+    _setup_performance_parser
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Time the Aviary benchmark tests and compare them to a baseline')
+    _setup_performance_parser(parser)
+
+    sys.exit(_exec_performance(parser.parse_args()))
@@ -1,3 +1,4 @@
+import numpy as np
 import openmdao.api as om
 
 from aviary.variable_info.functions import add_aviary_input
@@ -158,9 +159,6 @@ class CLmaxCalculation(om.ExplicitComponent):
                 "VLAM14",
                 "fus_lift",
             ],
-            dependent=True,
-            method="cs",
-            step=1e-8,
         )
         self.declare_partials(
             Dynamic.Mission.MACH,
@@ -186,9 +184,6 @@ class CLmaxCalculation(om.ExplicitComponent):
                 "VLAM14",
                 "fus_lift",
             ],
-            dependent=True,
-            method="cs",
-            step=1e-8,
         )
         self.declare_partials(
             "reynolds",
@@ -217,9 +212,6 @@ class CLmaxCalculation(om.ExplicitComponent):
                 "VLAM14",
                 "fus_lift",
             ],
-            dependent=True,
-            method="cs",
-            step=1e-8,
         )
 
     def compute(self, inputs, outputs):
@@ -263,3 +255,64 @@ class CLmaxCalculation(om.ExplicitComponent):
 
         VK = mach * sos
         outputs["reynolds"] = reynolds = (avg_chord * VK / kinematic_viscosity) / 100000
+
+    def compute_partials(self, inputs, J):
+
+        sos = inputs[Dynamic.Mission.SPEED_OF_SOUND]
+        wing_loading = inputs[Aircraft.Wing.LOADING]
+        P = inputs[Dynamic.Mission.STATIC_PRESSURE]
+        avg_chord = inputs[Aircraft.Wing.AVERAGE_CHORD]
+        kinematic_viscosity = inputs["kinematic_viscosity"]
+
+        # the three lift terms of CL_max, each a product of its factors
+        terms = [
+            [Aircraft.Wing.MAX_LIFT_REF, "VLAM1", "VLAM2"],
+            [Aircraft.Wing.FLAP_LIFT_INCREMENT_OPTIMUM, "VLAM3",
+                "VLAM4", "VLAM5", "VLAM6", "VLAM7", "VLAM8"],
+            [Aircraft.Wing.SLAT_LIFT_INCREMENT_OPTIMUM,
+                "VLAM9", "VLAM10", "VLAM11", "VLAM12"],
+        ]
+        correction = inputs["VLAM13"] * inputs["VLAM14"]
+
+        dCL_max = {}
+        lift_sum = 0.0
+        for term in terms:
+            factors = [inputs[name] for name in term]
+            lift_sum = lift_sum + np.prod(factors, axis=0)
+
+            for i, name in enumerate(term):
+                dCL_max[name] = correction * np.prod(factors[:i] + factors[i + 1:],
+                                                     axis=0)
+
+        dCL_max["VLAM13"] = lift_sum * inputs["VLAM14"]
+        dCL_max["VLAM14"] = lift_sum * inputs["VLAM13"]
+        dCL_max["fus_lift"] = 1.0
+
+        CL_max = lift_sum * correction + inputs["fus_lift"]
+        mach = (wing_loading / CL_max / 0.7 / P) ** 0.5
+
+        dmach_dCL_max = -0.5 * mach / CL_max
+        dreynolds_dmach = avg_chord * sos / kinematic_viscosity / 100000
+
+        for name, deriv in dCL_max.items():
+            J["CL_max", name] = deriv
+            J[Dynamic.Mission.MACH, name] = dmach_dCL_max * deriv
+            J["reynolds", name] = dreynolds_dmach * dmach_dCL_max * deriv
+
+        dmach_dwing_loading = 0.5 * mach / wing_loading
+        dmach_dP = -0.5 * mach / P
+
+        J[Dynamic.Mission.MACH, Aircraft.Wing.LOADING] = dmach_dwing_loading
+        J[Dynamic.Mission.MACH, Dynamic.Mission.STATIC_PRESSURE] = dmach_dP
+
+        J["reynolds", Aircraft.Wing.LOADING] = dreynolds_dmach * dmach_dwing_loading
+        J["reynolds", Dynamic.Mission.STATIC_PRESSURE] = dreynolds_dmach * dmach_dP
+        J["reynolds", Dynamic.Mission.SPEED_OF_SOUND] = (
+            avg_chord * mach / kinematic_viscosity / 100000
+        )
+        J["reynolds", Aircraft.Wing.AVERAGE_CHORD] = (
+            mach * sos / kinematic_viscosity / 100000
+        )
+        J["reynolds", "kinematic_viscosity"] = (
+            -avg_chord * mach * sos / kinematic_viscosity**2 / 100000
+        )
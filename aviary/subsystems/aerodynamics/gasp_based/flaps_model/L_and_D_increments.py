@@ -1,3 +1,4 @@
+import numpy as np
 import openmdao.api as om
 
 from aviary.variable_info.functions import add_aviary_input
@@ -97,9 +98,6 @@ class LiftAndDragIncrements(om.ExplicitComponent):
             "delta_CD",
             [Aircraft.Wing.FLAP_DRAG_INCREMENT_OPTIMUM,
                 "VDEL1", "VDEL2", "VDEL3", "VDEL4", "VDEL5"],
-            dependent=True,
-            method="cs",
-            step=1e-8,
         )
         self.declare_partials(
             "delta_CL",
@@ -114,9 +112,6 @@ class LiftAndDragIncrements(om.ExplicitComponent):
                 "VLAM13",
                 "VLAM14",
             ],
-            dependent=True,
-            method="cs",
-            step=1e-8,
         )
 
     def compute(self, inputs, outputs):
@@ -151,3 +146,20 @@ class LiftAndDragIncrements(om.ExplicitComponent):
             * VLAM13
             * VLAM14
         )
+
+    def compute_partials(self, inputs, J):
+
+        # both increments are plain products, so the partial with respect to each
+        # factor is the product of all of the others
+        products = {
+            "delta_CD": [Aircraft.Wing.FLAP_DRAG_INCREMENT_OPTIMUM,
+                         "VDEL1", "VDEL2", "VDEL3", "VDEL4", "VDEL5"],
+            "delta_CL": [Aircraft.Wing.FLAP_LIFT_INCREMENT_OPTIMUM, "VLAM3", "VLAM4",
+                         "VLAM5", "VLAM6", "VLAM7", "VLAM8", "VLAM13", "VLAM14"],
+        }
+
+        for output, names in products.items():
+            factors = [inputs[name] for name in names]
+
+            for i, name in enumerate(names):
+                J[output, name] = np.prod(factors[:i] + factors[i + 1:], axis=0)
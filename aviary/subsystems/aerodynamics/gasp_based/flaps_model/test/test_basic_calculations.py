@@ -21,7 +21,7 @@ class BasicFlapsCalculationsTestCase(unittest.TestCase):
 
         self.prob.model.add_subsystem('BC', BasicFlapsCalculations(), promotes=['*'])
 
-        self.prob.setup()
+        self.prob.setup(force_alloc_complex=True)
 
         # initial conditions
         self.prob.set_val(Aircraft.Wing.SWEEP, 25.0, units="deg")
@@ -81,8 +81,9 @@ class BasicFlapsCalculationsTestCase(unittest.TestCase):
         ans = self.prob["VLAM12"]
         assert_near_equal(ans, reg_data, tol)
 
-        data = self.prob.check_partials(out_stream=None, method="fd")
-        assert_check_partials(data, atol=1e-6, rtol=4e-6)
+        # the analytic partials are checked against complex step
+        data = self.prob.check_partials(out_stream=None, method="cs")
+        assert_check_partials(data, atol=1e-10, rtol=1e-10)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 import unittest
 
+import numpy as np
 import openmdao.api as om
+from openmdao.utils.assert_utils import assert_check_partials, assert_near_equal
 from parameterized import parameterized
 
 from aviary.subsystems.mass.flops_based.wing_detailed import \
@@ -18,6 +20,54 @@ class DetailedWingBendingFactTest(unittest.TestCase):
     def setUp(self):
         self.prob = om.Problem()
 
+    # the rectangular distribution (3) used to fail with a station count mismatch, its
+    # values match the original implementation with one load intensity per station
+    @parameterized.expand([(1, 11.785247148903908, 0.9101870990290313),
+                           (2, 17.9383915855199, 0.9409943065376437),
+                           (3, 24.122167234787636, 0.9561205581239635)])
+    def test_load_distribution(self, load_distribution, bending_factor,
+                               pod_inertia_factor):
+        num_stations = 12
+        options = get_flops_inputs('N3CC')
+        options.set_val(Aircraft.Wing.INPUT_STATION_DIST,
+                        np.linspace(0.0, 1.0, num_stations))
+        options.set_val(Aircraft.Wing.LOAD_DISTRIBUTION_CONTROL, load_distribution)
+
+        prob = self.prob
+        prob.model.add_subsystem(
+            "wing",
+            DetailedWingBendingFact(aviary_options=options),
+            promotes_inputs=['*'],
+            promotes_outputs=['*'],
+        )
+        prob.setup(check=False, force_alloc_complex=True)
+
+        prob.set_val(Aircraft.Wing.LOAD_PATH_SWEEP_DIST,
+                     np.linspace(30.0, 20.0, num_stations - 1), 'deg')
+        prob.set_val(Aircraft.Wing.THICKNESS_TO_CHORD_DIST,
+                     np.linspace(0.14, 0.1, num_stations))
+        prob.set_val(Aircraft.Wing.CHORD_PER_SEMISPAN_DIST,
+                     np.linspace(0.3, 0.1, num_stations))
+        prob.set_val(Mission.Design.GROSS_MASS, 150000.0, 'lbm')
+        prob.set_val(Aircraft.Engine.POD_MASS, 9000.0, 'lbm')
+        prob.set_val(Aircraft.Wing.ASPECT_RATIO, 11.0)
+        prob.set_val(Aircraft.Wing.ASPECT_RATIO_REF, 9.0)
+        prob.set_val(Aircraft.Wing.STRUT_BRACING_FACTOR, 0.0)
+        prob.set_val(Aircraft.Wing.AEROELASTIC_TAILORING_FACTOR, 0.3)
+        prob.set_val(Aircraft.Engine.WING_LOCATIONS, 0.31)
+        prob.set_val(Aircraft.Wing.THICKNESS_TO_CHORD, 0.11)
+        prob.set_val(Aircraft.Wing.THICKNESS_TO_CHORD_REF, 0.12)
+
+        prob.run_model()
+
+        assert_near_equal(prob.get_val(Aircraft.Wing.BENDING_FACTOR), bending_factor,
+                          1e-12)
+        assert_near_equal(prob.get_val(Aircraft.Wing.ENG_POD_INERTIA_FACTOR),
+                          pod_inertia_factor, 1e-12)
+
+        partial_data = prob.check_partials(out_stream=None, method='cs')
+        assert_check_partials(partial_data, atol=1e-10, rtol=1e-10)
+
 
 class DetailedWingBendingTest(unittest.TestCase):
 
@@ -53,28 +53,67 @@ class DetailedWingBendingFact(om.ExplicitComponent):
 
         add_aviary_output(self, Aircraft.Wing.ENG_POD_INERTIA_FACTOR, val=0.0)
 
+        # The integration stations only depend on options, and the interpolation of the
+        # chord and thickness distributions onto them is linear in the distribution
+        # values, so both are computed once here.
+        inp_stations = np.array(input_station_dist)
+        num_integration_stations = \
+            aviary_options.get_val(Aircraft.Wing.NUM_INTEGRATION_STATIONS)
+
+        target_dy = (inp_stations[-1] - inp_stations[0]) / num_integration_stations
+        stations_per_section = np.floor(np.abs(np.diff(inp_stations) / target_dy + 0.5))
+        stations_per_section[-1] += 1  # add one more point to the last section
+        integration_stations = np.empty(0)
+        section = np.empty(0, dtype=int)
+
+        for i, val in enumerate(inp_stations[1:]):
+            endpoint = i == len(inp_stations) - 2
+            per_section = int(stations_per_section[i])
+            integration_stations = np.append(
+                integration_stations,
+                np.linspace(inp_stations[i], val, per_section, endpoint=endpoint))
+            section = np.append(section, i * np.ones(per_section, dtype=int))
+
+        dy = np.diff(integration_stations)
+
+        # maps the load path sweep of each section onto the integration stations
+        sweep_map = np.zeros((len(integration_stations), num_input_stations - 1))
+        sweep_map[np.arange(len(integration_stations)), section] = 1.0
+
+        self._integration_stations = integration_stations
+        self._dy = dy
+        self._sweep_map = sweep_map
+        self._avg_sweep_weights = \
+            ((dy[1:] + 2.0 * integration_stations[1:-1]) * dy[1:]) @ sweep_map[1:-1]
+
+        interp = InterpND(method='slinear', points=(inp_stations),
+                          x_interp=integration_stations)
+        _, self._interp_weights = interp.evaluate_spline(
+            np.zeros(num_input_stations), compute_derivative=True)
+
     def setup_partials(self):
-        # TODO: Analytic derivs will be challenging, but possible.
-        self.declare_partials("*", "*", method='cs')
+        wrt = [Aircraft.Wing.LOAD_PATH_SWEEP_DIST,
+               Aircraft.Wing.THICKNESS_TO_CHORD_DIST,
+               Aircraft.Wing.CHORD_PER_SEMISPAN_DIST,
+               Aircraft.Wing.ASPECT_RATIO,
+               Aircraft.Wing.ASPECT_RATIO_REF,
+               Aircraft.Wing.STRUT_BRACING_FACTOR,
+               Aircraft.Wing.AEROELASTIC_TAILORING_FACTOR,
+               Aircraft.Wing.THICKNESS_TO_CHORD,
+               Aircraft.Wing.THICKNESS_TO_CHORD_REF]
+
+        self.declare_partials(Aircraft.Wing.BENDING_FACTOR, wrt)
+
+        self.declare_partials(
+            Aircraft.Wing.ENG_POD_INERTIA_FACTOR,
+            wrt + [Mission.Design.GROSS_MASS,
+                   Aircraft.Engine.POD_MASS,
+                   Aircraft.Engine.WING_LOCATIONS])
 
     def compute(self, inputs, outputs):
         aviary_options: AviaryValues = self.options['aviary_options']
-        input_station_dist = aviary_options.get_val(Aircraft.Wing.INPUT_STATION_DIST)
-        inp_stations = np.array(input_station_dist)
-        num_integration_stations = \
-            aviary_options.get_val(Aircraft.Wing.NUM_INTEGRATION_STATIONS)
         num_wing_engines = aviary_options.get_val(Aircraft.Engine.NUM_WING_ENGINES)
 
-        # TODO: Support all options for this parameter.
-        # 0.0 : input distribution
-        # 1.0 : triangular distribution
-        # 2.0 : elliptical distribution (default)
-        # 3.0 : rectangular distribution
-        # 1.0-2.0 : blend of triangular and elliptical
-        # 2.0-3.0 : blend of elliptical and rectangular
-        load_distribution_factor = \
-            aviary_options.get_val(Aircraft.Wing.LOAD_DISTRIBUTION_CONTROL)
-
         load_path_sweep = inputs[Aircraft.Wing.LOAD_PATH_SWEEP_DIST]
         thickness_to_chord = inputs[Aircraft.Wing.THICKNESS_TO_CHORD_DIST]
         chord = inputs[Aircraft.Wing.CHORD_PER_SEMISPAN_DIST]
@@ -106,40 +145,15 @@ class DetailedWingBendingFact(om.ExplicitComponent):
         pod_mass = engine_data[:, 0]
         engine_locations = engine_data[:, 1]
 
-        target_dy = (inp_stations[-1] - inp_stations[0]) / num_integration_stations
-        stations_per_section = np.floor(np.abs(np.diff(inp_stations) / target_dy + 0.5))
-        stations_per_section[-1] += 1  # add one more point to the last section
-        integration_stations = np.empty(0, dtype=chord.dtype)
-        sweep_int_stations = np.empty(0, dtype=chord.dtype)
-
-        for i, val in enumerate(inp_stations[1:]):
-            endpoint = i == len(inp_stations) - 2
-            per_section = int(stations_per_section[i])
-            integration_stations = np.append(
-                integration_stations,
-                np.linspace(inp_stations[i], val, per_section, endpoint=endpoint))
-            sweep_int_stations = np.append(sweep_int_stations,
-                                           load_path_sweep[i] * np.ones(per_section))
+        integration_stations = self._integration_stations
+        dy = self._dy
+        sweep_int_stations = self._sweep_map @ load_path_sweep
 
-        dy = np.diff(integration_stations)
-        avg_sweep = np.sum((dy[1:] + 2.0 * integration_stations[1:-1]) * dy[1:] *
-                           sweep_int_stations[1:-1])
+        avg_sweep = self._avg_sweep_weights @ load_path_sweep
 
-        # TODO: add all load_distribution_factor options
-        if load_distribution_factor == 1:
-            load_intensity = 1.0 - integration_stations
-        elif load_distribution_factor == 2:
-            load_intensity = np.sqrt(1.0 - integration_stations ** 2)
-        elif load_distribution_factor == 3:
-            load_intensity = np.ones(num_integration_stations + 1)
-        else:
-            raise om.AnalysisError(
-                f'{load_distribution_factor} is not a valid value for {Aircraft.Wing.LOAD_DISTRIBUTION_CONTROL}, it must be "1", "2", or "3".')
+        load_intensity = self._get_load_intensity()
 
-        chord_interp = InterpND(method='slinear', points=(inp_stations),
-                                x_interp=integration_stations)
-        chord_int_stations = chord_interp.evaluate_spline(
-            chord, compute_derivative=False)
+        chord_int_stations = self._interp_weights @ chord
         if arref > 0.0:
             # Scale
             chord_int_stations *= arref / ar
@@ -160,10 +174,7 @@ class DetailedWingBendingFact(om.ExplicitComponent):
         emi = (del_moment + dy * load_path_length) * csw
         # em = np.sum(emi)
 
-        tc_interp = InterpND(method='slinear', points=(inp_stations),
-                             x_interp=integration_stations)
-        tc_int_stations = tc_interp.evaluate_spline(
-            thickness_to_chord, compute_derivative=False)
+        tc_int_stations = self._interp_weights @ thickness_to_chord
         if tcref > 0.0:
             tc_int_stations *= tc / tcref
 
@@ -187,7 +198,7 @@ class DetailedWingBendingFact(om.ExplicitComponent):
                     * sa**2 + 0.03*caya * (1.0-0.5*faert)*sa))
         outputs[Aircraft.Wing.BENDING_FACTOR] = bt
 
-        eel = np.zeros(len(dy) + 1)
+        eel = np.zeros(len(dy) + 1, dtype=engine_locations.dtype)
         loc = np.where(integration_stations < engine_locations[0])[0]
         eel[loc] = 1.0
 
@@ -203,3 +214,240 @@ class DetailedWingBendingFact(om.ExplicitComponent):
 
         outputs[Aircraft.Wing.ENG_POD_INERTIA_FACTOR] = 1.0 - \
             bte / bt * pod_mass / gross_mass
+
+    def compute_partials(self, inputs, J):
+        aviary_options: AviaryValues = self.options['aviary_options']
+        num_wing_engines = aviary_options.get_val(Aircraft.Engine.NUM_WING_ENGINES)
+
+        load_path_sweep = inputs[Aircraft.Wing.LOAD_PATH_SWEEP_DIST]
+        thickness_to_chord = inputs[Aircraft.Wing.THICKNESS_TO_CHORD_DIST]
+        chord = inputs[Aircraft.Wing.CHORD_PER_SEMISPAN_DIST]
+        engine_locations = inputs[Aircraft.Engine.WING_LOCATIONS]
+        gross_mass = inputs[Mission.Design.GROSS_MASS]
+        pod_mass = inputs[Aircraft.Engine.POD_MASS]
+        fstrt = inputs[Aircraft.Wing.STRUT_BRACING_FACTOR]
+        faert = inputs[Aircraft.Wing.AEROELASTIC_TAILORING_FACTOR]
+
+        ar = inputs[Aircraft.Wing.ASPECT_RATIO]
+        arref = inputs[Aircraft.Wing.ASPECT_RATIO_REF]
+        tc = inputs[Aircraft.Wing.THICKNESS_TO_CHORD]
+        tcref = inputs[Aircraft.Wing.THICKNESS_TO_CHORD_REF]
+
+        # the engine that is used is the one with the inboard-most location
+        num_engine_models = pod_mass.size
+        pod_index = np.repeat(np.arange(num_engine_models),
+                              (1+num_wing_engines) % 2)
+        engine_locations = engine_locations.flatten()
+        engine_index = np.lexsort(
+            np.vstack((pod_mass.flatten()[pod_index], engine_locations)))[0]
+        engine_location = engine_locations[engine_index]
+        pod_mass = pod_mass.flatten()[pod_index[engine_index]]
+
+        integration_stations = self._integration_stations
+        dy = self._dy
+        sweep_map = self._sweep_map
+        interp_weights = self._interp_weights
+        sweep_int_stations = sweep_map @ load_path_sweep
+        avg_sweep = self._avg_sweep_weights @ load_path_sweep
+
+        load_intensity = self._get_load_intensity()
+        load_a = 2*load_intensity[:-1] + load_intensity[1:]
+        load_b = 2*load_intensity[1:] + load_intensity[:-1]
+        moment_a = load_intensity[:-1] + load_intensity[1:]
+        moment_b = 3*load_intensity[1:] + load_intensity[:-1]
+
+        chord_int_stations = interp_weights @ chord
+        chord_scale = 1.0
+        dchord_scale_dar = dchord_scale_darref = 0.0
+        if arref > 0.0:
+            chord_scale = arref / ar
+            dchord_scale_dar = -arref / ar**2
+            dchord_scale_darref = 1.0 / ar
+        chord_int = chord_int_stations * chord_scale
+
+        tc_int_stations = interp_weights @ thickness_to_chord
+        tc_scale = 1.0
+        dtc_scale_dtc = dtc_scale_dtcref = 0.0
+        if tcref > 0.0:
+            tc_scale = tc / tcref
+            dtc_scale_dtc = 1.0 / tcref
+            dtc_scale_dtcref = -tc / tcref**2
+        tc_int = tc_int_stations * tc_scale
+
+        del_load = dy * (chord_int[:-1] * load_a + chord_int[1:] * load_b) / 6
+        el = np.sum(del_load)
+        del_moment = dy**2 * (chord_int[:-1] * moment_a + chord_int[1:] * moment_b) / 12
+        load_path_length = np.cumsum(del_load[::-1])[::-1] - del_load
+        moment = del_moment + dy * load_path_length
+
+        sweep_angle = sweep_int_stations[:-1] * np.pi/180.
+        csw = 1. / np.cos(sweep_angle)
+        dcsw_dsweep = csw * np.tan(sweep_angle) * np.pi/180.
+
+        total_moment = np.cumsum((moment * csw)[::-1])[::-1]
+        inv_area = 1.0 / (chord_int[:-1] * tc_int[:-1])
+
+        # trapezoidal integration weights of the bending material per station
+        weights = np.zeros(len(dy))
+        weights[:-1] += 0.5 * dy[:-1]
+        weights[1:] += 0.5 * dy[:-1]
+        pm = np.sum(weights * total_moment * csw * inv_area)
+
+        # derivative of an integral of the cumulative moments with respect to the
+        # moment of each segment
+        dint_dmoment = np.cumsum(weights * csw * inv_area)
+
+        def chord_derivs(dval_ddel_load, dval_ddel_moment):
+            """
+            Map derivatives with respect to the segment loads and moments onto the
+            chord at the integration stations.
+            """
+            dval_dchord = np.zeros(len(integration_stations))
+            dval_dchord[:-1] += dval_ddel_load * dy * load_a / 6 + \
+                dval_ddel_moment * dy**2 * moment_a / 12
+            dval_dchord[1:] += dval_ddel_load * dy * load_b / 6 + \
+                dval_ddel_moment * dy**2 * moment_b / 12
+            return dval_dchord
+
+        # bending material
+        dpm_dmoment = dint_dmoment * csw
+        dpm_dload_path_length = dpm_dmoment * dy
+        dpm_ddel_load = np.cumsum(dpm_dload_path_length) - dpm_dload_path_length
+        dpm_dinv_area = weights * total_moment * csw
+
+        dpm_dchord = chord_derivs(dpm_ddel_load, dpm_dmoment)
+        dpm_dchord[:-1] -= dpm_dinv_area * inv_area / chord_int[:-1]
+        dpm_dtc = np.zeros(len(integration_stations))
+        dpm_dtc[:-1] -= dpm_dinv_area * inv_area / tc_int[:-1]
+        dpm_dcsw = weights * total_moment * inv_area + dint_dmoment * moment
+
+        del_dchord = chord_derivs(np.ones(len(dy)), 0.0)
+
+        # sweep and aspect ratio correction
+        sa = np.sin(avg_sweep * np.pi / 180.)
+        dsa_dsweep = np.cos(avg_sweep * np.pi / 180.) * np.pi / 180. * \
+            self._avg_sweep_weights
+        if ar <= 5.0:
+            caya = 0.0
+            dcaya_dar = 0.0
+        else:
+            caya = ar - 5.0
+            dcaya_dar = 1.0
+
+        ar_term = ar**(0.25*fstrt)
+        sweep_term = 1.0 + (0.5*faert - 0.16*fstrt) * sa**2 + \
+            0.03*caya * (1.0-0.5*faert)*sa
+        denom = ar_term * sweep_term
+
+        ddenom_dsa = ar_term * (2.0 * (0.5*faert - 0.16*fstrt) * sa +
+                                0.03*caya * (1.0-0.5*faert))
+        ddenom_dar = 0.25*fstrt * ar_term / ar * sweep_term + \
+            ar_term * 0.03 * dcaya_dar * (1.0-0.5*faert) * sa
+        ddenom_dfstrt = 0.25 * np.log(ar) * ar_term * sweep_term - \
+            ar_term * 0.16 * sa**2
+        ddenom_dfaert = ar_term * (0.5 * sa**2 - 0.015*caya * sa)
+
+        bt = 4 * pm / (el * denom)
+
+        dbt_dpm = 4 / (el * denom)
+        dbt_del = -bt / el
+        dbt_ddenom = -bt / denom
+
+        dbt_dchord_int = dbt_dpm * dpm_dchord + dbt_del * del_dchord
+        dbt_dtc_int = dbt_dpm * dpm_dtc
+        dbt_dsweep = (dbt_dpm * dpm_dcsw * dcsw_dsweep) @ sweep_map[:-1] + \
+            dbt_ddenom * ddenom_dsa * dsa_dsweep
+
+        # engine pod inertia relief
+        loc = np.where(integration_stations < engine_location)[0]
+        delme = np.zeros(len(dy))
+        delme[loc[:-1]] = dy[loc[:-1]]
+        delme[loc[-1]] = engine_location - integration_stations[loc[-1]]
+
+        eem = np.cumsum((delme * csw)[::-1])[::-1]
+        bte = 8 * np.sum(weights * eem * csw * inv_area)
+
+        dbte_dinv_area = 8 * weights * eem * csw
+        dbte_dchord_int = np.zeros(len(integration_stations))
+        dbte_dchord_int[:-1] -= dbte_dinv_area * inv_area / chord_int[:-1]
+        dbte_dtc_int = np.zeros(len(integration_stations))
+        dbte_dtc_int[:-1] -= dbte_dinv_area * inv_area / tc_int[:-1]
+        dbte_dcsw = 8 * (weights * eem * inv_area + dint_dmoment * delme)
+        dbte_dsweep = (dbte_dcsw * dcsw_dsweep) @ sweep_map[:-1]
+        dbte_dlocation = 8 * dint_dmoment[loc[-1]] * csw[loc[-1]]
+
+        dfact_dbte = -pod_mass / (bt * gross_mass)
+        dfact_dbt = bte * pod_mass / (bt**2 * gross_mass)
+
+        dfact_dchord_int = dfact_dbte * dbte_dchord_int + dfact_dbt * dbt_dchord_int
+        dfact_dtc_int = dfact_dbte * dbte_dtc_int + dfact_dbt * dbt_dtc_int
+
+        for of, dval_dchord_int, dval_dtc_int, dval_dbt in (
+            (Aircraft.Wing.BENDING_FACTOR, dbt_dchord_int, dbt_dtc_int, 1.0),
+            (Aircraft.Wing.ENG_POD_INERTIA_FACTOR, dfact_dchord_int, dfact_dtc_int,
+             dfact_dbt),
+        ):
+            dval_dchord_scale = dval_dchord_int @ chord_int_stations
+            dval_dtc_scale = dval_dtc_int @ tc_int_stations
+
+            J[of, Aircraft.Wing.CHORD_PER_SEMISPAN_DIST] = \
+                chord_scale * dval_dchord_int @ interp_weights
+            J[of, Aircraft.Wing.THICKNESS_TO_CHORD_DIST] = \
+                tc_scale * dval_dtc_int @ interp_weights
+            J[of, Aircraft.Wing.ASPECT_RATIO] = \
+                dval_dchord_scale * dchord_scale_dar + \
+                dval_dbt * dbt_ddenom * ddenom_dar
+            J[of, Aircraft.Wing.ASPECT_RATIO_REF] = \
+                dval_dchord_scale * dchord_scale_darref
+            J[of, Aircraft.Wing.THICKNESS_TO_CHORD] = dval_dtc_scale * dtc_scale_dtc
+            J[of, Aircraft.Wing.THICKNESS_TO_CHORD_REF] = \
+                dval_dtc_scale * dtc_scale_dtcref
+            J[of, Aircraft.Wing.STRUT_BRACING_FACTOR] = \
+                dval_dbt * dbt_ddenom * ddenom_dfstrt
+            J[of, Aircraft.Wing.AEROELASTIC_TAILORING_FACTOR] = \
+                dval_dbt * dbt_ddenom * ddenom_dfaert
+
+        J[Aircraft.Wing.BENDING_FACTOR, Aircraft.Wing.LOAD_PATH_SWEEP_DIST] = \
+            dbt_dsweep
+        J[Aircraft.Wing.ENG_POD_INERTIA_FACTOR, Aircraft.Wing.LOAD_PATH_SWEEP_DIST] = \
+            dfact_dbte * dbte_dsweep + dfact_dbt * dbt_dsweep
+
+        J[Aircraft.Wing.ENG_POD_INERTIA_FACTOR, Mission.Design.GROSS_MASS] = \
+            bte * pod_mass / (bt * gross_mass**2)
+
+        dfact_dpod_mass = np.zeros(num_engine_models)
+        dfact_dpod_mass[pod_index[engine_index]] = -bte / (bt * gross_mass)
+        J[Aircraft.Wing.ENG_POD_INERTIA_FACTOR, Aircraft.Engine.POD_MASS] = \
+            dfact_dpod_mass
+
+        dfact_dlocation = np.zeros(len(engine_locations))
+        dfact_dlocation[engine_index] = dfact_dbte * dbte_dlocation
+        J[Aircraft.Wing.ENG_POD_INERTIA_FACTOR, Aircraft.Engine.WING_LOCATIONS] = \
+            dfact_dlocation
+
+    def _get_load_intensity(self):
+        aviary_options: AviaryValues = self.options['aviary_options']
+        integration_stations = self._integration_stations
+
+        # TODO: Support all options for this parameter.
+        # 0.0 : input distribution
+        # 1.0 : triangular distribution
+        # 2.0 : elliptical distribution (default)
+        # 3.0 : rectangular distribution
+        # 1.0-2.0 : blend of triangular and elliptical
+        # 2.0-3.0 : blend of elliptical and rectangular
+        load_distribution_factor = \
+            aviary_options.get_val(Aircraft.Wing.LOAD_DISTRIBUTION_CONTROL)
+
+        # TODO: add all load_distribution_factor options
+        if load_distribution_factor == 1:
+            load_intensity = 1.0 - integration_stations
+        elif load_distribution_factor == 2:
+            load_intensity = np.sqrt(1.0 - integration_stations ** 2)
+        elif load_distribution_factor == 3:
+            load_intensity = np.ones(len(integration_stations))
+        else:
+            raise om.AnalysisError(
+                f'{load_distribution_factor} is not a valid value for {Aircraft.Wing.LOAD_DISTRIBUTION_CONTROL}, it must be "1", "2", or "3".')
+
+        return load_intensity
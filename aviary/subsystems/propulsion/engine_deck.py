@@ -22,8 +22,16 @@ dependent_options : dict
     provided options.
 """
 
+import copy
+import hashlib
+import json
 import math
+import os
+import tempfile
 import warnings
+import zipfile
+
+from pathlib import Path
 
 import numpy as np
 import openmdao.api as om
@@ -34,7 +42,10 @@ from openmdao.utils.units import convert_units
 from aviary.subsystems.propulsion.engine_model import EngineModel
 from aviary.subsystems.propulsion.engine_scaling import EngineScaling
 from aviary.subsystems.propulsion.engine_sizing import SizeEngine
+from aviary.subsystems.propulsion.throttle_lookup import ThrottleLookup
 from aviary.subsystems.propulsion.utils import (EngineModelVariables,
+                                                SharedTableMetaModelComp,
+                                                build_interpolation_table,
                                                 convert_geopotential_altitude,
                                                 default_units)
 from aviary.utils.aviary_values import AviaryValues, NamedValues, get_keys, get_items
@@ -42,6 +53,7 @@ from aviary.variable_info.variable_meta_data import _MetaData
 from aviary.variable_info.variables import Aircraft, Dynamic, Mission, Settings
 from aviary.variable_info.enums import Verbosity
 from aviary.utils.csv_data_file import read_data_file
+from aviary.utils.functions import get_path
 from aviary.interface.utils.markdown_utils import round_it
 
 
@@ -109,6 +121,20 @@ dependent_options = {
                                            Aircraft.Engine.FLIGHT_IDLE_MAX_FRACTION,)
 }
 
+# options that change the processed engine data, and therefore the cached tables
+cached_data_options = (
+    Aircraft.Engine.GEOPOTENTIAL_ALT,
+    Aircraft.Engine.IGNORE_NEGATIVE_THRUST,
+    Aircraft.Engine.GENERATE_FLIGHT_IDLE,
+    Aircraft.Engine.FLIGHT_IDLE_THRUST_FRACTION,
+    Aircraft.Engine.FLIGHT_IDLE_MIN_FRACTION,
+    Aircraft.Engine.FLIGHT_IDLE_MAX_FRACTION,
+)
+
+# bump when the processing of engine data or the layout of cache files changes, so
+# existing cache files are no longer used
+CACHE_VERSION = 1
+
 
 class EngineDeck(EngineModel):
     """
@@ -306,7 +332,18 @@ class EngineDeck(EngineModel):
             Normalize throttles/hybrid throttles.
 
             Fill flight idle points.
+
+            Build interpolation tables shared by all mission ODEs.
+
+        If Aircraft.Engine.DATA_CACHE_DIR is provided, the processed data of a deck read
+        from a data file is stored there, and loaded instead of processing the file again
+        as long as neither the file nor the relevant options have changed.
         """
+        cache_file = self._get_cache_file()
+        if cache_file is not None and self._load_cache(cache_file):
+            self._build_interpolation_tables()
+            return
+
         self._read_data(data)
 
         # perform consistency checks on data
@@ -331,6 +368,359 @@ class EngineDeck(EngineModel):
         if self.get_val(Aircraft.Engine.GENERATE_FLIGHT_IDLE):
             self._generate_flight_idle()
 
+        if cache_file is not None:
+            self._save_cache(cache_file)
+
+        self._build_interpolation_tables()
+
+    def _get_cache_file(self):
+        """
+        Return the path of the cache file for this EngineDeck's processed data, or None
+        if processed data is not cached.
+
+        The file name contains a hash of the contents of the data file, the options that
+        affect data processing and the required variables, so a changed data file or
+        option is never served from an out-of-date cache file.
+        """
+        cache_dir = self.get_item(Aircraft.Engine.DATA_CACHE_DIR)[0]
+        if not self.read_from_file or cache_dir is None:
+            return None
+
+        data_file = get_path(self.get_val(Aircraft.Engine.DATA_FILE))
+
+        file_hash = hashlib.sha256()
+        with open(data_file, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                file_hash.update(chunk)
+
+        key = {'version': CACHE_VERSION,
+               'file': file_hash.hexdigest(),
+               'required_variables': sorted(var.name for var in self.required_variables),
+               'options': {}}
+        for option in cached_data_options:
+            val = self.get_item(option)[0]
+            if isinstance(val, np.ndarray):
+                val = val.tolist()
+            key['options'][option] = val
+
+        key_hash = hashlib.sha256(
+            json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+        return Path(cache_dir) / f'{data_file.stem}_{key_hash[:16]}.npz'
+
+    def _save_cache(self, cache_file):
+        """
+        Save processed engine data to cache_file, an uncompressed .npz file. The file is
+        written to a temporary file first and then moved into place, so concurrent runs
+        sharing a cache directory never read a partially written file.
+        """
+        arrays = {}
+        for key, val in self._original_data.items():
+            name = key.name if isinstance(key, EngineModelVariables) else key
+            arrays['original:' + name] = val
+        for key, val in self.data.items():
+            arrays['data:' + key.name] = val
+        for key, val in self.packed_data.items():
+            arrays['packed_data:' + key.name] = val
+
+        for attr in ('model_length', 'mach_max_count', 'alt_max_count',
+                     'data_max_count', 'data_indices', 'throttle_min', 'throttle_max',
+                     'hybrid_throttle_min', 'hybrid_throttle_max'):
+            arrays['attr:' + attr] = np.asarray(getattr(self, attr))
+
+        arrays['engine_variables'] = np.array(json.dumps(
+            {key.name: units for key, units in self.engine_variables.items()}))
+
+        if self.use_thrust:
+            arrays['reference_sls_thrust'] = np.asarray(
+                self.get_val(Aircraft.Engine.REFERENCE_SLS_THRUST, 'lbf'))
+
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                np.savez(file, **arrays)
+            os.replace(tmp_name, cache_file)
+        except BaseException:
+            os.remove(tmp_name)
+            raise
+
+    def _load_cache(self, cache_file):
+        """
+        Load processed engine data from cache_file.
+
+        Returns
+        -------
+        bool
+            True if cached data was loaded, False if cache_file does not exist or could
+            not be read.
+        """
+        try:
+            with np.load(cache_file, allow_pickle=False) as cached:
+                arrays = {name: cached[name] for name in cached.files}
+        except (OSError, ValueError, zipfile.BadZipFile):
+            return False
+
+        original_data = {key: np.array([]) for key in EngineModelVariables}
+        data = {}
+        packed_data = {}
+        for name, val in arrays.items():
+            group, _, key = name.partition(':')
+            if group == 'original':
+                original_data[EngineModelVariables.__members__.get(key, key)] = val
+            elif group == 'data':
+                data[EngineModelVariables[key]] = val
+            elif group == 'packed_data':
+                packed_data[EngineModelVariables[key]] = val
+            elif group == 'attr':
+                setattr(self, key, val.item() if val.ndim == 0 else val)
+
+        self._original_data = original_data
+        self.data = data
+        self.packed_data = packed_data
+
+        self.engine_variables = {
+            EngineModelVariables[key]: units
+            for key, units in json.loads(str(arrays['engine_variables'])).items()}
+        self._set_variable_flags()
+
+        if self.use_thrust:
+            if Aircraft.Engine.REFERENCE_SLS_THRUST not in get_keys(self.options):
+                self.set_val(Aircraft.Engine.REFERENCE_SLS_THRUST,
+                             arrays['reference_sls_thrust'].item(), units='lbf')
+            # reference thrust is already known, only updates scaling options
+            self._set_reference_thrust()
+
+        return True
+
+    def _build_interpolation_tables(self):
+        """
+        Build the interpolation tables for the processed engine data. Tables are stored
+        in self.interp_tables, keyed by the name of the interpolation component in
+        build_mission() and then by output name. They do not depend on num_nodes, so the
+        same tables are shared by reference between every ODE and phase that this
+        EngineDeck is added to.
+
+        Requires processed (packed, normalized) data.
+        """
+        interp_method = self.get_item(Aircraft.Engine.INTERPOLATION_METHOD)[0]
+        if interp_method is None:
+            interp_method = _MetaData[Aircraft.Engine.INTERPOLATION_METHOD]['default_value']
+        data = self.data
+
+        training_inputs = [data[MACH], data[ALTITUDE], data[THROTTLE]]
+        if self.use_hybrid_throttle:
+            training_inputs.append(data[HYBRID_THROTTLE])
+
+        outputs = {'thrust_net_unscaled': THRUST,
+                   'fuel_flow_rate_unscaled': FUEL_FLOW,
+                   'electric_power_unscaled': ELECTRIC_POWER,
+                   'nox_rate_unscaled': NOX_RATE}
+        if self.use_shaft_power:
+            if SHAFT_POWER in self.engine_variables:
+                outputs['shaft_power_unscaled'] = SHAFT_POWER
+            else:
+                outputs['shaft_power_corrected_unscaled'] = SHAFT_POWER_CORRECTED
+        if self.use_t4:
+            outputs[Dynamic.Mission.TEMPERATURE_ENGINE_T4] = TEMPERATURE
+
+        engine_tables = {}
+        for name in outputs:
+            engine_tables[name] = build_interpolation_table(
+                training_inputs, data[outputs[name]], method=interp_method,
+                extrapolate=True)
+
+        interp_tables = self.interp_tables = {'interpolation': engine_tables}
+        self._interp_tables_method = interp_method
+
+        if not self.use_thrust:
+            # unscaled max thrust is a default (zero) output of the main interpolator
+            engine_tables['thrust_net_max_unscaled'] = engine_tables['thrust_net_unscaled']
+            return
+
+        # max thrust uses the same table as net thrust, only without extrapolation. A
+        # shallow copy shares the underlying table data instead of regenerating it
+        max_thrust_table = copy.copy(engine_tables['thrust_net_unscaled'])
+        max_thrust_table.extrapolate = False
+        interp_tables['max_thrust_interpolation'] = {
+            'thrust_net_max_unscaled': max_thrust_table}
+
+        if not (self.global_throttle or (self.global_hybrid_throttle
+                                         and self.use_hybrid_throttle)):
+            packed_data = self.packed_data
+            flight_conditions = np.nonzero(self.data_indices)
+            mach_table = packed_data[MACH][flight_conditions][:, 0]
+            alt_table = packed_data[ALTITUDE][flight_conditions][:, 0]
+
+            throttle_tables = interp_tables['interp_max_throttles'] = {}
+            if not self.global_throttle:
+                throttle_tables['throttle_max'] = build_interpolation_table(
+                    [mach_table, alt_table], self.throttle_max, method=interp_method,
+                    extrapolate=False)
+            if not self.global_hybrid_throttle and self.use_hybrid_throttle:
+                throttle_tables['hybrid_throttle_max'] = build_interpolation_table(
+                    [mach_table, alt_table], self.hybrid_throttle_max,
+                    method=interp_method, extrapolate=False)
+
+        if self.get_item(Aircraft.Engine.PRECOMPUTE_MAX_THRUST)[0]:
+            self._build_max_thrust_envelope()
+
+        if self.get_item(Aircraft.Engine.PRECOMPUTE_INVERSE_THRUST)[0]:
+            self._build_inverse_thrust_table()
+
+    def _build_max_thrust_envelope(self):
+        """
+        Precompute max throttle, max hybrid throttle (if used) and max thrust at every
+        flight condition (Mach, altitude pair) in the engine data, and build reduced
+        interpolation tables from them. Used instead of the duplicate full-deck max
+        thrust interpolator when Aircraft.Engine.PRECOMPUTE_MAX_THRUST is True.
+
+        Max thrust is evaluated with the engine's own thrust table, and flight conditions
+        are grouped the same way as in that table. With global max throttles (the
+        default), interpolating the envelope therefore gives the same result as
+        interpolating the full deck at max throttle. If max throttles vary by flight
+        condition, the full deck is evaluated at an interpolated max throttle, which
+        the envelope only reproduces at the flight conditions in the engine data;
+        between them the two differ by interpolation error.
+
+        Requires the interpolation tables built by _build_interpolation_tables().
+        """
+        interp_tables = self.interp_tables
+        interp_method = self._interp_tables_method
+
+        flight_conditions = np.unique(
+            np.column_stack((self.data[MACH], self.data[ALTITUDE])), axis=0)
+        mach_table, alt_table = flight_conditions.T
+        num_points = len(mach_table)
+
+        envelope = self.max_thrust_envelope = {MACH: mach_table, ALTITUDE: alt_table}
+
+        if self.global_throttle:
+            envelope[THROTTLE] = np.full(num_points, self.throttle_max, dtype=float)
+        else:
+            envelope[THROTTLE] = interp_tables['interp_max_throttles'][
+                'throttle_max']._interpolate(flight_conditions)
+        max_throttles = [envelope[THROTTLE]]
+
+        if self.use_hybrid_throttle:
+            if self.global_hybrid_throttle:
+                envelope[HYBRID_THROTTLE] = np.full(num_points,
+                                                    self.hybrid_throttle_max,
+                                                    dtype=float)
+            else:
+                envelope[HYBRID_THROTTLE] = interp_tables['interp_max_throttles'][
+                    'hybrid_throttle_max']._interpolate(flight_conditions)
+            max_throttles.append(envelope[HYBRID_THROTTLE])
+
+        thrust_table = interp_tables['interpolation']['thrust_net_unscaled']
+        envelope[THRUST] = thrust_table._interpolate(
+            np.column_stack((flight_conditions, *max_throttles)))
+
+        envelope_tables = interp_tables['max_thrust_envelope'] = {}
+        envelope_tables['thrust_net_max_unscaled'] = build_interpolation_table(
+            [mach_table, alt_table], envelope[THRUST], method=interp_method,
+            extrapolate=False)
+        envelope_tables['throttle_max'] = build_interpolation_table(
+            [mach_table, alt_table], envelope[THROTTLE], method=interp_method,
+            extrapolate=False)
+        if self.use_hybrid_throttle:
+            envelope_tables['hybrid_throttle_max'] = build_interpolation_table(
+                [mach_table, alt_table], envelope[HYBRID_THROTTLE],
+                method=interp_method, extrapolate=False)
+
+    def _build_inverse_thrust_table(self):
+        """
+        Build a table of throttle as a function of Mach, altitude and net thrust, used
+        when Aircraft.Engine.PRECOMPUTE_INVERSE_THRUST is True to look up the throttle
+        that produces a required thrust instead of solving for it.
+
+        At every flight condition in the engine data, the engine's own thrust table is
+        evaluated along the throttle points of that flight condition (refined between
+        them for interpolation methods that are not piecewise linear). Points where
+        thrust does not increase with throttle are dropped, so that the inverse is
+        monotone. Flight conditions are grouped the same way as in the thrust table, so
+        at those flight conditions the inverse of a 'slinear' table is exact.
+
+        Requires the interpolation tables built by _build_interpolation_tables().
+        """
+        if self.use_hybrid_throttle:
+            if self.get_val(Settings.VERBOSITY).value >= 1:
+                warnings.warn(f'EngineDeck <{self.name}>: an inverse thrust table '
+                              'cannot be built for engines that use hybrid throttle')
+            return
+
+        interp_method = self._interp_tables_method
+        thrust_table = self.interp_tables['interpolation']['thrust_net_unscaled']
+        refinement = 1 if interp_method == 'slinear' else 4
+
+        data = self.data
+        flight_conditions = np.column_stack((data[MACH], data[ALTITUDE]))
+        # data is sorted by Mach, altitude and throttle
+        _, starts = np.unique(flight_conditions, axis=0, return_index=True)
+        ends = np.append(starts[1:], len(data[MACH]))
+
+        inverse_data = {MACH: [], ALTITUDE: [], THRUST: [], THROTTLE: []}
+        for start, end in zip(starts, ends):
+            throttles = data[THROTTLE][start:end]
+            if len(throttles) < 2:
+                continue
+
+            if refinement > 1:
+                fractions = np.linspace(0., 1., refinement + 1)[:-1]
+                throttles = np.append(
+                    (throttles[:-1, np.newaxis] +
+                     np.diff(throttles)[:, np.newaxis] * fractions).ravel(),
+                    throttles[-1])
+
+            points = np.column_stack((np.tile(flight_conditions[start], (len(throttles), 1)),
+                                      throttles))
+            thrusts = thrust_table._interpolate(points)
+
+            # keep the points where thrust is higher than at every lower throttle
+            monotone = np.append(True, thrusts[1:] > np.maximum.accumulate(thrusts)[:-1])
+            if np.count_nonzero(monotone) < 2:
+                continue
+
+            num_points = np.count_nonzero(monotone)
+            inverse_data[MACH].append(np.full(num_points, flight_conditions[start, 0]))
+            inverse_data[ALTITUDE].append(np.full(num_points,
+                                                  flight_conditions[start, 1]))
+            inverse_data[THRUST].append(thrusts[monotone])
+            inverse_data[THROTTLE].append(throttles[monotone])
+
+        inverse_data = self.inverse_thrust_data = {
+            key: np.concatenate(val) for key, val in inverse_data.items()}
+
+        self.interp_tables['inverse_thrust'] = {
+            Dynamic.Mission.THROTTLE: build_interpolation_table(
+                [inverse_data[MACH], inverse_data[ALTITUDE], inverse_data[THRUST]],
+                inverse_data[THROTTLE], method=interp_method, extrapolate=True)}
+
+    def build_throttle_lookup(self, num_nodes):
+        """
+        Return a component that looks up the throttle that produces a required total
+        thrust from all engines of this EngineDeck, or None if this EngineDeck does not
+        have an inverse thrust table (see Aircraft.Engine.PRECOMPUTE_INVERSE_THRUST).
+
+        Parameters
+        ----------
+        num_nodes : int
+            Number of nodes present in the current mission segment.
+
+        Returns
+        -------
+        ThrottleLookup
+            Component with inputs Mach, altitude, required_thrust and
+            Aircraft.Engine.SCALE_FACTOR, and output throttle.
+        """
+        if 'inverse_thrust' not in self.interp_tables:
+            return None
+
+        return ThrottleLookup(
+            num_nodes=num_nodes, aviary_options=self.options,
+            throttle_interp=self.interp_tables['inverse_thrust'][Dynamic.Mission.THROTTLE],
+            thrust_interp=self.interp_tables['interpolation']['thrust_net_unscaled'])
+
     def _read_data(self, raw_data: NamedValues):
         """
         Import tabular engine data; either from memory or from a data file.
@@ -387,8 +777,8 @@ class EngineDeck(EngineModel):
                 # Convert data to expected units. Required so settings like tolerances
                 # that assume units work as expected
                 try:
-                    val = np.array([convert_units(i, units, default_units[key])
-                                   for i in val])
+                    val = convert_units(np.array(val, dtype=float), units,
+                                        default_units[key])
                 except TypeError:
                     raise TypeError(f"{message}: units of '{units}' provided for "
                                     f'<{key.name}> are not compatible with expected units '
@@ -543,32 +933,6 @@ class EngineDeck(EngineModel):
 
         Modifies unpacked data in place, updates packed data.
         """
-        def _extrapolate(array):
-            """
-            Linearly extrapolate variable to idle thrust point.
-
-            Parameters
-            ----------
-            array : numpy.ndarray
-                Data used for extrapolation.
-
-            Returns
-            -------
-            rvalue : float
-                Extrapolated flight idle value.
-            """
-            y0 = array[0]
-            y1 = array[1]
-
-            if y0 == 0 and y1 == 0:
-                return 0
-
-            rvalue = (
-                y0 + (y1 - y0) * extrap_term
-            )
-
-            return rvalue
-
         idle_thrust_fract = self.get_val(Aircraft.Engine.FLIGHT_IDLE_THRUST_FRACTION)
         idle_min_fract = self.get_val(Aircraft.Engine.FLIGHT_IDLE_MIN_FRACTION)
         idle_max_fract = self.get_val(Aircraft.Engine.FLIGHT_IDLE_MAX_FRACTION)
@@ -584,11 +948,6 @@ class EngineDeck(EngineModel):
         if SHAFT_POWER in self.engine_variables:
             direct_calc_vars.append(SHAFT_POWER)
 
-        # stored information about packed data
-        mach_max_count = self.mach_max_count
-        alt_max_count = self.alt_max_count
-        data_indices = self.data_indices
-
         # Throttle is already normalized from 0 to 1. Set flight idle to -0.1, which will
         # get re-normalized to 0
         # -0.1 is chosen to avoid stretching out the data range while at the same time
@@ -597,8 +956,6 @@ class EngineDeck(EngineModel):
         throttle_idle = -0.1
         hybrid_throttle_idle = 0
 
-        idle_points = {key: np.empty(0) for key in packed_data}
-
         # Normally, only one idle point is needed - however, when hybrid throttle is
         # present, there needs to be a sweep of points for a given Mach/alt/throttle
         # to satisfy the interpolator's requirements for at least 3 points per dimension
@@ -611,111 +968,91 @@ class EngineDeck(EngineModel):
             # This time, we want an arbitrarily small number
             h_tol = 1e-4
 
-        for M in range(mach_max_count):
-            for A in range(alt_max_count):
-                # if no data at this Mach, alt index combination, skip
-                if data_indices[M, A] == 0:
-                    continue
+        # all Mach, alt index combinations with data, in the same order as the data
+        mach_idx, alt_idx = np.nonzero(self.data_indices)
+        data_indices = self.data_indices[mach_idx, alt_idx]
+
+        # don't generate flight idle points if thrust is already zero or negative at
+        # lowest index
+        keep = packed_data[THRUST][mach_idx, alt_idx, 0] > self.thrust_tol
+        mach_idx = mach_idx[keep]
+        alt_idx = alt_idx[keep]
+        data_indices = data_indices[keep]
+
+        # packed data at the given data index for each flight condition
+        def _packed_points(key, index):
+            return packed_data[key][mach_idx, alt_idx, index]
+
+        # if there is only one data point at a Mach, alt combination, use thrust fraction
+        # instead of extrapolation
+        # TODO idle currently calculated using lowest index data points - this is not
+        #      guaranteed to be at hybrid throttle idle point, could be negative
+        single_point = data_indices == 1
+
+        idle_values = {}
+
+        # define known data for idle point (independent variables)
+        idle_values[MACH] = _packed_points(MACH, 0)
+        idle_values[ALTITUDE] = _packed_points(ALTITUDE, 0)
+        idle_values[THROTTLE] = np.full(len(mach_idx), throttle_idle, dtype=float)
+
+        # calculate idle thrust, shaft powers as a percentage of max thrust at Mach, alt
+        # point. These do not get idle_min/max checks
+        for var in direct_calc_vars:
+            idle_calc_value = _packed_points(var, data_indices - 1) * idle_thrust_fract
+            idle_values[var] = idle_calc_value
+
+            # Calculate term for linear extrapolation - shaft power has highest
+            # "preference" since it is last in the list, followed by corrected
+            # shaft power then finally thrust. This is designed for compatibility
+            # with turboshaft engine decks in TurbopropModels.
+            # Only one extrapolation term can be used for all dependent vars
+            # Not used for flight conditions with a single data point
+            with np.errstate(divide='ignore', invalid='ignore'):
+                extrap_term = (idle_calc_value - _packed_points(var, 0)) / (
+                    _packed_points(var, 1) - _packed_points(var, 0))
+
+        # compute idle data
+        for key in packed_data:
+            # skip independent variables or thrust, which is already calculated
+            if key in [MACH, ALTITUDE, THROTTLE, HYBRID_THROTTLE] + direct_calc_vars:
+                continue
 
-                # don't generate flight idle points if thrust is already zero or negative
-                # at lowest index
-                if packed_data[THRUST][M, A, 0] <= self.thrust_tol:
-                    continue
+            y0 = _packed_points(key, 0)
+            y1 = _packed_points(key, 1)
+
+            # extrapolate to idle from lowest two throttle points in data
+            with np.errstate(invalid='ignore'):
+                extrapolated = np.where((y0 == 0) & (y1 == 0), 0.,
+                                        y0 + (y1 - y0) * extrap_term)
+            idle_value = np.where(single_point, y0 * idle_thrust_fract, extrapolated)
+
+            # idle cannot be below or above user-set limits
+            var_min = _packed_points(key, -1) * idle_min_fract
+            var_max = _packed_points(key, -1) * idle_max_fract
 
-                # define known data for idle point (independent variables)
-                idle_points[MACH] = np.append(
-                    idle_points[MACH], [packed_data[MACH][M, A, 0]] * num_points)
-                idle_points[ALTITUDE] = np.append(
-                    idle_points[ALTITUDE], [packed_data[ALTITUDE][M, A, 0]] * num_points)
-                idle_points[THROTTLE] = np.append(
-                    idle_points[THROTTLE], [throttle_idle] * num_points)
+            idle_values[key] = np.where(idle_value < var_min, var_min,
+                                        np.where(idle_value > var_max, var_max,
+                                                 idle_value))
+
+        # expand each flight condition to num_points idle points
+        idle_points = {}
+        for key in packed_data:
+            if key == HYBRID_THROTTLE:
                 if self.use_hybrid_throttle:
                     hybrid_throttle_range = np.linspace(hybrid_throttle_idle-h_tol,
                                                         hybrid_throttle_idle+h_tol,
                                                         num_points)
-                    idle_points[HYBRID_THROTTLE] = np.append(
-                        idle_points[HYBRID_THROTTLE], hybrid_throttle_range)
+                    idle_points[key] = np.tile(hybrid_throttle_range, len(mach_idx))
                 else:
-                    idle_points[HYBRID_THROTTLE] = np.append(
-                        idle_points[HYBRID_THROTTLE], hybrid_throttle_idle)
-
-                # if there is only one data point at this Mach, alt combination, use
-                # thrust fraction instead of extrapolation
-                # TODO idle currently calculated using lowest index data points - this is not
-                #      guaranteed to be at hybrid throttle idle point, could be negative
-                if data_indices[M, A] == 1:
-                    for key in packed_data:
-                        if key not in [
-                                MACH,
-                                ALTITUDE,
-                                THROTTLE,
-                                HYBRID_THROTTLE] + direct_calc_vars:
-                            idle_value = packed_data[key][M, A, 0] * idle_thrust_fract
-                            var_min = packed_data[key][M, A, -1] * idle_min_fract
-                            var_max = packed_data[key][M, A, -1] * idle_max_fract
-
-                            if idle_value < var_min:
-                                idle_value = var_min
-                            elif idle_value > var_max:
-                                idle_value = var_max
-
-                            idle_points[key] = np.append(idle_points[key],
-                                                         [idle_value] * num_points)
-                            # add Mach, alt combination to idle_points with idle power
-                            # codes
-
-                    # thrust, shaft powers do not get idle_min/max checks
-                    for var in direct_calc_vars:
-                        idle_points[var] = np.append(idle_points[var],
-                                                     [[packed_data[var][M, A, 0]
-                                                       * idle_thrust_fract]] * num_points)
-                    # move to next data point
-                    continue
-
-                # calculate idle thrust, shaft powers as a percentage of max thrust at Mach, alt point
-                for var in direct_calc_vars:
-                    idle_calc_value = packed_data[var][M, A, data_indices[M, A] - 1]\
-                        * idle_thrust_fract
-
-                    # add this point to idle_points
-                    idle_points[var] = np.append(idle_points[var],
-                                                 [idle_calc_value] * num_points)
-
-                    # Calculate term for linear extrapolation - shaft power has highest
-                    # "preference" since it is last in the list, followed by corrected
-                    # shaft power then finally thrust. This is designed for compatibility
-                    # with turboshaft engine decks in TurbopropModels.
-                    # Only one extrapolation term can be used for all dependent vars
-                    extrap_term = (idle_calc_value - packed_data[var][M, A, 0]) / (
-                        packed_data[var][M, A, 1] - packed_data[var][M, A, 0])
-
-                # compute idle data
-                for key in packed_data:
-                    # skip independent variables or thrust, which is already calculated
-                    if key not in [
-                            MACH,
-                            ALTITUDE,
-                            THROTTLE,
-                            HYBRID_THROTTLE] + direct_calc_vars:
-                        # extrapolate to idle from lowest two throttle points in data
-                        idle_value = _extrapolate(packed_data[key][M, A])
-
-                        # idle cannot be below or above user-set limits
-                        var_min = packed_data[key][M, A, -1] * idle_min_fract
-                        var_max = packed_data[key][M, A, -1] * idle_max_fract
-
-                        if idle_value < var_min:
-                            idle_value = var_min
-                        elif idle_value > var_max:
-                            idle_value = var_max
-
-                        # store newly computed idle point
-                        idle_points[key] = np.append(idle_points[key],
-                                                     [idle_value] * num_points)
+                    idle_points[key] = np.full(len(mach_idx), hybrid_throttle_idle,
+                                               dtype=float)
+            else:
+                idle_points[key] = np.repeat(idle_values[key], num_points)
 
         # add idle points to data
         for key in packed_data:
-            self.data[key] = np.append(self.data[key], idle_points[key])
+            self.data[key] = np.concatenate((self.data[key], idle_points[key]))
 
         # update model length
         self.model_length = len(self.data[ALTITUDE])
@@ -746,11 +1083,19 @@ class EngineDeck(EngineModel):
         """
         Builds the OpenMDAO metamodel component for the engine deck.
         Currently only the semistructured model is supported.
+
+        The component evaluates the interpolation tables in self.interp_tables rather
+        than building its own.
         """
         interp_method = self.get_val(Aircraft.Engine.INTERPOLATION_METHOD)
+        # tables are rebuilt only if interpolation method was changed after setup
+        if interp_method != self._interp_tables_method:
+            self._build_interpolation_tables()
+
         # interpolator object for engine data
-        engine = om.MetaModelSemiStructuredComp(
-            method=interp_method, extrapolate=True, vec_size=num_nodes)
+        engine = SharedTableMetaModelComp(
+            method=interp_method, extrapolate=True, vec_size=num_nodes,
+            interps=self.interp_tables['interpolation'])
 
         units = default_units
         for key in self.engine_variables:
@@ -826,8 +1171,9 @@ class EngineDeck(EngineModel):
     def build_mission(self, num_nodes, aviary_inputs) -> om.Group:
         """
         Creates interpolator objects to be added to mission-level propulsion subsystem.
-        Interpolators must be re-generated for each ODE due to potentialy different
-        num_nodes in each mission segment.
+        Interpolator components must be re-generated for each ODE due to potentialy
+        different num_nodes in each mission segment, but all of them evaluate the same
+        interpolation tables, which are built once during EngineDeck setup.
 
         Parameters
         ----------
@@ -847,15 +1193,54 @@ class EngineDeck(EngineModel):
 
         engine = self._build_engine_interpolator(num_nodes, aviary_inputs)
         units = self.engine_variable_units
+        interp_tables = self.interp_tables
+
+        use_max_thrust_envelope = self.use_thrust and \
+            self.get_item(Aircraft.Engine.PRECOMPUTE_MAX_THRUST)[0]
 
         # Create copy of interpolation component that computes max thrust for current
         # flight condition
         # NOTE max thrust is assumed to occur at maximum throttle and hybrid throttle
         #      for each flight condition
         # TODO Use solver to find throttle/hybrid throttle for maximum thrust at given flight condition?
-        #      Pre-solve max throttle/hybrid throttle for each flight condition, interpolate on
-        #      reduced data set?
-        if self.use_thrust:
+        if use_max_thrust_envelope:
+            # interpolate on max thrust/throttles pre-solved at each flight condition
+            if 'max_thrust_envelope' not in interp_tables:
+                self._build_max_thrust_envelope()
+            envelope = self.max_thrust_envelope
+
+            max_thrust_envelope = SharedTableMetaModelComp(
+                method=interp_method, extrapolate=False, vec_size=num_nodes,
+                interps=interp_tables['max_thrust_envelope'])
+
+            max_thrust_envelope.add_input(Dynamic.Mission.MACH,
+                                          envelope[MACH],
+                                          units='unitless',
+                                          desc='Current flight Mach number')
+            max_thrust_envelope.add_input(Dynamic.Mission.ALTITUDE,
+                                          envelope[ALTITUDE],
+                                          units=units[ALTITUDE],
+                                          desc='Current flight altitude')
+            # global max throttles are constant, so they are not interpolated
+            if not self.global_throttle:
+                max_thrust_envelope.add_output('throttle_max',
+                                               envelope[THROTTLE],
+                                               units='unitless',
+                                               desc='max throttle avaliable at current '
+                                                    'flight condition')
+            if not self.global_hybrid_throttle and self.use_hybrid_throttle:
+                max_thrust_envelope.add_output('hybrid_throttle_max',
+                                               envelope[HYBRID_THROTTLE],
+                                               units='unitless',
+                                               desc='max hybrid throttle avaliable at '
+                                                    'current flight condition')
+            max_thrust_envelope.add_output('thrust_net_max_unscaled',
+                                           envelope[THRUST],
+                                           units=units[THRUST],
+                                           desc='Current max net thrust produced '
+                                                '(unscaled)')
+
+        elif self.use_thrust:
             if self.global_throttle or (self.global_hybrid_throttle
                                         and self.use_hybrid_throttle):
                 # create IndepVarComp to pass maximum throttle is to max thrust interpolator
@@ -874,21 +1259,14 @@ class EngineDeck(EngineModel):
                                                desc='Engine maximum hybrid throttle')
             if not (self.global_throttle or (self.global_hybrid_throttle
                                              and self.use_hybrid_throttle)):
-                interp_throttles = om.MetaModelSemiStructuredComp(method=interp_method,
-                                                                  extrapolate=False,
-                                                                  vec_size=num_nodes)
+                interp_throttles = SharedTableMetaModelComp(
+                    method=interp_method, extrapolate=False, vec_size=num_nodes,
+                    interps=interp_tables['interp_max_throttles'])
 
                 packed_data = self.packed_data
-                mach_table = np.array([])
-                alt_table = np.array([])
-
-                for M in range(self.mach_max_count):
-                    for A in range(self.alt_max_count):
-                        if self.data_indices[M, A] != 0:
-                            mach_table = np.append(
-                                mach_table, packed_data[MACH][M, A, 0])
-                            alt_table = np.append(
-                                alt_table, packed_data[ALTITUDE][M, A, 0])
+                flight_conditions = np.nonzero(self.data_indices)
+                mach_table = packed_data[MACH][flight_conditions][:, 0]
+                alt_table = packed_data[ALTITUDE][flight_conditions][:, 0]
 
                 # add inputs and outputs to interpolator
                 interp_throttles.add_input(Dynamic.Mission.MACH,
@@ -913,9 +1291,10 @@ class EngineDeck(EngineModel):
                                                      'current flight condition')
 
             # Calculation of max thrust currently done with a duplicate of the engine
-            # model and scaling components
-            max_thrust_engine = om.MetaModelSemiStructuredComp(
-                method=interp_method, extrapolate=False, vec_size=num_nodes)
+            # model and scaling components (sharing the engine's thrust table)
+            max_thrust_engine = SharedTableMetaModelComp(
+                method=interp_method, extrapolate=False, vec_size=num_nodes,
+                interps=interp_tables['max_thrust_interpolation'])
 
             max_thrust_engine.add_input(Dynamic.Mission.MACH,
                                         self.data[MACH],
@@ -956,7 +1335,13 @@ class EngineDeck(EngineModel):
                                    engine,
                                    promotes_inputs=['*'],
                                    promotes_outputs=['*'])
-        if self.use_thrust:
+        if use_max_thrust_envelope:
+            engine_group.add_subsystem('max_thrust_envelope',
+                                       max_thrust_envelope,
+                                       promotes_inputs=['*'],
+                                       promotes_outputs=['*'])
+
+        elif self.use_thrust:
             if self.global_throttle or (self.global_hybrid_throttle
                                         and self.use_hybrid_throttle):
                 engine_group.add_subsystem('fixed_max_throttles',
@@ -1250,8 +1635,8 @@ class EngineDeck(EngineModel):
         # store normalized throttle data
         if self.global_throttle:
             self.data[THROTTLE] = normalize(self.data[THROTTLE])
-            self.throttle_min = min(self.data[THROTTLE])
-            self.throttle_max = max(self.data[THROTTLE])
+            self.throttle_min = np.min(self.data[THROTTLE])
+            self.throttle_max = np.max(self.data[THROTTLE])
         else:
             self.data[THROTTLE] = normalized_throttle
             self.throttle_min = throttle_min
@@ -1262,8 +1647,8 @@ class EngineDeck(EngineModel):
             if self.global_hybrid_throttle:
                 norm_hybrid_throttle = _hybrid_throttle_norm(self.data[HYBRID_THROTTLE])
 
-                self.hybrid_throttle_min = min(self.data[HYBRID_THROTTLE])
-                self.hybrid_throttle_max = max(self.data[HYBRID_THROTTLE])
+                self.hybrid_throttle_min = np.min(self.data[HYBRID_THROTTLE])
+                self.hybrid_throttle_max = np.max(self.data[HYBRID_THROTTLE])
                 self.data[HYBRID_THROTTLE] = norm_hybrid_throttle
             else:
                 self.data[HYBRID_THROTTLE] = normalized_hybrid_throttle
@@ -1306,95 +1691,79 @@ class EngineDeck(EngineModel):
         """
         # method requires sorted data
         self._sort_data()
-        # get updated data count
-        self._count_data()
+        # get updated data count, and where each data point goes in the packed arrays
+        mach_idx, alt_idx, point_idx = self._count_data()
 
-        mach_max_count = self.mach_max_count
-        alt_max_count = self.alt_max_count
-        data_max_count = self.data_max_count
-        data_indices = self.data_indices
+        shape = (self.mach_max_count, self.alt_max_count, self.data_max_count)
+        packed_idx = np.ravel_multi_index((mach_idx, alt_idx, point_idx), shape)
 
         packed_data = self.packed_data = {}
-        idx = 0
 
         for key in self.data:
-            packed_data[key] = np.zeros((mach_max_count, alt_max_count, data_max_count))
-
-        for M in range(mach_max_count):
-
-            for A in range(alt_max_count):
-                if data_indices[M, A] == 0:
-                    # skip point if there is no data
-                    continue
-
-                # number of data points is index+1
-                for D in range(data_indices[M, A] + 1):
-                    for key in self.data:
-                        unpacked_data = self.data[key]
-                        if idx < len(unpacked_data):
-                            packed_data[key][M, A, D] = unpacked_data[idx]
-                    idx += 1
+            packed_data[key] = np.zeros(np.prod(shape, dtype=int))
+            packed_data[key][packed_idx] = self.data[key]
+            packed_data[key] = packed_data[key].reshape(shape)
 
     def _count_data(self):
         """
         Count unique data entries in the engine data for each Mach, altitude combination.
         Requires that data is sorted.
 
+        Mach numbers (and altitudes for a given Mach number) within tolerance of the
+        first value of their group are counted as the same flight condition. Only rows
+        where the exact Mach, altitude pair changes can start a new flight condition, so
+        tolerances are only checked once per run of identical pairs instead of for every
+        data point.
+
+        Returns
+        -------
+        mach_idx : numpy.ndarray
+            Mach index of each data point in the packed data.
+        alt_idx : numpy.ndarray
+            Altitude index of each data point in the packed data.
+        point_idx : numpy.ndarray
+            Index of each data point within its flight condition in the packed data.
+
         Raises
         ------
         UserWarning
             If insufficient number of altitude points (<2) provided for a given Mach
             number.
         """
-        mach_count = 0
-        # First mach number must have at least one altitude associated with it
-        alt_count = 1
-        max_alt_count = 0
-        # First mach number must have at least one data point associated with it
-        data_count = 1
-        max_data_count = 0
+        mach_numbers = self.data[MACH]
+        altitudes = self.data[ALTITUDE]
+        model_length = len(mach_numbers)
 
-        # data_indices stores how many data points there are for a given Mach/alt combo
-        data_indices = np.array([[]])
+        # first row of each run of identical Mach, altitude pairs
+        new_run = np.ones(model_length, dtype=bool)
+        new_run[1:] = (mach_numbers[1:] != mach_numbers[:-1]) | \
+            (altitudes[1:] != altitudes[:-1])
+        run_starts = np.flatnonzero(new_run)
 
-        curr_mach = curr_alt = np.inf
+        run_mach_idx = np.empty(len(run_starts), dtype=int)
+        run_alt_idx = np.empty(len(run_starts), dtype=int)
 
-        mach_numbers = self.data[MACH]
-        altitudes = self.data[ALTITUDE]
+        mach_count = 0
+        alt_count = 0
+        curr_mach = curr_alt = np.inf
 
-        # Loop through data. Keep track of last unique value (curr_*) to compare each new
-        #   value with
-        # Count number of altitudes per mach, number of data points per
-        #   mach/altitude combination, compare with max_count
-        for idx in range(self.model_length):
+        # Keep track of last unique value (curr_*) to compare each new value with
+        for run, idx in enumerate(run_starts):
             mach_num = mach_numbers[idx]
             alt = altitudes[idx]
 
             if math.isclose(mach_num, curr_mach, abs_tol=self.mach_tol):
-
-                if math.isclose(alt, curr_alt, abs_tol=self.alt_tol):
-                    data_indices[mach_count - 1, alt_count - 1] = data_count
-                    data_count += 1
-
-                else:
+                if not math.isclose(alt, curr_alt, abs_tol=self.alt_tol):
                     # new altitude for this mach number, count it
                     curr_alt = alt
                     alt_count += 1
-                    data_indices = extend_array(data_indices, [mach_count, alt_count])
-
-                    if data_count > max_data_count:
-                        max_data_count = data_count
-                    # new altitude means reset data counter
-                    data_count = 1
-                    # count data associated with new altitude
-                    data_indices[mach_count - 1, alt_count - 1] = 1
 
             else:
                 # new Mach number
                 # if there are less than two altitudes for this Mach number, quit
                 if alt_count < 2 and mach_count > 0:
                     raise UserWarning('Only one altitude provided for Mach number '
-                                      f'{mach_numbers[mach_count]:6.3f} in engine data file '
+                                      f'{curr_mach:6.3f} in engine data file '
                                       f'<{self.get_val(Aircraft.Engine.DATA_FILE).name}>'
                                       )
 
@@ -1403,24 +1772,36 @@ class EngineDeck(EngineModel):
                 mach_count += 1
 
                 # new mach comes with new altitude, record and count it
-                if alt_count > max_alt_count:
-                    max_alt_count = alt_count
-                # new mach means reset altitude counter
                 curr_alt = alt
                 alt_count = 1
-                data_indices = extend_array(data_indices, [mach_count, alt_count])
 
-                if data_count > max_data_count:
-                    max_data_count = data_count
-                # new mach means reset data counter
-                data_count = 1
-                # count data associated with new altitude
-                data_indices[mach_count - 1, alt_count - 1] = 1
+            run_mach_idx[run] = mach_count - 1
+            run_alt_idx[run] = alt_count - 1
+
+        run_lengths = np.diff(run_starts, append=model_length)
+        mach_idx = np.repeat(run_mach_idx, run_lengths)
+        alt_idx = np.repeat(run_alt_idx, run_lengths)
+
+        max_alt_count = alt_idx.max(initial=-1) + 1
+
+        # number of data points for each Mach/alt combo. Data is sorted, so points of
+        # the same flight condition are contiguous
+        flat_idx = mach_idx * max_alt_count + alt_idx
+        data_counts = np.bincount(flat_idx, minlength=mach_count * max_alt_count)
+        group_starts = np.flatnonzero(np.diff(flat_idx, prepend=-1))
+        point_idx = np.arange(model_length) - np.repeat(
+            group_starts, np.diff(group_starts, append=model_length))
+
+        # data_indices stores the index of the last data point for a given Mach/alt
+        # combo, or 1 if there is only one data point (0 means there is no data)
+        data_indices = np.where(data_counts > 1, data_counts - 1, data_counts)
 
         self.mach_max_count = mach_count
         self.alt_max_count = max_alt_count
-        self.data_max_count = max_data_count
-        self.data_indices = data_indices.astype(int)
+        self.data_max_count = data_counts.max(initial=0)
+        self.data_indices = data_indices.reshape(mach_count, max_alt_count).astype(int)
+
+        return mach_idx, alt_idx, point_idx
 
 
 #####################
@@ -1455,51 +1836,10 @@ def normalize(base_list, maximum=None, minimum=None):
         Normalized data from base_list.
     """
     if maximum is None:
-        maximum = max(base_list)
+        maximum = np.max(base_list)
     if minimum is None:
-        minimum = min(base_list)
+        minimum = np.min(base_list)
 
-    norm_list = np.array([(x - minimum) / (maximum - minimum) for x in base_list])
+    norm_list = (np.asarray(base_list) - minimum) / (maximum - minimum)
 
     return norm_list
-
-
-def extend_array(inp_array, size):
-    """
-    Extends input array such that it is at least as large as the target size in
-    all dimensions. If input array is smaller in any dimension, extends input
-    array to match target size in that dimension. Works on arrays up to 3
-    dimensions. Returns copy of input array extended in required dimensions with newly
-    created points set to 0.
-
-    Parameters
-    ----------
-    inp_array : (list, numpy.ndarray)
-        Array that needs to be checked for expansion.
-    size : list
-        List containing desired minimum length of inp_array along each dimension.
-
-    Returns
-    -------
-    inp_array : numpy.ndarray
-        The provided array extended in the desired dimensions with with newly created
-        points set to 0.
-    """
-    # TODO may be built-in numpy functions that can replace this and support n dimensions
-    dims = np.array(np.shape(inp_array))
-    while size[0] > dims[0]:
-        inp_array = np.concatenate(
-            (inp_array, np.zeros((1, *dims[1:]))), 0)
-        dims[0] += 1
-    if len(dims) > 1:
-        while size[1] > dims[1]:
-            inp_array = np.concatenate(
-                (inp_array, np.zeros((dims[0], 1, *dims[2:]))), 1)
-            dims[1] += 1
-        if len(dims) > 2:
-            while size[2] > dims[2]:
-                inp_array = np.concatenate(
-                    (inp_array, np.zeros((*dims[:2], 1))), 2)
-                dims[2] += 1
-
-    return inp_array
@@ -238,6 +238,182 @@ def _biquad(T, i, xi, yi):
     return z, lmt
 
 
+def _interval_coeffs(x, x1, x2, x3, x4, ra, dra):
+    """
+    weights of the four table points used by _unint and _biquad, and their
+    derivatives with respect to x
+    """
+    rb = 1.0 - ra
+    drb = -dra
+    p1 = x2 - x1
+    p2 = x3 - x2
+    p3 = x4 - x3
+    p4 = p1 + p2
+    p5 = p2 + p3
+    d1 = x - x1
+    d2 = x - x2
+    d3 = x - x3
+    d4 = x - x4
+    c1 = ra/p1*d2/p4*d3
+    c2 = -ra/p1*d1/p2*d3 + rb/p2*d3/p5*d4
+    c3 = ra/p2*d1/p4*d2 - rb/p2*d2/p3*d4
+    c4 = rb/p5*d2/p3*d3
+    dc1 = dra/p1*d2/p4*d3 + ra/p1/p4*(d2 + d3)
+    dc2 = -dra/p1*d1/p2*d3 - ra/p1/p2*(d1 + d3) + \
+        drb/p2*d3/p5*d4 + rb/p2/p5*(d3 + d4)
+    dc3 = dra/p2*d1/p4*d2 + ra/p2/p4*(d1 + d2) - \
+        drb/p2*d2/p3*d4 - rb/p2/p3*(d2 + d4)
+    dc4 = drb/p5*d2/p3*d3 + rb/p5/p3*(d2 + d3)
+
+    return (c1, c2, c3, c4), (dc1, dc2, dc3, dc4)
+
+
+def _search_interval(xa, x):
+    """
+    Vectorized interval search shared by _unint_vec and _biquad_vec. xa must be in
+    ascending order. Returns the index of the first point of xa not less than x
+    (len(xa) if there is none), the first of the four points to interpolate over, and
+    the blending factor between the two overlapping curves and its derivative with
+    respect to x.
+    """
+    n = len(xa)
+    idx = np.searchsorted(xa, x.real, side='left')
+    idx_c = np.clip(idx, 1, n - 1)
+    jx1 = np.where(idx_c == n - 1, n - 4, np.maximum(idx_c - 2, 0))
+    blend = (idx_c != 1) & (idx_c != n - 1)
+    ra = np.where(idx_c == 1, 1.0, (xa[idx_c] - x) / (xa[idx_c] - xa[idx_c - 1]))
+    ra = np.where(idx_c == n - 1, 0.0, ra)
+    dra = np.where(blend, -1.0 / (xa[idx_c] - xa[idx_c - 1]), 0.0)
+
+    return idx, jx1, ra, dra
+
+
+def _unint_vec(xa, ya, x):
+    """
+    Vectorized version of _unint that evaluates the table at an array of points at
+    once, returning the values, their slopes with respect to x, and the limit flags.
+    ya may hold a separate table for each point along its leading axes, and x is
+    broadcast against them. Values and limit flags match _unint exactly. Slopes are
+    zero off the ends of the table; at the table points they are the slopes of the
+    interpolating curve. Table searches only use the real part of x, so the routine
+    can also be complex-stepped.
+    """
+    xa = np.asarray(xa)
+    ya = np.asarray(ya)
+    n = len(xa)
+    x = np.asarray(x)
+    shape = np.broadcast_shapes(x.shape, ya.shape[:-1])
+    x = np.broadcast_to(x, shape).ravel()
+    xr = x.real
+
+    if ya.ndim == 1:
+        def take(j):
+            return ya[j]
+    else:
+        ya = np.broadcast_to(ya, shape + (n,)).reshape(-1, n)
+        rows = np.arange(x.size)
+
+        def take(j):
+            return ya[rows, j]
+
+    idx, jx1, ra, dra = _search_interval(xa, x)
+    (c1, c2, c3, c4), (dc1, dc2, dc3, dc4) = _interval_coeffs(
+        x, xa[jx1], xa[jx1 + 1], xa[jx1 + 2], xa[jx1 + 3], ra, dra)
+    y1, y2, y3, y4 = take(jx1), take(jx1 + 1), take(jx1 + 2), take(jx1 + 3)
+    y = y1*c1 + y2*c2 + y3*c3 + y4*c4
+    dy_dx = y1*dc1 + y2*dc2 + y3*dc3 + y4*dc4
+
+    low = xr < xa[0]
+    high = idx == n
+    node = ~high & (xa[np.minimum(idx, n - 1)] == xr)
+    if np.any(node):
+        y_node = take(np.minimum(idx, n - 1))[node]
+        if np.iscomplexobj(y):
+            # keep the slope of the curve through the node when complex stepping
+            y_node = y_node.real + 1j * y[node].imag
+        y[node] = y_node
+    if np.any(high):
+        y[high] = take(n - 1)[high] if ya.ndim > 1 else ya[n - 1]
+        dy_dx[high] = 0.0
+    if np.any(low):
+        y[low] = take(0)[low] if ya.ndim > 1 else ya[0]
+        dy_dx[low] = 0.0
+
+    Lmt = np.zeros(x.size, dtype=int)
+    Lmt[low] = 1  # off low end
+    Lmt[high] = 2  # off high end
+
+    return y.reshape(shape), dy_dx.reshape(shape), Lmt.reshape(shape)
+
+
+def _biquad_vec(T, i, xi, yi):
+    """
+    Vectorized version of _biquad that evaluates the table at arrays of points at
+    once, returning the values, their slopes with respect to x and y, and the limit
+    flags. Values and limit flags match _biquad exactly. Slopes are zero in any
+    direction the point is off the table. Table searches only use the real parts of xi
+    and yi, so the routine can also be complex-stepped.
+    """
+    nx = int(T[i])
+    ny = int(T[i+1])
+    j1 = int(i + 2)
+    j2 = j1 + nx - 1
+    x, y = np.broadcast_arrays(np.asarray(xi), np.asarray(yi))
+    xr = x.real
+
+    # search in x sense
+    xt = T[j1:j2+1]
+    jn, jx1, ra_x, dra_x = _search_interval(xt, x)
+    kx = np.where(xr < xt[0], 1, 0)
+    x = np.where(xr < xt[0], xt[0], x)
+    (cx1, cx2, cx3, cx4), dcx = _interval_coeffs(
+        x, xt[jx1], xt[jx1 + 1], xt[jx1 + 2], xt[jx1 + 3], ra_x, dra_x)
+    dcx = [np.where(kx == 1, 0.0, dc) for dc in dcx]
+    jx = j1 + jx1
+
+    if ny == 0:
+        jy = jx + nx
+        z = cx1*T[jy] + cx2*T[jy+1] + cx3*T[jy+2] + cx4*T[jy+3]
+        dz_dx = dcx[0]*T[jy] + dcx[1]*T[jy+1] + dcx[2]*T[jy+2] + dcx[3]*T[jy+3]
+        dz_dy = np.zeros_like(z)
+        lmt = kx
+    else:
+        # bivariate table, search in y sense
+        j3 = j2 + 1
+        j4 = j3 + ny - 1
+        yt = T[j3:j4+1]
+        yr = y.real
+        jn_y, jy1, ra_y, dra_y = _search_interval(yt, y)
+        ky = np.where(yr < yt[0], 1, np.where(jn_y == ny, 2, 0))
+        y = np.where(yr < yt[0], yt[0], np.where(jn_y == ny, yt[-1], y))
+        cy, dcy = _interval_coeffs(
+            y, yt[jy1], yt[jy1 + 1], yt[jy1 + 2], yt[jy1 + 3], ra_y, dra_y)
+
+        lmt = kx + 3*ky
+        # interpolate in y sense
+        jy = (j4 + 1) + (jx - i - 2)*ny + jy1
+        z = 0.0
+        dz_dx = 0.0
+        dz_dy = 0.0
+        for m in range(4):
+            rows = (T[jy + m], T[jy + m + ny], T[jy + m + 2*ny], T[jy + m + 3*ny])
+            z_m = cx1*rows[0] + cx2*rows[1] + cx3*rows[2] + cx4*rows[3]
+            z = z + cy[m]*z_m
+            dz_dx = dz_dx + cy[m]*(dcx[0]*rows[0] + dcx[1]*rows[1] + dcx[2]*rows[2]
+                                   + dcx[3]*rows[3])
+            dz_dy = dz_dy + dcy[m]*z_m
+        dz_dy = np.where(ky != 0, 0.0, dz_dy)
+
+    # _biquad returns zero when x is off the high end of the table
+    off_high = jn == nx
+    z = np.where(off_high, 0.0, z)
+    dz_dx = np.where(off_high, 0.0, dz_dx)
+    dz_dy = np.where(off_high, 0.0, dz_dy)
+    lmt = np.where(off_high, 0, lmt)
+
+    return z, dz_dx, dz_dy, lmt
+
+
 CP_Angle_table = np.array([
     [  # 2 blades
         [0.0158, 0.0165, .0188, .0230, .0369,
@@ -577,244 +753,292 @@ class HamiltonStandard(om.ExplicitComponent):
         # Tip Compressibility loss factor
         self.add_output('comp_tip_loss_factor', val=np.zeros(nn), units='unitless')
 
-        self.declare_partials('*', '*', method='fd', form='forward')
+    def setup_partials(self):
+        arange = np.arange(self.options['num_nodes'])
+
+        # every output at a node only depends on the inputs at that node
+        self.declare_partials(
+            '*',
+            ['power_coefficient', 'advance_ratio', Dynamic.Mission.MACH, 'tip_mach'],
+            rows=arange, cols=arange)
+        self.declare_partials(
+            '*',
+            [Aircraft.Engine.PROPELLER_ACTIVITY_FACTOR,
+             Aircraft.Engine.PROPELLER_INTEGRATED_LIFT_COEFFICIENT])
 
     def compute(self, inputs, outputs):
+        ang_blade, ct, xft = self._compute_coefficients(
+            *[inputs[name] for name in self._input_names])
+
+        outputs['blade_angle'] = ang_blade
+        outputs['thrust_coefficient'] = ct
+        outputs['comp_tip_loss_factor'] = xft
+
+    def compute_partials(self, inputs, partials):
+        # The table look-ups are only piecewise smooth, so the partials are computed
+        # with complex step. Nodes are independent of each other, which means a
+        # node-wise input can be perturbed at every node at once.
+        step = 1.e-30
+        args = [inputs[name] for name in self._input_names]
+        nn = self.options['num_nodes']
+
+        for i, name in enumerate(self._input_names):
+            perturbed = list(args)
+            perturbed[i] = args[i] + step * 1j
+            derivs = self._compute_coefficients(*perturbed)
+
+            for output, deriv in zip(
+                    ('blade_angle', 'thrust_coefficient', 'comp_tip_loss_factor'),
+                    derivs):
+                deriv = deriv.imag / step
+                if args[i].size != nn or nn == 1:
+                    deriv = deriv.reshape((nn, 1))
+                partials[output, name] = deriv
+
+    @property
+    def _input_names(self):
+        return ['power_coefficient', 'advance_ratio', Dynamic.Mission.MACH, 'tip_mach',
+                Aircraft.Engine.PROPELLER_ACTIVITY_FACTOR,
+                Aircraft.Engine.PROPELLER_INTEGRATED_LIFT_COEFFICIENT]
+
+    def _compute_coefficients(self, power_coefficient, advance_ratio, mach, tip_mach,
+                              act_factor, cli):
+        """
+        Compute the blade angle, thrust coefficient and compressibility tip loss factor
+        for all nodes at once. Any of the inputs can be complex, in which case all
+        branching is done on their real parts.
+        """
         verbosity = self.options['aviary_options'].get_val(Settings.VERBOSITY)
         num_blades = self.options['aviary_options'].get_val(
             Aircraft.Engine.NUM_PROPELLER_BLADES)
+        nn = self.options['num_nodes']
+        dtype = np.result_type(power_coefficient, advance_ratio, mach, tip_mach,
+                               act_factor, cli)
+        J = advance_ratio
+        act_factor = act_factor[0]
+        cli = cli[0]
 
-        for i_node in range(self.options['num_nodes']):
-            ichck = 0
-            run_flag = 0
-            xft = 1.0
-            AF_adj_CP = np.zeros(7)  # AFCP: an AF adjustment of CP to be assigned
-            AF_adj_CT = np.zeros(7)  # AFCT: an AF adjustment of CT to be assigned
-            CTT = np.zeros(7)
-            BLL = np.zeros(7)
-            BLLL = np.zeros(7)
-            PXCLI = np.zeros(7)
-            XFFT = np.zeros(6)
-            CTG = np.zeros(11)
-            CTG1 = np.zeros(11)
-            TXCLI = np.zeros(6)
-            CTTT = np.zeros(4)
-            XXXFT = np.zeros(4)
-            act_factor = inputs[Aircraft.Engine.PROPELLER_ACTIVITY_FACTOR][0]
-            for k in range(2):
-                AF_adj_CP[k], run_flag = _unint(Act_Factor_arr, AFCPC[k], act_factor)
-                AF_adj_CT[k], run_flag = _unint(Act_Factor_arr, AFCTC[k], act_factor)
-            for k in range(2, 7):
-                AF_adj_CP[k] = AF_adj_CP[1]
-                AF_adj_CT[k] = AF_adj_CT[1]
-            if (inputs['advance_ratio'][i_node] <= 0.5):
-                AFCTE = 2.*inputs['advance_ratio'][i_node] * \
-                    (AF_adj_CT[1] - AF_adj_CT[0]) + AF_adj_CT[0]
-            else:
-                AFCTE = AF_adj_CT[1]
-
-            # bounding J (advance ratio) for setting up interpolation
-            if (inputs['advance_ratio'][i_node] <= 1.0):
-                J_begin = 0
-                J_end = 3
-            elif (inputs['advance_ratio'][i_node] <= 1.5):
-                J_begin = 1
-                J_end = 4
-            elif (inputs['advance_ratio'][i_node] <= 2.0):
-                J_begin = 2
-                J_end = 5
+        ichck = np.zeros(nn, dtype=int)
+        BLLL = np.zeros((4, nn), dtype=dtype)
+        CTTT = np.zeros((4, nn), dtype=dtype)
+        XXXFT = np.zeros((4, nn), dtype=dtype)
+
+        # AFCP: an AF adjustment of CP to be assigned
+        # AFCT: an AF adjustment of CT to be assigned
+        # only the first two entries differ, the rest are copies of AF_adj_CP[1]
+        AF_adj_CP, _, run_flag = _unint_vec(Act_Factor_arr, AFCPC, act_factor)
+        AF_adj_CT, _, run_flag = _unint_vec(Act_Factor_arr, AFCTC, act_factor)
+        AFCTE = np.where(J.real <= 0.5,
+                         2.*J*(AF_adj_CT[1] - AF_adj_CT[0]) + AF_adj_CT[0],
+                         AF_adj_CT[1])
+
+        # bounding J (advance ratio) for setting up interpolation
+        # J <= 1.0: 0, J <= 1.5: 1, J <= 2.0: 2, else 3
+        J_begin = np.searchsorted([1.0, 1.5, 2.0], J.real, side='left')
+        J_groups = [(jb, np.flatnonzero(J_begin == jb)) for jb in np.unique(J_begin)]
+
+        CL_tab_idx_begin = 0  # NCLT
+        CL_tab_idx_end = 0  # NCLTT
+        # flag that given lift coeff (cli) does not fall on a node point of CL_arr
+        CL_tab_idx_flg = 0  # NCL_flg
+        ifnd = 0
+        for ii in range(6):
+            cl_idx = ii
+            if (abs(cli.real - CL_arr[ii]) <= 0.0009):
+                ifnd = 1
+                break
+        if (ifnd == 0):
+            if (cli.real <= 0.6):
+                CL_tab_idx_begin = 0
+                CL_tab_idx_end = 3
+            elif (cli.real <= 0.7):
+                CL_tab_idx_begin = 1
+                CL_tab_idx_end = 4
             else:
-                J_begin = 3
-                J_end = 6
-
-            CL_tab_idx_begin = 0  # NCLT
-            CL_tab_idx_end = 0  # NCLTT
-            # flag that given lift coeff (cli) does not fall on a node point of CL_arr
-            CL_tab_idx_flg = 0  # NCL_flg
-            ifnd = 0
-            cli = inputs[Aircraft.Engine.PROPELLER_INTEGRATED_LIFT_COEFFICIENT][0]
-            power_coefficient = inputs['power_coefficient'][i_node]
-            for ii in range(6):
-                cl_idx = ii
-                if (abs(cli - CL_arr[ii]) <= 0.0009):
-                    ifnd = 1
-                    break
-            if (ifnd == 0):
-                if (cli <= 0.6):
-                    CL_tab_idx_begin = 0
-                    CL_tab_idx_end = 3
-                elif (cli <= 0.7):
-                    CL_tab_idx_begin = 1
-                    CL_tab_idx_end = 4
+                CL_tab_idx_begin = 2
+                CL_tab_idx_end = 5
+        else:
+            CL_tab_idx_begin = cl_idx
+            CL_tab_idx_end = cl_idx
+            # flag that given lift coeff (cli) falls on a node point of CL_arr
+            CL_tab_idx_flg = 1
+        CL_tab_range = range(CL_tab_idx_begin, CL_tab_idx_end+1)
+        CL_tab_slice = slice(CL_tab_idx_begin, CL_tab_idx_begin+4)
+
+        lmod = (num_blades % 2) + 1
+        if (lmod == 1):
+            nbb = 1
+            idx_blade = int(num_blades/2.0)
+            # even number of blades idx_blade = 1 if 2 blades;
+            #                       idx_blade = 2 if 4 blades;
+            #                       idx_blade = 3 if 6 blades;
+            #                       idx_blade = 4 if 8 blades.
+            idx_blade = idx_blade - 1
+        else:
+            nbb = 4
+            # odd number of blades
+            idx_blade = 0  # start from first blade
+
+        # compressibility correction does not depend on the thrust coefficient
+        DMN = np.zeros((6, nn), dtype=dtype)
+        for kl in CL_tab_range:
+            ZMCRT, _, run_flag = _unint_vec(advance_ratio_array2, mach_corr_table[kl], J)
+            DMN[kl] = np.where(J.real != 0.0, mach - ZMCRT,
+                               tip_mach - mach_tip_corr_arr[kl])
+
+        TFCLII, _, run_flag = _unint_vec(advance_ratio_array, TF_CLI_arr, J)
+
+        for ibb in range(nbb):
+            # nbb = 1 even number of blades. No interpolation needed
+            # nbb = 4 odd number of blades. So, interpolation done
+            #       using 4 sets of even J (advance ratio) interpolation
+            CTT = np.zeros((nn, 7), dtype=dtype)
+            BLL = np.zeros((nn, 7), dtype=dtype)
+            for kdx in range(7):
+                # nodes whose advance ratio interval uses this table entry
+                nodes = np.flatnonzero((J_begin <= kdx) & (kdx <= J_begin + 3))
+                if nodes.size == 0:
+                    continue
+
+                CP_Eff = power_coefficient[nodes]*AF_adj_CP[min(kdx, 1)]
+                PBL, _, run_flag = _unint_vec(CPEC, BL_P_corr_table[idx_blade], CP_Eff)
+                # PBL = number of blades correction for power_coefficient
+                CPE1 = CP_Eff*PBL*PF_CLI_arr[kdx]
+                PXCLI = np.zeros((nodes.size, 6), dtype=dtype)
+                for kl in CL_tab_range:
+                    CPE1X = np.where(CPE1.real < CP_CLi_table[kl][0],
+                                     CP_CLi_table[kl][0], CPE1)
+                    cli_len = cli_arr_len[kl]
+                    PXCLI[:, kl], _, run_flag = _unint_vec(
+                        CP_CLi_table[kl][:cli_len], XPCLI[kl], CPE1X)
+                    ichck[nodes] += run_flag == 1
+                    report = (verbosity is Verbosity.DEBUG) | (ichck[nodes] <= 1)
+                    for i in np.flatnonzero(report & (run_flag == 1)):
+                        i_node = nodes[i]
+                        warnings.warn(
+                            f"Mach,VTMACH,J,power_coefficient,CP_Eff =: {mach[i_node]},{tip_mach[i_node]},{J[i_node]},{power_coefficient[i_node]},{CP_Eff[i]}")
+                    if kl in (4, 5):
+                        for i in np.flatnonzero(report & (CPE1.real < 0.010)):
+                            print(
+                                f"Extrapolated data is being used for CLI=.{kl + 2}--CPE1,PXCLI,L= , {CPE1[i]},{PXCLI[i, kl]},{idx_blade}   Suggest inputting CLI=.5")
+                if (CL_tab_idx_flg != 1):
+                    PCLI, _, run_flag = _unint_vec(
+                        CL_arr[CL_tab_slice], PXCLI[:, CL_tab_slice], cli)
                 else:
-                    CL_tab_idx_begin = 2
-                    CL_tab_idx_end = 5
-            else:
-                CL_tab_idx_begin = cl_idx
-                CL_tab_idx_end = cl_idx
-                # flag that given lift coeff (cli) falls on a node point of CL_arr
-                CL_tab_idx_flg = 1
-
-            lmod = (num_blades % 2) + 1
-            if (lmod == 1):
-                nbb = 1
-                idx_blade = int(num_blades/2.0)
-                # even number of blades idx_blade = 1 if 2 blades;
-                #                       idx_blade = 2 if 4 blades;
-                #                       idx_blade = 3 if 6 blades;
-                #                       idx_blade = 4 if 8 blades.
-                idx_blade = idx_blade - 1
-            else:
-                nbb = 4
-                # odd number of blades
-                idx_blade = 0  # start from first blade
-
-            for ibb in range(nbb):
-                # nbb = 1 even number of blades. No interpolation needed
-                # nbb = 4 odd number of blades. So, interpolation done
-                #       using 4 sets of even J (advance ratio) interpolation
-                for kdx in range(J_begin, J_end+1):
-                    CP_Eff = power_coefficient*AF_adj_CP[kdx]
-                    PBL, run_flag = _unint(CPEC, BL_P_corr_table[idx_blade], CP_Eff)
-                    # PBL = number of blades correction for power_coefficient
-                    CPE1 = CP_Eff*PBL*PF_CLI_arr[kdx]
-                    CL_tab_idx = CL_tab_idx_begin
-                    for kl in range(CL_tab_idx_begin, CL_tab_idx_end+1):
-                        CPE1X = CPE1
-                        if (CPE1 < CP_CLi_table[CL_tab_idx][0]):
-                            CPE1X = CP_CLi_table[CL_tab_idx][0]
-                        cli_len = cli_arr_len[CL_tab_idx]
-                        PXCLI[kl], run_flag = _unint(
-                            CP_CLi_table[CL_tab_idx][:cli_len], XPCLI[CL_tab_idx], CPE1X)
-                        if (run_flag == 1):
-                            ichck = ichck + 1
-                        if (verbosity is Verbosity.DEBUG or ichck <= 1):
-                            if (run_flag == 1):
-                                warnings.warn(
-                                    f"Mach,VTMACH,J,power_coefficient,CP_Eff =: {inputs[Dynamic.Mission.MACH][i_node]},{inputs['tip_mach'][i_node]},{inputs['advance_ratio'][i_node]},{power_coefficient},{CP_Eff}")
-                            if (kl == 4 and CPE1 < 0.010):
-                                print(
-                                    f"Extrapolated data is being used for CLI=.6--CPE1,PXCLI,L= , {CPE1},{PXCLI[kl]},{idx_blade}   Suggest inputting CLI=.5")
-                            if (kl == 5 and CPE1 < 0.010):
-                                print(
-                                    f"Extrapolated data is being used for CLI=.7--CPE1,PXCLI,L= , {CPE1},{PXCLI[kl]},{idx_blade}   Suggest inputting CLI=.5")
-                            if (kl == 6 and CPE1 < 0.010):
-                                print(
-                                    f"Extrapolated data is being used for CLI=.8--CPE1,PXCLI,L= , {CPE1},{PXCLI[kl]},{idx_blade}   Suggest inputting CLI=.5")
-                        NERPT = 1
-                        CL_tab_idx = CL_tab_idx+1
-                    if (CL_tab_idx_flg != 1):
-                        PCLI, run_flag = _unint(
-                            CL_arr[CL_tab_idx_begin:CL_tab_idx_begin+4], PXCLI[CL_tab_idx_begin:CL_tab_idx_begin+4], inputs[Aircraft.Engine.PROPELLER_INTEGRATED_LIFT_COEFFICIENT][0])
-                    else:
-                        PCLI = PXCLI[CL_tab_idx_begin]
-                        # PCLI = CLI adjustment to power_coefficient
-                    CP_Eff = CP_Eff*PCLI  # the effective CP at baseline point for kdx
-                    ang_len = ang_arr_len[kdx]
-                    BLL[kdx], run_flag = _unint(
-                        CP_Angle_table[idx_blade][kdx][:ang_len], Blade_angle_table[kdx], CP_Eff)  # blade angle at baseline point for kdx
-                    try:
-                        CTT[kdx], run_flag = _unint(
-                            Blade_angle_table[kdx], CT_Angle_table[idx_blade][kdx][:ang_len], BLL[kdx])  # thrust coeff at baseline point for kdx
-                    except IndexError:
+                    PCLI = PXCLI[:, CL_tab_idx_begin]
+                    # PCLI = CLI adjustment to power_coefficient
+                CP_Eff = CP_Eff*PCLI  # the effective CP at baseline point for kdx
+                ang_len = ang_arr_len[kdx]
+                # blade angle at baseline point for kdx
+                BLL[nodes, kdx], _, run_flag = _unint_vec(
+                    CP_Angle_table[idx_blade][kdx][:ang_len], Blade_angle_table[kdx],
+                    CP_Eff)
+                # the zero-padded rows of Blade_angle_table cannot be interpolated
+                # past their second to last entry
+                blade_angles = Blade_angle_table[kdx][:ang_len]
+                if ang_len < len(Blade_angle_table[kdx]):
+                    BLL_real = BLL[nodes, kdx].real
+                    if np.any((BLL_real > blade_angles[-2]) &
+                              (BLL_real != blade_angles[-1])):
                         raise om.AnalysisError(
                             "interp failed for CTT (thrust coefficient) in hamilton_standard.py")
-                    if (run_flag > 1):
-                        NERPT = 2
+                # thrust coeff at baseline point for kdx
+                CTT[nodes, kdx], _, run_flag = _unint_vec(
+                    blade_angles, CT_Angle_table[idx_blade][kdx][:ang_len],
+                    BLL[nodes, kdx])
+                if np.any(run_flag > 1):
+                    NERPT = 2
+                    for flag in run_flag[run_flag > 1]:
                         print(
-                            f"ERROR IN PROP. PERF.-- NERPT={NERPT}, run_flag={run_flag}")
-
-                BLLL[ibb], run_flag = _unint(
-                    advance_ratio_array[J_begin:J_begin+4], BLL[J_begin:J_begin+4], inputs['advance_ratio'][i_node])
-                ang_blade = BLLL[ibb]
-                CTTT[ibb], run_flag = _unint(
-                    advance_ratio_array[J_begin:J_begin+4], CTT[J_begin:J_begin+4], inputs['advance_ratio'][i_node])
-
-                # make extra correction. CTG is an "error" function, and the iteration (loop counter = "IL") tries to drive CTG/CT to 0
-                # ERR_CT = CTG1[il]/CTTT[ibb], where CTG1 =CT_Eff - CTTT(IBB).
-                CTG[0] = .100
-                CTG[1] = .200
-                TFCLII, run_flag = _unint(
-                    advance_ratio_array, TF_CLI_arr, inputs['advance_ratio'][i_node])
-                NCTG = 10
-                ifnd1 = 0
-                ifnd2 = 0
-                for il in range(NCTG):
-                    ct = CTG[il]
-                    CT_Eff = CTG[il]*AFCTE
-                    TBL, run_flag = _unint(CTEC, BL_T_corr_table[idx_blade], CT_Eff)
-                    # TBL = number of blades correction for thrust_coefficient
-                    CTE1 = CT_Eff*TBL*TFCLII
-                    CL_tab_idx = CL_tab_idx_begin
-                    for kl in range(CL_tab_idx_begin, CL_tab_idx_end+1):
-                        CTE1X = CTE1
-                        if (CTE1 < CT_CLi_table[CL_tab_idx][0]):
-                            CTE1X = CT_CLi_table[CL_tab_idx][0]
-                        cli_len = cli_arr_len[CL_tab_idx]
-                        TXCLI[kl], run_flag = _unint(
-                            CT_CLi_table[CL_tab_idx][:cli_len], XTCLI[CL_tab_idx][:cli_len], CTE1X)
-                        NERPT = 5
-                        if (run_flag == 1):
-                            # off lower bound only.
-                            print(
-                                f"ERROR IN PROP. PERF.-- NERPT={NERPT}, run_flag={run_flag}, il = {il}, kl = {kl}")
-                        if (inputs['advance_ratio'][i_node] != 0.0):
-                            ZMCRT, run_flag = _unint(
-                                advance_ratio_array2, mach_corr_table[CL_tab_idx], inputs['advance_ratio'][i_node])
-                            DMN = inputs[Dynamic.Mission.MACH][i_node] - ZMCRT
-                        else:
-                            ZMCRT = mach_tip_corr_arr[CL_tab_idx]
-                            DMN = inputs['tip_mach'][i_node] - ZMCRT
-                        XFFT[kl] = 1.0  # compressibility tip loss factor
-                        if (DMN > 0.0):
-                            CTE2 = CT_Eff*TXCLI[kl]*TBL
-                            XFFT[kl], run_flag = _biquad(comp_mach_CT_arr, 1, DMN, CTE2)
-                        CL_tab_idx = CL_tab_idx + 1
-                    if (CL_tab_idx_flg != 1):
-                        cli = inputs[Aircraft.Engine.PROPELLER_INTEGRATED_LIFT_COEFFICIENT][0]
-                        TCLII, run_flag = _unint(
-                            CL_arr[CL_tab_idx_begin:CL_tab_idx_begin+4], TXCLI[CL_tab_idx_begin:CL_tab_idx_begin+4], cli)
-                        xft, run_flag = _unint(
-                            CL_arr[CL_tab_idx_begin:CL_tab_idx_begin+4], XFFT[CL_tab_idx_begin:CL_tab_idx_begin+4], cli)
-                    else:
-                        TCLII = TXCLI[CL_tab_idx_begin]
-                        xft = XFFT[CL_tab_idx_begin]
-                    ct = CTG[il]
-                    CT_Eff = CTG[il]*AFCTE*TCLII
-                    CTG1[il] = CT_Eff - CTTT[ibb]
-                    if (abs(CTG1[il]/CTTT[ibb]) < 0.001):
-                        ifnd1 = 1
-                        break
-                    if (il > 0):
-                        CTG[il+1] = -CTG1[il-1] * \
-                            (CTG[il] - CTG[il-1])/(CTG1[il] - CTG1[il-1]) + CTG[il-1]
-                        if (CTG[il+1] <= 0):
-                            ifnd2 = 1
-                            break
-
-                if (ifnd1 == 0 and ifnd2 == 0):
-                    raise ValueError(
-                        f"Integrated design cl adjustment not working properly for ct definition (ibb={ibb})")
-                if (ifnd1 == 0 and ifnd2 == 1):
-                    ct = 0.0
-                CTTT[ibb] = ct
-                XXXFT[ibb] = xft
-                idx_blade = idx_blade + 1
-
-            if (nbb != 1):
-                # interpolation by the number of blades if odd number
-                ang_blade, run_flag = _unint(
-                    num_blades_arr, BLLL[:4], num_blades)
-                ct, run_flag = _unint(num_blades_arr, CTTT, num_blades)
-                xft, run_flag = _unint(num_blades_arr, XXXFT, num_blades)
-
-            # NOTE this could be handled via the metamodel comps (extrapolate flag)
-            if ichck > 0:
-                print(f"  table look-up error = {ichck} (if you go outside the tables.)")
-
-            outputs['blade_angle'][i_node] = ang_blade
-            outputs['thrust_coefficient'][i_node] = ct
-            outputs['comp_tip_loss_factor'][i_node] = xft
+                            f"ERROR IN PROP. PERF.-- NERPT={NERPT}, run_flag={flag}")
+
+            for jb, nodes in J_groups:
+                BLLL[ibb, nodes], _, run_flag = _unint_vec(
+                    advance_ratio_array[jb:jb+4], BLL[nodes, jb:jb+4], J[nodes])
+                CTTT[ibb, nodes], _, run_flag = _unint_vec(
+                    advance_ratio_array[jb:jb+4], CTT[nodes, jb:jb+4], J[nodes])
+            ang_blade = BLLL[ibb]
+
+            # make extra correction. CTG is an "error" function, and the iteration (loop counter = "IL") tries to drive CTG/CT to 0
+            # ERR_CT = CTG1[il]/CTTT[ibb], where CTG1 =CT_Eff - CTTT(IBB).
+            # Each node stops iterating as soon as it has converged.
+            CTG = np.zeros((nn, 11), dtype=dtype)
+            CTG1 = np.zeros((nn, 11), dtype=dtype)
+            CTG[:, 0] = .100
+            CTG[:, 1] = .200
+            ct = np.zeros(nn, dtype=dtype)
+            xft = np.ones(nn, dtype=dtype)
+            ifnd2 = np.zeros(nn, dtype=bool)
+            active = np.arange(nn)
+            NCTG = 10
+            for il in range(NCTG):
+                if active.size == 0:
+                    break
+                CT_Eff = CTG[active, il]*AFCTE[active]
+                TBL, _, run_flag = _unint_vec(CTEC, BL_T_corr_table[idx_blade], CT_Eff)
+                # TBL = number of blades correction for thrust_coefficient
+                CTE1 = CT_Eff*TBL*TFCLII[active]
+                TXCLI = np.zeros((active.size, 6), dtype=dtype)
+                XFFT = np.zeros((active.size, 6), dtype=dtype)
+                for kl in CL_tab_range:
+                    CTE1X = np.where(CTE1.real < CT_CLi_table[kl][0],
+                                     CT_CLi_table[kl][0], CTE1)
+                    cli_len = cli_arr_len[kl]
+                    TXCLI[:, kl], _, run_flag = _unint_vec(
+                        CT_CLi_table[kl][:cli_len], XTCLI[kl][:cli_len], CTE1X)
+                    NERPT = 5
+                    for flag in run_flag[run_flag == 1]:
+                        # off lower bound only.
+                        print(
+                            f"ERROR IN PROP. PERF.-- NERPT={NERPT}, run_flag={flag}, il = {il}, kl = {kl}")
+                    XFFT[:, kl] = 1.0  # compressibility tip loss factor
+                    compressible = DMN[kl, active].real > 0.0
+                    if np.any(compressible):
+                        CTE2 = CT_Eff[compressible]*TXCLI[compressible, kl] * \
+                            TBL[compressible]
+                        XFFT[compressible, kl], _, _, run_flag = _biquad_vec(
+                            comp_mach_CT_arr, 1, DMN[kl, active][compressible], CTE2)
+                if (CL_tab_idx_flg != 1):
+                    TCLII, _, run_flag = _unint_vec(
+                        CL_arr[CL_tab_slice], TXCLI[:, CL_tab_slice], cli)
+                    xft[active], _, run_flag = _unint_vec(
+                        CL_arr[CL_tab_slice], XFFT[:, CL_tab_slice], cli)
+                else:
+                    TCLII = TXCLI[:, CL_tab_idx_begin]
+                    xft[active] = XFFT[:, CL_tab_idx_begin]
+                ct[active] = CTG[active, il]
+                CT_Eff = CTG[active, il]*AFCTE[active]*TCLII
+                CTG1[active, il] = CT_Eff - CTTT[ibb, active]
+                converged = np.abs(
+                    (CTG1[active, il]/CTTT[ibb, active]).real) < 0.001
+                active = active[~converged]
+                if (il > 0):
+                    CTG[active, il+1] = -CTG1[active, il-1] * \
+                        (CTG[active, il] - CTG[active, il-1]) / \
+                        (CTG1[active, il] - CTG1[active, il-1]) + CTG[active, il-1]
+                    negative = CTG[active, il+1].real <= 0
+                    ifnd2[active[negative]] = True
+                    active = active[~negative]
+
+            if active.size > 0:
+                raise ValueError(
+                    f"Integrated design cl adjustment not working properly for ct definition (ibb={ibb})")
+            ct[ifnd2] = 0.0
+            CTTT[ibb] = ct
+            XXXFT[ibb] = xft
+            idx_blade = idx_blade + 1
+
+        if (nbb != 1):
+            # interpolation by the number of blades if odd number
+            ang_blade, _, run_flag = _unint_vec(num_blades_arr, BLLL.T, num_blades)
+            ct, _, run_flag = _unint_vec(num_blades_arr, CTTT.T, num_blades)
+            xft, _, run_flag = _unint_vec(num_blades_arr, XXXFT.T, num_blades)
+
+        # NOTE this could be handled via the metamodel comps (extrapolate flag)
+        for count in ichck[ichck > 0]:
+            print(f"  table look-up error = {count} (if you go outside the tables.)")
+
+        return ang_blade, ct, xft
 
 
 class PostHamiltonStandard(om.ExplicitComponent):
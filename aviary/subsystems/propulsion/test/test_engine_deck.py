@@ -1,12 +1,19 @@
 import csv
+import tempfile
+import time
+import tracemalloc
 import unittest
 from pathlib import Path
 
-from openmdao.utils.assert_utils import assert_near_equal
+import numpy as np
+import openmdao.api as om
+from openmdao.utils.assert_utils import assert_check_partials, assert_near_equal
 
 from aviary.subsystems.propulsion.engine_deck import EngineDeck
 from aviary.subsystems.propulsion.utils import EngineModelVariables as keys
+from aviary.utils.aviary_values import AviaryValues
 from aviary.utils.named_values import NamedValues
+from aviary.variable_info.variables import Aircraft, Dynamic
 from aviary.validation_cases.validation_data.flops_data.FLOPS_Test_Data import \
     FLOPS_Test_Data
 
@@ -130,6 +137,475 @@ class EngineDeckTest(unittest.TestCase):
         assert_near_equal(thrust, expected_thrust, tolerance=tol)
         assert_near_equal(fuel_flow_rate, expected_fuel_flow_rate, tolerance=tol)
 
+    def test_pack_data(self):
+        mach_number, altitude, throttle = np.meshgrid(
+            [0, 0.4, 0.8], [0, 10000, 20000], [0.5, 0.75, 1], indexing='ij')
+        # last flight condition has more points than any other
+        mach_number = np.append(mach_number, 0.8)
+        altitude = np.append(altitude, 20000)
+        throttle = np.append(throttle, 0.25)
+        thrust = 10000 * throttle * (1 - mach_number / 2) - altitude / 100
+
+        data_input = NamedValues()
+        data_input.set_val('mach', mach_number, 'unitless')
+        data_input.set_val('altitude', altitude, 'ft')
+        data_input.set_val('throttle', throttle, 'unitless')
+        data_input.set_val('thrust', thrust, 'lbf')
+
+        options = AviaryValues()
+        options.set_val(Aircraft.Engine.GENERATE_FLIGHT_IDLE, False)
+        model = EngineDeck('engine', options, data_input)
+
+        expected_indices = np.full((3, 3), 2)
+        expected_indices[2, 2] = 3
+        assert_near_equal(model.data_indices, expected_indices)
+        self.assertEqual(model.data_max_count, 4)
+
+        packed_thrust = model.packed_data[keys.THRUST]
+        assert_near_equal(packed_thrust[0, 1], [4900, 7400, 9900, 0])
+        assert_near_equal(packed_thrust[2, 2], [1300, 2800, 4300, 5800])
+
+    def bench_test_large_deck(self):
+        print('\ndata points | EngineDeck construction (s)')
+        for num_throttles in (10, 100, 1000):
+            mach, alt, throttle = np.meshgrid(np.linspace(0, 0.9, 20),
+                                              np.linspace(0, 40000, 50),
+                                              np.linspace(0.05, 1, num_throttles),
+                                              indexing='ij')
+            thrust = 30000 * throttle * (1 - mach / 3) * (1 - alt / 80000)
+
+            data_input = NamedValues()
+            data_input.set_val('mach', mach.ravel(), 'unitless')
+            data_input.set_val('altitude', alt.ravel(), 'ft')
+            data_input.set_val('throttle', throttle.ravel(), 'unitless')
+            data_input.set_val('thrust', thrust.ravel(), 'lbf')
+            data_input.set_val('fuel_flow', 0.5 * thrust.ravel(), 'lbm/h')
+
+            options = AviaryValues()
+            options.set_val(Aircraft.Engine.GENERATE_FLIGHT_IDLE, True)
+
+            start = time.perf_counter()
+            EngineDeck('engine', options, data_input)
+            print(f'{mach.size:11d} | {time.perf_counter() - start:27.2f}')
+
+
+class SharedInterpolationTablesTest(unittest.TestCase):
+    def build_problem(self, engine, num_phases, num_nodes=20):
+        prob = om.Problem()
+        for i in range(num_phases):
+            nn = num_nodes + i
+            ivc = om.IndepVarComp()
+            ivc.add_output(Dynamic.Mission.MACH, np.linspace(0.1, 0.8, nn))
+            ivc.add_output(Dynamic.Mission.ALTITUDE,
+                           np.linspace(0, 35000, nn), units='ft')
+            ivc.add_output(Dynamic.Mission.THROTTLE, np.linspace(1, 0.5, nn))
+            phase = prob.model.add_subsystem(f'phase_{i}', om.Group())
+            phase.add_subsystem('ivc', ivc, promotes=['*'])
+            phase.add_subsystem('engine', engine.build_mission(nn, engine.options),
+                                promotes=['*'])
+
+        prob.setup()
+
+        return prob
+
+    def test_shared_tables(self):
+        aviary_values = FLOPS_Test_Data['LargeSingleAisle2FLOPS']['inputs']
+        engine = aviary_values.get_val('engine_models')[0]
+
+        prob = self.build_problem(engine, num_phases=2)
+        prob.run_model()
+
+        tables = engine.interp_tables
+        for i in range(2):
+            comp = prob.model._get_subsystem(f'phase_{i}.engine.interpolation')
+            for name, interp in comp.interps.items():
+                self.assertIs(interp, tables['interpolation'][name])
+
+            comp = prob.model._get_subsystem(
+                f'phase_{i}.engine.max_thrust_interpolation')
+            self.assertIs(comp.interps['thrust_net_max_unscaled'],
+                          tables['max_thrust_interpolation']['thrust_net_max_unscaled'])
+
+        # compare against tables built from scratch by a regular metamodel
+        reference = om.MetaModelSemiStructuredComp(
+            method=engine.get_val(Aircraft.Engine.INTERPOLATION_METHOD),
+            extrapolate=True, vec_size=21)
+        reference.add_input(Dynamic.Mission.MACH, engine.data[keys.MACH])
+        reference.add_input(Dynamic.Mission.ALTITUDE, engine.data[keys.ALTITUDE],
+                            units='ft')
+        reference.add_input(Dynamic.Mission.THROTTLE, engine.data[keys.THROTTLE])
+        reference.add_output('thrust_net_unscaled', engine.data[keys.THRUST],
+                             units='lbf')
+        reference.add_output('fuel_flow_rate_unscaled', engine.data[keys.FUEL_FLOW],
+                             units='lb/h')
+
+        ref_prob = om.Problem()
+        ref_prob.model.add_subsystem('interp', reference, promotes=['*'])
+        ref_prob.setup()
+        for name in (Dynamic.Mission.MACH, Dynamic.Mission.ALTITUDE,
+                     Dynamic.Mission.THROTTLE):
+            ref_prob.set_val(name, prob.get_val(f'phase_1.{name}'))
+        ref_prob.run_model()
+
+        for name in ('thrust_net_unscaled', 'fuel_flow_rate_unscaled'):
+            assert_near_equal(prob.get_val(f'phase_1.{name}'),
+                              ref_prob.get_val(name), tolerance=1e-12)
+
+    def bench_test_shared_tables_setup(self):
+        aviary_values = FLOPS_Test_Data['LargeSingleAisle2FLOPS']['inputs']
+        engine = aviary_values.get_val('engine_models')[0]
+
+        print('\nphases | setup time (s) | peak memory (MB)')
+        peak_memory = []
+        for num_phases in (1, 2, 4, 8, 16):
+            tracemalloc.start()
+            start = time.perf_counter()
+            self.build_problem(engine, num_phases).final_setup()
+            setup_time = time.perf_counter() - start
+            peak_memory.append(tracemalloc.get_traced_memory()[1] / 1e6)
+            tracemalloc.stop()
+
+            print(f'{num_phases:6d} | {setup_time:14.3f} | {peak_memory[-1]:16.2f}')
+
+        # adding phases must not add full copies of the interpolation tables
+        table_memory = sum(interp.table.values.nbytes for interp in
+                           engine.interp_tables['interpolation'].values()) / 1e6
+        self.assertLess(peak_memory[-1] - peak_memory[-2], 8 * table_memory + 50)
+
+
+class MaxThrustEnvelopeTest(unittest.TestCase):
+    def build_problem(self, engine, num_nodes, mach=None, altitude=None):
+        if mach is None:
+            # include off-grid flight conditions
+            mach = np.linspace(0.05, 0.83, num_nodes)
+            altitude = np.linspace(500, 41000, num_nodes)
+
+        prob = om.Problem()
+        ivc = om.IndepVarComp()
+        ivc.add_output(Dynamic.Mission.MACH, mach)
+        ivc.add_output(Dynamic.Mission.ALTITUDE, altitude, units='ft')
+        ivc.add_output(Dynamic.Mission.THROTTLE, np.linspace(1, 0.3, num_nodes))
+        prob.model.add_subsystem('ivc', ivc, promotes=['*'])
+        prob.model.add_subsystem('engine', engine.build_mission(num_nodes, engine.options),
+                                 promotes=['*'])
+        prob.setup(force_alloc_complex=True)
+
+        return prob
+
+    def test_max_thrust_envelope(self):
+        nn = 50
+        aviary_values = FLOPS_Test_Data['LargeSingleAisle2FLOPS']['inputs']
+        options = aviary_values.get_val('engine_models')[0].options.deepcopy()
+
+        reference_engine = EngineDeck('engine', options)
+        options.set_val(Aircraft.Engine.PRECOMPUTE_MAX_THRUST, True)
+        engine = EngineDeck('engine', options)
+
+        # the envelope only matches the full deck everywhere if max throttle is the
+        # same at all flight conditions
+        self.assertTrue(engine.global_throttle)
+
+        reference_prob = self.build_problem(reference_engine, nn)
+        reference_prob.run_model()
+        prob = self.build_problem(engine, nn)
+        prob.run_model()
+
+        self.assertIn('max_thrust_envelope', engine.interp_tables)
+        self.assertIsNone(prob.model._get_subsystem('engine.max_thrust_interpolation'))
+
+        for name in ('thrust_net_max_unscaled', Dynamic.Mission.THRUST_MAX,
+                     Dynamic.Mission.THRUST):
+            assert_near_equal(prob.get_val(name), reference_prob.get_val(name),
+                              tolerance=1e-12)
+
+        partial_data = prob.check_partials(out_stream=None, method='cs',
+                                           includes=['*max_thrust_envelope*'])
+        assert_check_partials(partial_data, atol=1e-8, rtol=1e-8)
+
+    def test_max_thrust_envelope_throttle_limits(self):
+        class LocalThrottleDeck(EngineDeck):
+            def _set_variable_flags(self):
+                self.global_throttle = False
+                super()._set_variable_flags()
+
+        aviary_values = FLOPS_Test_Data['LargeSingleAisle2FLOPS']['inputs']
+        options = aviary_values.get_val('engine_models')[0].options.deepcopy()
+
+        reference_engine = LocalThrottleDeck('engine', options)
+        options.set_val(Aircraft.Engine.PRECOMPUTE_MAX_THRUST, True)
+        engine = LocalThrottleDeck('engine', options)
+
+        # with max throttle interpolated by flight condition, the envelope matches the
+        # full deck at the flight conditions in the engine data
+        envelope = engine.max_thrust_envelope
+        mach = envelope[keys.MACH]
+        altitude = envelope[keys.ALTITUDE]
+
+        reference_prob = self.build_problem(reference_engine, len(mach), mach, altitude)
+        reference_prob.run_model()
+        prob = self.build_problem(engine, len(mach), mach, altitude)
+        prob.run_model()
+
+        self.assertFalse(engine.global_throttle)
+
+        for name in ('throttle_max', 'thrust_net_max_unscaled',
+                     Dynamic.Mission.THRUST_MAX):
+            assert_near_equal(prob.get_val(name), reference_prob.get_val(name),
+                              tolerance=1e-12)
+
+    def bench_test_max_thrust_envelope(self):
+        aviary_values = FLOPS_Test_Data['LargeSingleAisle2FLOPS']['inputs']
+        options = aviary_values.get_val('engine_models')[0].options.deepcopy()
+
+        reference_engine = EngineDeck('engine', options)
+        options.set_val(Aircraft.Engine.PRECOMPUTE_MAX_THRUST, True)
+        engine = EngineDeck('engine', options)
+
+        print('\nnodes | max thrust: full deck (ms) | envelope (ms) | '
+              'engine total: full deck (ms) | envelope (ms)')
+        for nn in (20, 100, 1000):
+            max_thrust_timings = []
+            total_timings = []
+            for deck, max_thrust_name in ((reference_engine, 'max_thrust_interpolation'),
+                                          (engine, 'max_thrust_envelope')):
+                prob = self.build_problem(deck, nn)
+                prob.run_model()
+                engine_group = prob.model._get_subsystem('engine')
+                max_thrust = prob.model._get_subsystem(f'engine.{max_thrust_name}')
+
+                for system, timings in ((max_thrust, max_thrust_timings),
+                                        (engine_group, total_timings)):
+                    start = time.perf_counter()
+                    for _ in range(10):
+                        system.run_solve_nonlinear()
+                        system.run_linearize()
+                    timings.append((time.perf_counter() - start) * 100)
+
+            print(f'{nn:5d} | {max_thrust_timings[0]:27.2f} | '
+                  f'{max_thrust_timings[1]:13.2f} | {total_timings[0]:29.2f} | '
+                  f'{total_timings[1]:13.2f}')
+            self.assertLess(max_thrust_timings[1], max_thrust_timings[0])
+
+
+class InverseThrustTableTest(unittest.TestCase):
+    def setUp(self):
+        aviary_values = FLOPS_Test_Data['LargeSingleAisle2FLOPS']['inputs']
+        options = aviary_values.get_val('engine_models')[0].options.deepcopy()
+        options.set_val(Aircraft.Engine.PRECOMPUTE_INVERSE_THRUST, True)
+        self.engine = EngineDeck('engine', options)
+        self.num_engines = options.get_val(Aircraft.Engine.NUM_ENGINES)
+        self.scale_factor = 1.1
+
+    def get_flight_conditions(self, points_per_cell):
+        """
+        Return every flight condition in the engine data, and random points inside each
+        (Mach, altitude) cell of the data that has data at all four corners.
+        """
+        data = self.engine.data
+        flight_conditions = np.unique(
+            np.column_stack((data[keys.MACH], data[keys.ALTITUDE])), axis=0)
+        altitudes = {mach: set(flight_conditions[flight_conditions[:, 0] == mach, 1])
+                     for mach in np.unique(flight_conditions[:, 0])}
+        machs = sorted(altitudes)
+
+        rng = np.random.default_rng(0)
+        points = [flight_conditions]
+        for mach0, mach1 in zip(machs[:-1], machs[1:]):
+            alts = sorted(altitudes[mach0] & altitudes[mach1])
+            for alt0, alt1 in zip(alts[:-1], alts[1:]):
+                points.append(np.column_stack(
+                    (rng.uniform(mach0, mach1, points_per_cell),
+                     rng.uniform(alt0, alt1, points_per_cell))))
+
+        return np.vstack(points), len(flight_conditions)
+
+    def build_problem(self, flight_conditions, required_thrust, use_lookup):
+        nn = len(flight_conditions)
+        engine = self.engine
+
+        prob = om.Problem()
+        model = prob.model
+        ivc = om.IndepVarComp()
+        ivc.add_output(Dynamic.Mission.MACH, flight_conditions[:, 0])
+        ivc.add_output(Dynamic.Mission.ALTITUDE, flight_conditions[:, 1], units='ft')
+        ivc.add_output('required_thrust', required_thrust, units='lbf')
+        ivc.add_output(Aircraft.Engine.SCALE_FACTOR, self.scale_factor)
+        model.add_subsystem('ivc', ivc, promotes=['*'])
+
+        if use_lookup:
+            model.add_subsystem('throttle_lookup', engine.build_throttle_lookup(nn),
+                                promotes=['*'])
+            model.add_subsystem('engine', engine.build_mission(nn, engine.options),
+                                promotes=['*'])
+        else:
+            group = model.add_subsystem('prop_group', om.Group(), promotes=['*'])
+            group.add_subsystem('engine', engine.build_mission(nn, engine.options),
+                                promotes=['*'])
+            group.add_subsystem(
+                'thrust_balance',
+                om.BalanceComp(
+                    Dynamic.Mission.THROTTLE, val=np.ones(nn), lower=0.0, upper=1.0,
+                    units='unitless', lhs_name=Dynamic.Mission.THRUST,
+                    rhs_name='required_thrust', use_mult=True, mult_val=self.num_engines,
+                    eq_units='lbf'),
+                promotes=['*'])
+            group.nonlinear_solver = om.NewtonSolver(
+                solve_subsystems=True, maxiter=30, atol=1e-10, rtol=1e-12, iprint=-1)
+            group.nonlinear_solver.linesearch = om.BoundsEnforceLS()
+            group.linear_solver = om.DirectSolver(assemble_jac=True)
+
+        prob.setup(force_alloc_complex=True)
+
+        return prob
+
+    def test_inverse_table(self):
+        engine = self.engine
+        inverse_data = engine.inverse_thrust_data
+
+        # thrust increases with throttle at every flight condition
+        flight_conditions = np.column_stack((inverse_data[keys.MACH],
+                                             inverse_data[keys.ALTITUDE]))
+        same_condition = np.all(flight_conditions[1:] == flight_conditions[:-1], axis=1)
+        self.assertTrue(np.all(np.diff(inverse_data[keys.THRUST])[same_condition] > 0.))
+
+        # the inverse of the thrust table at the flight conditions in the data
+        thrust_table = engine.interp_tables['interpolation']['thrust_net_unscaled']
+        throttle_table = engine.interp_tables['inverse_thrust'][Dynamic.Mission.THROTTLE]
+        assert_near_equal(
+            thrust_table._interpolate(
+                np.column_stack((flight_conditions, inverse_data[keys.THROTTLE]))),
+            inverse_data[keys.THRUST], tolerance=1e-12)
+        assert_near_equal(
+            throttle_table._interpolate(
+                np.column_stack((flight_conditions, inverse_data[keys.THRUST]))),
+            inverse_data[keys.THROTTLE], tolerance=1e-12)
+
+    def test_newton_solution(self):
+        flight_conditions, num_data_points = self.get_flight_conditions(3)
+        nn = len(flight_conditions)
+        throttle = np.random.default_rng(1).uniform(0.6, 1.0, nn)
+
+        thrust_table = self.engine.interp_tables['interpolation']['thrust_net_unscaled']
+        required_thrust = self.num_engines * self.scale_factor * \
+            thrust_table._interpolate(np.column_stack((flight_conditions, throttle)))
+
+        results = {}
+        for use_lookup in (False, True):
+            prob = self.build_problem(flight_conditions, required_thrust, use_lookup)
+            prob.run_model()
+            results[use_lookup] = prob
+
+        newton, lookup = results[False], results[True]
+        assert_near_equal(newton.get_val(Dynamic.Mission.THROTTLE), throttle, 1e-8)
+        for name in (Dynamic.Mission.THROTTLE, Dynamic.Mission.THRUST,
+                     Dynamic.Mission.FUEL_FLOW_RATE_NEGATIVE):
+            assert_near_equal(lookup.get_val(name), newton.get_val(name), 1e-8)
+
+        # analytic partials, away from the kinks of the tables at the flight conditions
+        # in the data
+        points = slice(num_data_points, num_data_points + 12)
+        prob = self.build_problem(flight_conditions[points], required_thrust[points],
+                                  use_lookup=True)
+        prob.run_model()
+        partial_data = prob.check_partials(out_stream=None, method='cs',
+                                           includes=['*throttle_lookup*'])
+        assert_check_partials(partial_data, atol=1e-10, rtol=1e-8)
+
+    def test_throttle_limits(self):
+        flight_conditions = np.array([[0.5, 20000.], [0.5, 20000.], [0.8, 35000.]])
+        thrust_table = self.engine.interp_tables['interpolation']['thrust_net_unscaled']
+        max_thrust = self.num_engines * self.scale_factor * thrust_table._interpolate(
+            np.column_stack((flight_conditions, np.ones(3))))
+        required_thrust = max_thrust * np.array([1.2, 0.9, -1.])
+
+        results = {}
+        for use_lookup in (False, True):
+            prob = self.build_problem(flight_conditions, required_thrust, use_lookup)
+            prob.run_model()
+            results[use_lookup] = prob.get_val(Dynamic.Mission.THROTTLE)
+
+        assert_near_equal(results[True][[0, 2]], [1., 0.], 0.)
+        assert_near_equal(results[True], results[False], 1e-8)
+
+    def bench_test_throttle_lookup(self):
+        flight_conditions, _ = self.get_flight_conditions(20)
+        thrust_table = self.engine.interp_tables['interpolation']['thrust_net_unscaled']
+
+        print('\nnodes | Newton (ms) | lookup (ms)')
+        for nn in (1, 20, 200):
+            points = flight_conditions[:nn]
+            required_thrust = self.num_engines * self.scale_factor * \
+                thrust_table._interpolate(np.column_stack((points, np.full(nn, 0.8))))
+
+            timings = []
+            for use_lookup in (False, True):
+                prob = self.build_problem(points, required_thrust, use_lookup)
+                prob.run_model()
+
+                start = time.perf_counter()
+                for _ in range(20):
+                    prob.set_val(Dynamic.Mission.THROTTLE, np.ones(nn))
+                    prob.run_model()
+                timings.append((time.perf_counter() - start) * 50)
+
+            print(f'{nn:5d} | {timings[0]:11.2f} | {timings[1]:11.2f}')
+            self.assertLess(timings[1], timings[0])
+
+
+class DataCacheTest(unittest.TestCase):
+    def test_data_cache(self):
+        aviary_values = FLOPS_Test_Data['LargeSingleAisle2FLOPS']['inputs']
+        options = aviary_values.get_val('engine_models')[0].options.deepcopy()
+        reference_engine = EngineDeck('engine', options.deepcopy())
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            options.set_val(Aircraft.Engine.DATA_CACHE_DIR, cache_dir)
+            cold_engine = EngineDeck('engine', options.deepcopy())
+            cache_files = list(Path(cache_dir).glob('*.npz'))
+            self.assertEqual(len(cache_files), 1)
+
+            warm_engine = EngineDeck('engine', options.deepcopy())
+            # loading from cache must not rewrite the cache file
+            self.assertEqual(list(Path(cache_dir).glob('*')), cache_files)
+
+            # a change to an option affecting data processing needs a new cache file
+            options.set_val(Aircraft.Engine.FLIGHT_IDLE_THRUST_FRACTION, 0.05)
+            EngineDeck('engine', options.deepcopy())
+            self.assertEqual(len(list(Path(cache_dir).glob('*.npz'))), 2)
+
+        for engine in (cold_engine, warm_engine):
+            self.assertEqual(engine.engine_variables, reference_engine.engine_variables)
+            self.assertEqual(engine.model_length, reference_engine.model_length)
+            self.assertEqual(engine.throttle_max, reference_engine.throttle_max)
+            assert_near_equal(engine.data_indices, reference_engine.data_indices)
+            for key in reference_engine.data:
+                assert_near_equal(engine.data[key], reference_engine.data[key],
+                                  tolerance=0.)
+                assert_near_equal(engine.packed_data[key],
+                                  reference_engine.packed_data[key], tolerance=0.)
+            assert_near_equal(
+                engine.get_val(Aircraft.Engine.REFERENCE_SLS_THRUST, 'lbf'),
+                reference_engine.get_val(Aircraft.Engine.REFERENCE_SLS_THRUST, 'lbf'),
+                tolerance=0.)
+
+    def bench_test_data_cache(self):
+        options = AviaryValues()
+        options.set_val(Aircraft.Engine.DATA_FILE, 'models/engines/turbofan_28k.deck')
+        options.set_val(Aircraft.Engine.GENERATE_FLIGHT_IDLE, True)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            print('\ncache | EngineDeck construction (ms)')
+            timings = {}
+            for cache in ('none', 'cold', 'warm'):
+                if cache != 'none':
+                    options.set_val(Aircraft.Engine.DATA_CACHE_DIR, cache_dir)
+                start = time.perf_counter()
+                EngineDeck('engine', options.deepcopy())
+                timings[cache] = (time.perf_counter() - start) * 1000
+                print(f'{cache:>5} | {timings[cache]:28.1f}')
+
+        self.assertLess(timings['warm'], timings['none'])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,3 +1,4 @@
+import time
 import unittest
 
 import numpy as np
@@ -9,6 +10,8 @@ from dymos.models.atmosphere import USatm1976Comp
 from aviary.constants import TSLS_DEGR
 from aviary.variable_info.variables import Aircraft
 from aviary.subsystems.propulsion.propeller_performance import PropellerPerformance
+from aviary.subsystems.propulsion.hamilton_standard import HamiltonStandard
+import aviary.subsystems.propulsion.hamilton_standard as hs
 from aviary.variable_info.variables import Aircraft, Dynamic
 from aviary.variable_info.options import get_option_defaults
 
@@ -238,5 +241,424 @@ class PropellerPerformanceTest(unittest.TestCase):
         assert_check_partials(partial_data, atol=1.5e-3, rtol=1e-4)
 
 
+class LoopedHamiltonStandard(HamiltonStandard):
+    """
+    Node-by-node implementation of HamiltonStandard with finite difference partials,
+    which the vectorized version replaced. Diagnostic output has been removed. Used as
+    a reference for benchmarking.
+    """
+
+    def setup_partials(self):
+        self.declare_partials('*', '*', method='fd', form='forward')
+
+    def compute_partials(self, inputs, partials):
+        pass
+
+    def compute(self, inputs, outputs):
+        num_blades = self.options['aviary_options'].get_val(
+            Aircraft.Engine.NUM_PROPELLER_BLADES)
+        cli = inputs[Aircraft.Engine.PROPELLER_INTEGRATED_LIFT_COEFFICIENT][0]
+
+        for i_node in range(self.options['num_nodes']):
+            run_flag = 0
+            xft = 1.0
+            AF_adj_CP = np.zeros(7)  # AFCP: an AF adjustment of CP to be assigned
+            AF_adj_CT = np.zeros(7)  # AFCT: an AF adjustment of CT to be assigned
+            CTT = np.zeros(7)
+            BLL = np.zeros(7)
+            BLLL = np.zeros(7)
+            PXCLI = np.zeros(7)
+            XFFT = np.zeros(6)
+            CTG = np.zeros(11)
+            CTG1 = np.zeros(11)
+            TXCLI = np.zeros(6)
+            CTTT = np.zeros(4)
+            XXXFT = np.zeros(4)
+            J = inputs['advance_ratio'][i_node]
+            act_factor = inputs[Aircraft.Engine.PROPELLER_ACTIVITY_FACTOR][0]
+            for k in range(2):
+                AF_adj_CP[k], run_flag = hs._unint(
+                    hs.Act_Factor_arr, hs.AFCPC[k], act_factor)
+                AF_adj_CT[k], run_flag = hs._unint(
+                    hs.Act_Factor_arr, hs.AFCTC[k], act_factor)
+            for k in range(2, 7):
+                AF_adj_CP[k] = AF_adj_CP[1]
+                AF_adj_CT[k] = AF_adj_CT[1]
+            if (J <= 0.5):
+                AFCTE = 2.*J*(AF_adj_CT[1] - AF_adj_CT[0]) + AF_adj_CT[0]
+            else:
+                AFCTE = AF_adj_CT[1]
+
+            # bounding J (advance ratio) for setting up interpolation
+            if (J <= 1.0):
+                J_begin = 0
+                J_end = 3
+            elif (J <= 1.5):
+                J_begin = 1
+                J_end = 4
+            elif (J <= 2.0):
+                J_begin = 2
+                J_end = 5
+            else:
+                J_begin = 3
+                J_end = 6
+            J_slice = slice(J_begin, J_begin + 4)
+
+            CL_tab_idx_begin = 0  # NCLT
+            CL_tab_idx_end = 0  # NCLTT
+            # flag that given lift coeff (cli) does not fall on a node point of hs.CL_arr
+            CL_tab_idx_flg = 0  # NCL_flg
+            ifnd = 0
+            power_coefficient = inputs['power_coefficient'][i_node]
+            for ii in range(6):
+                cl_idx = ii
+                if (abs(cli - hs.CL_arr[ii]) <= 0.0009):
+                    ifnd = 1
+                    break
+            if (ifnd == 0):
+                if (cli <= 0.6):
+                    CL_tab_idx_begin = 0
+                    CL_tab_idx_end = 3
+                elif (cli <= 0.7):
+                    CL_tab_idx_begin = 1
+                    CL_tab_idx_end = 4
+                else:
+                    CL_tab_idx_begin = 2
+                    CL_tab_idx_end = 5
+            else:
+                CL_tab_idx_begin = cl_idx
+                CL_tab_idx_end = cl_idx
+                # flag that given lift coeff (cli) falls on a node point of hs.CL_arr
+                CL_tab_idx_flg = 1
+            CL_slice = slice(CL_tab_idx_begin, CL_tab_idx_begin + 4)
+
+            lmod = (num_blades % 2) + 1
+            if (lmod == 1):
+                nbb = 1
+                idx_blade = int(num_blades/2.0)
+                # even number of blades idx_blade = 1 if 2 blades;
+                #                       idx_blade = 2 if 4 blades;
+                #                       idx_blade = 3 if 6 blades;
+                #                       idx_blade = 4 if 8 blades.
+                idx_blade = idx_blade - 1
+            else:
+                nbb = 4
+                # odd number of blades
+                idx_blade = 0  # start from first blade
+
+            for ibb in range(nbb):
+                # nbb = 1 even number of blades. No interpolation needed
+                # nbb = 4 odd number of blades. So, interpolation done
+                #       using 4 sets of even J (advance ratio) interpolation
+                for kdx in range(J_begin, J_end+1):
+                    CP_Eff = power_coefficient*AF_adj_CP[kdx]
+                    PBL, run_flag = hs._unint(
+                        hs.CPEC, hs.BL_P_corr_table[idx_blade], CP_Eff)
+                    # PBL = number of blades correction for power_coefficient
+                    CPE1 = CP_Eff*PBL*hs.PF_CLI_arr[kdx]
+                    CL_tab_idx = CL_tab_idx_begin
+                    for kl in range(CL_tab_idx_begin, CL_tab_idx_end+1):
+                        CPE1X = CPE1
+                        if (CPE1 < hs.CP_CLi_table[CL_tab_idx][0]):
+                            CPE1X = hs.CP_CLi_table[CL_tab_idx][0]
+                        cli_len = hs.cli_arr_len[CL_tab_idx]
+                        PXCLI[kl], run_flag = hs._unint(
+                            hs.CP_CLi_table[CL_tab_idx][:cli_len], hs.XPCLI[CL_tab_idx],
+                            CPE1X)
+                        CL_tab_idx = CL_tab_idx+1
+                    if (CL_tab_idx_flg != 1):
+                        PCLI, run_flag = hs._unint(
+                            hs.CL_arr[CL_slice], PXCLI[CL_slice], cli)
+                    else:
+                        PCLI = PXCLI[CL_tab_idx_begin]
+                        # PCLI = CLI adjustment to power_coefficient
+                    CP_Eff = CP_Eff*PCLI  # the effective CP at baseline point for kdx
+                    ang_len = hs.ang_arr_len[kdx]
+                    # blade angle at baseline point for kdx
+                    BLL[kdx], run_flag = hs._unint(
+                        hs.CP_Angle_table[idx_blade][kdx][:ang_len],
+                        hs.Blade_angle_table[kdx], CP_Eff)
+                    try:
+                        # thrust coeff at baseline point for kdx
+                        CTT[kdx], run_flag = hs._unint(
+                            hs.Blade_angle_table[kdx],
+                            hs.CT_Angle_table[idx_blade][kdx][:ang_len], BLL[kdx])
+                    except IndexError:
+                        raise om.AnalysisError(
+                            "interp failed for CTT (thrust coefficient) in "
+                            "hamilton_standard.py")
+
+                BLLL[ibb], run_flag = hs._unint(
+                    hs.advance_ratio_array[J_slice], BLL[J_slice], J)
+                ang_blade = BLLL[ibb]
+                CTTT[ibb], run_flag = hs._unint(
+                    hs.advance_ratio_array[J_slice], CTT[J_slice], J)
+
+                # make extra correction. CTG is an "error" function, and the iteration
+                # (loop counter = "IL") tries to drive CTG/CT to 0
+                # ERR_CT = CTG1[il]/CTTT[ibb], where CTG1 =CT_Eff - CTTT(IBB).
+                CTG[0] = .100
+                CTG[1] = .200
+                TFCLII, run_flag = hs._unint(hs.advance_ratio_array, hs.TF_CLI_arr, J)
+                NCTG = 10
+                ifnd1 = 0
+                ifnd2 = 0
+                for il in range(NCTG):
+                    ct = CTG[il]
+                    CT_Eff = CTG[il]*AFCTE
+                    TBL, run_flag = hs._unint(
+                        hs.CTEC, hs.BL_T_corr_table[idx_blade], CT_Eff)
+                    # TBL = number of blades correction for thrust_coefficient
+                    CTE1 = CT_Eff*TBL*TFCLII
+                    CL_tab_idx = CL_tab_idx_begin
+                    for kl in range(CL_tab_idx_begin, CL_tab_idx_end+1):
+                        CTE1X = CTE1
+                        if (CTE1 < hs.CT_CLi_table[CL_tab_idx][0]):
+                            CTE1X = hs.CT_CLi_table[CL_tab_idx][0]
+                        cli_len = hs.cli_arr_len[CL_tab_idx]
+                        TXCLI[kl], run_flag = hs._unint(
+                            hs.CT_CLi_table[CL_tab_idx][:cli_len],
+                            hs.XTCLI[CL_tab_idx][:cli_len], CTE1X)
+                        if (J != 0.0):
+                            ZMCRT, run_flag = hs._unint(
+                                hs.advance_ratio_array2, hs.mach_corr_table[CL_tab_idx],
+                                J)
+                            DMN = inputs[Dynamic.Mission.MACH][i_node] - ZMCRT
+                        else:
+                            ZMCRT = hs.mach_tip_corr_arr[CL_tab_idx]
+                            DMN = inputs['tip_mach'][i_node] - ZMCRT
+                        XFFT[kl] = 1.0  # compressibility tip loss factor
+                        if (DMN > 0.0):
+                            CTE2 = CT_Eff*TXCLI[kl]*TBL
+                            XFFT[kl], run_flag = hs._biquad(
+                                hs.comp_mach_CT_arr, 1, DMN, CTE2)
+                        CL_tab_idx = CL_tab_idx + 1
+                    if (CL_tab_idx_flg != 1):
+                        TCLII, run_flag = hs._unint(
+                            hs.CL_arr[CL_slice], TXCLI[CL_slice], cli)
+                        xft, run_flag = hs._unint(
+                            hs.CL_arr[CL_slice], XFFT[CL_slice], cli)
+                    else:
+                        TCLII = TXCLI[CL_tab_idx_begin]
+                        xft = XFFT[CL_tab_idx_begin]
+                    ct = CTG[il]
+                    CT_Eff = CTG[il]*AFCTE*TCLII
+                    CTG1[il] = CT_Eff - CTTT[ibb]
+                    if (abs(CTG1[il]/CTTT[ibb]) < 0.001):
+                        ifnd1 = 1
+                        break
+                    if (il > 0):
+                        CTG[il+1] = -CTG1[il-1] * \
+                            (CTG[il] - CTG[il-1])/(CTG1[il] - CTG1[il-1]) + CTG[il-1]
+                        if (CTG[il+1] <= 0):
+                            ifnd2 = 1
+                            break
+
+                if (ifnd1 == 0 and ifnd2 == 0):
+                    raise ValueError(
+                        "Integrated design cl adjustment not working properly for ct "
+                        f"definition (ibb={ibb})")
+                if (ifnd1 == 0 and ifnd2 == 1):
+                    ct = 0.0
+                CTTT[ibb] = ct
+                XXXFT[ibb] = xft
+                idx_blade = idx_blade + 1
+
+            if (nbb != 1):
+                # interpolation by the number of blades if odd number
+                ang_blade, run_flag = hs._unint(
+                    hs.num_blades_arr, BLLL[:4], num_blades)
+                ct, run_flag = hs._unint(hs.num_blades_arr, CTTT, num_blades)
+                xft, run_flag = hs._unint(hs.num_blades_arr, XXXFT, num_blades)
+
+            outputs['blade_angle'][i_node] = ang_blade
+            outputs['thrust_coefficient'][i_node] = ct
+            outputs['comp_tip_loss_factor'][i_node] = xft
+
+
+class HamiltonStandardTest(unittest.TestCase):
+    def build_problem(self, num_nodes, num_blades, cli, seed=0,
+                      comp_class=HamiltonStandard):
+        options = get_option_defaults()
+        options.set_val(Aircraft.Engine.NUM_PROPELLER_BLADES, num_blades)
+
+        prob = om.Problem()
+        prob.model.add_subsystem(
+            'hamilton_standard',
+            comp_class(num_nodes=num_nodes, aviary_options=options),
+            promotes=['*'])
+        prob.setup(force_alloc_complex=True)
+
+        rng = np.random.default_rng(seed)
+        advance_ratio = rng.uniform(0.0, 2.5, num_nodes)
+        # include the boundaries of the advance ratio intervals
+        advance_ratio[:5] = [0.0, 0.5, 1.0, 1.5, 2.0]
+        prob.set_val('power_coefficient', rng.uniform(0.02, 0.15, num_nodes))
+        prob.set_val('advance_ratio', advance_ratio)
+        prob.set_val(Dynamic.Mission.MACH, rng.uniform(0.0, 0.6, num_nodes))
+        prob.set_val('tip_mach', rng.uniform(0.3, 0.9, num_nodes))
+        prob.set_val(Aircraft.Engine.PROPELLER_ACTIVITY_FACTOR, 150.0)
+        prob.set_val(Aircraft.Engine.PROPELLER_INTEGRATED_LIFT_COEFFICIENT, cli)
+
+        return prob
+
+    def test_vectorized(self):
+        # values of the node-by-node implementation that was vectorized
+        expected = {
+            (3, 0.65): {
+                'thrust_coefficient': [
+                    0.06383337169227386, 0.06223743159743626, 0.07743781538787749,
+                    0.07404757717936865, 0.08816226165275783, 0.011905662280020764],
+                'blade_angle': [
+                    1.7448926263917417, 12.048536344934314, 23.337706331490672,
+                    30.06094100546879, 32.93285702193317, 39.781785585253616],
+                'comp_tip_loss_factor': [
+                    0.9999999999999996, 0.9999999999999996, 0.9999999999999996,
+                    0.9950246328458607, 0.8859798562161889, 0.853890004478773],
+            },
+            (4, 0.5): {
+                'thrust_coefficient': [
+                    0.04259999999999996, 0.07662443878500269, 0.07955927555767925,
+                    0.0781060365123029, 0.09066964082957178, 0.025652316252455315],
+                'blade_angle': [
+                    0.0, 12.804690924222788, 23.41331034882607,
+                    30.130854283106107, 32.82760070415538, 40.549027596608994],
+                'comp_tip_loss_factor': [
+                    1.0, 1.0, 1.0, 1.0, 0.9262355928530818, 0.9219621920466964],
+            },
+        }
+
+        for (num_blades, cli), values in expected.items():
+            with self.subTest(num_blades=num_blades, cli=cli):
+                prob = self.build_problem(6, num_blades, cli)
+                prob.set_val('power_coefficient', [0.03, 0.06, 0.09, 0.12, 0.15, 0.1])
+                prob.set_val('advance_ratio', [0.0, 0.5, 1.0, 1.37, 1.5, 2.2])
+                prob.set_val(Dynamic.Mission.MACH, [0.0, 0.1, 0.2, 0.35, 0.45, 0.55])
+                prob.set_val('tip_mach', [0.3, 0.5, 0.6, 0.7, 0.8, 0.9])
+                prob.run_model()
+
+                for name, value in values.items():
+                    assert_near_equal(prob.get_val(name), value, 1e-12)
+
+                partial_data = prob.check_partials(
+                    out_stream=None, method='cs', compact_print=True)
+                assert_check_partials(partial_data, atol=1e-10, rtol=1e-10)
+
+    def bench_test_vectorized(self):
+        for num_nodes in (20, 100, 1000):
+            timings = {}
+            for comp_class in (LoopedHamiltonStandard, HamiltonStandard):
+                prob = self.build_problem(num_nodes, 4, 0.5, comp_class=comp_class)
+                prob.run_model()
+
+                start = time.perf_counter()
+                prob.model.run_solve_nonlinear()
+                compute_time = time.perf_counter() - start
+
+                # finite differencing the looped version over 1000 nodes takes
+                # more than ten minutes
+                partials_time = np.nan
+                if comp_class is HamiltonStandard or num_nodes <= 100:
+                    start = time.perf_counter()
+                    prob.model.run_linearize()
+                    partials_time = time.perf_counter() - start
+
+                timings[comp_class] = (compute_time, partials_time)
+                print(f'{comp_class.__name__}, num_nodes={num_nodes}: compute '
+                      f'{compute_time * 1e3:.1f} ms, '
+                      f'partials {partials_time * 1e3:.1f} ms')
+
+            if num_nodes <= 100:
+                self.assertLess(timings[HamiltonStandard][1],
+                                timings[LoopedHamiltonStandard][1])
+            else:
+                self.assertLess(timings[HamiltonStandard][0],
+                                timings[LoopedHamiltonStandard][0])
+
+
+class TableRoutineTest(unittest.TestCase):
+    """
+    Test the vectorized table routines against the scalar ones they were ported from
+    """
+
+    def sample_points(self, xa):
+        # every table point, the midpoints between them and points off both ends
+        xa = np.asarray(xa)
+        midpoints = 0.5 * (xa[1:] + xa[:-1])
+        span = xa[-1] - xa[0]
+        return np.unique(np.concatenate(
+            [xa, midpoints, [xa[0] - 0.1 * span, xa[-1] + 0.1 * span],
+             np.linspace(xa[0], xa[-1], 37)]))
+
+    def assert_unint_vec(self, xa, ya):
+        x = self.sample_points(xa)
+        y, dy_dx, lmt = hs._unint_vec(xa, ya, x)
+
+        for i, x_i in enumerate(x):
+            y_ref, lmt_ref = hs._unint(xa, ya, x_i)
+            self.assertEqual(y[i], y_ref)
+            self.assertEqual(lmt[i], lmt_ref)
+
+        # some tables are constant, so use an absolute tolerance on the slopes
+        y_cs, _, _ = hs._unint_vec(xa, ya, x + 1e-30j)
+        np.testing.assert_allclose(dy_dx, y_cs.imag / 1e-30, rtol=1e-12, atol=1e-12)
+
+        # away from the table points the slopes are smooth
+        step = 1e-7
+        x = 0.5 * (x[1:] + x[:-1])
+        x = x[np.min(np.abs(x[:, np.newaxis] - xa), axis=1) > 1e-5]
+        fd = [(hs._unint(xa, ya, x_i + step)[0] - hs._unint(xa, ya, x_i - step)[0])
+              / (2 * step) for x_i in x]
+        np.testing.assert_allclose(hs._unint_vec(xa, ya, x)[1], fd, rtol=1e-5, atol=1e-6)
+
+    def test_unint_vec_CPEC(self):
+        for table in hs.BL_P_corr_table:
+            self.assert_unint_vec(hs.CPEC, table)
+
+    def test_unint_vec_CTEC(self):
+        for table in hs.BL_T_corr_table:
+            self.assert_unint_vec(hs.CTEC, table)
+
+    def test_unint_vec_CP_CLi(self):
+        for kl, cli_len in enumerate(hs.cli_arr_len):
+            self.assert_unint_vec(hs.CP_CLi_table[kl][:cli_len], hs.XPCLI[kl])
+
+    def test_unint_vec_CT_CLi(self):
+        for kl, cli_len in enumerate(hs.cli_arr_len):
+            self.assert_unint_vec(
+                hs.CT_CLi_table[kl][:cli_len], hs.XTCLI[kl][:cli_len])
+
+    def test_unint_vec_tables_per_point(self):
+        xa = hs.CPEC
+        x = self.sample_points(xa)
+        ya = np.array([hs.BL_P_corr_table[i % 4] for i in range(x.size)])
+
+        y, dy_dx, lmt = hs._unint_vec(xa, ya, x)
+
+        for i, x_i in enumerate(x):
+            y_ref, lmt_ref = hs._unint(xa, ya[i], x_i)
+            self.assertEqual(y[i], y_ref)
+            self.assertEqual(lmt[i], lmt_ref)
+            self.assertEqual(dy_dx[i], hs._unint_vec(xa, ya[i], x_i)[1])
+
+    def test_biquad_vec(self):
+        T = hs.comp_mach_CT_arr
+        x, y = np.meshgrid(self.sample_points(T[3:12]), self.sample_points(T[12:24]))
+        x = x.ravel()
+        y = y.ravel()
+
+        z, dz_dx, dz_dy, lmt = hs._biquad_vec(T, 1, x, y)
+
+        for i in range(x.size):
+            z_ref, lmt_ref = hs._biquad(T, 1, x[i], y[i])
+            self.assertEqual(z[i], z_ref)
+            self.assertEqual(lmt[i], lmt_ref)
+
+        z_cs, _, _, _ = hs._biquad_vec(T, 1, x + 1e-30j, y)
+        np.testing.assert_allclose(dz_dx, z_cs.imag / 1e-30, rtol=1e-12, atol=1e-12)
+        z_cs, _, _, _ = hs._biquad_vec(T, 1, x, y + 1e-30j)
+        np.testing.assert_allclose(dz_dy, z_cs.imag / 1e-30, rtol=1e-12, atol=1e-12)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,158 @@
+import numpy as np
+import openmdao.api as om
+
+from aviary.utils.aviary_values import AviaryValues
+from aviary.variable_info.functions import add_aviary_input
+from aviary.variable_info.variables import Aircraft, Dynamic
+
+
+class ThrottleLookup(om.ExplicitComponent):
+    '''
+    Computes the throttle at which all engines of an engine model produce a required
+    total net thrust, without a solver (see EngineDeck.build_throttle_lookup).
+
+    The throttle is looked up from a table of throttle as a function of Mach, altitude
+    and unscaled net thrust, then refined at each node with Newton steps on the
+    engine's own thrust table, so that it matches the thrust table to round-off
+    instead of to the accuracy of the inverse table. Throttle is limited to between 0
+    and 1, the same bounds used by the thrust balance that this component replaces.
+    '''
+
+    def initialize(self):
+        self.options.declare('num_nodes', types=int)
+
+        self.options.declare(
+            'aviary_options', types=AviaryValues,
+            desc='collection of Aircraft/Mission specific options of the engine model')
+
+        self.options.declare(
+            'throttle_interp', recordable=False,
+            desc='InterpNDSemi table of throttle as a function of Mach number, altitude '
+                 '(ft) and unscaled net thrust of a single engine (lbf)')
+
+        self.options.declare(
+            'thrust_interp', recordable=False,
+            desc='InterpNDSemi table of unscaled net thrust of a single engine (lbf) as a '
+                 'function of Mach number, altitude (ft) and throttle')
+
+        self.options.declare(
+            'maxiter', types=int, default=10,
+            desc='maximum number of Newton steps taken from the looked up throttle')
+
+    def setup(self):
+        nn = self.options['num_nodes']
+
+        add_aviary_input(self, Aircraft.Engine.SCALE_FACTOR, val=1.0)
+
+        self.add_input(Dynamic.Mission.MACH, val=np.zeros(nn), units='unitless',
+                       desc='Current flight Mach number')
+        self.add_input(Dynamic.Mission.ALTITUDE, val=np.zeros(nn), units='ft',
+                       desc='Current flight altitude')
+        self.add_input('required_thrust', val=np.zeros(nn), units='lbf',
+                       desc='Net thrust required from all engines')
+
+        self.add_output(Dynamic.Mission.THROTTLE, val=np.ones(nn), units='unitless',
+                        desc='Engine throttle that produces the required thrust')
+
+    def setup_partials(self):
+        nn = self.options['num_nodes']
+        r = np.arange(nn)
+
+        self.declare_partials(
+            Dynamic.Mission.THROTTLE,
+            [Dynamic.Mission.MACH, Dynamic.Mission.ALTITUDE, 'required_thrust'],
+            rows=r, cols=r)
+        self.declare_partials(
+            Dynamic.Mission.THROTTLE, Aircraft.Engine.SCALE_FACTOR,
+            rows=r, cols=np.zeros(nn, dtype=int))
+
+    def _get_thrust_factor(self, inputs):
+        '''
+        Return the factor from required total thrust to unscaled thrust of one engine.
+        '''
+        options: AviaryValues = self.options['aviary_options']
+        num_engines = options.get_val(Aircraft.Engine.NUM_ENGINES)
+
+        # scale factor only applies if engine performance is scaled
+        if options.get_val(Aircraft.Engine.SCALE_PERFORMANCE):
+            return 1.0 / (num_engines * inputs[Aircraft.Engine.SCALE_FACTOR])
+
+        return 1.0 / num_engines
+
+    def _solve(self, flight_conditions, thrust):
+        '''
+        Return the throttle that produces the unscaled thrust at each flight condition,
+        the derivatives of the thrust table at that throttle, and which nodes are not
+        limited by the throttle bounds.
+        '''
+        thrust_interp = self.options['thrust_interp']
+
+        throttle = self.options['throttle_interp'].interpolate(
+            np.column_stack((flight_conditions, thrust)))
+        throttle = np.clip(throttle, 0.0, 1.0)
+
+        for _ in range(self.options['maxiter']):
+            table_thrust, dthrust = thrust_interp.interpolate(
+                np.column_stack((flight_conditions, throttle)), compute_derivative=True)
+
+            slope = dthrust[:, 2]
+            step = np.divide(table_thrust - thrust, slope, out=np.zeros_like(thrust),
+                             where=slope != 0.0)
+            new_throttle = np.clip(throttle - step, 0.0, 1.0)
+
+            converged = np.all(np.abs(new_throttle - throttle) <= 1e-14)
+            throttle = new_throttle
+
+            if converged:
+                break
+
+        _, dthrust = thrust_interp.interpolate(
+            np.column_stack((flight_conditions, throttle)), compute_derivative=True)
+
+        bounded = (throttle > 0.0) & (throttle < 1.0) & (dthrust[:, 2] != 0.0)
+
+        return throttle, dthrust, bounded
+
+    def compute(self, inputs, outputs):
+        flight_conditions = np.column_stack((inputs[Dynamic.Mission.MACH],
+                                             inputs[Dynamic.Mission.ALTITUDE]))
+        thrust = inputs['required_thrust'] * self._get_thrust_factor(inputs)
+
+        throttle, dthrust, bounded = self._solve(flight_conditions.real, thrust.real)
+
+        if np.iscomplexobj(thrust) or np.iscomplexobj(flight_conditions):
+            # one more Newton step, from the converged throttle, carries the complex
+            # perturbation of the inputs
+            table_thrust = self.options['thrust_interp'].interpolate(
+                np.column_stack((flight_conditions, throttle)))
+            slope = np.where(bounded, dthrust[:, 2], 1.0)
+            throttle = throttle - np.where(bounded, (table_thrust - thrust) / slope, 0.0)
+
+        outputs[Dynamic.Mission.THROTTLE] = throttle
+
+    def compute_partials(self, inputs, J):
+        options: AviaryValues = self.options['aviary_options']
+        flight_conditions = np.column_stack((inputs[Dynamic.Mission.MACH],
+                                             inputs[Dynamic.Mission.ALTITUDE]))
+        thrust_factor = self._get_thrust_factor(inputs)
+        thrust = inputs['required_thrust'] * thrust_factor
+
+        throttle, dthrust, bounded = self._solve(flight_conditions, thrust)
+
+        # implicit derivatives of thrust_table(mach, altitude, throttle) = thrust, which
+        # are zero where throttle is limited
+        dthrottle_dthrust = np.where(bounded, 1.0 / np.where(bounded, dthrust[:, 2], 1.0),
+                                     0.0)
+
+        J[Dynamic.Mission.THROTTLE, Dynamic.Mission.MACH] = \
+            -dthrust[:, 0] * dthrottle_dthrust
+        J[Dynamic.Mission.THROTTLE, Dynamic.Mission.ALTITUDE] = \
+            -dthrust[:, 1] * dthrottle_dthrust
+        J[Dynamic.Mission.THROTTLE, 'required_thrust'] = \
+            dthrottle_dthrust * thrust_factor
+
+        if options.get_val(Aircraft.Engine.SCALE_PERFORMANCE):
+            J[Dynamic.Mission.THROTTLE, Aircraft.Engine.SCALE_FACTOR] = \
+                -dthrottle_dthrust * thrust / inputs[Aircraft.Engine.SCALE_FACTOR]
+        else:
+            J[Dynamic.Mission.THROTTLE, Aircraft.Engine.SCALE_FACTOR] = 0.0
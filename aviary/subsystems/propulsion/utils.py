@@ -8,6 +8,7 @@ from enum import Enum, auto
 
 import numpy as np
 import openmdao.api as om
+from openmdao.components.interp_util.interp_semi import InterpNDSemi
 
 import aviary.constants as constants
 
@@ -104,6 +105,66 @@ def convert_geopotential_altitude(altitude):
     return altitude
 
 
+class SharedTableMetaModelComp(om.MetaModelSemiStructuredComp):
+    '''
+    MetaModelSemiStructuredComp that evaluates interpolation tables which have already
+    been built (for example by an EngineDeck) instead of generating new tables from its
+    training data during setup. The same tables can be shared by any number of
+    components, regardless of vec_size.
+
+    Training data must still be provided to add_input() and add_output(), but is only
+    stored by reference.
+    '''
+
+    def initialize(self):
+        super().initialize()
+        self.options.declare(
+            'interps', types=dict, recordable=False,
+            desc='Pre-built InterpNDSemi objects keyed by the name of the output they '
+                 'provide')
+
+    def _setup_var_data(self):
+        interps = self.options['interps']
+
+        for name in self.training_outputs:
+            try:
+                self.interps[name] = interps[name]
+            except KeyError:
+                raise KeyError(f'{self.msginfo}: No pre-built interpolation table was '
+                               f"provided for output '{name}'")
+
+        # skip MetaModelSemiStructuredComp's table generation
+        super(om.MetaModelSemiStructuredComp, self)._setup_var_data()
+
+
+def build_interpolation_table(training_inputs, training_output, method='slinear',
+                              extrapolate=True):
+    '''
+    Build a semi-structured interpolation table from flat training data, which can be
+    shared between any number of SharedTableMetaModelComp instances.
+
+    Parameters
+    ----------
+    training_inputs : list of numpy.ndarray
+        Training data for each independent variable, in the order the inputs are added
+        to the components that will use this table.
+    training_output : numpy.ndarray
+        Training data for the dependent variable.
+    method : str
+        Interpolation method, see om.MetaModelSemiStructuredComp.
+    extrapolate : bool
+        Whether extrapolation is allowed when evaluating the table.
+
+    Returns
+    -------
+    InterpNDSemi
+        The interpolation table.
+    '''
+    grid = np.array([col for col in training_inputs]).T
+
+    return InterpNDSemi(grid, training_output, method=method, extrapolate=extrapolate)
+
+
 class UncorrectData(om.Group):
     def initialize(self):
         self.options.declare(
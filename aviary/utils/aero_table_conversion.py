@@ -8,7 +8,7 @@ import numpy as np
 from enum import Enum
 from pathlib import Path
 
-from aviary.api import NamedValues
+from aviary.utils.named_values import NamedValues
 from aviary.utils.csv_data_file import write_data_file
 from aviary.utils.functions import get_path
 
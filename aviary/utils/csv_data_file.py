@@ -1,4 +1,5 @@
 import getpass
+import itertools
 import numpy as np
 import re
 import warnings
@@ -12,6 +13,10 @@ from aviary.utils.named_values import get_items, get_keys
 from aviary.utils.functions import get_path
 from aviary.utils.named_values import NamedValues
 
+# number of lines in the body of a data file that are converted to numbers at once,
+# which bounds the memory used for the text of large files
+_CHUNK_SIZE = 2**16
+
 
 def read_data_file(filename: (str, Path), metadata=None, aliases=None,
                    save_comments=False):
@@ -20,6 +25,9 @@ def read_data_file(filename: (str, Path), metadata=None, aliases=None,
     whitespace allowed between data entries. Spaces are not allowed in openMDAO
     variables, so any spaces in header entries are replaced with underscores.
 
+    Lines are read one at a time until the first line of numerical data. The rest of the
+    file is then read in chunks that are each converted to numbers at once.
+
     Parameters
     ----------
     filename : (str, Path)
@@ -161,11 +169,24 @@ def read_data_file(filename: (str, Path), metadata=None, aliases=None,
             # pull out data for each valid header, ignore other columns
             for idx, variable in enumerate(header.keys()):
                 # valid_indices matches dictionary order, pull data from correct column
-                raw_data[variable].append(line_data[valid_indices[idx]])
+                raw_data[variable].append(np.array([line_data[valid_indices[idx]]]))
+
+            # everything after the first line of numerical data is read in bulk
+            first_line = line_count + 1
+            while True:
+                lines = list(itertools.islice(file, _CHUNK_SIZE))
+                if not lines:
+                    break
+                chunk = _read_data_lines(lines, first_line, valid_indices, comments,
+                                         filepath)
+                for idx, variable in enumerate(header.keys()):
+                    raw_data[variable].append(chunk[:, idx])
+                first_line += len(lines)
 
     # store data in NamedValues object
     for variable in header.keys():
-        data.set_val(variable, val=np.array(raw_data[variable]), units=header[variable])
+        val = np.concatenate(raw_data[variable]) if raw_data[variable] else np.array([])
+        data.set_val(variable, val=val, units=header[variable])
 
     if save_comments:
         return data, comments
@@ -173,6 +194,59 @@ def read_data_file(filename: (str, Path), metadata=None, aliases=None,
         return data
 
 
+def _read_data_lines(lines, first_line, valid_indices, comments, filepath):
+    """
+    Convert lines of numerical data to an array with a column for each valid header
+    entry. Comments are stripped from the lines and added to comments.
+
+    The lines are converted with a single call to numpy.loadtxt. Lines it cannot handle,
+    such as rows with blank entries or a different number of entries, are converted one
+    at a time instead, so the result is always the same as reading the file line by
+    line.
+    """
+    text = ''.join(lines)
+
+    if '#' in text:
+        lines = list(lines)
+        for idx, line_data in enumerate(lines):
+            if '#' in line_data:
+                index = line_data.index('#')
+                comments.append(line_data[index+1:].strip())
+                lines[idx] = line_data[:index]
+
+    # ignore empty lines
+    data_lines = [line_data for line_data in lines if line_data.strip()]
+
+    if not data_lines:
+        return np.empty((0, len(valid_indices)))
+
+    if ';' in text:
+        data_lines = [line_data.replace(';', ',') for line_data in data_lines]
+
+    try:
+        chunk = np.loadtxt(data_lines, delimiter=',', comments=None, ndmin=2)
+        return chunk[:, valid_indices]
+    except (ValueError, IndexError):
+        pass
+
+    chunk = []
+    for line_count, line_data in enumerate(lines, first_line):
+        line_data = re.split(r'[;,]\s*', line_data.strip())
+
+        if line_data == ['']:
+            continue
+
+        try:
+            line_data = [float(var) for var in line_data if var != '']
+        except (ValueError):
+            raise ValueError(
+                f'Non-numerical value found in data file <{filepath}> on line '
+                f'{str(line_count)}')
+        chunk.append([line_data[index] for index in valid_indices])
+
+    return np.array(chunk).reshape(-1, len(valid_indices))
+
+
 def write_data_file(filename: (str, Path) = None, data: NamedValues = None,
                     comments: (str, list) = [], include_timestamp: bool = False):
     """
@@ -1,14 +1,13 @@
 import numpy as np
 import openmdao.api as om
 from pathlib import Path
-import pkg_resources
 
 from openmdao.utils.units import convert_units
 from aviary.utils.aviary_values import AviaryValues, get_keys
 from aviary.variable_info.enums import ProblemType, EquationsOfMotion, LegacyCode
 from aviary.variable_info.functions import add_aviary_output, add_aviary_input
 from aviary.variable_info.variable_meta_data import _MetaData
-from aviary.interface.download_models import get_model
+from aviary.interface.download_models import aviary_resource, get_model
 
 
 class Null:
@@ -348,8 +347,7 @@ def get_path(path: [str, Path], verbose: bool = False) -> Path:
     # If the path still doesn't exist, attempt to find it relative to the Aviary package.
     if not path.exists():
         # Determine the path relative to the Aviary package.
-        aviary_based_path = Path(
-            pkg_resources.resource_filename('aviary', original_path))
+        aviary_based_path = Path(aviary_resource(original_path))
         if verbose:
             print(
                 f"Unable to locate '{original_path}' as an absolute or relative path. Trying Aviary package path: {aviary_based_path}")
@@ -366,7 +364,7 @@ def get_path(path: [str, Path], verbose: bool = False) -> Path:
     # If the path still doesn't exist in any of the prioritized locations, raise an error.
     if not path.exists():
         raise FileNotFoundError(
-            f'File not found in absolute path: {original_path}, relative path:{Path.cwd() / path}, or Aviary-based path: {Path(pkg_resources.resource_filename("aviary", original_path))}'
+            f'File not found in absolute path: {original_path}, relative path:{Path.cwd() / path}, or Aviary-based path: {Path(aviary_resource(original_path))}'
         )
 
     # If verbose is True, print the path being used.
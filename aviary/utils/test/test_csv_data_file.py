@@ -1,9 +1,12 @@
+import time
 import unittest
 import warnings
+from unittest import mock
 
 from openmdao.utils.assert_utils import assert_near_equal
 from openmdao.utils.testing_utils import use_tempdirs
 
+import aviary.utils.csv_data_file as csv_data_file
 from aviary.utils.csv_data_file import write_data_file, read_data_file
 from aviary.utils.functions import get_path
 from aviary.utils.named_values import NamedValues, get_items, get_keys
@@ -80,6 +83,64 @@ class TestAviaryCSV(unittest.TestCase):
         if 'Real Var' not in get_keys(data):
             raise RuntimeError("'Real Var' is not in data read from csv")
 
+    def test_read_data_file_chunks(self):
+        contents = ['# comment 1\n',
+                    'x (ft), y (lbm), z\n',
+                    '1, 2, 3\n',
+                    '4; 5; 6 # comment 2\n',
+                    '\n',
+                    '7, 8, 9,\n',
+                    '10, 11, 12, 13\n',
+                    '  \n',
+                    '14,15,16\n']
+        with open('chunks.csv', 'w') as file:
+            file.writelines(contents)
+
+        # chunks that can be read in bulk and chunks that are read line by line must give
+        # the same result
+        for chunk_size in (1, 2, 3, 100):
+            with mock.patch.object(csv_data_file, '_CHUNK_SIZE', chunk_size):
+                data, comments = read_data_file('chunks.csv', save_comments=True)
+
+            self.assertEqual(comments, ['comment 1', 'comment 2'])
+            assert_near_equal(data.get_val('x', 'ft'), [1, 4, 7, 10, 14])
+            assert_near_equal(data.get_val('y', 'lbm'), [2, 5, 8, 11, 15])
+            assert_near_equal(data.get_val('z'), [3, 6, 9, 12, 16])
+
+        with open('chunks.csv', 'a') as file:
+            file.write('17, a, 19\n')
+
+        with self.assertRaises(ValueError) as cm:
+            read_data_file('chunks.csv')
+        self.assertIn('on line 9', str(cm.exception))
+
+    def bench_test_read_data_file(self):
+        print('\nfile | rows | read time (ms)')
+        decks = ['turbofan_22k', 'turbofan_23k_1', 'turbofan_24k_2', 'turbofan_28k',
+                 'turboprop_1120hp', 'turboprop_4465hp']
+        for deck in decks:
+            filename = get_path(f'models/engines/{deck}.deck')
+            start = time.perf_counter()
+            data = read_data_file(filename)
+            elapsed = (time.perf_counter() - start) * 1000
+            rows = len(data.get_item(next(iter(get_keys(data))))[0])
+            print(f'{deck} | {rows} | {elapsed:.1f}')
+
+        # large file made of many copies of the data in a shipped deck, read in chunks
+        with open(get_path('models/engines/turbofan_24k_2.deck')) as file:
+            lines = file.readlines()
+        header = next(idx for idx, line in enumerate(lines) if 'Mach' in line)
+        with open('large.deck', 'w') as file:
+            file.writelines(lines[:header + 1])
+            for _ in range(30):
+                file.writelines(lines[header + 1:])
+
+        start = time.perf_counter()
+        data = read_data_file('large.deck')
+        elapsed = (time.perf_counter() - start) * 1000
+        rows = len(data.get_item(next(iter(get_keys(data))))[0])
+        print(f'large.deck | {rows} | {elapsed:.1f}')
+
     def _compare_csv_results(self, data, comments):
         expected_data = self.data
 
@@ -0,0 +1,482 @@
+"""
+Performance regression harness for the Aviary benchmark cases.
+
+Each benchmark test is run in a separate process while the AviaryProblem build steps,
+setup, final_setup, run_model, run_driver and the driver's total derivative
+calculations are timed. The results can be saved as a JSON baseline, and later runs
+compared against it to find steps that have become slower or use more memory.
+"""
+import contextlib
+import datetime
+import functools
+import importlib
+import json
+import multiprocessing
+import os
+import pkgutil
+import platform
+import sys
+import traceback
+import unittest
+from collections import defaultdict
+from fnmatch import fnmatchcase
+from time import perf_counter
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import dymos
+import numpy as np
+import openmdao
+import openmdao.api as om
+from openmdao.core.driver import Driver
+
+import aviary
+from aviary.interface.methods_for_level2 import AviaryProblem
+
+# version of the layout of the baseline files
+BASELINE_FORMAT_VERSION = 1
+
+# test methods that are run by default, matching run_all_benchmarks and the
+# benchmark tests that are run as regular tests
+_benchmark_package = 'aviary.validation_cases.benchmark_tests'
+_benchmark_patterns = ('bench_test*', 'test_bench*')
+
+# (class, method, step name) of each timed call, in the order they are reported
+_timed_methods = [
+    (AviaryProblem, 'load_inputs', 'load_inputs'),
+    (AviaryProblem, 'check_and_preprocess_inputs', 'check_and_preprocess_inputs'),
+    (AviaryProblem, 'add_pre_mission_systems', 'add_pre_mission_systems'),
+    (AviaryProblem, 'add_phases', 'add_phases'),
+    (AviaryProblem, 'add_post_mission_systems', 'add_post_mission_systems'),
+    (AviaryProblem, 'link_phases', 'link_phases'),
+    (AviaryProblem, 'add_driver', 'add_driver'),
+    (AviaryProblem, 'add_design_variables', 'add_design_variables'),
+    (AviaryProblem, 'add_objective', 'add_objective'),
+    (AviaryProblem, 'setup', 'setup'),
+    (om.Problem, 'setup', 'setup'),
+    (AviaryProblem, 'set_initial_guesses', 'set_initial_guesses'),
+    (om.Problem, 'final_setup', 'final_setup'),
+    (om.Problem, 'run_model', 'run_model'),
+    (om.Problem, 'run_driver', 'run_driver'),
+    (Driver, '_compute_totals', 'derivatives'),
+]
+
+# steps that are part of another step, so their time is not removed from the caller
+_breakdown_steps = ('derivatives',)
+
+# metrics that are compared against the baseline, other than the step times
+_compared_metrics = ('total', 'time_per_iteration', 'peak_rss')
+
+
+class _StepTimer(object):
+    """
+    Accumulates the exclusive wall time of each timed step, so that the time of
+    final_setup is not also counted in run_driver.
+    """
+
+    def __init__(self):
+        self.times = defaultdict(float)
+        self.iterations = 0
+        self._stack = []
+
+    def wrap(self, step, method):
+        timer = self
+
+        @functools.wraps(method)
+        def timed(obj, *args, **kwargs):
+            # only the outermost call is timed, such as AviaryProblem.setup calling
+            # Problem.setup
+            if any(frame[0] == step for frame in timer._stack):
+                return method(obj, *args, **kwargs)
+
+            timer._stack.append([step, 0.])
+            start = perf_counter()
+            try:
+                return method(obj, *args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                _, nested = timer._stack.pop()
+
+                if step in _breakdown_steps:
+                    timer.times[step] += elapsed
+                else:
+                    timer.times[step] += elapsed - nested
+                    if timer._stack:
+                        timer._stack[-1][1] += elapsed
+
+                if step == 'run_driver':
+                    timer.iterations += obj.driver.iter_count
+
+        return timed
+
+    @contextlib.contextmanager
+    def installed(self):
+        """
+        Time the steps of every problem created inside this context.
+        """
+        originals = []
+        for cls, name, step in _timed_methods:
+            if name in cls.__dict__:
+                originals.append((cls, name, cls.__dict__[name]))
+                setattr(cls, name, self.wrap(step, cls.__dict__[name]))
+        try:
+            yield self
+        finally:
+            for cls, name, method in originals:
+                setattr(cls, name, method)
+
+
+def find_benchmark_cases(patterns=None):
+    """
+    Return the ids of the benchmark tests.
+
+    Parameters
+    ----------
+    patterns : list of str, optional
+        Glob patterns matched against the test ids. By default every bench_test* and
+        test_bench* method in the benchmark_tests package is returned.
+
+    Returns
+    -------
+    list of str
+        Test ids, such as
+        'aviary.validation_cases.benchmark_tests.test_bench_GwGm.ProblemPhaseTestCase.test_bench_GwGm'.
+    """
+    package = importlib.import_module(_benchmark_package)
+
+    cases = []
+    for module_info in pkgutil.iter_modules(package.__path__):
+        module = importlib.import_module(f'{_benchmark_package}.{module_info.name}')
+
+        for cls in vars(module).values():
+            if not (isinstance(cls, type) and issubclass(cls, unittest.TestCase)
+                    and cls.__module__ == module.__name__):
+                continue
+
+            cases.extend(
+                f'{module.__name__}.{cls.__qualname__}.{name}' for name in dir(cls)
+                if callable(getattr(cls, name))
+                and any(fnmatchcase(name, pattern) for pattern in _benchmark_patterns))
+
+    if patterns:
+        cases = [case for case in cases
+                 if any(fnmatchcase(case, f'*{pattern}*') for pattern in patterns)]
+
+    return cases
+
+
+def run_benchmark_case(case, timeout=None, log_filename=None):
+    """
+    Run a single benchmark test in a separate process and time it.
+
+    Parameters
+    ----------
+    case : str
+        Id of the test, as given by find_benchmark_cases.
+    timeout : float, optional
+        Time in seconds after which the test is terminated.
+    log_filename : str, optional
+        File that the printed output of the test is written to. By default it is
+        discarded.
+
+    Returns
+    -------
+    dict
+        The status of the test ('success', 'failed', 'error', 'skipped' or 'timeout'),
+        any error message, the total time and the time of each step in seconds, the
+        number of driver iterations and the time per iteration, and the peak resident
+        memory of the process in MB.
+    """
+    context = multiprocessing.get_context()
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_case, args=(case, log_filename, sender))
+    process.start()
+    sender.close()
+
+    result = None
+    if receiver.poll(timeout):
+        try:
+            result = receiver.recv()
+        except EOFError:
+            pass
+
+    if result is None:
+        if process.is_alive():
+            process.terminate()
+            result = _case_result('timeout', f'timed out after {timeout} s')
+        else:
+            result = _case_result('error',
+                                  f'process exited with code {process.exitcode}')
+
+    process.join()
+    receiver.close()
+
+    return result
+
+
+def _case_result(status, message=''):
+    return {'status': status, 'message': message, 'total': None, 'steps': {},
+            'driver_iterations': 0, 'time_per_iteration': None, 'peak_rss': None}
+
+
+def _run_case(case, log_filename, connection):
+    timer = _StepTimer()
+    result = _case_result('error')
+
+    try:
+        test = unittest.TestLoader().loadTestsFromName(case)
+        test_result = unittest.TestResult()
+
+        with open(log_filename or os.devnull, 'w') as log, \
+                contextlib.redirect_stdout(log), contextlib.redirect_stderr(log), \
+                timer.installed():
+            start = perf_counter()
+            test.run(test_result)
+            result['total'] = perf_counter() - start
+
+        if test_result.errors:
+            result['status'] = 'error'
+            result['message'] = test_result.errors[0][1]
+        elif test_result.failures:
+            result['status'] = 'failed'
+            result['message'] = test_result.failures[0][1]
+        elif test_result.skipped:
+            result['status'] = 'skipped'
+            result['message'] = test_result.skipped[0][1]
+        else:
+            result['status'] = 'success'
+
+    except Exception:
+        result['message'] = traceback.format_exc()
+
+    steps = {step: timer.times[step] for _, _, step in _timed_methods
+             if step in timer.times}
+    result['steps'] = steps
+    result['driver_iterations'] = timer.iterations
+    if timer.iterations:
+        result['time_per_iteration'] = steps['run_driver'] / timer.iterations
+
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kB on linux, bytes on macOS
+        result['peak_rss'] = peak_rss / (1024.**2 if sys.platform == 'darwin' else 1024.)
+
+    connection.send(result)
+    connection.close()
+
+
+def run_performance_benchmarks(cases=None, repeat=1, timeout=None, log_dir=None):
+    """
+    Run and time the benchmark tests.
+
+    Parameters
+    ----------
+    cases : list of str, optional
+        Ids of the tests to run, defaults to every benchmark found by
+        find_benchmark_cases.
+    repeat : int, optional
+        Number of times each test is run. The smallest of each timing is kept, which
+        reduces the noise from other activity on the machine.
+    timeout : float, optional
+        Time in seconds after which a single run of a test is terminated.
+    log_dir : str, optional
+        Directory that the printed output of each test is written to. By default it
+        is discarded.
+
+    Returns
+    -------
+    dict
+        The results, in the layout of the baseline files: the format version, the
+        versions of Aviary and its main dependencies, the platform, and the results of
+        each case (see run_benchmark_case).
+    """
+    if cases is None:
+        cases = find_benchmark_cases()
+
+    if log_dir is not None:
+        os.makedirs(log_dir, exist_ok=True)
+
+    results = {}
+    for case in cases:
+        runs = []
+        for idx in range(repeat):
+            log_filename = None
+            if log_dir is not None:
+                log_filename = os.path.join(log_dir, f'{case}.{idx}.log')
+
+            runs.append(run_benchmark_case(case, timeout=timeout,
+                                           log_filename=log_filename))
+
+            if runs[-1]['status'] != 'success':
+                break
+
+        results[case] = _fastest_run(runs)
+
+    return {
+        'format_version': BASELINE_FORMAT_VERSION,
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'versions': {
+            'aviary': aviary.__version__,
+            'openmdao': openmdao.__version__,
+            'dymos': dymos.__version__,
+            'numpy': np.__version__,
+            'python': platform.python_version(),
+        },
+        'platform': platform.platform(),
+        'cases': results,
+    }
+
+
+def _fastest_run(runs):
+    if runs[-1]['status'] != 'success':
+        return runs[-1]
+
+    result = dict(runs[0])
+    result['steps'] = {step: min(run['steps'][step] for run in runs)
+                       for step in runs[0]['steps']}
+    for name in _compared_metrics:
+        values = [run[name] for run in runs if run[name] is not None]
+        result[name] = min(values) if values else None
+
+    return result
+
+
+def write_baseline(results, filename):
+    """
+    Write benchmark results to a JSON baseline file.
+    """
+    with open(filename, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_baseline(filename):
+    """
+    Read a JSON baseline file written by write_baseline.
+    """
+    with open(filename) as f:
+        baseline = json.load(f)
+
+    version = baseline.get('format_version')
+    if version != BASELINE_FORMAT_VERSION:
+        raise ValueError(
+            f'{filename} has baseline format version {version}, but version '
+            f'{BASELINE_FORMAT_VERSION} is required; regenerate the baseline')
+
+    return baseline
+
+
+def compare_to_baseline(results, baseline, threshold=0.2, min_time=0.05, min_rss=10.):
+    """
+    Find the timings and memory use that have grown beyond a threshold.
+
+    Only cases that succeeded in both the results and the baseline are compared.
+
+    Parameters
+    ----------
+    results : dict
+        Results from run_performance_benchmarks.
+    baseline : dict
+        Baseline results, in the same layout.
+    threshold : float, optional
+        Allowed relative increase of each metric, defaults to 20%.
+    min_time : float, optional
+        Increases of times smaller than this (in seconds) are ignored as noise.
+    min_rss : float, optional
+        Increases of the peak memory smaller than this (in MB) are ignored.
+
+    Returns
+    -------
+    list of dict
+        One entry for each regression, with the case, the metric ('steps:<name>'
+        for the time of a step), the baseline and current values, and the relative
+        change.
+    """
+    regressions = []
+
+    for case, result in results['cases'].items():
+        expected = baseline['cases'].get(case)
+
+        if expected is None or result['status'] != 'success' or \
+                expected['status'] != 'success':
+            continue
+
+        metrics = [(f'steps:{step}', result['steps'][step], expected['steps'].get(step))
+                   for step in result['steps']]
+        metrics.extend((name, result[name], expected.get(name))
+                       for name in _compared_metrics)
+
+        for metric, current, old in metrics:
+            if current is None or old is None:
+                continue
+
+            tolerance = min_rss if metric == 'peak_rss' else min_time
+
+            if current > old * (1. + threshold) and current - old > tolerance:
+                regressions.append({
+                    'case': case,
+                    'metric': metric,
+                    'baseline': old,
+                    'current': current,
+                    'change': (current - old) / old if old else float('inf'),
+                })
+
+    return regressions
+
+
+def _setup_performance_parser(parser):
+    parser.add_argument(
+        'cases', nargs='*',
+        help='Patterns that select the benchmark tests to run, defaults to all of them')
+    parser.add_argument(
+        '-o', '--output', default='benchmark_performance.json',
+        help='JSON file that the results are written to; it can be used as the '
+             'baseline of later runs')
+    parser.add_argument(
+        '--baseline', default=None,
+        help='JSON file with the results of an earlier run to compare against')
+    parser.add_argument(
+        '--threshold', type=float, default=0.2,
+        help='Allowed relative increase of each timing and of the peak memory')
+    parser.add_argument(
+        '--repeat', type=int, default=1,
+        help='Number of times each test is run; the smallest timings are kept')
+    parser.add_argument(
+        '--timeout', type=float, default=None,
+        help='Time in seconds after which a test is terminated')
+    parser.add_argument(
+        '--log_dir', default=None,
+        help='Directory that the printed output of each test is written to')
+
+
+def _exec_performance(args):
+    cases = find_benchmark_cases(args.cases)
+
+    results = run_performance_benchmarks(cases, repeat=args.repeat,
+                                         timeout=args.timeout, log_dir=args.log_dir)
+    write_baseline(results, args.output)
+
+    for case, result in results['cases'].items():
+        steps = ', '.join(f'{step} {time:.2f}' for step, time in result['steps'].items())
+        total = 'n/a' if result['total'] is None else f'{result["total"]:.2f} s'
+        print(f'{case}: {result["status"]} ({total})')
+        if steps:
+            print(f'    {steps}')
+
+    if args.baseline is None:
+        return 0
+
+    regressions = compare_to_baseline(results, load_baseline(args.baseline),
+                                      threshold=args.threshold)
+
+    for regression in regressions:
+        print(f'REGRESSION {regression["case"]} {regression["metric"]}: '
+              f'{regression["baseline"]:.3f} -> {regression["current"]:.3f} '
+              f'(+{100 * regression["change"]:.0f}%)')
+
+    if not regressions:
+        print('No performance regressions found.')
+
+    return 1 if regressions else 0
@@ -0,0 +1,116 @@
+from copy import deepcopy
+import os
+import unittest
+
+import openmdao.api as om
+from openmdao.utils.testing_utils import use_tempdirs
+
+from aviary.interface.default_phase_info.height_energy import phase_info
+from aviary.interface.methods_for_level2 import AviaryProblem
+from aviary.validation_cases.benchmark_performance import compare_to_baseline, \
+    find_benchmark_cases, load_baseline, run_performance_benchmarks, write_baseline
+
+
+class TinyBenchmark(unittest.TestCase):
+    """
+    A small case used to exercise the harness. Its name does not match the benchmark
+    patterns, so it is not collected as a benchmark itself.
+    """
+
+    def run_paraboloid(self):
+        AviaryProblem().load_inputs('models/test_aircraft/aircraft_for_bench_FwFm.csv',
+                                    deepcopy(phase_info))
+
+        prob = om.Problem()
+        prob.model.add_subsystem(
+            'paraboloid', om.ExecComp('f = (x - 3.)**2 + x * y + (y + 4.)**2 - 3.'),
+            promotes=['*'])
+        prob.model.add_design_var('x', lower=-50., upper=50.)
+        prob.model.add_design_var('y', lower=-50., upper=50.)
+        prob.model.add_objective('f')
+        prob.driver = om.ScipyOptimizeDriver(optimizer='SLSQP', disp=False)
+
+        prob.setup()
+        prob.run_driver()
+
+
+def _result(steps, status='success', **kwargs):
+    result = {'status': status, 'message': '', 'total': sum(steps.values()),
+              'steps': steps, 'driver_iterations': 1, 'time_per_iteration': 1.,
+              'peak_rss': 500.}
+    result.update(kwargs)
+    return result
+
+
+@use_tempdirs
+class BenchmarkPerformanceTest(unittest.TestCase):
+    def test_find_benchmark_cases(self):
+        cases = find_benchmark_cases()
+
+        self.assertIn('aviary.validation_cases.benchmark_tests.test_bench_GwGm.'
+                      'ProblemPhaseTestCase.test_bench_GwGm', cases)
+        self.assertIn('aviary.validation_cases.benchmark_tests.'
+                      'test_FLOPS_balanced_field_length.TestFLOPSBalancedFieldLength.'
+                      'bench_test_SNOPT', cases)
+
+        cases = find_benchmark_cases(['FwFm'])
+        self.assertTrue(cases)
+        self.assertTrue(all('FwFm' in case for case in cases))
+
+    def test_run_benchmarks(self):
+        case = f'{__name__}.TinyBenchmark.run_paraboloid'
+        results = run_performance_benchmarks([case], repeat=2, log_dir='logs')
+
+        result = results['cases'][case]
+        self.assertEqual(result['status'], 'success', result['message'])
+        self.assertTrue(os.path.isfile(os.path.join('logs', f'{case}.1.log')))
+
+        steps = result['steps']
+        for step in ('load_inputs', 'setup', 'final_setup', 'run_driver', 'derivatives'):
+            self.assertGreater(steps[step], 0.)
+
+        # the steps are timed exclusively, apart from the derivatives
+        self.assertLess(sum(steps.values()) - steps['derivatives'], result['total'])
+        self.assertLess(steps['derivatives'], steps['run_driver'])
+        self.assertGreater(result['driver_iterations'], 0)
+        self.assertGreater(result['peak_rss'], 0.)
+
+        write_baseline(results, 'baseline.json')
+        baseline = load_baseline('baseline.json')
+        self.assertEqual(compare_to_baseline(results, baseline), [])
+
+    def test_compare_to_baseline(self):
+        baseline = {'cases': {
+            'a': _result({'setup': 1., 'run_driver': 10.}),
+            'b': _result({'setup': 1.}),
+            'c': _result({'setup': 1.}, status='skipped'),
+        }}
+        results = {'cases': {
+            # setup is too slow, and run_driver and the total are within the threshold
+            'a': _result({'setup': 1.5, 'run_driver': 11.}),
+            # larger relative change, but within the noise
+            'b': _result({'setup': 1.04}, peak_rss=505.),
+            'c': _result({'setup': 5.}),
+            'd': _result({'setup': 5.}),
+        }}
+
+        regressions = compare_to_baseline(results, baseline, threshold=0.2)
+
+        self.assertEqual([(item['case'], item['metric']) for item in regressions],
+                         [('a', 'steps:setup')])
+        self.assertAlmostEqual(regressions[0]['change'], 0.5)
+
+        results['cases']['b']['peak_rss'] = 700.
+        regressions = compare_to_baseline(results, baseline, threshold=0.2)
+        self.assertIn(('b', 'peak_rss'),
+                      [(item['case'], item['metric']) for item in regressions])
+
+    def test_baseline_version(self):
+        write_baseline({'format_version': 0, 'cases': {}}, 'old.json')
+
+        with self.assertRaises(ValueError):
+            load_baseline('old.json')
+
+
+if __name__ == '__main__':
+    unittest.main()
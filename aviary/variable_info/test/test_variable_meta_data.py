@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from openmdao.utils.testing_utils import use_tempdirs
+
+import aviary
+from aviary.variable_info import variable_meta_data
+from aviary.variable_info.core_meta_data import _MetaData
+
+
+@use_tempdirs
+class MetaDataSnapshotTest(unittest.TestCase):
+    def test_meta_data(self):
+        # other tests add variables to the module level CoreMetaData, so the meta data
+        # is compared in a fresh copy
+        meta_data, core_meta_data = variable_meta_data._build_meta_data()
+        self.assertEqual(meta_data, _MetaData)
+        self.assertEqual(core_meta_data, _MetaData)
+        self.assertIsNot(core_meta_data, meta_data)
+        self.assertIsNot(variable_meta_data.CoreMetaData, variable_meta_data._MetaData)
+
+    def test_snapshot(self):
+        snapshot_file = Path('snapshot.pickle')
+        key = variable_meta_data._get_snapshot_key()
+
+        with mock.patch.object(variable_meta_data, '_snapshot_file', snapshot_file):
+            meta_data, core_meta_data = variable_meta_data._build_meta_data()
+            self.assertTrue(snapshot_file.is_file())
+            self.assertEqual(meta_data, _MetaData)
+            self.assertEqual(core_meta_data, _MetaData)
+
+            # loaded from the snapshot
+            meta_data, core_meta_data = variable_meta_data._build_meta_data()
+            self.assertIsNot(meta_data, _MetaData)
+            self.assertEqual(meta_data, _MetaData)
+            self.assertIsNot(core_meta_data, meta_data)
+            self.assertEqual(core_meta_data, _MetaData)
+
+            self.assertIsNotNone(variable_meta_data._load_snapshot(key))
+
+            # a source file has changed
+            stale_key = key[:-1] + [(key[-1][0], key[-1][1] + 1, key[-1][2])]
+            self.assertIsNone(variable_meta_data._load_snapshot(stale_key))
+
+            snapshot_file.write_bytes(b'corrupt')
+            self.assertIsNone(variable_meta_data._load_snapshot(key))
+
+    def bench_test_import_time(self):
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+            [str(Path(aviary.__file__).parents[1]), env.get('PYTHONPATH', '')])
+        cmd = [sys.executable, '-c', 'import aviary.variable_info.variable_meta_data']
+
+        # make sure the snapshot is up to date
+        subprocess.run(cmd, env=env, check=True)
+
+        print('\nsnapshot | import time (ms)')
+        for use_snapshot in (False, True):
+            if use_snapshot:
+                env.pop('AVIARY_NO_METADATA_SNAPSHOT', None)
+            else:
+                env['AVIARY_NO_METADATA_SNAPSHOT'] = '1'
+
+            times = []
+            for _ in range(5):
+                start = time.perf_counter()
+                subprocess.run(cmd, env=env, check=True)
+                times.append(time.perf_counter() - start)
+
+            print(f'{str(use_snapshot):8} | {1e3 * min(times):.0f}')
+
+
+if __name__ == '__main__':
+    unittest.main()
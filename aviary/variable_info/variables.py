@@ -200,6 +200,7 @@ class Aircraft:
         CONSTANT_FUEL_CONSUMPTION = 'aircraft:engine:constant_fuel_consumption'
         CONTROLS_MASS = 'aircraft:engine:controls_mass'
 
+        DATA_CACHE_DIR = 'aircraft:engine:data_cache_dir'
         DATA_FILE = 'aircraft:engine:data_file'
         FLIGHT_IDLE_MAX_FRACTION = 'aircraft:engine:flight_idle_max_fraction'
         FLIGHT_IDLE_MIN_FRACTION = 'aircraft:engine:flight_idle_min_fraction'
@@ -222,6 +223,8 @@ class Aircraft:
         POD_MASS = 'aircraft:engine:pod_mass'
         POD_MASS_SCALER = 'aircraft:engine:pod_mass_scaler'
         POSITION_FACTOR = 'aircraft:engine:position_factor'
+        PRECOMPUTE_INVERSE_THRUST = 'aircraft:engine:precompute_inverse_thrust'
+        PRECOMPUTE_MAX_THRUST = 'aircraft:engine:precompute_max_thrust'
         PROPELLER_ACTIVITY_FACTOR = 'aircraft:engine:propeller_activity_factor'
         PROPELLER_DIAMETER = 'aircraft:engine:propeller_diameter'
         PROPELLER_INTEGRATED_LIFT_COEFFICIENT = 'aircraft:engine:propeller_integrated_lift_coefficient'